@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Podpowiedzi polityki: tabela z solve na pełnym grafie Aktu I, sprawdzona na powtórce
+z replays/ - skróty stanów w grze muszą trafiać w skróty z eksploracji."""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import thalanor_analysis as A
+import thalanor_replay as R
+import thalanor_v1_9 as T
+
+# Grubsze przedziały niż STATE_STEPS - ten sam Akt I, kilka razy mniej stanów
+STEPS = {"experience": 100, "current_hp": 4, "silver": 5}
+
+
+@pytest.fixture(scope="module")
+def advisor_path(tmp_path_factory):
+    ex = A.Explorer(T, steps=STEPS).run()
+    assert not ex.truncated
+    V, policy, _ = A.solve_values(ex)
+    assert A._tree_value(ex.root, V, "survival") > 0
+    path = str(tmp_path_factory.mktemp("advisor") / "advisor.json")
+    A.write_advisor(ex, policy, "survival", path)
+    return path
+
+
+def test_replay_gets_hints(advisor_path):
+    T.enable_advisor(T.Advisor.load(advisor_path))
+    try:
+        out = R.replay(T, R.load_transcript(os.path.join(ROOT, "replays", "act1_complete.json"))).output()
+    finally:
+        T.enable_advisor(None)
+    assert any(T.tr("ui.advisor_hint", choice=i) in out for i in range(1, 10))
+
+
+def test_truncated_exploration_writes_no_advisor(tmp_path):
+    ex = A.Explorer(T, max_states=100).run()
+    assert ex.truncated
+    V, policy, _ = A.solve_values(ex)
+    with pytest.raises(ValueError):
+        A.write_advisor(ex, policy, "survival", str(tmp_path / "advisor.json"))
+    assert not os.path.exists(tmp_path / "advisor.json")
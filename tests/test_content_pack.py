@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Walidacja paczek treści: każdy błąd kształtu albo sygnatury efektu to ContentError
+przy kompilacji, nie wyjątek w pierwszej sesji, która trafi na zły wybór."""
+
+import copy
+import inspect
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import thalanor_v1_9 as T
+
+
+def pack(effects=None, requirements=None, **extra):
+    choice = {"text": "c", "next_scene": None}
+    if effects is not None:
+        choice["effects"] = effects
+    if requirements is not None:
+        choice["requirements"] = requirements
+    data = {"items": [{"item_id": "stick", "item_type": "weapon", "damage": 1}],
+            "scenes": [{"scene_id": "s", "choices": [choice]}]}
+    data.update(extra)
+    return data
+
+
+def test_act1_compiles():
+    with open(os.path.join(ROOT, "content", "act1.json"), encoding="utf-8") as f:
+        scenes, items, _, _ = T.ContentPack.compile(json.load(f))
+    assert scenes and items
+
+
+def test_effect_table_matches_factories():
+    # Liczba argumentów w EFFECT_ARGS zgodna z fabrykami efektów w Game
+    assert set(T.EFFECT_ARGS) == set(T.EFFECT_VOCABULARY)
+    for name, factory in T.EFFECT_VOCABULARY.items():
+        params = inspect.signature(getattr(T.Game, factory)).parameters.values()
+        kinds, required = T.EFFECT_ARGS[name]
+        assert len(kinds) == len(params), name
+        assert required == sum(p.default is inspect.Parameter.empty for p in params), name
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"items": {"stick": {}}},
+    {"items": ["x"]},
+    {"items": [{"item_id": "a", "item_type": "weapon", "damage": "lots"}]},
+    {"merchants": [{"merchant_id": "m", "stock": [["stick", 1]]}]},
+    {"merchants": [{"merchant_id": "m", "buys": "weapon"}]},
+    {"merchants": [{"merchant_id": "m", "stock": {"stick": True}}]},
+    {"scenes": {"s": {}}},
+    {"scenes": ["s"]},
+    {"scenes": [{"scene_id": "s", "choices": ["c"]}]},
+    {"scenes": [{"scene_id": "s", "replaces": "old"}]},
+    pack(requirements=[]),
+    pack(requirements={"strength": "2"}),
+    pack(requirements={"flag": ["a", "b", "c"]}),
+    pack(requirements={"has_item": 3}),
+    pack(effects=[["exp"]]),
+    pack(effects=[["exp", 1, 2]]),
+    pack(effects=[["exp", "10"]]),
+    pack(effects=[["hp", True]]),
+    pack(effects=[["stat", "strength", "x"]]),
+    pack(effects=[["stat", "charisma", 1]]),
+    pack(effects=[["flag", "a", [1]]]),
+    pack(effects=[["pick_stat"]]),
+    pack(effects=[["mglak_escape_roll", "dexterity", "ok"]]),
+    pack(effects=[["equip_first_weapon", 1]]),
+    pack(effects=[[]]),
+    pack(effects=[[1]]),
+    pack(effects=["exp"]),
+])
+def test_malformed_pack_is_content_error(data):
+    with pytest.raises(T.ContentError):
+        T.ContentPack.compile(copy.deepcopy(data))
+
+
+def test_optional_effect_arguments():
+    scenes, _, _, _ = T.ContentPack.compile(pack(effects=[["flag", "a"], ["stat", "strength", 1, None],
+                                                          ["stat", "vitality", 1, 5]]))
+    assert scenes[0][-1][0][3] == (("flag", "a"), ("stat", "strength", 1, None), ("stat", "vitality", 1, 5))
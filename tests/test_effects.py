@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""Kod bajtowy efektów: assemble/disassemble się odwracają, a każdy efekt słownika paczek
+(też zagnieżdżone fx_if) zmienia stan i wypisuje to samo, co dawne efekty-funkcje."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import thalanor_v1_9 as T
+
+# Wyjście efektów wzorcowych do bufora sesji, jak print silnika
+print = T._session_print
+
+
+# Efekty w dawnej postaci - funkcja fn(game) na każdy efekt; rzuty z RNG sesji i ze
+# statystyk pochodnych, jak w interpreterze
+def _roll(ch, stat, base, per):
+    chance = base + ((getattr(ch.derived, stat, 1) - 1) * per if stat is not None else 0)
+    return T.rng().randint(1, 100) <= chance
+
+
+def ref_stat(game, stat, delta, cap=None):
+    ch = game.character
+    newv = getattr(ch, stat) + delta
+    if cap is not None:
+        newv = min(newv, cap)
+    setattr(ch, stat, newv)
+    print(f"  {'+' if delta > 0 else ''}{delta} {T.tr('stat.' + stat)}")
+    if stat == "vitality" and delta > 0:
+        ch.max_hp += 2 * delta
+        ch.current_hp = min(ch.max_hp, ch.current_hp + 2 * delta)
+        print(T.tr("fx.max_hp_up", n=2 * delta, max_hp=ch.max_hp))
+
+
+def ref_add_item(game, item_id):
+    it = game.items_db[item_id]
+    if game.character.inventory.add_item(T.ItemInstance(it)):
+        print(T.tr("fx.item_received", item=T.tr(it.name)))
+    else:
+        print(T.tr("fx.backpack_full"))
+
+
+def ref_equip(game):
+    ch = game.character
+    stack = ch.inventory.first_of_type("weapon")
+    if not stack:
+        print(T.tr("fx.no_weapon"))
+        return
+    it = ch.inventory.take(stack)
+    old = ch.equipment.equip(it)
+    print(T.tr("fx.weapon_equipped", item=T.tr(it.name)))
+    if old:
+        ch.inventory.add_item(old)
+
+
+def ref_bandage(game):
+    ch = game.character
+    if ch.inventory.remove_item("bandage"):
+        ch.heal(2)
+        print(T.tr("fx.bandage_used"))
+    elif ch.intelligence >= 2:
+        ch.heal(1)
+        print(T.tr("fx.wounds_dressed"))
+    else:
+        print(T.tr("fx.cannot_heal"))
+
+
+def ref_share(game, item_id, exp):
+    ch = game.character
+    if not ch.inventory.remove_item(item_id):
+        print(T.tr("fx.no_such_item"))
+        return
+    ch.add_experience(exp)
+    print(T.tr("fx.shared_item"))
+
+
+def ref_pay(game, amount):
+    ch = game.character
+    if ch.silver >= amount:
+        ch.silver -= amount
+        print(T.tr("fx.paid_silver", n=amount))
+    else:
+        print(T.tr("fx.not_enough_silver"))
+
+
+def ref_attack(base, per, exp, dmg):
+    def fn(game, stat, success_msg, fail_msg):
+        ch = game.character
+        if _roll(ch, stat, base, per):
+            print(f"  ✓ {T.tr(success_msg)}")
+            ch.add_experience(exp)
+        else:
+            print(f"  ✗ {T.tr(fail_msg)}")
+            ch.take_damage(dmg)
+    return fn
+
+
+def ref_final(chance, key, win_exp, dmg, lose_exp):
+    def fn(game):
+        ch = game.character
+        if _roll(ch, None, chance, 0):
+            print(T.tr(key + ".success"))
+            ch.add_experience(win_exp)
+        else:
+            print(T.tr(key + ".fail"))
+            ch.take_damage(dmg)
+            ch.add_experience(lose_exp)
+    return fn
+
+
+def ref_pick(game, stat):
+    T._pick_stat(game.character, stat)
+
+
+def ref_trade(game, merchant_id):
+    game.trade_menu(merchant_id)
+
+
+REFERENCE = {
+    "exp": lambda game, n: game.character.add_experience(n),
+    "hp": lambda game, n: game.character.heal(n) if n >= 0 else game.character.take_damage(-n),
+    "silver": lambda game, n: game.character.add_money(silver=n),
+    "silver_rng": lambda game, lo, hi: game.character.add_money(silver=T.rng().randint(lo, hi)),
+    "flag": lambda game, key, value=True: game.character.flags.__setitem__(key, value),
+    "print": lambda game, key: print("\n" + T.tr(key) + "\n"),
+    "stat": ref_stat,
+    "item": ref_add_item,
+    "equip_first_weapon": ref_equip,
+    "clear_directions": lambda game, keep: [game.character.flags.__setitem__(k, k == keep) for k in
+                                            ("direction_forest", "direction_hills", "direction_swamp")],
+    "bandage_or_int_heal": ref_bandage,
+    "share_item": ref_share,
+    "fight_damage": lambda game, n: game.character.take_damage(
+        max(1, n - 1) if game.character.flags.get("fight_advantage", False) else n),
+    "final_defend": lambda game: (game.character.take_damage(2), game.character.add_experience(20),
+                                  game.character.flags.__setitem__("act1_protector", True)),
+    "pay_silver": ref_pay,
+    "mglak_escape_roll": ref_attack(30, 15, 5, 1),
+    "mglak_final_escape": ref_final(50, "fx.mglak_final", 10, 1, 10),
+    "werewolf_attack_roll": ref_attack(30, 20, 10, 2),
+    "werewolf_final_roll": ref_final(60, "fx.werewolf_final", 20, 2, 15),
+    "pick_stat": ref_pick,
+    "trade": ref_trade,
+}
+
+
+# Stany startowe postaci - gałęzie efektów warunkowych
+def rich(ch, items):
+    ch.silver, ch.intelligence, ch.dexterity = 40, 3, 3
+    ch.inventory.add_item(T.ItemInstance(items["bandage"]))
+    ch.inventory.add_item(T.ItemInstance(items["primitive_stick"]))
+    ch.flags["fight_advantage"] = True
+
+
+def poor(ch, items):
+    ch.silver, ch.current_hp = 2, 3
+
+
+SETUPS = {"fresh": lambda ch, items: None, "rich": rich, "poor": poor}
+
+CASES = [
+    ["exp", 30], ["exp", 150], ["hp", 4], ["hp", -3], ["hp", -50], ["silver", 7], ["silver_rng", 1, 9],
+    ["flag", "a"], ["flag", "a", False], ["flag", "count", 3], ["print", "fx.no_weapon"],
+    ["stat", "strength", 2], ["stat", "vitality", 1], ["stat", "dexterity", 3, 2], ["stat", "reputation", -1],
+    ["item", "bandage"], ["equip_first_weapon"], ["clear_directions", "direction_hills"],
+    ["bandage_or_int_heal"], ["share_item", "bandage", 10], ["fight_damage", 2], ["fight_damage", 1],
+    ["final_defend"], ["pay_silver", 5], ["mglak_escape_roll", "dexterity", "fx.mglak_final.success",
+                                          "fx.mglak_final.fail"],
+    ["mglak_final_escape"], ["werewolf_attack_roll", "strength", "fx.werewolf_final.success",
+                             "fx.werewolf_final.fail"],
+    ["werewolf_final_roll"], ["pick_stat", "vitality"],
+]
+
+
+def compiled(effect):
+    return getattr(T.Game, T.EFFECT_VOCABULARY[effect[0]])(*effect[1:])
+
+
+def play(setup, seed, fn):
+    sio = T.SessionIO(["1", "3"], seed=seed)  # punkty za awans
+    token = sio.activate()
+    try:
+        game = T.Game()
+        ch = game.new_character("Ala")
+        SETUPS[setup](ch, game.items_db)
+        fn(game)
+        return game.character.state_key(), sio.output()
+    finally:
+        T._session_io.reset(token)
+
+
+def test_every_effect_has_a_case():
+    assert {c[0] for c in CASES} | {"trade"} == set(T.EFFECT_VOCABULARY)
+
+
+@pytest.mark.parametrize("setup", sorted(SETUPS))
+@pytest.mark.parametrize("effect", CASES, ids=lambda e: "-".join(map(str, e)))
+def test_bytecode_matches_reference(effect, setup):
+    for seed in range(6):
+        code = T.assemble([compiled(effect)])
+        want = play(setup, seed, lambda game: REFERENCE[effect[0]](game, *effect[1:]))
+        assert play(setup, seed, lambda game: T.execute(game, code)) == want
+
+
+@pytest.mark.parametrize("effect", CASES, ids=lambda e: "-".join(map(str, e)))
+def test_disassemble_round_trip(effect):
+    code = T.assemble([compiled(e) for e in (effect, ["bandage_or_int_heal"], effect)])
+    listing = T.disassemble(code)
+    rebuilt = ()
+    for pc, name, args in listing:
+        assert pc == len(rebuilt)
+        rebuilt += (T.OPNAMES.index(name),) + args
+    assert rebuilt == code
+
+
+def test_nested_if_jumps_land_on_instructions():
+    # fx_if w fx_if z gałęzią else: każdy skok trafia na początek instrukcji albo na koniec
+    inner = T.fx_if((T.OP_TEST_STAT, "intelligence", 2), (T.OP_ADD_HP, 1), (T.OP_ADD_HP, -1))
+    code = T.fx_if((T.OP_TEST_FLAG, "f"), inner + (T.OP_ADD_EXP, 5), (T.OP_SET_FLAG, "g", True))
+    starts = {pc for pc, _, _ in T.disassemble(code)} | {len(code)}
+    for pc, name, args in T.disassemble(code):
+        if name in ("JUMP", "TEST_FLAG", "TEST_STAT", "ROLL", "REMOVE_ITEM", "PAY_SILVER"):
+            assert pc + 1 + len(args) + args[-1] in starts
+
+    def reference(game):
+        ch = game.character
+        if ch.flags.get("f", False):
+            ch.heal(1) if ch.intelligence >= 2 else ch.take_damage(1)
+            ch.add_experience(5)
+        else:
+            ch.flags["g"] = True
+
+    for flag in (False, True):
+        for intelligence in (1, 2):
+            def setup(game, fn):
+                game.character.flags["f"] = flag
+                game.character.intelligence = intelligence
+                game.character.current_hp = 5
+                fn(game)
+            assert (play("fresh", 0, lambda g: setup(g, lambda g: T.execute(g, code)))
+                    == play("fresh", 0, lambda g: setup(g, reference)))
+
+
+def test_call_runs_plain_functions():
+    seen = []
+    code = T.assemble([(T.OP_ADD_EXP, 1), seen.append, (T.OP_ADD_EXP, 2)])
+    assert [name for _, name, _ in T.disassemble(code)] == ["ADD_EXP", "CALL", "ADD_EXP"]
+    play("fresh", 0, lambda game: T.execute(game, code))
+    assert len(seen) == 1
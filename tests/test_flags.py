@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""FlagSet / ActionSet / SymbolRegistry: maski bitowe zachowują się jak dawny dict i set -
+także dla nieznanych nazw, wartości nielogicznych (wymagania poza szybką ścieżką masek)
+i po zapisie/odczycie postaci."""
+
+import json
+import os
+import pickle
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import thalanor_v1_9 as T
+
+NAMES = ["test_flag_a", "test_flag_b", "test_flag_c", "test_flag_d"]
+VALUES = [True, False, 0, 1, 2, "x", "", None]
+
+
+def unknown(prefix):
+    # Nazwa, której żaden rejestr jeszcze nie zna
+    n = 0
+    while f"{prefix}_{n}" in T.FLAGS.index or f"{prefix}_{n}" in T.ACTIONS.index:
+        n += 1
+    return f"{prefix}_{n}"
+
+
+def test_registry_bits_are_stable():
+    reg = T.SymbolRegistry()
+    a, b = reg.bit("a"), reg.bit("b")
+    assert (a, b) == (0, 1) and reg.bit("a") == a
+    assert reg.names == {a: "a", b: "b"} and len(reg) == 2
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_flagset_behaves_like_dict(seed):
+    rng = random.Random(seed)
+    flags, model = T.FlagSet(), {}
+    for _ in range(200):
+        name = rng.choice(NAMES)
+        op = rng.random()
+        if op < 0.6:
+            value = rng.choice(VALUES)
+            flags[name] = value
+            model[name] = value
+        elif op < 0.8:
+            if name in model:
+                del flags[name]
+                del model[name]
+            else:
+                with pytest.raises(KeyError):
+                    del flags[name]
+        assert flags.get(name, "default") == model.get(name, "default")
+        assert (name in flags) == (name in model)
+        assert len(flags) == len(model)
+        assert dict(flags) == model
+        assert set(flags) == set(model)
+    assert T.FlagSet(model) == flags
+
+
+def test_flagset_unknown_names():
+    flags = T.FlagSet({"test_flag_a": True})
+    name = unknown("test_never_flag")
+    assert flags.get(name) is None and flags.get(name, 5) == 5
+    assert name not in flags
+    with pytest.raises(KeyError):
+        flags[name]
+    with pytest.raises(KeyError):
+        del flags[name]
+    # Odczyt nie rejestruje nazwy
+    assert name not in T.FLAGS.index
+
+
+def test_flag_set_to_false_is_not_missing():
+    flags = T.FlagSet({"test_flag_a": False})
+    assert "test_flag_a" in flags and flags["test_flag_a"] is False
+    assert flags.get("test_flag_b", "missing") == "missing"
+    flags["test_flag_a"] = 0  # 0 to nie False - trzymane jako wartość nielogiczna
+    assert flags["test_flag_a"] == 0 and flags["test_flag_a"] is not False
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_actionset_behaves_like_set(seed):
+    rng = random.Random(seed)
+    actions, model = T.ActionSet(), set()
+    for _ in range(100):
+        name = rng.choice(NAMES)
+        if rng.random() < 0.6:
+            actions.add(name)
+            model.add(name)
+        else:
+            actions.discard(name)
+            model.discard(name)
+        assert (name in actions) == (name in model)
+        assert set(actions) == model and len(actions) == len(model)
+    name = unknown("test_never_action")
+    actions.discard(name)
+    assert name not in actions and name not in T.ACTIONS.index
+
+
+REQUIREMENTS = [
+    {"flag": "test_flag_a"},
+    {"flag": ["test_flag_a", True]},
+    {"flag": ["test_flag_a", False]},
+    {"flag": ["test_flag_a", 1]},
+    {"flag": ["test_flag_a", "x"]},
+    {"not_flag": "test_flag_a"},
+    {"not_used": "test_flag_b"},
+    {"flag": "test_flag_a", "not_flag": "test_flag_c", "strength": 2},
+]
+
+
+@pytest.mark.parametrize("req", REQUIREMENTS, ids=json.dumps)
+@pytest.mark.parametrize("value", VALUES + ["unset"], ids=repr)
+@pytest.mark.parametrize("used", [False, True])
+def test_is_available_matches_check_requirement(req, value, used):
+    # Wartości nielogiczne wyłączają szybką ścieżkę masek - wynik ma być ten sam co słownikowy
+    game = T.Game()
+    ch = game.new_character("Ala")
+    if value != "unset":
+        ch.flags["test_flag_a"] = value
+        ch.flags["test_flag_c"] = value
+    if used:
+        ch.used_actions.add("test_flag_b")
+    choice = T.Choice("c", None, dict(req))
+    assert choice.is_available(game) == ch.check_requirement(req)[0]
+
+
+def make_character():
+    ch = T.Game().new_character("Ala")
+    ch.flags.update({"test_flag_a": True, "test_flag_b": False, "test_flag_c": 3, "test_flag_d": "x"})
+    ch.used_actions.add("test_flag_a")
+    ch.used_actions.add("test_flag_c")
+    return ch
+
+
+def test_save_load_round_trip():
+    ch = make_character()
+    data = json.loads(json.dumps(ch.to_dict()))
+    # Zapis trzyma nazwy, nie numery bitów
+    assert data["flags"] == {"test_flag_a": True, "test_flag_b": False, "test_flag_c": 3, "test_flag_d": "x"}
+    assert data["used_actions"] == ["test_flag_a", "test_flag_c"]
+    back = T.Character.from_dict(data)
+    assert dict(back.flags) == dict(ch.flags) and set(back.used_actions) == set(ch.used_actions)
+    assert back.state_key() == ch.state_key()
+
+
+def test_pickle_and_state_round_trip():
+    ch = make_character()
+    flags, actions = pickle.loads(pickle.dumps(ch.flags)), pickle.loads(pickle.dumps(ch.used_actions))
+    assert flags == ch.flags and set(actions) == set(ch.used_actions)
+    back = T.Character.from_state(ch.state_key(), {}, "Ala")
+    assert dict(back.flags) == dict(ch.flags) and set(back.used_actions) == set(ch.used_actions)
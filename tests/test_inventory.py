@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Plecak ze stosami: indeksy item_id/item_type (powyżej INDEX_FROM stosów) dają te same
+wyniki co przeszukiwanie listy, zabieranie idzie przez kilka stosów, a transfer jest
+w całości albo wcale."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import thalanor_v1_9 as T
+
+ITEMS = {iid: T.Item(iid, iid, "", kind, value=1) for iid, kind in
+         [("bandage", "consumable"), ("herb", "consumable"), ("stick", "weapon"),
+          ("knife", "weapon"), ("cap", "helmet"), ("coin", "misc")]}
+TYPES = sorted({it.item_type for it in ITEMS.values()})
+
+
+class FlatInventory(T.Inventory):
+    # Nigdy nie buduje indeksów - wzorzec dla plecaka z indeksami
+    INDEX_FROM = 10 ** 9
+
+
+def instance(iid, worn=False):
+    return T.ItemInstance(ITEMS[iid], durability=5 if worn else None)
+
+
+def layout(inv):
+    return [(s.item_id, s.count, s.instance.durability) for s in inv.stacks]
+
+
+def assert_consistent(inv, flat):
+    assert layout(inv) == layout(flat)
+    assert len(inv) == len(flat) == sum(s.count for s in inv.stacks)
+    assert inv.free_slots == flat.free_slots
+    for iid in ITEMS:
+        assert inv.has_item(iid) == flat.has_item(iid)
+        assert inv.count(iid) == flat.count(iid)
+    for kind in TYPES:
+        assert [id(s) for s in inv.of_type(kind)] == [id(s) for s in inv.stacks if s.item_type == kind]
+        first = inv.first_of_type(kind)
+        assert first is (inv.of_type(kind) or [None])[0]
+    if inv._by_id is not None:
+        # Indeksy trzymają dokładnie stosy z listy, w tej samej kolejności
+        assert {k: [id(s) for s in v] for k, v in inv._by_id.items()} == \
+            {iid: [id(s) for s in inv.stacks if s.item_id == iid] for iid in {s.item_id for s in inv.stacks}}
+
+
+def fill(inv, n):
+    # n stosów po jednej sztuce zużytego egzemplarza (nie łączą się w stosy), bez bandaży
+    worn = sorted(set(ITEMS) - {"bandage"})
+    for i in range(n):
+        assert inv.add_item(instance(worn[i % len(worn)], worn=True))
+
+
+def test_index_built_above_threshold():
+    inv = T.Inventory()
+    fill(inv, T.Inventory.INDEX_FROM)
+    assert inv._by_id is None
+    fill(inv, 1)
+    assert inv._by_id is not None and inv._by_type is not None
+    assert_consistent(inv, inv)
+
+
+def test_crossing_threshold_both_ways():
+    inv, flat = T.Inventory(), FlatInventory()
+    for target in (T.Inventory.INDEX_FROM + 4, 2, T.Inventory.INDEX_FROM + 1, 0, T.Inventory.INDEX_FROM + 3):
+        while len(inv.stacks) < target:
+            iid = sorted(ITEMS)[len(inv.stacks) % len(ITEMS)]
+            assert inv.add_item(instance(iid, worn=True)) and flat.add_item(instance(iid, worn=True))
+            assert_consistent(inv, flat)
+        while len(inv.stacks) > target:
+            # Na zmianę z początku i z końca listy - indeks musi zgubić właściwy stos
+            pos = 0 if len(inv.stacks) % 2 else -1
+            assert inv.take(inv.stacks[pos]) is not None and flat.take(flat.stacks[pos]) is not None
+            assert_consistent(inv, flat)
+    inv.clear()
+    assert inv._by_id is None and not inv.stacks and len(inv) == 0
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_random_operations_match_flat_inventory(seed):
+    rng = random.Random(seed)
+    inv, flat = T.Inventory(max_slots=16), FlatInventory(max_slots=16)
+    for _ in range(300):
+        iid = rng.choice(sorted(ITEMS))
+        op = rng.random()
+        if op < 0.35:
+            worn = rng.random() < 0.3
+            n = rng.choice([1, 1, 2, 5, 98, 120])
+            assert inv.add_item(instance(iid, worn), n) == flat.add_item(instance(iid, worn), n)
+        elif op < 0.45:
+            batch = [instance(rng.choice(sorted(ITEMS))) for _ in range(rng.randint(1, 4))]
+            assert [it.item.item_id for it in inv.add_items(batch)] == \
+                [it.item.item_id for it in flat.add_items(batch)]
+        elif op < 0.7:
+            n = rng.choice([1, 2, 50, 150])
+            a, b = inv.remove_item(iid, n), flat.remove_item(iid, n)
+            assert (a and a.item.item_id) == (b and b.item.item_id)
+        elif op < 0.8:
+            counts = {i: rng.randint(0, 3) for i in rng.sample(sorted(ITEMS), 2)}
+            assert inv.remove_items(counts) == flat.remove_items(counts)
+        elif inv.stacks:
+            pos = rng.randrange(len(inv.stacks))
+            n = rng.randint(1, 3)
+            assert (inv.take(inv.stacks[pos], n) is None) == (flat.take(flat.stacks[pos], n) is None)
+        assert_consistent(inv, flat)
+
+
+@pytest.mark.parametrize("cls", [T.Inventory, FlatInventory])
+def test_partial_removal_across_stacks(cls):
+    inv = cls()
+    fill(inv, T.Inventory.INDEX_FROM)  # z T.Inventory indeks powstaje przy stosach bandaży
+    assert inv.add_item(instance("bandage"), 2 * T.Inventory.MAX_STACK + 10)
+    assert [s.count for s in inv.stacks if s.item_id == "bandage"] == [99, 99, 10]
+    # Najpierw najnowsze stosy: 10 z ostatniego, 5 z przedostatniego
+    assert inv.remove_item("bandage", 15) is not None
+    assert [s.count for s in inv.stacks if s.item_id == "bandage"] == [99, 94]
+    # Za dużo - nic nie znika
+    total = inv.count("bandage")
+    assert inv.remove_item("bandage", total + 1) is None and inv.count("bandage") == total
+    assert inv.remove_items({"bandage": 100, "herb": 3}) is False and inv.count("bandage") == total
+    assert inv.remove_items({"bandage": 100}) is True
+    assert [s.count for s in inv.stacks if s.item_id == "bandage"] == [93]
+    # Ostatnie sztuki - pusty stos znika z listy (i z indeksu)
+    assert inv.remove_item("bandage", 93) is not None
+    assert not inv.has_item("bandage") and inv.first_of_type("consumable").item_id == "herb"
+    assert len(inv.stacks) == T.Inventory.INDEX_FROM
+    assert_consistent(inv, inv)
+
+
+@pytest.mark.parametrize("cls", [T.Inventory, FlatInventory])
+def test_transfer_moves_all(cls):
+    src, dst = cls(), cls(max_slots=4)
+    fill(src, T.Inventory.INDEX_FROM + 1)
+    assert src.add_item(instance("bandage"), 150)
+    assert dst.add_item(instance("bandage"), 60)
+    assert src.transfer(dst, {"bandage": 140, "knife": 1})
+    assert src.count("bandage") == 10 and dst.count("bandage") == 60 + 140
+    assert [s.count for s in dst.stacks if s.item_id == "bandage"] == [99, 99, 2]
+    assert dst.has_item("knife") and dst.first_of_type("weapon").item_id == "knife"
+    assert_consistent(src, src)
+    assert_consistent(dst, dst)
+
+
+@pytest.mark.parametrize("counts", [
+    {"bandage": 100, "knife": 1},                    # brak miejsca u celu dopiero po drugim przedmiocie
+    {"bandage": 40, "knife": 1, "herb": 5},          # herb: za mało sztuk, choć inne by weszły
+    {"bandage": 1000},
+])
+@pytest.mark.parametrize("cls", [T.Inventory, FlatInventory])
+def test_failed_transfer_changes_nothing(cls, counts):
+    src, dst = cls(), cls(max_slots=2)
+    fill(src, T.Inventory.INDEX_FROM + 1)
+    assert src.add_item(instance("bandage"), 150)
+    assert dst.add_item(instance("bandage"), 60)
+    before = layout(src), layout(dst), len(src), len(dst)
+    assert src.transfer(dst, counts) is False
+    assert (layout(src), layout(dst), len(src), len(dst)) == before
+    assert_consistent(src, src)
+    assert_consistent(dst, dst)
+
+
+def test_save_load_keeps_stacks():
+    inv = T.Inventory()
+    fill(inv, T.Inventory.INDEX_FROM + 2)
+    assert inv.add_item(instance("herb"), 120)
+    back = T.Inventory.from_save(inv.to_save(), ITEMS)
+    assert layout(back) == layout(inv) and len(back) == len(inv)
+    assert_consistent(back, back)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Przeładowanie treści: zła paczka (albo dowolny wyjątek przy budowie) zostawia stary
+katalog, trafia do last_error i failures, a wątek obserwatora działa dalej."""
+
+import json
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import thalanor_v1_9 as T
+
+
+@pytest.fixture
+def game_cls(tmp_path, monkeypatch):
+    monkeypatch.setenv("THALANOR_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "act1.json"
+    shutil.copy(os.path.join(ROOT, "content", "act1.json"), path)
+    # Osobna klasa gry - własny katalog, katalog Game zostaje nietknięty
+    cls = type("ReloadGame", (T.Game,), {"CONTENT_PACKS": (str(path),)})
+    T.ContentCatalog.shared(cls)
+    yield cls
+    T.ContentCatalog._active.pop(cls, None)
+
+
+def break_pack(cls, mutate):
+    path = cls.CONTENT_PACKS[0]
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    mutate(data)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda d: d["scenes"][0]["choices"][0].update(effects=[["exp"]]),
+    lambda d: d["scenes"][0]["choices"][0].update(requirements=[]),
+    lambda d: d.update(items=["x"]),
+])
+def test_bad_pack_keeps_old_catalog(game_cls, mutate):
+    old = T.ContentCatalog.active(game_cls)
+    reloader = T.CatalogReloader(game_cls)
+    break_pack(game_cls, mutate)
+    assert reloader.reload() is False
+    assert isinstance(reloader.last_error, T.ContentError)
+    assert reloader.failures == 1
+    assert T.ContentCatalog.active(game_cls) is old
+
+
+def test_unexpected_build_error_is_recorded(game_cls, monkeypatch):
+    old = T.ContentCatalog.active(game_cls)
+
+    def broken(self):
+        raise TypeError("boom")
+
+    monkeypatch.setattr(T.ContentCatalog, "build", broken)
+    reloader = T.CatalogReloader(game_cls)
+    assert reloader.reload() is False
+    assert isinstance(reloader.last_error, TypeError)
+    assert T.ContentCatalog.active(game_cls) is old
+
+
+def test_watcher_survives_errors(game_cls, monkeypatch):
+    reloader = T.CatalogReloader(game_cls, interval=0.01)
+    monkeypatch.setattr(reloader, "poll", lambda: 1 / 0)
+    reloader.start()
+    try:
+        deadline = time.monotonic() + 5
+        while reloader.failures < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert reloader.failures >= 3
+        assert reloader._thread.is_alive()
+        assert isinstance(reloader.last_error, ZeroDivisionError)
+    finally:
+        reloader.stop()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Handel przez trade_menu - Akt I nie ma kupca, więc kupiec jest dokładany do
+katalogu osobnej klasy gry (ContentCatalog.shared jest per klasa, katalog Game zostaje czysty)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import thalanor_v1_9 as T
+
+
+class TradeGame(T.Game):
+    pass
+
+
+def make_game():
+    game = TradeGame()
+    game.catalog.merchants.setdefault("test_trader", T.Merchant(
+        "test_trader", "Handlarz", None, 120, 50, ("weapon", "consumable"), (("bandage", 5), ("silver_knife", 1))))
+    game.new_character("Ala")
+    game.character.gold, game.character.silver = 1, 0
+    return game
+
+
+def trade(game, *lines):
+    sio = T.SessionIO(list(lines) + ["0"])
+    token = sio.activate()
+    try:
+        game.trade_menu("test_trader")
+    finally:
+        T._session_io.reset(token)
+    return sio.output()
+
+
+def test_buy_and_sell():
+    game = make_game()
+    out = trade(game, "k 1 2", "s 1 1")
+    assert T.tr("trade.bought", item=T.tr(game.items_db["bandage"].name), n=2) in out
+    assert game.merchant_stock("test_trader").count("bandage") == 4
+    assert game.character.inventory.count("bandage") == 1
+
+
+def test_zero_quantity_is_rejected():
+    game = make_game()
+    money = (game.character.gold, game.character.silver)
+    out = trade(game, "k 1 0", "k 1 -3", "s 1 0")
+    assert "x0" not in out and "x-3" not in out
+    assert out.count(T.tr("trade.invalid")) == 3
+    assert (game.character.gold, game.character.silver) == money
+    assert game.merchant_stock("test_trader").count("bandage") == 5
+
+
+def test_transact_empty_batch_fails():
+    game = make_game()
+    assert T.transact(game, "test_trader", buy={"bandage": 0}) == (False, ("count", None))
+    assert T.transact(game, "test_trader") == (False, ("count", None))
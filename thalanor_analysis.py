@@ -0,0 +1,1190 @@
+# -*- coding: utf-8 -*-
+"""
+THALANOR – analiza treści i balansu
+
+    python thalanor_analysis.py sweep [--episodes N] [--policy NAZWA ...] [--workers N] [--seed N] [--coverage PLIK] [--json]
+    python thalanor_analysis.py coverage [PLIK ...] [--sim N] [--workers N] [--dot PLIK] [--out PLIK] [--json]
+    python thalanor_analysis.py explore [--start SCENA] [--max-states N] [--exact] [--graph PLIK] [--json]
+    python thalanor_analysis.py solve [--objective survival|exp] [--start SCENA] [--max-states N] [--exact] [--advisor PLIK] [--json]
+
+sweep - balans startowych buildów: każde rozdanie 2 punktów w prolog_instincts
+(siła, zręczność, inteligencja, witalność - 10 buildów) z każdą polityką wyboru
+gałęzi. Epizody grane bez wejścia/wyjścia (scena -> dostępne wybory -> polityka ->
+Choice.apply), w partiach, w procesach równolegle; rzuty z RNG sesji (ziarno
+z --seed, buildu, polityki i numeru epizodu - wynik powtarzalny). Punkty za awans
+idą na zmianę w statystyki buildu. Raport: przeżycie (z przedziałem 95%), ukończenie
+Aktu I, średnie EXP i poziom w act1_dawn_ending oraz wybory z wymaganiem statystyki,
+które build odblokował (dostępne w choć jednym epizodzie).
+
+coverage - pokrycie scen i wyborów: ile razy scena była pokazana, a wybór pokazany,
+dostępny, zablokowany (wg kategorii powodu: stat, flag, has_item, not_used),
+już zrobiony, wybrany i ukończony (postać przeżyła jego efekty). Źródła: epizody
+symulacji (jak sweep, --sim na build i politykę) i zrzuty liczników z gry
+(THALANOR_COVERAGE=plik) albo z sweep --coverage - liczniki się sumują. Raport:
+tabela, sceny i wybory, do których nikt nie dotarł; --dot zapisuje graf scen
+z nałożonym pokryciem, --out scalone liczniki.
+
+explore - wszystkie osiągalne stany Aktu I od prolog_instincts: stan decyzji to
+scena + postać (statystyki, HP, pieniądze, przedmioty, flagi, akcje jednorazowe).
+Z każdego stanu każdy dostępny wybór, każdy wynik rzutu (z prawdopodobieństwem)
+i każdy wybór punktu za awans. Stany deduplikowane po kanonicznym kluczu - flagi,
+akcje i statystyki, których żadna osiągalna scena już nie przeczyta, są z klucza
+wycięte, HP ponad sumę dalszych obrażeń i EXP bez szans na kolejny awans są
+przycięte. Każdy podzbiór opcjonalnych akcji daje jednak inne EXP, HP i srebro,
+więc domyślnie te pola są w kluczu przedziałami (STATE_STEPS) - cały Akt I to
+wtedy ~70 tys. stanów; --exact liczy dokładnie, ale zwykle kończy się na limicie
+--max-states. Raport: stany na scenę, przejścia do śmierci i ukończenia, sceny
+i wybory nigdy niedostępne (tylko gdy przestrzeń zbadano w całości), soft-locki
+(stan bez dostępnego wyboru) i pętle bez drogi do końca; --graph zapisuje graf
+(JSON). --start bada od innej sceny ze świeżą postacią.
+
+solve - polityka optymalna na grafie z explore: indukcja wsteczna po stanach
+(wartość stanu = najlepszy wybór, rzut = suma p * wartość, punkt za awans = najlepszy),
+powtarzana do zbieżności, gdy graf ma pętle. Cel survival - prawdopodobieństwo
+ukończenia Aktu I, exp - oczekiwane EXP na koniec Aktu I (0 przy śmierci). Raport:
+wartość startu i dla każdej sceny oczekiwana liczba odwiedzin przy grze optymalnej,
+średnia wartość, najczęstszy najlepszy wybór i strata za najgorszy dostępny wybór -
+scena, w której strata jest zerowa, przy grze optymalnej niczego nie rozstrzyga.
+Przy przerwanej eksploracji stany nierozwinięte mają wartość 0 (wynik jest dolnym
+ograniczeniem). --advisor zapisuje tabelę polityki dla podpowiedzi w grze
+(THALANOR_ADVISOR=plik python thalanor_v1_9.py) - tylko z pełnej eksploracji.
+
+Polityki sweep:
+  first    - pierwszy dostępny wybór
+  last     - ostatni dostępny wybór
+  random   - losowy dostępny wybór
+  explore  - najpierw jednorazowe wybory w scenie, potem pierwsze przejście dalej
+  cautious - unika rzutów i obrażeń (ROLL, ujemne ADD_HP), potem jak first
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+STATS = ("strength", "dexterity", "intelligence", "vitality")
+START_SCENE = "prolog_instincts"
+ENDING_SCENE = "act1_dawn_ending"
+# Limit kroków epizodu - polityka krążąca między scenami bez końca kończy jako "utknął"
+MAX_STEPS = 400
+
+
+# =============================================================================
+# EPIZOD
+# =============================================================================
+
+def builds() -> List[Tuple[str, str]]:
+    """Wszystkie rozdania 2 punktów (kolejność wyboru bez znaczenia)."""
+    return list(itertools.combinations_with_replacement(STATS, 2))
+
+
+def _risky(T, choice) -> bool:
+    code = choice.code
+    for _, name, args in T.disassemble(code):
+        if name == "ROLL" or (name == "ADD_HP" and args[0] < 0):
+            return True
+    return False
+
+
+def _policy_first(T, scene, options, rng):
+    return options[0]
+
+
+def _policy_last(T, scene, options, rng):
+    return options[-1]
+
+
+def _policy_random(T, scene, options, rng):
+    return rng.choice(options)
+
+
+def _policy_explore(T, scene, options, rng):
+    for c in options:
+        if c.one_time_id and c.next_scene in (None, scene.scene_id):
+            return c
+    for c in options:
+        if c.next_scene not in (None, scene.scene_id):
+            return c
+    return options[0]
+
+
+def _policy_cautious(T, scene, options, rng):
+    safe = [c for c in options if not _risky(T, c)]
+    return (safe or options)[0]
+
+
+POLICIES = {
+    "first": _policy_first,
+    "last": _policy_last,
+    "random": _policy_random,
+    "explore": _policy_explore,
+    "cautious": _policy_cautious,
+}
+
+
+def _session_io(T):
+    # Sesja bez wyjścia; na pytanie o punkty za awans odpowiada statystykami buildu
+    class SweepIO(T.SessionIO):
+        def __init__(self, seed: int, level_picks: Tuple[str, ...]):
+            super().__init__(seed=seed)
+            self.level_picks = itertools.cycle(str(STATS.index(s) + 1) for s in level_picks)
+            self.prompt = T.tr("char.pick_stat_prompt")
+            self.other_reads = 0
+
+        def read(self, prompt: str) -> str:
+            if prompt == self.prompt:
+                return next(self.level_picks)
+            # Inne pytania (menu handlu itp.) - pusta odpowiedź wychodzi z menu
+            self.other_reads += 1
+            if self.other_reads > 50:
+                raise T.InputExhausted(prompt)
+            return ""
+
+        def write(self, text: str) -> None:
+            pass
+
+    return SweepIO
+
+
+def _total_exp(ch) -> int:
+    return ch.experience + sum(100 * lvl for lvl in range(1, ch.level))
+
+
+def play_episode(T, sio_cls, build: Tuple[str, str], policy: str, seed: int, gated: Dict, cov=None) -> dict:
+    """Jeden epizod od prolog_instincts do śmierci, końca Aktu I albo limitu kroków (cov - T.Coverage)."""
+    sio = sio_cls(seed, build)
+    token = sio.activate()
+    try:
+        game = T.Game()
+        game.new_character("Sweep")
+        game.current_scene_id = START_SCENE
+        choose = POLICIES[policy]
+        picks = list(build)
+        ending = None
+        outcome = "stuck"
+        unlocked = set()
+        for _ in range(MAX_STEPS):
+            scene = game.scenes[game.current_scene_id]
+            scene.enter(game)
+            nxt = scene.check_exit(game)
+            if nxt:
+                game.current_scene_id = nxt
+                continue
+            if scene.scene_id == ENDING_SCENE and ending is None:
+                ending = (_total_exp(game.character), game.character.level)
+            if cov is not None:
+                cov.record_scene(scene, game)
+            options = [c for c in scene.choices if c.is_available(game)]
+            for c in options:
+                key = gated.get(id(c))
+                if key is not None:
+                    unlocked.add(key)
+            if not options:
+                break
+            if scene.scene_id == START_SCENE and picks:
+                stat = picks[0]
+                chosen = next((c for c in options if c.code[:2] == (T.OP_PICK_STAT, stat)), None)
+                if chosen is not None:
+                    picks.pop(0)
+                else:
+                    chosen = choose(T, scene, options, sio.rng)
+            else:
+                chosen = choose(T, scene, options, sio.rng)
+            chosen.apply(game)
+            if cov is not None:
+                cov.record_taken(scene, chosen, game)
+            if chosen.next_scene is not None:
+                game.current_scene_id = chosen.next_scene
+            ch = game.character
+            if ch.current_hp <= 0:
+                outcome = "died"
+                break
+            if ch.flags.get("act1_completed", False):
+                outcome = "completed"
+                break
+    except T.InputExhausted:
+        outcome = "stuck"
+    finally:
+        T._session_io.reset(token)
+    return {"outcome": outcome, "ending": ending, "unlocked": unlocked}
+
+
+def _gated_choices(T) -> Dict[int, str]:
+    """id(wybór) -> 'scena#pozycja (wymagania)' dla wyborów z wymaganiem statystyki."""
+    game = T.Game()
+    game.scenes.materialize_all()
+    gated = {}
+    for scene in game.scenes.values():
+        for i, c in enumerate(scene.choices):
+            req = c.requirements
+            if any(k in req for k in STATS):
+                need = ", ".join(f"{k}>={req[k]}" for k in STATS if k in req)
+                gated[id(c)] = f"{scene.scene_id}#{i} ({need})"
+    return gated
+
+
+def sweep_job(job: Tuple[Tuple[str, str], str, int, int, bool]) -> dict:
+    """Partia epizodów jednego buildu i polityki (uruchamiana w procesie roboczym)."""
+    import thalanor_v1_9 as T
+    build, policy, episodes, seed, coverage = job
+    sio_cls = _session_io(T)
+    cov = T.Coverage() if coverage else None
+    gated = _gated_choices(T)
+    outcomes = {"completed": 0, "died": 0, "stuck": 0}
+    exp_sum = level_sum = reached = 0
+    unlocked: Dict[str, int] = {}
+    for n in range(episodes):
+        res = play_episode(T, sio_cls, build, policy, seed * 100003 + n, gated, cov)
+        outcomes[res["outcome"]] += 1
+        if res["ending"] is not None:
+            reached += 1
+            exp_sum += res["ending"][0]
+            level_sum += res["ending"][1]
+        for key in res["unlocked"]:
+            unlocked[key] = unlocked.get(key, 0) + 1
+    return {
+        "build": "+".join(build),
+        "policy": policy,
+        "episodes": episodes,
+        "outcomes": outcomes,
+        "reached_ending": reached,
+        "exp_at_ending": exp_sum / reached if reached else None,
+        "level_at_ending": level_sum / reached if reached else None,
+        "unlocked": dict(sorted(unlocked.items())),
+        "coverage": T.Coverage.to_rows(cov.snapshot()) if cov is not None else None,
+    }
+
+
+def _survival(row: dict) -> Tuple[float, float]:
+    """Udział epizodów bez śmierci i połowa szerokości przedziału 95% (przybliżenie normalne)."""
+    n = row["episodes"]
+    p = 1 - row["outcomes"]["died"] / n
+    return p, 1.96 * (p * (1 - p) / n) ** 0.5
+
+
+def sweep(episodes: int, policies: List[str], workers: int, seed: int, coverage: bool = False) -> dict:
+    import thalanor_v1_9 as T
+    # Wynik ma nie zależeć od PYTHONHASHSEED - ziarno partii liczone ze stałego opisu
+    jobs = [(b, p, episodes, _stable_seed(seed, b, p), coverage) for b in builds() for p in policies]
+    T.Game()
+    t0 = time.perf_counter()
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as pool:
+            rows = list(pool.map(sweep_job, jobs, chunksize=1))
+    else:
+        rows = [sweep_job(job) for job in jobs]
+    wall = time.perf_counter() - t0
+    cov = T.Coverage()
+    for row in rows:
+        row["survival"], row["survival_ci95"] = _survival(row)
+        part = row.pop("coverage")
+        if part:
+            cov.merge(T.Coverage.from_rows(part))
+    res = {"episodes": episodes, "seed": seed, "workers": workers, "wall_s": wall,
+           "episodes_per_s": episodes * len(jobs) / wall, "rows": rows}
+    if coverage:
+        res["coverage"] = cov.snapshot()
+    return res
+
+
+def _stable_seed(seed: int, build: Tuple[str, str], policy: str) -> int:
+    import zlib
+    return zlib.crc32(f"{seed}:{'+'.join(build)}:{policy}".encode())
+
+
+def print_sweep(res: dict) -> None:
+    print(f"Balans buildów: {len(res['rows'])} partii po {res['episodes']} epizodów, "
+          f"{res['workers']} proc., {res['wall_s']:.1f} s ({res['episodes_per_s']:.0f} epizodów/s)")
+    print(f"  {'build':26} {'polityka':9} {'przeżycie':>15} {'ukończ.':>8} {'utknął':>7} {'EXP@świt':>9} {'poz.':>5}")
+    for row in res["rows"]:
+        n = row["episodes"]
+        exp = "-" if row["exp_at_ending"] is None else f"{row['exp_at_ending']:.1f}"
+        lvl = "-" if row["level_at_ending"] is None else f"{row['level_at_ending']:.2f}"
+        print(f"  {row['build']:26} {row['policy']:9} {row['survival'] * 100:8.1f}% ±{row['survival_ci95'] * 100:4.1f} "
+              f"{row['outcomes']['completed'] / n * 100:7.1f}% {row['outcomes']['stuck'] / n * 100:6.1f}% {exp:>9} {lvl:>5}")
+    print("\n  Wybory z wymaganiem statystyki odblokowane przez build (dowolna polityka):")
+    by_build: Dict[str, set] = {}
+    for row in res["rows"]:
+        by_build.setdefault(row["build"], set()).update(row["unlocked"])
+    every = set.intersection(*by_build.values()) if by_build else set()
+    for build, keys in by_build.items():
+        extra = sorted(keys - every)
+        print(f"  {build:26} {len(keys):3d}  {', '.join(extra) if extra else '(tylko wspólne)'}")
+    if every:
+        print(f"  {'wspólne dla wszystkich':26} {len(every):3d}  {', '.join(sorted(every))}")
+
+
+# =============================================================================
+# POKRYCIE
+# =============================================================================
+
+def coverage_table(T, counts: Dict[tuple, int]) -> List[dict]:
+    """Liczniki Coverage jako tabela: scena (pokazania) -> wybory (zdarzenia, blokady wg powodu)."""
+    game = T.Game()
+    game.scenes.materialize_all()
+    table = []
+    for scene in game.scenes.values():
+        sid = scene.scene_id
+        choices = []
+        for i, c in enumerate(scene.choices):
+            blocked = {event.split(":", 1)[1]: n for (s, pos, event), n in counts.items()
+                       if s == sid and pos == i and event.startswith("blocked:")}
+            row = {"choice": i, "text": T.tr(c.text), "next": c.next_scene or sid}
+            for event in ("shown", "available", "done", "taken", "completed"):
+                row[event] = counts.get((sid, i, event), 0)
+            row["blocked"] = dict(sorted(blocked.items()))
+            choices.append(row)
+        table.append({"scene": sid, "shown": counts.get((sid, -1, "shown"), 0), "choices": choices})
+    return table
+
+
+def coverage(paths: List[str], sim: int, workers: int, seed: int) -> dict:
+    import thalanor_v1_9 as T
+    cov = T.Coverage()
+    for path in paths:
+        cov.merge(T.Coverage.load(path))
+    if sim:
+        cov.merge(sweep(sim, list(POLICIES), workers, seed, coverage=True)["coverage"])
+    counts = cov.snapshot()
+    table = coverage_table(T, counts)
+    return {
+        "sources": paths,
+        "sim_episodes": sim * len(builds()) * len(POLICIES),
+        "scenes": table,
+        "never_shown": [row["scene"] for row in table if not row["shown"]],
+        "never_taken": [f"{row['scene']}#{c['choice']}" for row in table for c in row["choices"] if not c["taken"]],
+        "_counts": counts,
+    }
+
+
+def print_coverage(res: dict) -> None:
+    print(f"Pokrycie scen i wyborów: symulacja {res['sim_episodes']} epizodów, zrzuty: {len(res['sources'])}")
+    print(f"\n  {'scena / wybór':40} {'pokazany':>9} {'dostępny':>9} {'zrobiony':>9} {'wybrany':>8} "
+          f"{'ukończony':>9}  zablokowany (powód)")
+    for row in res["scenes"]:
+        print(f"  {row['scene']:40} {row['shown']:9d}")
+        for c in row["choices"]:
+            blocked = ", ".join(f"{k} {n}" for k, n in c["blocked"].items()) or "-"
+            print(f"    #{c['choice']} {c['text'][:35]:35} {c['shown']:9d} {c['available']:9d} {c['done']:9d} "
+                  f"{c['taken']:8d} {c['completed']:9d}  {blocked}")
+    print(f"\n  Sceny nigdy niepokazane ({len(res['never_shown'])}): {', '.join(res['never_shown']) or '-'}")
+    print(f"  Wybory nigdy niewybrane ({len(res['never_taken'])}): {', '.join(res['never_taken']) or '-'}")
+
+
+def write_coverage_dot(res: dict, path: str) -> None:
+    """Graf scen (Graphviz DOT): kolor węzła - pokazania sceny, grubość krawędzi - wybrania wyboru."""
+    top_scene = max([row["shown"] for row in res["scenes"]] + [1])
+    top_choice = max([c["taken"] for row in res["scenes"] for c in row["choices"]] + [1])
+    lines = ["digraph coverage {", '  node [shape=box, style=filled, fontname="sans"];']
+    for row in res["scenes"]:
+        heat = row["shown"] / top_scene
+        color = f'"0.000 {heat:.3f} 1.000"' if row["shown"] else "lightgrey"
+        lines.append(f'  "{row["scene"]}" [label="{row["scene"]}\\n{row["shown"]}", fillcolor={color}];')
+        for c in row["choices"]:
+            width = 1 + 5 * c["taken"] / top_choice
+            style = "solid" if c["taken"] else "dashed" if c["available"] else "dotted"
+            lines.append(f'  "{row["scene"]}" -> "{c["next"]}" [label="#{c["choice"]} {c["taken"]}", '
+                         f'penwidth={width:.2f}, style={style}];')
+    lines.append("}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+# =============================================================================
+# PRZESTRZEŃ STANÓW
+# =============================================================================
+
+class _Branch(Exception):
+    """Przebieg doszedł do nieznanego jeszcze losowania albo pytania o punkty - trzeba rozgałęzić."""
+
+    def __init__(self, kind: str, values: tuple):
+        super().__init__(kind)
+        self.kind = kind
+        self.values = values
+
+
+class _ScriptedRandom:
+    # RNG odtwarzający zadany ciąg wyników; po jego końcu zgłasza rozgałęzienie
+    def __init__(self, script: tuple):
+        self.script = script
+        self.pos = 0
+
+    def _next(self, kind: str, values: tuple):
+        if self.pos < len(self.script):
+            value = self.script[self.pos]
+            self.pos += 1
+            return value
+        raise _Branch(kind, values)
+
+    def randint(self, a: int, b: int) -> "_Draw":
+        return _Draw(self, a, b)
+
+    def choice(self, seq):
+        return seq[self._next("chance", tuple((i, 1 / len(seq)) for i in range(len(seq))))]
+
+
+class _Draw:
+    # Wynik randint(a, b) liczony leniwie: porównanie z progiem (rzut ROLL) rozgałęzia
+    # tylko na prawda/fałsz z prawdopodobieństwem, inne użycie - na każdą wartość
+    __slots__ = ("rng", "value", "values")
+
+    def __init__(self, rng: _ScriptedRandom, a: int, b: int):
+        self.rng, self.value = rng, None
+        self.values = range(a, b + 1)  # wartości zgodne z wynikami wcześniejszych porównań
+
+    def _compare(self, test) -> bool:
+        if self.value is not None:
+            return test(self.value)
+        values = self.values
+        hits = [v for v in values if test(v)]
+        if len(hits) in (0, len(values)):
+            return len(hits) == len(values)
+        p = len(hits) / len(values)
+        result = self.rng._next("chance", ((True, p), (False, 1 - p)))
+        self.values = hits if result else [v for v in values if not test(v)]
+        return result
+
+    def __gt__(self, x): return self._compare(lambda v: v > x)
+    def __ge__(self, x): return self._compare(lambda v: v >= x)
+    def __lt__(self, x): return self._compare(lambda v: v < x)
+    def __le__(self, x): return self._compare(lambda v: v <= x)
+
+    def __index__(self) -> int:
+        if self.value is None:
+            values = self.values
+            self.value = self.rng._next("chance", tuple((v, 1 / len(values)) for v in values))
+        return self.value
+
+    __int__ = __index__
+    def __add__(self, x): return int(self) + x
+    def __radd__(self, x): return x + int(self)
+    def __sub__(self, x): return int(self) - x
+    def __rsub__(self, x): return x - int(self)
+
+
+def _explorer_io(T):
+    # Sesja eksploratora: losowania i punkty za awans z jednego skryptu, wyjście pominięte
+    class ExplorerIO(T.SessionIO):
+        # Bez SessionIO.__init__ - przebiegów są setki tysięcy, a własne Random, bufor
+        # i kolejka wejść nie są tu potrzebne
+        inputs, clock, save_dir, saves, marks = (), None, None, None, None
+        prompt = T.tr("char.pick_stat_prompt")
+
+        def __init__(self, script: tuple):
+            self.rng = _ScriptedRandom(script)
+
+        def read(self, prompt: str) -> str:
+            if prompt == self.prompt:
+                return self.rng._next("pick", ("1", "2", "3", "4"))
+            raise T.InputExhausted(prompt)
+
+        def write(self, text: str) -> None:
+            pass
+
+    return ExplorerIO
+
+
+def _code_parts(obj) -> Tuple[set, set]:
+    """Napisy-stałe i nazwy (atrybuty, globalne) z kodu funkcji, także zagnieżdżonych -
+    nazwy flag i akcji czytanych w kodzie i pola postaci, do których kod sięga."""
+    import functools
+    import types
+    if isinstance(obj, (staticmethod, classmethod)):
+        obj = obj.__func__
+    if isinstance(obj, functools.partial):
+        consts, names = _code_parts(obj.func)
+        return consts | {a for a in obj.args if isinstance(a, str)}, names
+    code = getattr(obj, "__code__", None)
+    if code is None:
+        return set(), set()
+    consts, names, stack = set(), set(), [code]
+    while stack:
+        c = stack.pop()
+        names.update(c.co_names)
+        for const in c.co_consts:
+            if isinstance(const, str):
+                consts.add(const)
+            elif isinstance(const, types.CodeType):
+                stack.append(const)
+    return consts, names
+
+
+def _const_strings(obj) -> set:
+    return _code_parts(obj)[0]
+
+
+# Rozdzielczość klucza stanu (przybliżenie - stany w jednym przedziale dzielą przyszłość
+# pierwszego z nich): EXP co pół progu awansu, HP co 3, srebro co 5 (progi i opłaty
+# w Akcie I są wielokrotnościami 5). --exact wyłącza.
+STATE_STEPS = {"experience": 50, "current_hp": 3, "silver": 5}
+
+# Pola postaci, które zawsze zostają w kluczu stanu: poziom i maks. HP (próg awansu, leczenie);
+# EXP i HP mają własne reguły (StateRelevance.exp_gain, hp_cap)
+_KEPT_STATS = ("level", "experience", "max_hp", "current_hp")
+_INF = float("inf")
+
+
+def liveness(T, game) -> Dict[str, Any]:
+    """scena -> StateRelevance: co z postaci treść osiągalna z tej sceny może jeszcze przeczytać.
+
+    Flagi i akcje jednorazowe czytają wymagania, instrukcje TEST_FLAG i hooki scen
+    osiągalnych z danej (przejścia wyborów i napisy-id scen w warunkach wyjścia) oraz
+    reszta kodu silnika (pętla gry, rozdawanie punktów...) - tego nie analizujemy,
+    więc nazwy z jego stałych są żywe zawsze. Fabryki efektów (fx_*) pomijamy: to,
+    co czytają ich programy, widać w instrukcjach wyborów.
+
+    Statystyki czytają wymagania, TEST_STAT, ROLL, PAY_SILVER (srebro) i hooki (nazwy
+    pól w kodzie); nieczytane dalej wypadają z klucza. HP jest przycinane do sumy
+    dalszych obrażeń + 1, a EXP od dołu do progu awansu minus EXP do zdobycia dalej -
+    chyba że hook czyta je wprost, wybór z obrażeniami/EXP da się powtarzać w pętli
+    albo wybór woła dowolną funkcję (CALL) - wtedy zostają dokładne.
+    """
+    game.scenes.materialize_all()
+    scene_ids = set(game.scenes.ids())
+    stat_names = set(T.CHARACTER_STATS)
+    hooks = set()
+    for scene in game.scenes.values():
+        for fn in (scene.on_enter, scene.exit_condition):
+            if fn is not None:
+                hooks |= {a for a in getattr(fn, "args", ()) if isinstance(a, str)}
+    engine = set()
+    for owner in (T, *(v for v in vars(T).values() if isinstance(v, type) and v.__module__ == T.__name__)):
+        for name, fn in vars(owner).items():
+            if owner is T.Game and (name in hooks or name.startswith(("fx_", "_fx_"))):
+                continue
+            engine |= _const_strings(fn)
+    flags0 = sum(1 << T.FLAGS.bit(n) for n in engine if n in T.FLAGS.index)
+    actions0 = sum(1 << T.ACTIONS.bit(n) for n in engine if n in T.ACTIONS.index)
+
+    reads: Dict[str, Tuple[int, int]] = {}
+    stats_read: Dict[str, set] = {}
+    succ: Dict[str, set] = {}
+    # Wybory z obrażeniami / EXP: (scena, następna scena, jednorazowy?, obrażenia, EXP)
+    gains: List[Tuple[str, str, bool, int, int]] = []
+    for scene in game.scenes.values():
+        fm = am = 0
+        nxt = set()
+        read = set()
+        for c in scene.choices:
+            need_on, need_off, forbid_on, forbid_used, flag_bits, rest = c.req_masks
+            fm |= flag_bits
+            am |= forbid_used | c.done_mask
+            for k, v in rest.items():
+                if k == "flag":
+                    fm |= 1 << T.FLAGS.bit(v[0])
+                elif k in stat_names:
+                    read.add(k)
+            damage = exp = 0
+            for _, name, args in T.disassemble(c.code):
+                if name == "TEST_FLAG":
+                    fm |= 1 << T.FLAGS.bit(args[0])
+                elif name in ("TEST_STAT", "ROLL") and args[0] is not None:
+                    read.add(args[0])
+                elif name == "PAY_SILVER":
+                    read.add("silver")
+                elif name == "ADD_HP" and args[0] < 0:
+                    damage -= args[0]
+                elif name == "ADD_EXP" and args[0] > 0:
+                    exp += args[0]
+                elif name == "CALL":
+                    names = _const_strings(args[0])
+                    fm |= sum(1 << T.FLAGS.bit(n) for n in names if n in T.FLAGS.index)
+                    am |= sum(1 << T.ACTIONS.bit(n) for n in names if n in T.ACTIONS.index)
+                    read |= stat_names
+            nxt.add(c.next_scene or scene.scene_id)
+            if damage or exp:
+                gains.append((scene.scene_id, c.next_scene or scene.scene_id, bool(c.done_mask), damage, exp))
+        for fn in (scene.on_enter, scene.exit_condition):
+            if fn is not None:
+                names, attrs = set(), set()
+                for hook in getattr(fn, "args", ()):
+                    consts, used = _code_parts(getattr(T.Game, hook, None))
+                    names |= consts
+                    attrs |= used
+                fm |= sum(1 << T.FLAGS.bit(n) for n in names if n in T.FLAGS.index)
+                am |= sum(1 << T.ACTIONS.bit(n) for n in names if n in T.ACTIONS.index)
+                read |= attrs & stat_names
+                # Scenę zmienia tylko warunek wyjścia - id scen w hookach wejścia to klucze narracji
+                if fn is scene.exit_condition:
+                    nxt |= names & scene_ids
+        reads[scene.scene_id] = (fm, am)
+        stats_read[scene.scene_id] = read
+        succ[scene.scene_id] = nxt & scene_ids
+
+    reach: Dict[str, set] = {}
+    for start in scene_ids:
+        seen, stack = {start}, [start]
+        while stack:
+            for n in succ[stack.pop()]:
+                if n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        reach[start] = seen
+
+    # Obrażenia i EXP do zdobycia dalej - każdy wybór raz, chyba że da się go powtórzyć
+    # (nie jest jednorazowy, a z jego następnej sceny da się wrócić do jego sceny)
+    cost = {sid: [0, 0] for sid in scene_ids}
+    for scene_id, nxt, once, damage, exp in gains:
+        loop = not once and nxt in reach and scene_id in reach[nxt]
+        for start in scene_ids:
+            if scene_id in reach[start]:
+                cost[start][0] += _INF if loop and damage else damage
+                cost[start][1] += _INF if loop and exp else exp
+
+    live = {}
+    for start in scene_ids:
+        fm, am = flags0, actions0
+        read = set()
+        for sid in reach[start]:
+            f, a = reads[sid]
+            fm |= f
+            am |= a
+            read |= stats_read[sid]
+        damage, exp = cost[start]
+        live[start] = T.StateRelevance(
+            fm, am,
+            tuple(i for i, n in enumerate(T.CHARACTER_STATS) if n not in _KEPT_STATS and n not in read),
+            None if "current_hp" in read or damage == _INF else int(damage) + 1,
+            None if "experience" in read or "level" in read or exp == _INF else int(exp),
+        )
+    return live
+
+
+# Stany końcowe (poza stanami decyzji); ukończenie to para (COMPLETED, EXP na koniec)
+DIED, COMPLETED, BLOCKED = "died", "completed", "blocked"
+
+
+def _end(leaf) -> str:
+    return leaf if isinstance(leaf, str) else leaf[0]
+
+
+class Explorer:
+    """Pełny graf stanów Aktu I: stan decyzji = scena + postać (Character.state_key()) po wejściu do sceny.
+
+    Z każdego stanu rozgałęzia każdy dostępny wybór; przejście to drzewo: losowania
+    ("chance" - wynik rzutu z prawdopodobieństwem) i punkty za awans ("pick" -
+    decyzja gracza) aż do kolejnego stanu decyzji albo końca (śmierć, koniec Aktu I,
+    pytanie spoza modelu). Tablica transpozycji po kanonicznym kluczu stanu: to, czego
+    nic dalej nie przeczyta (liveness - flagi, akcje, statystyki, HP ponad dalsze
+    obrażenia, EXP bez szans na awans), jest z klucza wycięte - stany różniące się
+    tylko tym mają tę samą przyszłość i liczą się raz. Przy exact_exp (cel "exp")
+    EXP zostaje w kluczu dokładnie - wartością stanu jest wtedy EXP na koniec.
+    """
+
+    def __init__(self, T, start_scene: str = START_SCENE, max_states: int = 200000, exact_exp: bool = False,
+                 steps: Optional[Dict[str, int]] = None):
+        import dataclasses
+        self.T = T
+        self.io = _explorer_io(T)
+        self.game = T.Game()
+        self.items = self.game.items_db
+        self.start_scene = start_scene
+        self.max_states = max_states
+        self.live = liveness(T, self.game)
+        steps = dict(STATE_STEPS if steps is None else steps)
+        if exact_exp:
+            steps.pop("experience", None)
+        resolution = tuple((T.CHARACTER_STATS.index(name), n) for name, n in steps.items() if n > 1)
+        self.live = {k: dataclasses.replace(rel, exp_gain=None if exact_exp else rel.exp_gain,
+                                            steps=tuple(st for st in resolution if st[0] not in rel.dropped))
+                     for k, rel in self.live.items()}
+        self.exact = not resolution
+        # Sceny, do których doszedł choć jeden przebieg (także przejściowe i ta z końcem aktu)
+        self.reached: set = set()
+        self.keys: Dict[tuple, int] = {}          # klucz kanoniczny -> numer
+        self.states: List[tuple] = []             # numer -> (scena, Character.state_key())
+        self.edges: Dict[int, Dict[int, tuple]] = {}  # numer -> {pozycja wyboru: drzewo przejścia}
+        self.truncated = False
+
+    # --- przebiegi ---
+    def _settle(self, game) -> Any:
+        ch = game.character
+        for _ in range(64):
+            self.reached.add(game.current_scene_id)
+            if ch.current_hp <= 0:
+                return DIED
+            if ch.flags.get("act1_completed", False):
+                return COMPLETED, ch.experience
+            scene = game.scenes.get(game.current_scene_id)
+            if scene is None:
+                return BLOCKED
+            scene.enter(game)
+            nxt = scene.check_exit(game)
+            if not nxt:
+                return self._intern(game.current_scene_id, game.character)
+            game.current_scene_id = nxt
+            ch = game.character
+        return BLOCKED
+
+    def canonical(self, scene_id: str, state: tuple) -> tuple:
+        return self.T.canonical_state(scene_id, state, self.live.get(scene_id) or self.T.StateRelevance())
+
+    def _intern(self, scene_id: str, ch) -> int:
+        state = ch.state_key()
+        key = self.canonical(scene_id, state)
+        sid = self.keys.get(key)
+        if sid is None:
+            sid = self.keys[key] = len(self.states)
+            self.states.append((scene_id, state))
+        return sid
+
+    def character(self, sid: int):
+        return self.T.Character.from_state(self.states[sid][1], self.items, "Explorer")
+
+    def _run(self, script: tuple, sid: Optional[int], choice_index: int) -> Any:
+        T = self.T
+        game = self.game
+        game.scene_narration = {}
+        sio = self.io(script)
+        token = sio.activate()
+        try:
+            if sid is None:
+                game.new_character("Explorer")
+                game.current_scene_id = self.start_scene
+                return self._settle(game)
+            scene_id = self.states[sid][0]
+            game.character = self.character(sid)
+            game.current_scene_id = scene_id
+            choice = game.scenes[scene_id].choices[choice_index]
+            choice.apply(game)
+            if choice.next_scene is not None:
+                game.current_scene_id = choice.next_scene
+            return self._settle(game)
+        except T.InputExhausted:
+            return BLOCKED
+        finally:
+            T._session_io.reset(token)
+
+    def transition(self, sid: Optional[int], choice_index: int = 0, script: tuple = ()) -> tuple:
+        """Drzewo przejścia: ("leaf", stan|koniec) | ("chance", ((p, poddrzewo), ...)) | ("pick", ((wartość, poddrzewo), ...))."""
+        try:
+            return ("leaf", self._run(script, sid, choice_index))
+        except _Branch as b:
+            if b.kind == "pick":
+                return ("pick", tuple((v, self.transition(sid, choice_index, script + (v,))) for v in b.values))
+            # Jednakowe poddrzewa (np. różne kwoty srebra z tym samym skutkiem) - sklejone, p zsumowane
+            merged: Dict[tuple, float] = {}
+            for v, p in b.values:
+                sub = self.transition(sid, choice_index, script + (v,))
+                merged[sub] = merged.get(sub, 0.0) + p
+            if len(merged) == 1:
+                return next(iter(merged))
+            return ("chance", tuple((p, sub) for sub, p in merged.items()))
+
+    # --- przeszukiwanie ---
+    def available(self, sid: int) -> List[int]:
+        scene_id = self.states[sid][0]
+        game = self.game
+        game.character = self.character(sid)
+        return [i for i, c in enumerate(game.scenes[scene_id].choices) if c.is_available(game)]
+
+    def run(self) -> "Explorer":
+        root = self.transition(None)
+        self.root = root
+        # Wszerz - przy limicie stanów wczesne sceny są zbadane w całości
+        queue = deque(sorted({n for n in _leaves(root) if isinstance(n, int)}))
+        seen = set(queue)
+        while queue:
+            sid = queue.popleft()
+            if len(self.states) > self.max_states:
+                self.truncated = True
+                break
+            out = self.edges[sid] = {}
+            for i in self.available(sid):
+                tree = out[i] = self.transition(sid, i)
+                for nxt in _leaves(tree):
+                    if isinstance(nxt, int) and nxt not in seen:
+                        seen.add(nxt)
+                        queue.append(nxt)
+        return self
+
+
+def _leaves(tree: tuple):
+    kind, body = tree
+    if kind == "leaf":
+        yield body
+    else:
+        for _, sub in body:
+            yield from _leaves(sub)
+
+
+def explore(max_states: int, start_scene: str = START_SCENE, exact: bool = False) -> dict:
+    import thalanor_v1_9 as T
+    t0 = time.perf_counter()
+    ex = Explorer(T, start_scene=start_scene, max_states=max_states, steps={} if exact else None).run()
+    wall = time.perf_counter() - t0
+
+    per_scene: Dict[str, int] = {}
+    for scene_id, _ in ex.states:
+        per_scene[scene_id] = per_scene.get(scene_id, 0) + 1
+    expanded = set(ex.edges)
+    soft_locks = sorted(sid for sid in expanded if not ex.edges[sid])
+    ends: Dict[str, int] = {DIED: 0, COMPLETED: 0, BLOCKED: 0}
+    used = set()
+    preds: Dict[Any, set] = {}
+    n_edges = 0
+    for sid, out in ex.edges.items():
+        scene_id = ex.states[sid][0]
+        for i, tree in out.items():
+            used.add((scene_id, i))
+            for nxt in set(_leaves(tree)):
+                n_edges += 1
+                node = nxt if isinstance(nxt, int) else _end(nxt)
+                preds.setdefault(node, set()).add(sid)
+                if node in ends:
+                    ends[node] += 1
+
+    # Stany, z których nie da się dojść do żadnego końca (pętle bez wyjścia); przy limicie
+    # stanów nierozwinięte liczą się jak koniec - ich przyszłości nie znamy
+    alive = set()
+    frontier = [sid for sid in range(len(ex.states)) if sid not in expanded]
+    stack = [end for end in (DIED, COMPLETED, BLOCKED) if end in preds] + frontier
+    while stack:
+        node = stack.pop()
+        for prev in preds.get(node, ()):
+            if prev not in alive:
+                alive.add(prev)
+                stack.append(prev)
+    trapped = sorted(sid for sid in expanded if sid not in alive and ex.edges[sid])
+
+    game = T.Game()
+    game.scenes.materialize_all()
+    unreachable_choices = [f"{sc.scene_id}#{i}" for sc in game.scenes.values()
+                           for i in range(len(sc.choices)) if (sc.scene_id, i) not in used]
+    # Przy limicie stanów "nieosiągalne" znaczy tylko "niezbadane" - takich list nie podajemy
+    if ex.truncated:
+        unreachable_scenes = unreachable_choices = None
+    else:
+        unreachable_scenes = sorted(set(game.scenes.ids()) - ex.reached)
+
+    def describe(sid: int) -> dict:
+        ch = ex.character(sid)
+        return {"state": sid, "scene": ex.states[sid][0], "hp": ch.current_hp, "level": ch.level}
+
+    return {
+        "start": start_scene,
+        "wall_s": wall,
+        "states": len(ex.states),
+        "expanded": len(expanded),
+        "edges": n_edges,
+        "truncated": ex.truncated,
+        "exact": ex.exact,
+        "states_per_scene": dict(sorted(per_scene.items(), key=lambda kv: -kv[1])),
+        "terminal_edges": ends,
+        "unreachable_scenes": unreachable_scenes,
+        "unreachable_choices": unreachable_choices,
+        "soft_locks": [describe(sid) for sid in soft_locks],
+        "trapped": [describe(sid) for sid in trapped],
+        "_explorer": ex,
+    }
+
+
+def write_graph(ex: Explorer, path: str) -> None:
+    """Graf stanów (JSON): węzły ze sceną i zapisem postaci, krawędzie z wyborem i prawdopodobieństwem."""
+    edges = []
+    for sid, out in ex.edges.items():
+        for i, tree in out.items():
+            for nxt, p, picks in _flatten(tree):
+                edges.append({"from": sid, "choice": i, "to": nxt, "p": p, "picks": picks})
+    nodes = [{"id": sid, "scene": scene_id, "character": ex.character(sid).to_dict()}
+             for sid, (scene_id, _) in enumerate(ex.states)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"nodes": nodes, "edges": edges}, f, ensure_ascii=False)
+
+
+def _flatten(tree: tuple, p: float = 1.0, picks: tuple = ()):
+    kind, body = tree
+    if kind == "leaf":
+        yield body, p, list(picks)
+    elif kind == "chance":
+        for q, sub in body:
+            yield from _flatten(sub, p * q, picks)
+    else:
+        for v, sub in body:
+            yield from _flatten(sub, p, picks + (v,))
+
+
+def print_explore(res: dict) -> None:
+    print(f"Przestrzeń stanów Aktu I od {res['start']}: {res['states']} stanów decyzji, {res['edges']} krawędzi, "
+          f"{res['wall_s']:.1f} s{'  (PRZERWANO - limit stanów)' if res['truncated'] else ''}")
+    if not res["exact"]:
+        print(f"  klucz stanu przybliżony (przedziały: {', '.join(f'{k} {n}' for k, n in STATE_STEPS.items())}; --exact wyłącza)")
+    ends = res["terminal_edges"]
+    print(f"  przejścia do końca: ukończenie {ends[COMPLETED]}, śmierć {ends[DIED]}, poza modelem {ends[BLOCKED]}")
+    print("\n  Stany na scenę:")
+    for scene_id, n in res["states_per_scene"].items():
+        print(f"  {scene_id:36} {n:7d}")
+    print()
+    if res["unreachable_scenes"] is not None:
+        print(f"  Sceny nieosiągalne ({len(res['unreachable_scenes'])}): {', '.join(res['unreachable_scenes']) or '-'}")
+        print(f"  Wybory nigdy niedostępne ({len(res['unreachable_choices'])}): "
+              f"{', '.join(res['unreachable_choices']) or '-'}")
+    print(f"  Soft-locki - brak dostępnego wyboru ({len(res['soft_locks'])}):")
+    for row in res["soft_locks"][:20]:
+        print(f"    #{row['state']} {row['scene']} (HP {row['hp']}, poziom {row['level']})")
+    print(f"  Pętle bez wyjścia - brak drogi do końca ({len(res['trapped'])}):")
+    for row in res["trapped"][:20]:
+        print(f"    #{row['state']} {row['scene']} (HP {row['hp']}, poziom {row['level']})")
+
+
+# =============================================================================
+# POLITYKA OPTYMALNA
+# =============================================================================
+
+OBJECTIVES = ("survival", "exp")
+
+
+def _terminal_value(leaf, objective: str) -> float:
+    if _end(leaf) != COMPLETED:
+        return 0.0
+    return 1.0 if objective == "survival" else float(leaf[1])
+
+
+def _tree_value(tree: tuple, V: List[float], objective: str) -> float:
+    kind, body = tree
+    if kind == "leaf":
+        return V[body] if isinstance(body, int) else _terminal_value(body, objective)
+    if kind == "chance":
+        return sum(p * _tree_value(sub, V, objective) for p, sub in body)
+    return max(_tree_value(sub, V, objective) for _, sub in body)
+
+
+def solve_values(ex: Explorer, objective: str = "survival", max_sweeps: int = 1000) -> Tuple[List[float], Dict[int, int], int]:
+    """Wartości stanów i najlepszy wybór w każdym rozwiniętym stanie; zwraca też liczbę przebiegów.
+
+    Stany numerowane wszerz, więc następniki mają zwykle większe numery - przebieg
+    od końca liczy prawie wszystko za pierwszym razem, kolejne domykają pętle.
+    Wartości rosną od 0 do najmniejszego punktu stałego; nierozwinięte stany zostają na 0.
+    """
+    V = [0.0] * len(ex.states)
+    policy: Dict[int, int] = {}
+    order = sorted(ex.edges, reverse=True)
+    for sweep_no in range(1, max_sweeps + 1):
+        changed = False
+        for sid in order:
+            best_i, best_v, best_loop = None, 0.0, True
+            for i, tree in ex.edges[sid].items():
+                v = _tree_value(tree, V, objective)
+                loop = sid in _leaves(tree)
+                # Przy remisie wybór, który nie wraca do tego samego stanu
+                if best_i is None or v > best_v + 1e-12 or (v > best_v - 1e-12 and best_loop and not loop):
+                    best_i, best_v, best_loop = i, v, loop
+            if best_i is not None:
+                policy[sid] = best_i
+            if abs(best_v - V[sid]) > 1e-12:
+                V[sid] = best_v
+                changed = True
+        if not changed:
+            return V, policy, sweep_no
+    return V, policy, max_sweeps
+
+
+def _reach(ex: Explorer, policy: Dict[int, int], V: List[float], objective: str) -> Dict[int, float]:
+    """Oczekiwana liczba odwiedzin stanów przy grze według polityki (punkty za awans - najlepsze)."""
+    def spread(tree: tuple, p: float, out: List[Tuple[int, float]]) -> None:
+        kind, body = tree
+        if kind == "leaf":
+            if isinstance(body, int):
+                out.append((body, p))
+        elif kind == "chance":
+            for q, sub in body:
+                spread(sub, p * q, out)
+        else:
+            spread(max(body, key=lambda vs: _tree_value(vs[1], V, objective))[1], p, out)
+
+    start: List[Tuple[int, float]] = []
+    spread(ex.root, 1.0, start)
+    succ: Dict[int, List[Tuple[int, float]]] = {}
+    indeg: Dict[int, int] = {}
+    stack = [sid for sid, _ in start]
+    seen = set(stack)
+    while stack:
+        sid = stack.pop()
+        out = succ[sid] = []
+        if sid in policy:
+            spread(ex.edges[sid][policy[sid]], 1.0, out)
+        for nxt, _ in out:
+            indeg[nxt] = indeg.get(nxt, 0) + 1
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    reach: Dict[int, float] = {}
+    for sid, p in start:
+        reach[sid] = reach.get(sid, 0.0) + p
+    # Kolejność topologiczna (Kahn); stany w pętlach polityki zostają bez przepływu dalej
+    queue = deque(sid for sid in seen if not indeg.get(sid))
+    while queue:
+        sid = queue.popleft()
+        for nxt, p in succ[sid]:
+            reach[nxt] = reach.get(nxt, 0.0) + reach.get(sid, 0.0) * p
+            indeg[nxt] -= 1
+            if not indeg[nxt]:
+                queue.append(nxt)
+    return reach
+
+
+def solve(objective: str, max_states: int, start_scene: str = START_SCENE, exact: bool = False) -> dict:
+    import thalanor_v1_9 as T
+    t0 = time.perf_counter()
+    ex = Explorer(T, start_scene=start_scene, max_states=max_states, exact_exp=objective == "exp",
+                  steps={} if exact else None).run()
+    t1 = time.perf_counter()
+    V, policy, sweeps = solve_values(ex, objective)
+    t2 = time.perf_counter()
+
+    reach = _reach(ex, policy, V, objective)
+    game = ex.game
+    scenes: Dict[str, dict] = {}
+    for sid, r in reach.items():
+        if sid not in policy or r <= 0:
+            continue
+        scene_id = ex.states[sid][0]
+        values = [_tree_value(tree, V, objective) for tree in ex.edges[sid].values()]
+        row = scenes.setdefault(scene_id, {"visits": 0.0, "value": 0.0, "loss": 0.0, "best": {}})
+        row["visits"] += r
+        row["value"] += r * V[sid]
+        row["loss"] += r * (V[sid] - min(values))
+        row["best"][policy[sid]] = row["best"].get(policy[sid], 0.0) + r
+    for scene_id, row in scenes.items():
+        visits = row["visits"]
+        row["value"] /= visits
+        row["loss"] /= visits
+        best = max(row["best"], key=row["best"].get)
+        row["best"] = f"{scene_id}#{best} ({ex.T.tr(game.scenes[scene_id].choices[best].text)})"
+
+    root_value = _tree_value(ex.root, V, objective)
+    return {
+        "objective": objective,
+        "start": start_scene,
+        "states": len(ex.states),
+        "truncated": ex.truncated,
+        "explore_s": t1 - t0,
+        "solve_s": t2 - t1,
+        "sweeps": sweeps,
+        "value": root_value,
+        "scenes": dict(sorted(scenes.items(), key=lambda kv: -kv[1]["visits"])),
+        "_explorer": ex,
+        "_policy": policy,
+    }
+
+
+def write_advisor(ex: Explorer, policy: Dict[int, int], objective: str, path: str) -> None:
+    """Tabela polityki dla Advisor: skrót kanonicznego stanu -> pozycja najlepszego wyboru w scenie."""
+    T = ex.T
+    table = {T.state_digest(ex.canonical(*ex.states[sid])): i for sid, i in policy.items()}
+    if ex.truncated:
+        raise ValueError("eksploracja przerwana na limicie stanów - tabela nie obejmowałaby całej gry")
+    live = {k: rel.to_save() for k, rel in ex.live.items()}
+    data = {"objective": objective, "live": live, "policy": table}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def print_solve(res: dict) -> None:
+    label = "prawdopodobieństwo ukończenia" if res["objective"] == "survival" else "oczekiwane EXP na koniec"
+    bound = "  (dolne ograniczenie - eksploracja przerwana)" if res["truncated"] else ""
+    print(f"Polityka optymalna od {res['start']}: {label} {res['value']:.4f}{bound}")
+    print(f"  {res['states']} stanów, eksploracja {res['explore_s']:.1f} s, "
+          f"indukcja wsteczna {res['solve_s'] * 1000:.0f} ms ({res['sweeps']} przebiegi)")
+    print(f"\n  {'scena':32} {'odwiedziny':>10} {'wartość':>9} {'strata':>8}  najczęstszy najlepszy wybór")
+    for scene_id, row in res["scenes"].items():
+        mark = "  [bez znaczenia]" if row["loss"] < 1e-9 and not res["truncated"] else ""
+        print(f"  {scene_id:32} {row['visits']:10.3f} {row['value']:9.4f} {row['loss']:8.4f}  {row['best']}{mark}")
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="thalanor_analysis", description="Analiza treści i balansu Thalanor")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("sweep", help="balans startowych buildów x polityki wyborów")
+    p.add_argument("--episodes", type=int, default=400, help="epizody na build i politykę")
+    p.add_argument("--policy", nargs="+", choices=sorted(POLICIES), default=list(POLICIES))
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--coverage", help="zapisz pokrycie scen i wyborów z epizodów (JSON, jak THALANOR_COVERAGE)")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("explore", help="pełny graf stanów Aktu I (wybory x rzuty)")
+    p.add_argument("--start", default=START_SCENE, help="scena startowa (świeża postać)")
+    p.add_argument("--max-states", type=int, default=200000)
+    p.add_argument("--exact", action="store_true", help="dokładny klucz stanu (bez przedziałów STATE_STEPS)")
+    p.add_argument("--graph", help="zapisz graf stanów (JSON) do pliku")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("solve", help="polityka optymalna na grafie stanów (przeżycie albo EXP)")
+    p.add_argument("--objective", choices=OBJECTIVES, default="survival")
+    p.add_argument("--start", default=START_SCENE, help="scena startowa (świeża postać)")
+    p.add_argument("--max-states", type=int, default=200000)
+    p.add_argument("--exact", action="store_true", help="dokładny klucz stanu (bez przedziałów STATE_STEPS)")
+    p.add_argument("--advisor", help="zapisz tabelę polityki dla podpowiedzi w grze (THALANOR_ADVISOR)")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("coverage", help="pokrycie scen i wyborów: tabela i graf (symulacja + zrzuty z gry)")
+    p.add_argument("paths", nargs="*", help="zrzuty pokrycia (THALANOR_COVERAGE, sweep --coverage)")
+    p.add_argument("--sim", type=int, default=None, help="epizody symulacji na build i politykę (bez plików: 100)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--dot", help="zapisz graf scen z nałożonym pokryciem (Graphviz DOT)")
+    p.add_argument("--out", help="zapisz scalone liczniki (JSON)")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "sweep":
+        res = sweep(args.episodes, args.policy, args.workers, args.seed, coverage=bool(args.coverage))
+        if args.coverage:
+            import thalanor_v1_9 as T
+            cov = T.Coverage()
+            cov.merge(res.pop("coverage"))
+            cov.dump(args.coverage)
+        if args.json:
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+        else:
+            print_sweep(res)
+    elif args.command == "explore":
+        res = explore(args.max_states, args.start, args.exact)
+        ex = res.pop("_explorer")
+        if args.graph:
+            write_graph(ex, args.graph)
+        if args.json:
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+        else:
+            print_explore(res)
+    elif args.command == "coverage":
+        sim = args.sim if args.sim is not None else (0 if args.paths else 100)
+        res = coverage(args.paths, sim, args.workers, args.seed)
+        counts = res.pop("_counts")
+        if args.out:
+            import thalanor_v1_9 as T
+            cov = T.Coverage()
+            cov.merge(counts)
+            cov.dump(args.out)
+        if args.dot:
+            write_coverage_dot(res, args.dot)
+        if args.json:
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+        else:
+            print_coverage(res)
+    elif args.command == "solve":
+        res = solve(args.objective, args.max_states, args.start, args.exact)
+        ex, policy = res.pop("_explorer"), res.pop("_policy")
+        if args.advisor and not ex.truncated:
+            write_advisor(ex, policy, args.objective, args.advisor)
+        if args.json:
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+        else:
+            print_solve(res)
+        if args.advisor and ex.truncated:
+            # Polityka z przerwanej eksploracji nie zna stanów za limitem - tabeli nie zapisujemy
+            print(f"--advisor: eksploracja przerwana na limicie stanów - {args.advisor} nie zapisany; "
+                  f"zwiększ --max-states albo zacznij dalej (--start)", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,810 @@
+# -*- coding: utf-8 -*-
+"""
+THALANOR – pomiary wydajności silnika
+
+    python thalanor_bench.py startup [--runs N] [--json]
+    python thalanor_bench.py reload [--sessions N] [--threads N] [--reloads N] [--json]
+    python thalanor_bench.py memory [--sessions N] [--steps N] [--json]
+    python thalanor_bench.py inventory [--entries N] [--kinds N] [--json]
+    python thalanor_bench.py trade [--stock N] [--sessions N] [--threads N] [--json]
+    python thalanor_bench.py micro [--filter TEKST] [--out PLIK] [--compare PLIK] [--threshold %] [--json]
+
+startup - zimny start od `python thalanor_v1_9.py` do pierwszej klatki menu
+głównego: import modułu, kompilacja skryptu, Game() (w tym _create_items
+i _create_scenes) oraz pełny czas procesu; osobno dla trybu "build"
+(katalog budowany z paczek) i "snapshot" (katalog z migawki).
+
+reload - przeładowanie treści pod obciążeniem: wątki obsługują kroki sesji,
+a CatalogReloader kolejno przebudowuje i podmienia katalog (na kopii content/).
+Raportuje czas budowy, pauzę podmiany i opóźnienia kroków sesji przed/w trakcie.
+
+memory - bajty na sesję (tracemalloc): N sesji rozegranych losowo przez `steps`
+kroków; osobno cała sesja (Game + Character) i sama postać (sesja - pusty Game).
+
+inventory - plecak z tysiącami sztuk: dodawanie, has_item, remove_item, pierwsza
+broń, przeniesienie do drugiego plecaka; Inventory (stosy + indeksy) obok listy
+przeszukiwanej liniowo (jak plecak sprzed stosów).
+
+trade - handel: kupiec z tysiącami rodzajów towaru, wiele sesji handlujących
+naraz w wątkach. Czas budowy cennika, wycena partii z gotowego cennika i z cen
+liczonych przy każdym odczycie, opóźnienia transakcji (transact) i rozmiar
+zmian towaru trzymanych przez sesję.
+
+micro - mikrobenchmarki gorących ścieżek silnika (Game(), Scene.display najbardziej
+rozbudowanych scen, wymagania, dostępność wyborów, serializacja postaci, zapis/odczyt
+slotu, plecak, skryptowane przejście Aktu I). Każdy przypadek: kalibracja liczby
+powtórzeń, kilka serii, min i mediana [µs/op]. --out zapisuje wynik (JSON, z commitem
+i wersją Pythona), --compare porównuje z wcześniejszym plikiem i kończy się kodem 1,
+gdy któryś przypadek zwolnił ponad --threshold procent.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAME_SCRIPT = os.path.join(HERE, "thalanor_v1_9.py")
+BOOT_MODES = ("build", "snapshot")
+
+
+# =============================================================================
+# STARTUP
+# =============================================================================
+
+# Sonda uruchamiana w świeżym interpreterze (argv: katalog gry, tryb startu).
+# json importowany dopiero na końcu, żeby nie zaniżać czasu importu gry.
+STARTUP_PROBE = r"""
+import sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import thalanor_v1_9 as T
+t1 = time.perf_counter()
+
+import builtins, contextlib, io
+timings = {"create_items": 0.0, "create_scenes": 0.0}
+
+def timed(name, fn):
+    def wrapper(self, *args):
+        t = time.perf_counter()
+        fn(self, *args)
+        timings[name] += time.perf_counter() - t
+    return wrapper
+
+T.ContentCatalog._create_items = timed("create_items", T.ContentCatalog._create_items)
+T.ContentCatalog._create_scenes = timed("create_scenes", T.ContentCatalog._create_scenes)
+
+class FirstFrame(BaseException):
+    pass
+
+def first_input(prompt=""):
+    raise FirstFrame
+
+t2 = time.perf_counter()
+game = T.Game(boot=sys.argv[2])
+t3 = time.perf_counter()
+builtins.input = first_input
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        game.run()
+    except FirstFrame:
+        pass
+t4 = time.perf_counter()
+
+import json
+print(json.dumps({
+    "import": t1 - t0,
+    "game_init": t3 - t2,
+    "create_items": timings["create_items"],
+    "create_scenes": timings["create_scenes"],
+    "first_frame": t4 - t3,
+    "to_first_frame": t4 - t0,
+}))
+"""
+
+
+def _probe(mode: str) -> Dict[str, float]:
+    import json
+    out = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE, HERE, mode],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _wall(argv: List[str], stdin: str = "") -> float:
+    t = time.perf_counter()
+    subprocess.run(argv, input=stdin, check=True, capture_output=True, text=True)
+    return time.perf_counter() - t
+
+
+def _compile_time() -> float:
+    # Skrypt uruchamiany jako __main__ nie korzysta z __pycache__ - kompilowany jest przy każdym starcie
+    with open(GAME_SCRIPT, encoding="utf-8") as f:
+        source = f.read()
+    t = time.perf_counter()
+    compile(source, GAME_SCRIPT, "exec")
+    return time.perf_counter() - t
+
+
+def _import_breakdown(top: int = 8) -> List[tuple]:
+    """Najdroższe moduły wg `-X importtime` (czas własny, ms)."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {HERE!r}); import thalanor_v1_9"],
+        check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    rows.sort(key=lambda r: r[1], reverse=True)
+    return rows[:top]
+
+
+def bench_startup(runs: int) -> dict:
+    _probe("snapshot")  # rozgrzewka: zapis migawki i __pycache__
+    result = {
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "interpreter": statistics.median(_wall([sys.executable, "-c", "pass"]) for _ in range(runs)),
+        "compile_script": statistics.median(_compile_time() for _ in range(runs)),
+        "imports": _import_breakdown(),
+        "modes": {},
+    }
+    for mode in BOOT_MODES:
+        probes = [_probe(mode) for _ in range(runs)]
+        row = {k: statistics.median(p[k] for p in probes) for k in probes[0]}
+        argv = [sys.executable, GAME_SCRIPT] + (["--snapshot"] if mode == "snapshot" else [])
+        row["process"] = statistics.median(_wall(argv, "0\n") for _ in range(runs))
+        result["modes"][mode] = row
+    return result
+
+
+def print_startup(res: dict) -> None:
+    ms = lambda s: f"{s * 1000:8.2f} ms"
+    print(f"Zimny start (python {res['python']}, mediana z {res['runs']} uruchomień)")
+    print(f"  {'interpreter (python -c pass)':32}{ms(res['interpreter'])}")
+    print(f"  {'kompilacja skryptu':32}{ms(res['compile_script'])}")
+    print()
+    print(f"  {'':32}" + "".join(f"{m:>11}" for m in BOOT_MODES))
+    for key, label in (
+        ("import", "import thalanor_v1_9"),
+        ("game_init", "Game()"),
+        ("create_items", "  _create_items"),
+        ("create_scenes", "  _create_scenes"),
+        ("first_frame", "run() -> menu główne"),
+        ("to_first_frame", "import -> menu główne"),
+        ("process", "proces (stdin: 0)"),
+    ):
+        print(f"  {label:32}" + "".join(ms(res["modes"][m][key]).rjust(11) for m in BOOT_MODES))
+    print()
+    print("  Import - najdroższe moduły (czas własny / łączny):")
+    for name, self_ms, cum_ms in res["imports"]:
+        print(f"    {name:30}{self_ms:8.2f} ms {cum_ms:8.2f} ms")
+
+
+# =============================================================================
+# RELOAD
+# =============================================================================
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"n": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+    xs = sorted(samples)
+    return {"n": len(xs), "p50": xs[len(xs) // 2], "p99": xs[min(len(xs) - 1, int(len(xs) * 0.99))], "max": xs[-1]}
+
+
+def _session_step(game, rng: random.Random) -> None:
+    # Ścieżka obsługi sesji bez wejścia/wyjścia: synchronizacja katalogu, scena, dostępność wyborów, przejście
+    game._sync_catalog()
+    scene = game.scenes[game.current_scene_id]
+    targets = [c.next_scene for c in scene.choices if c.is_available(game) and c.next_scene]
+    if targets:
+        game.current_scene_id = rng.choice(targets)
+
+
+def bench_reload(sessions: int, threads: int, reloads: int, phase: float) -> dict:
+    import thalanor_v1_9 as T
+
+    # Kopia treści - przeładowania nie dotykają plików repozytorium
+    tmp = tempfile.mkdtemp(prefix="thalanor-reload-")
+    content = os.path.join(tmp, "content")
+    shutil.copytree(T.CONTENT_DIR, content, ignore=shutil.ignore_patterns("__pycache__"))
+    T.CONTENT_DIR = content
+    T.ContentCatalog._active.clear()
+    try:
+        rng = random.Random(1)
+        games = []
+        for _ in range(sessions):
+            g = T.Game()
+            g.character = T.Character("Bench")
+            g.current_scene_id = rng.choice(g.scenes.ids())
+            games.append(g)
+
+        lat: Dict[str, List[float]] = {"baseline": [], "reload": []}
+        phase_name = ["baseline"]
+        stop = threading.Event()
+
+        def worker(seed: int) -> None:
+            wrng = random.Random(seed)
+            clock = time.perf_counter
+            while not stop.is_set():
+                g = games[wrng.randrange(len(games))]
+                t = clock()
+                _session_step(g, wrng)
+                lat[phase_name[0]].append(clock() - t)
+
+        pool = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(threads)]
+        for th in pool:
+            th.start()
+        time.sleep(phase)
+
+        phase_name[0] = "reload"
+        reloader = T.CatalogReloader()
+        pack = os.path.join(content, T.Game.CONTENT_PACKS[0])
+        builds, pauses = [], []
+        t_reload = time.perf_counter()
+        for i in range(reloads):
+            # Zmiana treści (inna zawartość = nowy digest, pełna kompilacja paczki)
+            with open(pack, "a", encoding="utf-8") as f:
+                f.write(" ")
+            if reloader.poll():
+                builds.append(reloader.last_build)
+                pauses.append(reloader.last_pause)
+            time.sleep(phase / reloads)
+        t_reload = time.perf_counter() - t_reload
+        stop.set()
+        for th in pool:
+            th.join()
+
+        current = T.ContentCatalog.active(T.Game)
+        for g in games:
+            g._sync_catalog()
+        return {
+            "sessions": sessions,
+            "threads": threads,
+            "reloads": reloads,
+            "swaps": reloader.swaps,
+            "failures": reloader.failures,
+            "build": _percentiles(builds),
+            "pause": _percentiles(pauses),
+            "step_baseline": _percentiles(lat["baseline"]),
+            "step_reload": _percentiles(lat["reload"]),
+            "steps_per_s_baseline": len(lat["baseline"]) / phase,
+            "steps_per_s_reload": len(lat["reload"]) / t_reload,
+            "sessions_on_latest": sum(g.catalog is current for g in games),
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def print_reload(res: dict) -> None:
+    us = lambda s: f"{s * 1e6:10.1f} us"
+    print(f"Przeładowanie treści: {res['sessions']} sesji, {res['threads']} wątki obsługi, "
+          f"{res['swaps']}/{res['reloads']} podmian (błędy: {res['failures']})")
+    print(f"  {'':28}{'p50':>13}{'p99':>13}{'max':>13}")
+    for key, label in (("build", "budowa katalogu (w tle)"), ("pause", "pauza podmiany"),
+                       ("step_baseline", "krok sesji - bez przeład."), ("step_reload", "krok sesji - z przeład.")):
+        row = res[key]
+        print(f"  {label:28}{us(row['p50'])}{us(row['p99'])}{us(row['max'])}")
+    print(f"  kroki/s: {res['steps_per_s_baseline']:.0f} bez przeładowań, {res['steps_per_s_reload']:.0f} w trakcie")
+    print(f"  sesje na najnowszym katalogu: {res['sessions_on_latest']}/{res['sessions']}")
+
+
+# =============================================================================
+# MEMORY
+# =============================================================================
+
+def _play_steps(game, rng: random.Random, steps: int) -> None:
+    # Losowa rozgrywka bez interfejsu: hooki sceny, warunek wyjścia, dostępny wybór i jego efekty
+    for _ in range(steps):
+        game._sync_catalog()
+        scene = game.scenes[game.current_scene_id]
+        scene.enter(game)
+        nxt = scene.check_exit(game)
+        if nxt:
+            game.current_scene_id = nxt
+            continue
+        options = [c for c in scene.choices if c.is_available(game)]
+        if not options or game.character.current_hp <= 0:
+            break
+        choice = rng.choice(options)
+        choice.apply(game)
+        if choice.next_scene is not None:
+            game.current_scene_id = choice.next_scene
+
+
+def bench_memory(sessions: int, steps: int) -> dict:
+    import builtins
+    import contextlib
+    import tracemalloc
+    import thalanor_v1_9 as T
+
+    # Katalog, sceny i teksty współdzielone przez proces - poza pomiarem
+    T.Game().scenes.materialize_all()
+    T.tr("ui.intro")
+
+    old_input = builtins.input
+    builtins.input = lambda prompt="": "1"  # rozdawanie punktów przy awansie
+    random.seed(7)
+    rng = random.Random(7)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            games = []
+            for i in range(sessions):
+                g = T.Game()
+                g.character = T.Character(f"Gracz{i}")
+                _play_steps(g, rng, steps)
+                games.append(g)
+            session_bytes = tracemalloc.get_traced_memory()[0] - base
+            tracemalloc.stop()
+
+            # Sama sesja bez postaci - różnica to koszt postaci
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            bare = [T.Game() for _ in range(sessions)]
+            game_bytes = tracemalloc.get_traced_memory()[0] - base
+            tracemalloc.stop()
+    finally:
+        builtins.input = old_input
+    return {
+        "sessions": sessions,
+        "steps": steps,
+        "bytes_per_session": session_bytes / sessions,
+        "bytes_per_character": (session_bytes - game_bytes) / sessions,
+        "avg_flags": sum(len(g.character.flags) for g in games) / sessions,
+        "avg_used_actions": sum(len(g.character.used_actions) for g in games) / sessions,
+        "avg_items": sum(len(g.character.inventory) for g in games) / sessions,
+    }
+
+
+def print_memory(res: dict) -> None:
+    print(f"Pamięć: {res['sessions']} sesji po {res['steps']} krokach losowej rozgrywki")
+    print(f"  bajty / sesja (Game + Character): {res['bytes_per_session']:10.0f}")
+    print(f"  bajty / postać:                   {res['bytes_per_character']:10.0f}")
+    print(f"  średnio: {res['avg_flags']:.1f} flag, {res['avg_used_actions']:.1f} akcji jednorazowych, "
+          f"{res['avg_items']:.1f} przedmiotów w plecaku")
+
+
+# =============================================================================
+# INVENTORY
+# =============================================================================
+
+class _ListInventory:
+    # Plecak sprzed stosów: lista egzemplarzy, wyszukiwanie liniowe - punkt odniesienia
+    def __init__(self, max_slots: int):
+        self.max_slots = max_slots
+        self.items = []
+
+    def add_item(self, item) -> bool:
+        if len(self.items) >= self.max_slots:
+            return False
+        self.items.append(item)
+        return True
+
+    def remove_item(self, item_id: str):
+        for i, it in enumerate(self.items):
+            if it.item_id == item_id:
+                return self.items.pop(i)
+        return None
+
+    def has_item(self, item_id: str) -> bool:
+        return any(it.item_id == item_id for it in self.items)
+
+    def first_of_type(self, item_type: str):
+        return next((it for it in self.items if it.item_type == item_type), None)
+
+    def transfer(self, other, item_id: str, count: int) -> bool:
+        for _ in range(count):
+            it = self.remove_item(item_id)
+            if it is None or not other.add_item(it):
+                return False
+        return True
+
+
+def _per_op(fn, ops: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) / ops * 1e6
+
+
+def bench_inventory(entries: int, kinds: int) -> dict:
+    import thalanor_v1_9 as T
+
+    types = ("consumable", "misc", "weapon", "armor")
+    # Ostatni rodzaj to jedyna broń - najgorszy przypadek dla przeszukiwania listy
+    defs = [T.Item(f"item_{k}", f"item_{k}", "", types[k % 2] if k < kinds - 1 else "weapon")
+            for k in range(kinds)]
+    rng = random.Random(11)
+    picks = [defs[rng.randrange(kinds - 1)] for _ in range(entries - 1)] + [defs[-1]]
+    lookups = [defs[rng.randrange(kinds)].item_id for _ in range(2000)] + ["missing"] * 500
+    results = {}
+    for label, make in (("list", lambda: _ListInventory(entries * 2)),
+                        ("stacked", lambda: T.Inventory(max_slots=entries * 2))):
+        inv = make()
+        row = {"add_us": _per_op(lambda: [inv.add_item(T.ItemInstance(d)) for d in picks], entries)}
+        row["has_item_us"] = _per_op(lambda: [inv.has_item(i) for i in lookups], len(lookups))
+        row["first_weapon_us"] = _per_op(lambda: [inv.first_of_type("weapon") for _ in range(200)], 200)
+        other = make()
+        moved = min(200, entries // (2 * kinds) or 1)
+        if label == "list":
+            row["transfer_us"] = _per_op(lambda: inv.transfer(other, defs[0].item_id, moved), moved)
+        else:
+            row["transfer_us"] = _per_op(lambda: inv.transfer(other, {defs[0].item_id: moved}), moved)
+        removes = [defs[rng.randrange(kinds - 1)].item_id for _ in range(500)]
+        row["remove_us"] = _per_op(lambda: [inv.remove_item(i) for i in removes], len(removes))
+        row["slots_used"] = len(inv.items) if label == "list" else len(inv.stacks)
+        results[label] = row
+    return {"entries": entries, "kinds": kinds, "results": results}
+
+
+def print_inventory(res: dict) -> None:
+    print(f"Plecak: {res['entries']} sztuk, {res['kinds']} rodzajów przedmiotów  [µs / operacja]")
+    cols = ("add_us", "has_item_us", "remove_us", "first_weapon_us", "transfer_us")
+    print(f"  {'':8} " + " ".join(f"{c[:-3]:>13}" for c in cols) + f" {'miejsca':>9}")
+    for label, row in res["results"].items():
+        print(f"  {label:8} " + " ".join(f"{row[c]:13.3f}" for c in cols) + f" {row['slots_used']:9d}")
+
+
+# =============================================================================
+# TRADE
+# =============================================================================
+
+def _trade_catalog(T, stock: int):
+    # Katalog z syntetycznym kupcem (bez plików) - podstawiany sesjom zamiast aktywnego
+    catalog = T.ContentCatalog(T.Game)
+    kinds = ("consumable", "misc", "weapon", "armor")
+    catalog.items = {f"ware_{i}": T.Item(f"ware_{i}", f"ware_{i}", "", kinds[i % 4], value=5 + i % 200)
+                     for i in range(stock)}
+    catalog.merchants = {"bench": T.Merchant("bench", "bench", "bench", 120, 50, kinds,
+                                             tuple((iid, 50) for iid in catalog.items))}
+    return catalog
+
+
+def _quote_per_lookup(merchant, ch, items, buy: Dict[str, int]) -> int:
+    # Punkt odniesienia: premia i cena liczone przy każdym odczycie
+    total = 0
+    for iid, n in buy.items():
+        modifier = merchant.modifier(ch)
+        total += max(1, -(-items[iid].value * merchant.sell_pct * (100 - modifier) // 10000)) * n
+    return total
+
+
+def bench_trade(stock: int, sessions: int, threads: int, trades: int) -> dict:
+    import thalanor_v1_9 as T
+
+    catalog = _trade_catalog(T, stock)
+    merchant = catalog.merchants["bench"]
+    ids = list(catalog.items)
+
+    t0 = time.perf_counter()
+    T.PriceTable.build(merchant, 0, catalog.items)
+    table_ms = (time.perf_counter() - t0) * 1000
+
+    games = []
+    for i in range(sessions):
+        g = T.Game()
+        g.catalog = catalog
+        g.character = T.Character(f"Kupiec{i}")
+        g.character.reputation = i % 11 - 5
+        g.character.gold = 1000
+        g.character.inventory.max_slots = 200
+        games.append(g)
+
+    rng = random.Random(3)
+    batch = {iid: 2 for iid in rng.sample(ids, 10)}
+    g = games[0]
+    reps = 2000
+    quote_us = _per_op(lambda: [T.quote(g, "bench", batch) for _ in range(reps)], reps)
+    per_lookup_us = _per_op(lambda: [_quote_per_lookup(merchant, g.character, catalog.items, batch)
+                                     for _ in range(reps)], reps)
+
+    samples: List[float] = []
+    failures = [0]
+    lock = threading.Lock()
+
+    def worker(part: List) -> None:
+        r = random.Random(len(part))
+        local, failed = [], 0
+        for _ in range(trades):
+            g = r.choice(part)
+            inv = g.character.inventory
+            sell = {}
+            if len(inv) and r.random() < 0.5:
+                s = r.choice(inv.stacks)
+                sell = {s.item_id: 1}
+            buy = {iid: r.randint(1, 3) for iid in r.sample(ids, r.randint(1, 4))}
+            t = time.perf_counter()
+            ok, _ = T.transact(g, "bench", buy=buy, sell=sell)
+            local.append((time.perf_counter() - t) * 1e6)
+            failed += not ok
+        with lock:
+            samples.extend(local)
+            failures[0] += failed
+
+    parts = [games[i::threads] for i in range(threads)]
+    t0 = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(p,)) for p in parts]
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    wall = time.perf_counter() - t0
+    return {
+        "stock": stock,
+        "sessions": sessions,
+        "threads": threads,
+        "price_table_ms": table_ms,
+        "price_tables": len(catalog.price_tables),
+        "quote_us": quote_us,
+        "quote_per_lookup_us": per_lookup_us,
+        "avg_stock_delta": sum(len(g.merchant_stock("bench").delta) for g in games) / sessions,
+        "transact_us": _percentiles(samples),
+        "transactions_per_s": len(samples) / wall,
+        "rejected": failures[0],
+    }
+
+
+def print_trade(res: dict) -> None:
+    print(f"Handel: towar {res['stock']} rodzajów, {res['sessions']} sesji, {res['threads']} wątki")
+    print(f"  cennik (budowa):          {res['price_table_ms']:8.2f} ms   (zbudowanych: {res['price_tables']})")
+    print(f"  wycena 10 pozycji:        {res['quote_us']:8.2f} µs   (ceny przy odczycie: {res['quote_per_lookup_us']:.2f} µs)")
+    p = res["transact_us"]
+    print(f"  transact [µs]: p50 {p['p50']:.1f}  p99 {p['p99']:.1f}  max {p['max']:.1f}")
+    print(f"  transakcje/s: {res['transactions_per_s']:.0f}  (odrzucone: {res['rejected']})")
+    print(f"  sesja przechowuje średnio {res['avg_stock_delta']:.1f} zmienionych pozycji towaru")
+
+
+# =============================================================================
+# MICRO
+# =============================================================================
+
+# Skryptowane przejście Aktu I - transkrypcja powtórek (thalanor_replay.py) dochodząca do act1_completed
+ACT1_TRANSCRIPT = os.path.join(HERE, "replays", "act1_complete.json")
+
+
+def _play_script(T, transcript: dict, workdir: str) -> "object":
+    import thalanor_replay
+    sio = thalanor_replay.replay(T, transcript, save_dir=workdir)
+    if sio.output() != transcript["output"]:
+        raise RuntimeError("transkrypcja Aktu I nie dotarła do końca - treść się zmieniła?")
+    return sio
+
+
+def _micro_cases(T, workdir: str) -> List[tuple]:
+    import thalanor_replay
+    game = T.Game()
+    game.scenes.materialize_all()
+    ch = T.Character("Bench", strength=3, dexterity=3, intelligence=3, vitality=2)
+    for flag in ("has_torch", "fire_strong", "escaped_mglak", "picks_done"):
+        ch.flags[flag] = True
+    ch.flags["stat_picks_count"] = 2
+    for action in ("look_window", "take_pouch", "forest_check_wagon"):
+        ch.used_actions.add(action)
+    ch.inventory.add_item(T.ItemInstance(game.items_db["bandage"]), 3)
+    ch.equipment.equip(T.ItemInstance(game.items_db["primitive_stick"]))
+    game.character = ch
+
+    busiest = sorted(game.scenes.values(), key=lambda sc: -len(sc.choices))[:3]
+    choices = [c for sc in game.scenes.values() for c in sc.choices]
+    req = {"intelligence": 2, "flag": ["has_torch", True], "not_used": "steal_silver_knife"}
+    saved = ch.to_dict()
+
+    T.SaveManager.SLOT_FILES = [os.path.join(workdir, f"slot{i}.json") for i in range(T.SaveManager.SLOT_COUNT)]
+    T.SaveManager.save(0, ch, "act1_night_camp")
+
+    def inventory_ops():
+        inv = T.Inventory()
+        for it in ("bandage", "primitive_stick", "bandage", "silver_knife"):
+            inv.add_item(T.ItemInstance(game.items_db[it]))
+        inv.has_item("silver_knife")
+        inv.first_of_type("weapon")
+        inv.remove_item("bandage")
+
+    cases = [
+        ("game_init", T.Game),
+        *((f"scene_display[{sc.scene_id}]", partial(sc.display, game)) for sc in busiest),
+        ("check_requirement", partial(ch.check_requirement, req)),
+        ("is_available[all]", lambda: [c.is_available(game) for c in choices]),
+        ("block_reason[all]", lambda: [c.block_reason(game) for c in choices]),
+        ("character_to_dict", ch.to_dict),
+        ("character_from_dict", partial(T.Character.from_dict, saved, game.items_db)),
+        ("save_slot", partial(T.SaveManager.save, 1, ch, "act1_night_camp")),
+        ("load_slot", partial(T.SaveManager.load, 0, game.items_db)),
+        ("inventory_ops", inventory_ops),
+        ("playthrough_act1", partial(_play_script, T, thalanor_replay.load_transcript(ACT1_TRANSCRIPT), workdir)),
+    ]
+    return cases
+
+
+def _measure(fn, repeat: int, target: float = 0.2) -> Dict[str, float]:
+    # Jak timeit.autorange: liczba wywołań tak, by seria trwała ~target sekund
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= target / 4 or loops >= 1 << 20:
+            break
+        loops *= 4
+    loops = max(1, int(loops * target / max(dt, 1e-9)))
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - t0) / loops * 1e6)
+    return {"loops": loops, "min_us": min(runs), "median_us": statistics.median(runs)}
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+        return out.stdout.strip() or "?"
+    except OSError:
+        return "?"
+
+
+def bench_micro(only: str = "", repeat: int = 5) -> dict:
+    import contextlib
+    import gc
+    import platform
+    import thalanor_v1_9 as T
+
+    old_slots = T.SaveManager.SLOT_FILES
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w", encoding="utf-8") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        try:
+            for name, fn in _micro_cases(T, workdir):
+                if only and only not in name:
+                    continue
+                # Jak timeit: bez cyklicznego GC w trakcie pomiaru
+                gc.collect()
+                gc.disable()
+                try:
+                    results[name] = _measure(fn, repeat)
+                finally:
+                    gc.enable()
+        finally:
+            T.SaveManager.SLOT_FILES = old_slots
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_micro(res: dict, baseline: dict, threshold: float) -> List[tuple]:
+    """(przypadek, przed, po, zmiana %, regresja?) - porównanie min_us z wcześniejszym wynikiem."""
+    rows = []
+    for name, row in res["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        change = (row["min_us"] / old["min_us"] - 1) * 100
+        rows.append((name, old["min_us"], row["min_us"], change, change > threshold))
+    return rows
+
+
+def print_micro(res: dict, rows: List[tuple] = ()) -> None:
+    print(f"Mikrobenchmarki (commit {res['commit']}, Python {res['python']}, {res['repeat']} serii)  [µs/op]")
+    print(f"  {'przypadek':40} {'min':>12} {'mediana':>12} {'powt.':>8}")
+    for name, row in res["results"].items():
+        print(f"  {name:40} {row['min_us']:12.2f} {row['median_us']:12.2f} {row['loops']:8d}")
+    if rows:
+        print("\n  Porównanie (min):")
+        for name, old, new, change, bad in rows:
+            print(f"  {name:40} {old:12.2f} -> {new:10.2f}  {change:+6.1f}%{'  REGRESJA' if bad else ''}")
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="thalanor_bench", description="Pomiary wydajności Thalanor")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("startup", help="zimny start do pierwszej klatki menu")
+    p.add_argument("--runs", type=int, default=15)
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("reload", help="przeładowanie treści pod obciążeniem")
+    p.add_argument("--sessions", type=int, default=2000)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--reloads", type=int, default=20)
+    p.add_argument("--phase", type=float, default=2.0, help="czas fazy pomiaru [s]")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("memory", help="bajty na sesję (tracemalloc)")
+    p.add_argument("--sessions", type=int, default=2000)
+    p.add_argument("--steps", type=int, default=30)
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("inventory", help="plecak z tysiącami sztuk")
+    p.add_argument("--entries", type=int, default=5000)
+    p.add_argument("--kinds", type=int, default=40)
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("trade", help="handel: duży towar, wiele sesji")
+    p.add_argument("--stock", type=int, default=5000)
+    p.add_argument("--sessions", type=int, default=200)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--trades", type=int, default=5000, help="transakcje na wątek")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("micro", help="mikrobenchmarki gorących ścieżek")
+    p.add_argument("--filter", default="", help="tylko przypadki zawierające tekst")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--out", help="zapisz wynik (JSON) do pliku")
+    p.add_argument("--compare", help="porównaj z wynikiem zapisanym przez --out")
+    p.add_argument("--threshold", type=float, default=15.0, help="próg regresji [%%]")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "startup":
+        res = bench_startup(args.runs)
+        if args.json:
+            import json
+            print(json.dumps(res, indent=2))
+        else:
+            print_startup(res)
+    elif args.command == "reload":
+        res = bench_reload(args.sessions, args.threads, args.reloads, args.phase)
+        if args.json:
+            import json
+            print(json.dumps(res, indent=2))
+        else:
+            print_reload(res)
+    elif args.command == "memory":
+        res = bench_memory(args.sessions, args.steps)
+        if args.json:
+            import json
+            print(json.dumps(res, indent=2))
+        else:
+            print_memory(res)
+    elif args.command == "inventory":
+        res = bench_inventory(args.entries, args.kinds)
+        if args.json:
+            import json
+            print(json.dumps(res, indent=2))
+        else:
+            print_inventory(res)
+    elif args.command == "trade":
+        res = bench_trade(args.stock, args.sessions, args.threads, args.trades)
+        if args.json:
+            import json
+            print(json.dumps(res, indent=2))
+        else:
+            print_trade(res)
+    elif args.command == "micro":
+        import json
+        res = bench_micro(args.filter, args.repeat)
+        rows = []
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                rows = compare_micro(res, json.load(f), args.threshold)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(res, f, indent=2)
+        if args.json:
+            print(json.dumps(res, indent=2))
+        else:
+            print_micro(res, rows)
+        if any(bad for *_, bad in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,477 @@
+# -*- coding: utf-8 -*-
+"""
+THALANOR – fuzzer wejścia (menu i pętla scen)
+
+    python thalanor_fuzz.py run [--episodes N] [--steps N] [--timeout S] [--workers N] [--seed N] [--lang pl] [--trade] [--out KATALOG] [--json]
+    python thalanor_fuzz.py min PLIK [--out PLIK]
+
+run - epizody Game.run() od menu głównego z losowym i złośliwym wejściem: numery
+wyborów i slotów (także spoza zakresu), ogromne i ujemne liczby, cyfry unicode,
+emoji, znaki sterujące, puste linie, bardzo długie napisy, serie "menu" (menu gry,
+ekwipunek, zapis, nowa gra), polecenia handlu (litery trade.key_buy/key_sell
+języka) z dziwnymi ilościami, rozdanie punktów. Epizody w procesach równolegle;
+ziarno epizodu z --seed, numeru partii i epizodu (wynik powtarzalny). Każdy
+epizod ma własny katalog zapisów.
+
+--trade - Akt I nie ma kupca, więc epizod zamiast Game.run() stawia postać
+(losowe pieniądze i plecak) przed kupcem fuzzera dołożonym do katalogu osobnej
+klasy gry i woła trade_menu, aż skończy się wejście; odpowiedzi to głównie
+polecenia handlu z numerami i ilościami spoza zakresu.
+
+Wykrywane: wyjątki (poza końcem wejścia), zawieszenia - za dużo kroków scen albo
+linii wyjścia bez pytania o wejście, albo epizod dłuższy niż --timeout sekund
+(pętla w menu, która nie pisze i nie czyta) - oraz naruszenia niezmienników postaci
+(HP > max HP, max HP <= 0, ujemne srebro lub złoto, pusty stos w plecaku),
+sprawdzanych przy każdym pytaniu i po każdym kroku sceny. Znaleziska grupowane
+po sygnaturze (rodzaj + miejsce w kodzie gry), z każdej grupy najkrótsze wejście
+jest minimalizowane (delta debugging: usuwanie fragmentów, potem upraszczanie
+pojedynczych odpowiedzi) i zapisywane jako transkrypcja (ziarno, wejście,
+znalezisko) w --out. Kod 1, gdy coś znaleziono.
+
+min - minimalizuje zapisaną transkrypcję jeszcze raz (np. po zmianie gry).
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+CLOCK = "2000-01-01 00:00:00"
+# Budżety epizodu: odpowiedzi gracza, kroki scen i linie wyjścia bez pytania o wejście
+STEPS = 400
+SCENE_STEPS_BUDGET = 500
+WRITES_BUDGET = 20000
+# Budżet czasu epizodu (s) - zwykły epizod trwa milisekundy
+TIMEOUT = 5.0
+
+SENSIBLE = ("1", "2", "3", "4", "5", "6", "1", "2", "3", "1", "2", "1")
+ADVERSARIAL = (
+    "", " ", "\t", "   \t ", "0", "00", "-1", "+1", "1.5", "1e3", "0x1", "7", "9", "12", "99",
+    "9" * 40, str(2 ** 63), "-" + str(2 ** 63), "١", "１", "²", "Ⅷ", "ą", "Żółć", "😀", "‮1",
+    "\x00", "\x1b[2J", "\r", "menu", "MENU", " menu ", "menu menu", "t", "T", "n", "y", "tak", "yes",
+    "x" * 5000, "%s %d {}", "{name}", "k 1 99999999", "k 1 -5", "k 0 1", "k 99 1", "k 1 0", "s 1 -1",
+    "b 1 -5", "s 1 99999999", "b 99 1", "K 1 1", "k", "s", "k x y", "k 1 1 1", "kup 1 1", "weapon", "nic",
+)
+# Kupiec fuzzera (--trade): towar i skup ze wszystkich typów przedmiotów w grze
+TRADE_MERCHANT = "fuzz_trader"
+
+
+class _Finding(BaseException):
+    # BaseException - żeby nie połknął go żaden "except Exception" w grze
+    def __init__(self, kind: str, detail: str, where: str = ""):
+        super().__init__(kind, detail)
+        self.kind, self.detail, self.where = kind, detail, where
+
+
+def _fuzz_io(T):
+    # Sesja fuzzera: wejście losowane (albo ze skryptu przy minimalizacji), wyjście tylko liczone
+    class FuzzIO(T.SessionIO):
+        def __init__(self, seed: int, script: Optional[List[str]] = None, steps: int = STEPS,
+                     save_dir: Optional[str] = None, trade: bool = False, timeout: float = TIMEOUT):
+            super().__init__(seed=seed, clock=CLOCK, save_dir=save_dir)
+            import random
+            self.gen = random.Random(seed ^ 0x5EED)
+            self.script = None if script is None else list(script)
+            self.steps = steps
+            self.trade = trade
+            self.timeout = timeout
+            self.deadline = time.perf_counter() + timeout
+            self.taken: List[str] = []
+            self.burst: List[str] = []
+            self.game = None
+            self.writes = self.scene_steps = 0
+
+        def next_input(self) -> str:
+            if self.burst:
+                return self.burst.pop()
+            gen = self.gen
+            r = gen.random()
+            if self.trade:
+                if r < 0.7:
+                    key = gen.choice((T.tr("trade.key_buy"), T.tr("trade.key_sell")))
+                    qty = gen.choice(("", " 1", " 2", " 5", " 0", " -1", " 99", " " + str(2 ** 63)))
+                    return f"{key} {gen.choice(('0', '1', '1', '2', '3', '9', '-1'))}{qty}"
+                return gen.choice(SENSIBLE + ADVERSARIAL)
+            if r < 0.6:
+                return gen.choice(SENSIBLE)
+            if r < 0.72:
+                # Seria przez menu gry: podmenu, odpowiedź w nim, czasem wyjście
+                self.burst = [gen.choice(SENSIBLE + ADVERSARIAL) for _ in range(gen.randint(1, 4))]
+                return "menu"
+            return gen.choice(ADVERSARIAL)
+
+        def read(self, prompt: str) -> str:
+            check_invariants(self.game)
+            self.check_time()
+            self.writes = self.scene_steps = 0
+            if self.script is not None:
+                if len(self.taken) >= len(self.script):
+                    raise T.InputExhausted(prompt)
+                line = self.script[len(self.taken)]
+            else:
+                if len(self.taken) >= self.steps:
+                    raise T.InputExhausted(prompt)
+                line = self.next_input()
+            self.taken.append(line)
+            return line
+
+        def write(self, text: str) -> None:
+            self.writes += 1
+            if self.writes > WRITES_BUDGET:
+                raise _Finding("hang", f"{WRITES_BUDGET} linii wyjścia bez pytania o wejście")
+            if not self.writes & 63:
+                self.check_time()
+
+        def check_time(self, where: str = "") -> None:
+            if time.perf_counter() > self.deadline:
+                raise _Finding("hang", f"epizod dłuższy niż {self.timeout:g} s", where)
+
+        def attach(self, game) -> None:
+            self.game = game
+            play_scene = game.play_scene
+
+            def counted() -> None:
+                self.scene_steps += 1
+                if self.scene_steps > SCENE_STEPS_BUDGET:
+                    raise _Finding("hang", f"{SCENE_STEPS_BUDGET} kroków scen bez pytania o wejście",
+                                   game.current_scene_id)
+                play_scene()
+                check_invariants(game)
+
+            game.play_scene = counted
+
+    return FuzzIO
+
+
+_TRADE_GAMES: Dict[str, type] = {}
+
+
+def _trade_game(T) -> type:
+    """Klasa gry z kupcem fuzzera - ContentCatalog.shared jest per klasa, katalog Game zostaje czysty."""
+    cls = _TRADE_GAMES.get(T.__name__)
+    if cls is None:
+        cls = _TRADE_GAMES[T.__name__] = type("FuzzTradeGame", (T.Game,), {})
+        items = cls().items_db
+        cls().catalog.merchants.setdefault(TRADE_MERCHANT, T.Merchant(
+            TRADE_MERCHANT, "Handlarz", None, 120, 50, tuple(sorted({it.item_type for it in items.values()})),
+            tuple((item_id, 3) for item_id in sorted(items))))
+    return cls
+
+
+def _play_trade(T, sio, lang: str) -> "T.Game":
+    # Postać z losowymi pieniędzmi i plecakiem u kupca; po wyjściu z handlu - z powrotem
+    game = _trade_game(T)(lang=lang)
+    sio.attach(game)
+    game.new_character("Fuzz")
+    ch = game.character
+    ch.gold, ch.silver = sio.gen.randint(0, 30), sio.gen.randint(0, 500)
+    for item_id in sorted(game.items_db):
+        for _ in range(sio.gen.randint(0, 2)):
+            ch.inventory.add_item(T.ItemInstance(game.items_db[item_id]))
+    while True:
+        game.trade_menu(TRADE_MERCHANT)
+        check_invariants(game)
+
+
+def check_invariants(game) -> None:
+    ch = getattr(game, "character", None)
+    if ch is None:
+        return
+    if ch.current_hp > ch.max_hp:
+        raise _Finding("invariant", f"HP {ch.current_hp} > max HP {ch.max_hp}", "current_hp")
+    if ch.max_hp <= 0:
+        raise _Finding("invariant", f"max HP {ch.max_hp} <= 0", "max_hp")
+    if ch.silver < 0 or ch.gold < 0:
+        raise _Finding("invariant", f"ujemne pieniądze: {ch.gold} zł, {ch.silver} sr", "money")
+    inv = ch._inventory
+    if inv is not None and any(s.count <= 0 for s in inv._stacks):
+        raise _Finding("invariant", "pusty stos w plecaku", "inventory")
+
+
+# =============================================================================
+# EPIZOD
+# =============================================================================
+
+def _where(tb, module_file: str) -> str:
+    # Najgłębsza ramka w kodzie gry - sygnatura wyjątku nie zależy od wejścia
+    frames = [f for f in traceback.extract_tb(tb) if f.filename == module_file]
+    return f"{frames[-1].name}:{frames[-1].lineno}" if frames else "?"
+
+
+def play(T, io_cls, seed: int, lang: str, save_dir: str, script: Optional[List[str]] = None,
+         steps: int = STEPS, trade: bool = False, timeout: float = TIMEOUT) -> Tuple[Optional[dict], List[str]]:
+    """Jeden epizod; zwraca (znalezisko albo None, użyte wejście)."""
+    for name in os.listdir(save_dir):
+        os.remove(os.path.join(save_dir, name))
+    sio = io_cls(seed, script, steps, save_dir, trade, timeout)
+    token = sio.activate()
+    finding = None
+    alarm = _arm_alarm(T, sio, timeout)
+    try:
+        if trade:
+            _play_trade(T, sio, lang)
+        else:
+            game = T.Game(lang=lang)
+            sio.attach(game)
+            game.run()
+            check_invariants(game)
+    except T.InputExhausted:
+        pass
+    except _Finding as f:
+        finding = {"kind": f.kind, "where": f.where, "detail": f.detail}
+    except Exception as e:
+        finding = {"kind": "exception", "where": f"{type(e).__name__} @ {_where(e.__traceback__, T.__file__)}",
+                   "detail": f"{type(e).__name__}: {e}"[:300]}
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, alarm)
+        T._session_io.reset(token)
+    if finding is not None:
+        finding["signature"] = f"{finding['kind']}: {finding['where']}"
+    return finding, sio.taken
+
+
+def _arm_alarm(T, sio, timeout: float):
+    """Budzik na budżet czasu - łapie też pętle, które nie piszą i nie czytają (tylko wątek główny, POSIX).
+
+    Zwraca poprzednią obsługę SIGALRM albo None, gdy budzika nie ustawiono.
+    """
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return None
+
+    def on_alarm(signum, frame) -> None:
+        stack = traceback.extract_stack(frame)
+        frames = [f for f in stack if f.filename == T.__file__] or stack[-1:]
+        sio.deadline = 0.0
+        sio.check_time(frames[-1].name if frames else "")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    return previous
+
+
+def _episode_seed(seed: int, job: int, n: int) -> int:
+    return zlib.crc32(f"{seed}:{job}:{n}".encode())
+
+
+def fuzz_job(job: Tuple[int, int, int, int, str, bool, float]) -> dict:
+    """Partia epizodów (w procesie roboczym) - statystyki i najkrótsze wejście na sygnaturę."""
+    import thalanor_v1_9 as T
+    job_no, episodes, seed, steps, lang, trade, timeout = job
+    io_cls = _fuzz_io(T)
+    inputs = 0
+    found: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as save_dir:
+        for n in range(episodes):
+            ep_seed = _episode_seed(seed, job_no, n)
+            finding, taken = play(T, io_cls, ep_seed, lang, save_dir, steps=steps, trade=trade, timeout=timeout)
+            inputs += len(taken)
+            if finding is None:
+                continue
+            sig = finding["signature"]
+            old = found.get(sig)
+            if old is None or len(taken) < len(old["inputs"]):
+                found[sig] = {"seed": ep_seed, "inputs": taken, "finding": finding,
+                              "hits": (old or {}).get("hits", 0) + 1}
+            else:
+                old["hits"] += 1
+    return {"episodes": episodes, "inputs": inputs, "found": found}
+
+
+# =============================================================================
+# MINIMALIZACJA
+# =============================================================================
+
+def minimize(T, seed: int, inputs: List[str], signature: str, lang: str, trade: bool = False,
+             timeout: float = TIMEOUT) -> Tuple[List[str], int]:
+    """Najkrótsze wejście z tą samą sygnaturą znaleziska (ddmin + upraszczanie odpowiedzi) i liczba prób.
+
+    None zamiast wejścia, gdy znalezisko się nie odtwarza.
+    """
+    io_cls = _fuzz_io(T)
+    runs = [0]
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        def fails(candidate: List[str]) -> bool:
+            runs[0] += 1
+            finding, _ = play(T, io_cls, seed, lang, save_dir, script=candidate, trade=trade, timeout=timeout)
+            return finding is not None and finding["signature"] == signature
+
+        if not fails(inputs):
+            return None, runs[0]
+        # Wejście po znalezisku nie było czytane
+        _, taken = play(T, io_cls, seed, lang, save_dir, script=inputs, trade=trade, timeout=timeout)
+        current = taken
+        n = 2
+        while len(current) >= 2:
+            size = -(-len(current) // n)
+            chunks = [current[i:i + size] for i in range(0, len(current), size)]
+            for i in range(len(chunks)):
+                rest = [x for j, c in enumerate(chunks) if j != i for x in c]
+                if fails(rest):
+                    current, n = rest, max(n - 1, 2)
+                    break
+            else:
+                if n >= len(current):
+                    break
+                n = min(len(current), n * 2)
+        # Pojedyncze odpowiedzi: najprostszy zamiennik, który nadal daje znalezisko
+        for i, line in enumerate(current):
+            for simpler in ("", "1", line[:8]):
+                if len(simpler) < len(line) and fails(current[:i] + [simpler] + current[i + 1:]):
+                    current = current[:i] + [simpler] + current[i + 1:]
+                    break
+    return current, runs[0]
+
+
+def minimize_job(job: Tuple[dict, str, bool, float]) -> dict:
+    import thalanor_v1_9 as T
+    case, lang, trade, timeout = job
+    inputs, runs = minimize(T, case["seed"], case["inputs"], case["finding"]["signature"], lang, trade, timeout)
+    return dict(case, inputs=inputs or case["inputs"], original_length=len(case["inputs"]), minimize_runs=runs)
+
+
+def _transcript(case: dict, lang: str, trade: bool) -> dict:
+    return {"seed": case["seed"], "lang": lang, "boot": "build", "clock": CLOCK, "trade": trade, "inputs": case["inputs"],
+            "finding": case["finding"], "original_length": case.get("original_length", len(case["inputs"]))}
+
+
+def _file_name(signature: str) -> str:
+    return "".join(ch if ch.isalnum() else "_" for ch in signature).strip("_")[:80] + ".json"
+
+
+# =============================================================================
+# RUN
+# =============================================================================
+
+def run(episodes: int, steps: int, workers: int, seed: int, lang: str, out: Optional[str],
+        trade: bool = False, timeout: float = TIMEOUT) -> dict:
+    import thalanor_v1_9 as T
+    T.Game()
+    per_job = max(1, min(200, episodes // (workers * 4) or 1))
+    jobs = []
+    left = episodes
+    while left > 0:
+        jobs.append((len(jobs), min(per_job, left), seed, steps, lang, trade, timeout))
+        left -= per_job
+    t0 = time.perf_counter()
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(workers)
+    try:
+        parts = list(pool.map(fuzz_job, jobs, chunksize=1)) if pool else [fuzz_job(job) for job in jobs]
+        wall = time.perf_counter() - t0
+        found: Dict[str, dict] = {}
+        for part in parts:
+            for sig, case in part["found"].items():
+                old = found.get(sig)
+                hits = case["hits"] + (old["hits"] if old else 0)
+                if old is None or len(case["inputs"]) < len(old["inputs"]):
+                    found[sig] = case
+                found[sig]["hits"] = hits
+        t1 = time.perf_counter()
+        cases = [(case, lang, trade, timeout) for _, case in sorted(found.items())]
+        minimized = list(pool.map(minimize_job, cases, chunksize=1)) if pool else [minimize_job(c) for c in cases]
+        min_wall = time.perf_counter() - t1
+    finally:
+        if pool:
+            pool.shutdown()
+    if out and minimized:
+        os.makedirs(out, exist_ok=True)
+        for case in minimized:
+            case["path"] = os.path.join(out, _file_name(case["finding"]["signature"]))
+            with open(case["path"], "w", encoding="utf-8") as f:
+                json.dump(_transcript(case, lang, trade), f, ensure_ascii=False, indent=1)
+                f.write("\n")
+    inputs = sum(p["inputs"] for p in parts)
+    return {
+        "episodes": episodes,
+        "steps": steps,
+        "trade": trade,
+        "workers": workers,
+        "seed": seed,
+        "wall_s": wall,
+        "episodes_per_s": episodes / wall,
+        "inputs_per_s": inputs / wall,
+        "minimize_s": min_wall,
+        "findings": minimized,
+    }
+
+
+def print_run(res: dict) -> None:
+    print(f"Fuzzing{' handlu' if res['trade'] else ''}: {res['episodes']} epizodów po <= {res['steps']} odpowiedzi, {res['workers']} proc., "
+          f"{res['wall_s']:.1f} s ({res['episodes_per_s']:.0f} epizodów/s, {res['inputs_per_s']:.0f} odpowiedzi/s)")
+    if not res["findings"]:
+        print("  brak znalezisk")
+        return
+    print(f"  znaleziska ({len(res['findings'])}), minimalizacja {res['minimize_s']:.1f} s:")
+    for case in res["findings"]:
+        f = case["finding"]
+        print(f"  - {f['signature']}  x{case['hits']}")
+        print(f"      {f['detail']}")
+        print(f"      wejście: {case['original_length']} -> {len(case['inputs'])} odpowiedzi: "
+              f"{json.dumps(case['inputs'], ensure_ascii=False)[:200]}")
+        if case.get("path"):
+            print(f"      zapis: {case['path']}")
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="thalanor_fuzz", description="Fuzzer wejścia Thalanor")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="epizody z losowym i złośliwym wejściem")
+    p.add_argument("--episodes", type=int, default=2000)
+    p.add_argument("--steps", type=int, default=STEPS, help="odpowiedzi gracza na epizod")
+    p.add_argument("--timeout", type=float, default=TIMEOUT, help="budżet czasu epizodu w sekundach")
+    p.add_argument("--trade", action="store_true", help="epizody w trade_menu u kupca fuzzera")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--lang", default="pl")
+    p.add_argument("--out", default="fuzz_findings", help="katalog na zminimalizowane transkrypcje")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("min", help="minimalizuj zapisaną transkrypcję")
+    p.add_argument("path")
+    p.add_argument("--out", help="zapisz wynik (domyślnie nadpisz plik)")
+    args = parser.parse_args(argv)
+
+    import thalanor_v1_9 as T
+
+    if args.command == "run":
+        res = run(args.episodes, args.steps, args.workers, args.seed, args.lang, args.out, args.trade, args.timeout)
+        if args.json:
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+        else:
+            print_run(res)
+        return 1 if res["findings"] else 0
+    if args.command == "min":
+        with open(args.path, encoding="utf-8") as f:
+            transcript = json.load(f)
+        sig = transcript["finding"]["signature"]
+        inputs, runs = minimize(T, transcript["seed"], transcript["inputs"], sig, transcript.get("lang", "pl"),
+                                transcript.get("trade", False))
+        if inputs is None:
+            print(f"{args.path}: znalezisko się nie odtwarza ({sig})")
+            return 0
+        print(f"{args.path}: {sig} - {len(transcript['inputs'])} -> {len(inputs)} odpowiedzi ({runs} prób)")
+        transcript["inputs"] = inputs
+        with open(args.out or args.path, "w", encoding="utf-8") as f:
+            json.dump(transcript, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
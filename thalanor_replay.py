@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+THALANOR – powtórki skryptowanego wejścia
+
+    python thalanor_replay.py record PLIK [--seed N] [--lang pl] [--boot build] (--inputs PLIK | --random N)
+    python thalanor_replay.py check [PLIK ...]
+    python thalanor_replay.py load [PLIK ...] [--sessions N] [--threads N] [--json]
+
+Transkrypcja (JSON) to ziarno RNG, język, tryb startu, stały zegar zapisów, lista
+wejść gracza (menu, imię, numery wyborów, rozdanie punktów) i oczekiwane wyjście.
+Gra biegnie bez terminala: Game.run() czyta wejście z transkrypcji i pisze do
+bufora (SessionIO), każda powtórka ma własny katalog zapisów. Bez plików
+sprawdzane są wszystkie transkrypcje z katalogu replays/.
+
+record - rozgrywa wejście (z pliku - jedna linia na odpowiedź - albo N losowych
+odpowiedzi) i zapisuje transkrypcję razem z wyjściem jako wzorzec.
+
+check - powtarza transkrypcje i porównuje wyjście ze wzorcem (diff przy różnicy,
+kod 1, gdy któraś się nie zgadza).
+
+load - generator obciążenia: N powtórek transkrypcji naraz w wątkach. Raportuje
+opóźnienie kroku silnika (od odpowiedzi gracza do kolejnego pytania), przepustowość
+kroków i sesji na sekundę oraz liczbę powtórek z wyjściem innym niż wzorzec.
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPLAY_DIR = os.path.join(HERE, "replays")
+CLOCK = "2000-01-01 00:00:00"
+
+# Odpowiedzi losowanych transkrypcji - numery wyborów i menu, imię, puste i błędne wejście
+RANDOM_POOL = ("1", "2", "3", "4", "5", "6", "1", "2", "3", "1", "2", "menu", "0", "", "x", "7", "t", "n", "Bob")
+
+
+# =============================================================================
+# TRANSKRYPCJE
+# =============================================================================
+
+def load_transcript(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_transcript(path: str, transcript: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(transcript, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+def random_inputs(seed: int, n: int) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(RANDOM_POOL) for _ in range(n)]
+
+
+def replay(T, transcript: dict, save_dir: Optional[str] = None, timed: bool = False):
+    """Rozgrywa transkrypcję w bieżącym wątku; zwraca SessionIO (wyjście, znaczniki kroków)."""
+    with tempfile.TemporaryDirectory() if save_dir is None else nullcontext(save_dir) as workdir:
+        sio = T.SessionIO(transcript["inputs"], seed=transcript["seed"], clock=transcript.get("clock", CLOCK),
+                          save_dir=workdir, timed=timed)
+        token = sio.activate()
+        try:
+            T.Game(lang=transcript.get("lang", T.DEFAULT_LANG), boot=transcript.get("boot", "build")).run()
+        except T.InputExhausted:
+            pass
+        finally:
+            T._session_io.reset(token)
+    return sio
+
+
+def record(T, path: str, inputs: List[str], seed: int, lang: str, boot: str) -> dict:
+    transcript = {"seed": seed, "lang": lang, "boot": boot, "clock": CLOCK, "inputs": inputs}
+    transcript["output"] = replay(T, transcript).output()
+    save_transcript(path, transcript)
+    return transcript
+
+
+def check(T, paths: List[str]) -> List[tuple]:
+    """(plik, zgodne?, diff) dla każdej transkrypcji."""
+    import difflib
+    rows = []
+    for path in paths:
+        transcript = load_transcript(path)
+        got = replay(T, transcript).output()
+        diff = []
+        if got != transcript["output"]:
+            diff = list(difflib.unified_diff(transcript["output"].splitlines(), got.splitlines(),
+                                             "wzorzec", "powtórka", lineterm="", n=1))
+        rows.append((path, not diff, diff))
+    return rows
+
+
+# =============================================================================
+# LOAD
+# =============================================================================
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"n": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    xs = sorted(samples)
+    at = lambda q: xs[min(len(xs) - 1, int(len(xs) * q))]
+    return {"n": len(xs), "p50": xs[len(xs) // 2], "p90": at(0.9), "p99": at(0.99), "max": xs[-1]}
+
+
+def bench_load(T, transcripts: List[dict], sessions: int, threads: int) -> dict:
+    jobs = iter(range(sessions))
+    lock = threading.Lock()
+    steps: List[float] = []
+    mismatches = [0]
+
+    def worker():
+        local, bad = [], 0
+        with tempfile.TemporaryDirectory() as workdir:
+            while True:
+                with lock:
+                    n = next(jobs, None)
+                if n is None:
+                    break
+                transcript = transcripts[n % len(transcripts)]
+                for name in os.listdir(workdir):
+                    os.remove(os.path.join(workdir, name))
+                sio = replay(T, transcript, save_dir=workdir, timed=True)
+                marks = sio.marks
+                local.extend((b - a) * 1e6 for a, b in zip(marks, marks[1:]))
+                bad += sio.output() != transcript["output"]
+        with lock:
+            steps.extend(local)
+            mismatches[0] += bad
+
+    T.Game()  # katalog treści zbudowany przed pomiarem
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - t0
+    return {
+        "sessions": sessions,
+        "threads": threads,
+        "transcripts": len(transcripts),
+        "wall_s": wall,
+        "sessions_per_s": sessions / wall,
+        "steps_per_s": len(steps) / wall,
+        "step_us": _percentiles(steps),
+        "mismatches": mismatches[0],
+    }
+
+
+def print_load(res: dict) -> None:
+    print(f"Powtórki: {res['sessions']} sesji ({res['transcripts']} transkrypcji), {res['threads']} wątki, "
+          f"{res['wall_s']:.2f} s")
+    print(f"  przepustowość: {res['sessions_per_s']:.1f} sesji/s, {res['steps_per_s']:.0f} kroków/s")
+    st = res["step_us"]
+    print(f"  krok [µs]: p50 {st['p50']:.1f}  p90 {st['p90']:.1f}  p99 {st['p99']:.1f}  max {st['max']:.1f}  (n={st['n']})")
+    print(f"  wyjście inne niż wzorzec: {res['mismatches']}")
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _paths(given: List[str]) -> List[str]:
+    return given or sorted(glob.glob(os.path.join(REPLAY_DIR, "*.json")))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="thalanor_replay", description="Powtórki skryptowanego wejścia Thalanor")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("record", help="rozegraj wejście i zapisz wzorzec")
+    p.add_argument("path")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--lang", default="pl")
+    p.add_argument("--boot", default="build", choices=("build", "snapshot"))
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--inputs", help="plik z wejściem (jedna linia na odpowiedź)")
+    src.add_argument("--random", type=int, metavar="N", help="N losowych odpowiedzi (ziarno --seed)")
+    p = sub.add_parser("check", help="porównaj powtórki ze wzorcami")
+    p.add_argument("paths", nargs="*")
+    p = sub.add_parser("load", help="wiele powtórek naraz - opóźnienia i przepustowość")
+    p.add_argument("paths", nargs="*")
+    p.add_argument("--sessions", type=int, default=500)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    args = parser.parse_args(argv)
+
+    import thalanor_v1_9 as T
+
+    if args.command == "record":
+        if args.inputs:
+            with open(args.inputs, encoding="utf-8") as f:
+                inputs = f.read().splitlines()
+        else:
+            inputs = random_inputs(args.seed, args.random)
+        transcript = record(T, args.path, inputs, args.seed, args.lang, args.boot)
+        print(f"{args.path}: {len(inputs)} wejść, {len(transcript['output'].splitlines())} linii wyjścia")
+    elif args.command == "check":
+        rows = check(T, _paths(args.paths))
+        for path, ok, diff in rows:
+            print(f"{'OK   ' if ok else 'RÓŻNE'} {os.path.relpath(path)}")
+            for line in diff[:40]:
+                print(f"      {line}")
+        if not all(ok for _, ok, _ in rows):
+            return 1
+    elif args.command == "load":
+        res = bench_load(T, [load_transcript(p) for p in _paths(args.paths)], args.sessions, args.threads)
+        if args.json:
+            print(json.dumps(res, indent=2))
+        else:
+            print_load(res)
+        if res["mismatches"]:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1264 @@
+# -*- coding: utf-8 -*-
+"""
+THALANOR – sesje gry po stronie serwera
+
+    python thalanor_server.py serve [--host H] [--port N] [--store KATALOG] [--resident N] [--budget MB] [--idle S]
+                                    [--workers N] [--no-freeze]
+    python thalanor_server.py bench [--sessions N] [--resident N] [--budget MB] [--steps N] [--idle S] [--store KATALOG] [--json]
+    python thalanor_server.py snapshot [--sessions N] [--played N] [--steps N] [--touch N] [--json]
+    python thalanor_server.py check [PLIK ...] [--spill-every N]
+
+Sesja (Session) nie trzyma wątku czekającego na gracza. Jednostką pracy jest tura
+(Game.turn() - scena z wyborem, potem śmierć albo koniec aktu): sesja pamięta stan
+z granicy tury (Game.session_state(), marshal) i odpowiedzi gracza, które w tej
+turze już przyszły. Krok sesji odtwarza turę od tego stanu z wszystkimi czekającymi
+odpowiedziami; gdy gra znowu pyta o wejście, krok oddaje tylko nowe wyjście, a gdy
+tura się domknie - stan jest zatwierdzany i od razu liczona jest klatka następnej
+tury (do pytania). RNG tury wynika z ziarna sesji i numeru tury, zegar zapisów
+jest zamrożony na czas tury, a zapisy slotów trafiają na dysk dopiero po domknięciu
+tury, więc powtórzenie tury daje to samo wyjście. Hooki wejścia scen są
+idempotentne - powtórzenie ich niczego nie psuje.
+
+SessionManager trzyma aktywne sesje w LRU z limitem liczby i budżetem pamięci
+(rozmiar stanu po serializacji). Sesje bezczynne dłużej niż `idle` albo wypchnięte
+z LRU trafiają do magazynu na dysku (jeden plik marshal na sesję, zapis atomowy) i
+wracają przy następnym kroku gracza. Metryki (tekst Prometheusa): histogramy czasu
+przywracania i odkładania sesji, histogramy faz kroku gracza (StepTimer silnika:
+parse, apply, transition, enter, display; sesji: restore, commit i cały krok - step),
+liczba sesji żywych, w pamięci, na dysku i według bieżącej sceny, zapisy slotów
+czekające na domknięcie tury, śmierci postaci w ostatniej minucie, rozmiar stanu
+sesji w pamięci oraz RSS procesu.
+
+serve - API HTTP/JSON (asyncio, HTTP/1.1 z keep-alive, patrz Api): tworzenie sesji,
+kroki z kilkoma odpowiedziami naraz, zapis i wczytanie slotu. Odpowiedzią jest
+klatka - status (choice / input / ended), postać, scena z wyborami (dostępność i
+powód blokady), pytanie gry i surowy tekst - zamiast strumienia terminala.
+Z --workers N (prefork): proces główny buduje cały katalog treści (wszystkie sceny,
+teksty wszystkich języków), woła gc.freeze() i forkuje N procesów obsługi na jednym
+gnieździe nasłuchującym - strony katalogu zostają wspólne (copy-on-write). Każdy
+proces ma własny shard sesji (pierwszy bajt id sesji, magazyn KATALOG/w<N>); żądanie
+do cudzej sesji przechodzi do właściciela przez gniazdo unix. Proces główny wypisuje
+pamięć unikalną i wspólną procesów po starcie i na SIGUSR1, a procesy obsługi
+eksportują ją w /metrics.
+
+Przy zamknięciu (SIGTERM/SIGINT - restart przy wdrożeniu) sesje z pamięci - postać,
+scena, rozpoczęta tura z pytaniem - trafiają do jednego pliku migawki (KATALOG/
+snapshot.bin, w prefork: każdy proces swój, równolegle) jednym zapisem. Nowy proces
+czyta z niej przy starcie tylko indeks (mmap); rekord sesji dekodowany jest przy
+jej pierwszym kroku, a plik znika, gdy podjęte zostaną wszystkie sesje.
+
+bench - N sesji z losowym wejściem przez małe LRU i krótki limit bezczynności:
+przepustowość kroków, opóźnienie przywracania sesji z dysku, p50/p99 faz kroku i RSS procesu.
+
+snapshot - migawka N sesji (domyślnie 50 tys.) przy zamknięciu i start nowego
+menedżera z niej: czas zapisu, czas startu, opóźnienie pierwszego kroku sesji z
+migawki i zgodność klatek sprzed i po restarcie.
+
+check - transkrypcje z replays/ rozgrywane przez sesję na trzy sposoby: całe
+wejście w jednym kroku, odpowiedź po odpowiedzi oraz odpowiedź po odpowiedzi z
+odkładaniem sesji na dysk co N kroków. Wyjście musi być identyczne, a katalog
+treści (wspólny dla sesji i procesów) - niezmieniony przez hooki scen.
+"""
+
+import argparse
+import glob
+import json
+import marshal
+import os
+import random
+import re
+import struct
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPLAY_DIR = os.path.join(HERE, "replays")
+# Wersja formatu pliku sesji w magazynie
+STORE_VERSION = 1
+SESSION_ID = re.compile(r"[0-9a-f]{16}")
+# Migawka wszystkich sesji (drain): nagłówek, indeks (id, przesunięcie, długość), rekordy sesji
+SNAPSHOT_MAGIC = b"THSNAP01"
+SNAPSHOT_HEAD = struct.Struct("<8sI")
+SNAPSHOT_ENTRY = struct.Struct("<16sQI")
+
+# Okno miernika śmierci postaci [s]
+DEATH_WINDOW = 60.0
+# Histogramy serwera (Profiler z własnym opisem metryk): nazwa, etykiety, opis
+SERVER_METRICS = {
+    "rehydrate": ("thalanor_session_rehydrate_seconds", ("source",),
+                  "Czas przywrócenia sesji: z pliku sesji (spill) albo z migawki po restarcie (snapshot)."),
+    "spill": ("thalanor_session_spill_seconds", (),
+              "Czas odłożenia sesji do magazynu na dysku."),
+}
+
+
+# =============================================================================
+# SESJA
+# =============================================================================
+
+class SessionEnded(Exception):
+    """Krok sesji, w której gra się już skończyła (wyjście z gry, koniec po śmierci)."""
+
+
+class SessionBusy(Exception):
+    """Zapis/wczytanie w trakcie tury (gra czeka na dalszą część odpowiedzi) albo przed stworzeniem postaci."""
+
+
+class Session:
+    """Sesja gry: stan z granicy tury, odpowiedzi czekające w bieżącej turze i żywy Game."""
+
+    def __init__(self, sid: str, save_dir: str, lang: str, seed: int, clock: Optional[str] = None):
+        import thalanor_v1_9 as T
+        self.sid = sid
+        self.save_dir = save_dir
+        self.seed = seed
+        # Stały zegar zapisów (np. dla powtórek); None - czas rozpoczęcia tury
+        self.clock = clock
+        self.game = T.Game(lang=lang)
+        self.turn = 0
+        self.state = b""
+        self.pending: List[str] = []
+        # Znaki wyjścia bieżącej tury już oddane graczowi
+        self.sent = 0
+        self.turn_clock = ""
+        # Pytanie, na którym gra czeka (po ostatnim kroku), i całe wyjście bieżącej tury do niego
+        self.prompt = ""
+        self.screen = ""
+        self.last_used = time.monotonic()
+        # Zapisy slotów z rozpoczętej tury, czekające na jej domknięcie
+        self.queued_saves = 0
+        # Śmierci postaci (każda tura liczona raz, mimo powtórzeń) i tura ostatniej z nich
+        self.deaths = 0
+        self.died_turn = -1
+        # Game odpowiada stanowi z granicy tury (nie trzeba go odtwarzać przed turą)
+        self._clean = False
+
+    @classmethod
+    def new(cls, sid: str, save_dir: str, lang: str, name: Optional[str] = None,
+            seed: Optional[int] = None, clock: Optional[str] = None) -> "Session":
+        """Nowa sesja: z imieniem od razu w prologu, bez - od menu głównego."""
+        s = cls(sid, save_dir, lang, random.getrandbits(64) if seed is None else seed, clock)
+        if name is not None:
+            s.game.new_character(name)
+        s._commit()
+        return s
+
+    @property
+    def ended(self) -> bool:
+        return not self.game.running
+
+    def size(self) -> int:
+        """Przybliżona pamięć stanu sesji [B] - do budżetu SessionManager."""
+        return len(self.state) + sum(len(line) for line in self.pending)
+
+    def _commit(self) -> None:
+        import thalanor_v1_9 as T
+        st = T._step_timer
+        t0 = time.perf_counter()
+        self.state = marshal.dumps(self.game.session_state())
+        self.turn_clock = self.clock or T.now_ts()
+        self.sent = 0
+        self._clean = True
+        if st is not None:
+            st.observe("commit", time.perf_counter() - t0)
+
+    def _transaction(self, T, sio) -> None:
+        game = self.game
+        if game.character is None:
+            if not game.main_menu():
+                game.running = False
+                sio.write(T.tr("ui.goodbye") + "\n")
+            return
+        if not game.turn():
+            game.running = False
+        if not game.running:
+            sio.write(T.tr("ui.thanks") + "\n")
+
+    def _attempt(self) -> Tuple[str, bool, List[str]]:
+        """Tura od stanu z granicy z czekającymi odpowiedziami: (wyjście tury, domknięta?, nieużyte odpowiedzi)."""
+        import thalanor_v1_9 as T
+        game = self.game
+        if not self._clean:
+            st = T._step_timer
+            t0 = time.perf_counter()
+            game.restore_session(marshal.loads(self.state))
+            if st is not None:
+                st.observe("restore", time.perf_counter() - t0)
+        self._clean = False
+        deaths = game.deaths
+        sio = T.SessionIO(self.pending, seed=self.seed * 2 ** 32 + self.turn,
+                          clock=self.turn_clock, save_dir=self.save_dir, buffer_saves=True)
+        token = sio.activate()
+        lang_token = T._current_lang.set(game.lang)
+        try:
+            self._transaction(T, sio)
+            done = True
+        except T.InputExhausted as e:
+            self.prompt = e.args[0]
+            done = False
+        finally:
+            T._current_lang.reset(lang_token)
+            T._session_io.reset(token)
+        if game.deaths != deaths and self.died_turn != self.turn:
+            self.died_turn = self.turn
+            self.deaths += 1
+        self.queued_saves = 0 if done else len(sio.saves)
+        if done:
+            self._write_saves(T, sio.saves)
+        return sio.output(), done, list(sio.inputs)
+
+    def _write_saves(self, T, saves: Dict[int, str]) -> None:
+        # Zapisy slotów z domkniętej tury - w trakcie tury czekały w SessionIO,
+        # żeby powtórzenie tury widziało sloty takie, jak na jej początku
+        for idx, text in saves.items():
+            T._atomic_write(os.path.join(self.save_dir, T.SaveManager.SLOT_FILES[idx]), text)
+
+    def step(self, lines: List[str] = ()) -> str:
+        """Odpowiedzi gracza (może być kilka naraz); zwraca wyjście gry do następnego pytania."""
+        if self.ended:
+            raise SessionEnded(self.sid)
+        self.last_used = time.monotonic()
+        self.pending.extend(lines)
+        out = []
+        while True:
+            text, done, rest = self._attempt()
+            out.append(text[self.sent:])
+            self.screen = text
+            if not done:
+                self.sent = len(text)
+                break
+            self.turn += 1
+            self.pending = rest
+            self._commit()
+            if self.ended:
+                break
+        return "".join(out)
+
+    def frame(self, text: str) -> dict:
+        """Stan po kroku jako dane: status, postać, scena z wyborami (dostępność, powody) i wyjście."""
+        import thalanor_v1_9 as T
+        game = self.game
+        token = T._current_lang.set(game.lang)
+        try:
+            frame = {"session": self.sid, "turn": self.turn, "status": "ended" if self.ended else "input",
+                     "prompt": None if self.ended else self.prompt.strip(), "text": text}
+            ch = game.character
+            if ch is not None:
+                weapon = ch.equipment.slots.get("weapon")
+                frame["character"] = {
+                    "name": ch.name, "level": ch.level, "exp": ch.experience, "exp_to_level": ch.exp_to_level,
+                    "hp": ch.current_hp, "max_hp": ch.max_hp, "strength": ch.strength,
+                    "dexterity": ch.dexterity, "intelligence": ch.intelligence, "vitality": ch.vitality,
+                    "silver": ch.silver, "gold": ch.gold, "weapon": T.tr(weapon.name) if weapon else None,
+                }
+                scene = game.scenes.get(game.current_scene_id)
+                if not self.ended and scene is not None and self.prompt == T.tr("ui.your_choice"):
+                    frame["status"] = "choice"
+                    frame.update(scene.frame(game))
+            return frame
+        finally:
+            T._current_lang.reset(token)
+
+    def _at_boundary(self, T):
+        """Game w stanie z granicy tury i SessionIO z katalogiem zapisów sesji (poza turą);
+        SessionBusy, gdy tura jest rozpoczęta (czekają w niej odpowiedzi gracza)."""
+        if self.pending:
+            raise SessionBusy(self.sid)
+        if self.ended:
+            raise SessionEnded(self.sid)
+        self.game.restore_session(marshal.loads(self.state))
+        self._clean = True
+        return T.SessionIO(save_dir=self.save_dir, clock=self.clock)
+
+    def save(self, slot: int) -> None:
+        """Zapis stanu z początku bieżącej tury do slotu (0..SLOT_COUNT-1) - jak z menu gry."""
+        import thalanor_v1_9 as T
+        sio = self._at_boundary(T)
+        if self.game.character is None:
+            raise SessionBusy(self.sid)
+        token = sio.activate()
+        try:
+            T.SaveManager.save(slot, self.game.character, self.game.current_scene_id, self.game.merchant_stocks)
+        finally:
+            T._session_io.reset(token)
+
+    def load(self, slot: int) -> Optional[str]:
+        """Wczytanie slotu jako nowa granica tury (odrzuca rozpoczętą turę); wyjście do
+        następnego pytania albo None (pusty slot - sesja bez zmian)."""
+        import thalanor_v1_9 as T
+        pending, self.pending = self.pending, []
+        sio = self._at_boundary(T)
+        game = self.game
+        token = sio.activate()
+        try:
+            ch, sid = T.SaveManager.load(slot, game.items_db)
+            stocks = T.SaveManager.load_merchants(slot, game.catalog.merchants) if ch and sid else None
+        finally:
+            T._session_io.reset(token)
+        if not (ch and sid):
+            self.pending = pending
+            return None
+        game.character, game.current_scene_id, game.merchant_stocks = ch, sid, stocks
+        self.turn += 1
+        self._commit()
+        return self.step()
+
+    def to_record(self) -> bytes:
+        return marshal.dumps({
+            "version": STORE_VERSION,
+            "lang": self.game.lang,
+            "seed": self.seed,
+            "clock": self.clock,
+            "turn": self.turn,
+            "state": self.state,
+            "pending": self.pending,
+            "sent": self.sent,
+            "turn_clock": self.turn_clock,
+            "died_turn": self.died_turn,
+        })
+
+    @classmethod
+    def from_record(cls, sid: str, save_dir: str, raw: bytes) -> "Session":
+        """Sesja z magazynu - Game jest odtwarzany ze stanu dopiero przy pierwszym kroku."""
+        data = marshal.loads(raw)
+        if data.get("version") != STORE_VERSION:
+            raise ValueError(f"{sid}: nieznana wersja pliku sesji {data.get('version')!r}")
+        s = cls(sid, save_dir, data["lang"], data["seed"], data["clock"])
+        s.turn = data["turn"]
+        s.state = data["state"]
+        s.pending = data["pending"]
+        s.sent = data["sent"]
+        s.turn_clock = data["turn_clock"]
+        s.died_turn = data.get("died_turn", -1)
+        s.game.running = marshal.loads(s.state)["running"]
+        return s
+
+
+# =============================================================================
+# LRU I MAGAZYN
+# =============================================================================
+
+def memory_usage(pid: str = "self") -> Dict[str, int]:
+    """RSS, PSS oraz pamięć unikalna i współdzielona procesu [B] z /proc/<pid>/smaps_rollup ({} poza Linuksem)."""
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "unique", "Private_Dirty": "unique"}
+    out = {"rss": 0, "pss": 0, "shared": 0, "unique": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    out[fields[key]] += int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    return out
+
+
+def process_rss() -> int:
+    """Bieżący RSS procesu [B] (Linux: /proc/self/statm; gdzie indziej - szczyt z getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class SessionManager:
+    """Aktywne sesje w LRU z limitem liczby i pamięci; reszta w magazynie na dysku.
+
+    Jeden wątek (np. pętla serwera) - metody nie są bezpieczne dla wielu wątków naraz.
+    """
+
+    def __init__(self, store_dir: str, max_resident: int = 10000, budget: int = 256 << 20,
+                 idle: float = 300.0, lang: Optional[str] = None, shard: Optional[int] = None):
+        import thalanor_v1_9 as T
+        self.store_dir = store_dir
+        # Numer procesu obsługi (prefork) - pierwszy bajt id sesji, po nim inne procesy kierują do niej żądania
+        self.shard = shard
+        self.max_resident = max_resident
+        self.budget = budget
+        self.idle = idle
+        self.lang = lang or T.DEFAULT_LANG
+        self.live: "OrderedDict[str, Session]" = OrderedDict()
+        self.live_bytes = 0
+        os.makedirs(os.path.join(store_dir, "sessions"), exist_ok=True)
+        os.makedirs(os.path.join(store_dir, "saves"), exist_ok=True)
+        # Sesje odłożone wcześniej (także przez poprzedni proces) - wracają przy kroku
+        self.spilled = {name[:-4] for name in os.listdir(os.path.join(store_dir, "sessions"))
+                        if name.endswith(".bin") and SESSION_ID.fullmatch(name[:-4])}
+        # Sesje z migawki poprzedniego procesu (id -> przesunięcie, długość rekordu w _snapshot)
+        self.restored: Dict[str, Tuple[int, int]] = {}
+        self._snapshot = None
+        self.restore_seconds = 0.0
+        self.profiler = T.Profiler(metrics=SERVER_METRICS)
+        # Czasy faz kroku gracza - wspólne dla procesu (StepTimer silnika, plus restore/commit/step sesji)
+        self.step_timer = T._step_timer or T.enable_step_timing()
+        # Scena każdej sesji znanej procesowi (po ostatnim kroku) i czasy śmierci postaci z ostatniej minuty
+        self.scenes: Dict[str, str] = {}
+        self.deaths: "deque[float]" = deque()
+        self._open_snapshot()
+
+    def _session_path(self, sid: str) -> str:
+        return os.path.join(self.store_dir, "sessions", sid + ".bin")
+
+    def _save_dir(self, sid: str) -> str:
+        return os.path.join(self.store_dir, "saves", sid)
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.store_dir, "snapshot.bin")
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self.live or sid in self.spilled or sid in self.restored
+
+    def __len__(self) -> int:
+        return len(self.live) + len(self.spilled) + len(self.restored)
+
+    def create(self, name: Optional[str] = None, lang: Optional[str] = None,
+               seed: Optional[int] = None, clock: Optional[str] = None) -> Tuple[Session, str]:
+        """Nowa sesja i jej pierwsza klatka (do pierwszego pytania)."""
+        sid = self._new_id()
+        while sid in self:
+            sid = self._new_id()
+        os.makedirs(self._save_dir(sid), exist_ok=True)
+        s = Session.new(sid, self._save_dir(sid), lang or self.lang, name, seed, clock)
+        text = s.step()
+        self.scenes[sid] = s.game.current_scene_id
+        self._admit(s)
+        return s, text
+
+    def _new_id(self) -> str:
+        if self.shard is None:
+            return "%016x" % random.getrandbits(64)
+        return "%02x%014x" % (self.shard, random.getrandbits(56))
+
+    def get(self, sid: str) -> Session:
+        """Sesja o danym id - z pamięci albo przywrócona z magazynu; KeyError, gdy nie ma."""
+        s = self.live.get(sid)
+        if s is not None:
+            self.live.move_to_end(sid)
+            return s
+        t0 = time.perf_counter()
+        if sid in self.spilled:
+            with open(self._session_path(sid), "rb") as f:
+                s = Session.from_record(sid, self._save_dir(sid), f.read())
+            os.remove(self._session_path(sid))
+            self.spilled.discard(sid)
+            source = "spill"
+        elif sid in self.restored:
+            off, n = self.restored.pop(sid)
+            s = Session.from_record(sid, self._save_dir(sid), self._snapshot[off:off + n])
+            self._release_snapshot()
+            source = "snapshot"
+        else:
+            raise KeyError(sid)
+        self.profiler.observe("rehydrate", (source,), time.perf_counter() - t0)
+        self._admit(s)
+        return s
+
+    def step(self, sid: str, lines: List[str] = ()) -> str:
+        t0 = time.perf_counter()
+        try:
+            return self._call(sid, Session.step, lines)
+        finally:
+            self.step_timer.observe("step", time.perf_counter() - t0)
+
+    def save(self, sid: str, slot: int) -> None:
+        self._call(sid, Session.save, slot)
+
+    def load(self, sid: str, slot: int) -> Optional[str]:
+        return self._call(sid, Session.load, slot)
+
+    def _call(self, sid: str, method, *args):
+        # Operacja na sesji z rozliczeniem zmiany jej rozmiaru w budżecie LRU
+        s = self.get(sid)
+        before, deaths = s.size(), s.deaths
+        try:
+            return method(s, *args)
+        finally:
+            self.live_bytes += s.size() - before
+            self.scenes[sid] = s.game.current_scene_id
+            if s.deaths != deaths:
+                self.deaths.append(time.monotonic())
+            self._enforce(keep=sid)
+
+    def _admit(self, s: Session) -> None:
+        self.live[s.sid] = s
+        self.live_bytes += s.size()
+        self._enforce(keep=s.sid)
+
+    def _enforce(self, keep: str) -> None:
+        """Odkłada najdawniej używane sesje ponad limit liczby albo pamięci (poza bieżącą)."""
+        while len(self.live) > 1 and (len(self.live) > self.max_resident or self.live_bytes > self.budget):
+            sid = next(iter(self.live))
+            if sid == keep:
+                self.live.move_to_end(sid)
+                continue
+            self.spill(sid)
+
+    def spill(self, sid: str) -> None:
+        t0 = time.perf_counter()
+        s = self.live.pop(sid)
+        self.live_bytes -= s.size()
+        if s.ended:
+            self.scenes.pop(sid, None)
+            return
+        path = self._session_path(sid)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(s.to_record())
+        os.replace(tmp, path)
+        self.spilled.add(sid)
+        self.profiler.observe("spill", (), time.perf_counter() - t0)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Odkłada sesje bezczynne dłużej niż `idle` sekund; zwraca ich liczbę."""
+        limit = (time.monotonic() if now is None else now) - self.idle
+        n = 0
+        # LRU jest w kolejności ostatniego użycia - wystarczy zdejmować z początku
+        while self.live:
+            sid, s = next(iter(self.live.items()))
+            if s.last_used > limit:
+                break
+            self.spill(sid)
+            n += 1
+        return n
+
+    def close(self, sid: str) -> None:
+        """Usuwa sesję (z pamięci albo z magazynu); zapisy gracza zostają."""
+        self.scenes.pop(sid, None)
+        s = self.live.pop(sid, None)
+        if s is not None:
+            self.live_bytes -= s.size()
+        elif sid in self.spilled:
+            self.spilled.discard(sid)
+            os.remove(self._session_path(sid))
+        elif sid in self.restored:
+            del self.restored[sid]
+            self._release_snapshot()
+        else:
+            raise KeyError(sid)
+
+    # -------------------------
+    # Migawka (restart procesu)
+    # -------------------------
+    def drain(self) -> Tuple[int, int]:
+        """Wszystkie sesje z pamięci - razem z nieruszonymi jeszcze sesjami z poprzedniej migawki -
+        do jednego pliku migawki jednym zapisem; zwraca (liczba sesji, bajty).
+
+        Sesje nie giną z menedżera: wracają z nowej migawki przy pierwszym kroku."""
+        records = [(sid, s.to_record()) for sid, s in self.live.items() if not s.ended]
+        if self._snapshot is not None:
+            records += [(sid, self._snapshot[off:off + n]) for sid, (off, n) in self.restored.items()]
+        offset = SNAPSHOT_HEAD.size + SNAPSHOT_ENTRY.size * len(records)
+        index = []
+        for sid, raw in records:
+            index.append(SNAPSHOT_ENTRY.pack(sid.encode("ascii"), offset, len(raw)))
+            offset += len(raw)
+        blob = b"".join([SNAPSHOT_HEAD.pack(SNAPSHOT_MAGIC, len(records)), *index, *(raw for _, raw in records)])
+        path = self._snapshot_path()
+        self._close_snapshot()
+        if records:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        elif os.path.exists(path):
+            os.remove(path)
+        self.live.clear()
+        self.live_bytes = 0
+        self._open_snapshot()
+        return len(records), len(blob)
+
+    def _open_snapshot(self) -> None:
+        """Indeks migawki (mmap) - rekordy sesji czytane i dekodowane dopiero przy pierwszym kroku sesji."""
+        import mmap
+        path = self._snapshot_path()
+        if not os.path.exists(path):
+            return
+        t0 = time.perf_counter()
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = SNAPSHOT_HEAD.unpack_from(mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            mm.close()
+            raise ValueError(f"{path}: to nie jest migawka sesji")
+        end = SNAPSHOT_HEAD.size + SNAPSHOT_ENTRY.size * count
+        # Plik sesji (spill) jest nowszy niż migawka - wygrywa
+        spilled = self.spilled
+        self.restored = {sid: (off, n) for sid, off, n in
+                         ((raw.decode("ascii"), off, n) for raw, off, n in
+                          SNAPSHOT_ENTRY.iter_unpack(mm[SNAPSHOT_HEAD.size:end]))
+                         if sid not in spilled}
+        self._snapshot = mm
+        self.restore_seconds = time.perf_counter() - t0
+        self._release_snapshot()
+
+    def _close_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self.restored = {}
+
+    def _release_snapshot(self) -> None:
+        # Wszystkie sesje z migawki już w pamięci (albo usunięte) - plik nie jest potrzebny
+        if not self.restored and self._snapshot is not None:
+            self._close_snapshot()
+            os.remove(self._snapshot_path())
+
+    def deaths_per_minute(self, now: Optional[float] = None) -> int:
+        """Śmierci postaci w ostatnich DEATH_WINDOW sekundach."""
+        limit = (time.monotonic() if now is None else now) - DEATH_WINDOW
+        while self.deaths and self.deaths[0] <= limit:
+            self.deaths.popleft()
+        return len(self.deaths)
+
+    def render(self) -> str:
+        """Histogramy przywracania/odkładania i faz kroku, stan LRU i gry w formacie tekstowym Prometheusa."""
+        gauges = (
+            ("thalanor_sessions_live", "Sesje niezamknięte: w pamięci, na dysku i w migawce.", len(self)),
+            ("thalanor_save_queue_depth",
+             "Zapisy slotów w rozpoczętych turach sesji w pamięci, czekające na domknięcie tury.",
+             sum(s.queued_saves for s in self.live.values())),
+            ("thalanor_deaths_per_minute", "Śmierci postaci w ostatniej minucie.", self.deaths_per_minute()),
+            ("thalanor_sessions_resident", "Sesje w pamięci.", len(self.live)),
+            ("thalanor_sessions_spilled", "Sesje odłożone do magazynu na dysku.", len(self.spilled)),
+            ("thalanor_sessions_snapshot", "Sesje z migawki po restarcie, jeszcze nieprzywrócone.",
+             len(self.restored)),
+            ("thalanor_sessions_resident_state_bytes",
+             "Rozmiar stanu sesji w pamięci po serializacji (budżet LRU).", self.live_bytes),
+            ("process_resident_memory_bytes", "RSS procesu.", process_rss()),
+        )
+        mem = memory_usage()
+        if mem:
+            gauges += (
+                ("process_unique_memory_bytes", "Pamięć tylko tego procesu (Private_*, smaps_rollup).", mem["unique"]),
+                ("process_shared_memory_bytes", "Pamięć współdzielona z innymi procesami (Shared_*).", mem["shared"]),
+            )
+        lines = [self.profiler.render().rstrip("\n"), self.step_timer.render().rstrip("\n")]
+        for name, help_text, value in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        by_scene: Dict[str, int] = {}
+        for scene in self.scenes.values():
+            by_scene[scene] = by_scene.get(scene, 0) + 1
+        name = "thalanor_sessions_by_scene"
+        lines += [f"# HELP {name} Sesje według bieżącej sceny (po ostatnim kroku sesji w tym procesie).",
+                  f"# TYPE {name} gauge"]
+        lines += [f'{name}{{scene="{scene}"}} {n}' for scene, n in sorted(by_scene.items())]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        import thalanor_v1_9 as T
+        T._atomic_write(path, self.render())
+
+
+# =============================================================================
+# API HTTP
+# =============================================================================
+
+# Limity żądania: treść [B], odpowiedzi w jednym kroku, długość odpowiedzi
+MAX_BODY = 64 * 1024
+MAX_BATCH = 64
+MAX_INPUT = 1024
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 410: "Gone", 411: "Length Required", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, code: str):
+        super().__init__(status, code)
+        self.status, self.code = status, code
+
+
+class Api:
+    """API JSON nad SessionManager (HTTP/1.1, keep-alive, asyncio - tylko biblioteka standardowa).
+
+    POST   /sessions                 {"name"?, "lang"?}      -> 201, klatka
+    GET    /sessions/<id>                                    -> klatka (tekst: bieżąca tura)
+    POST   /sessions/<id>/step       {"inputs": [..]}        -> klatka po wszystkich odpowiedziach
+    POST   /sessions/<id>/save       {"slot": 1..4}          -> klatka
+    POST   /sessions/<id>/load       {"slot": 1..4}          -> klatka
+    DELETE /sessions/<id>                                    -> {"closed": id}
+    GET    /metrics                                          -> tekst Prometheusa
+    GET    /health
+
+    Kroki sesji liczone są w pętli zdarzeń (pojedyncze kroki to dziesiątki-setki µs CPU).
+    W trybie prefork żądanie do sesji innego procesu (shard w id sesji) jest przekazywane
+    jego właścicielowi przez gniazdo unix; /metrics?worker=N - metryki procesu N.
+    """
+
+    def __init__(self, manager: SessionManager, keepalive: float = 15.0, peers: Tuple[str, ...] = ()):
+        self.manager = manager
+        self.keepalive = keepalive
+        # Gniazda unix procesów obsługi (prefork, indeks = shard) - żądania do cudzych sesji idą do właściciela
+        self.peers = peers
+
+    def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        import thalanor_v1_9 as T
+        mgr = self.manager
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if parts == ["health"] and method == "GET":
+            return 200, {"ok": True, "sessions": len(mgr), "resident": len(mgr.live)}
+        if parts == ["metrics"] and method == "GET":
+            return 200, mgr.render()
+        if not parts or parts[0] != "sessions" or len(parts) > 3:
+            raise ApiError(404, "not_found")
+        req = self._json(body) if method == "POST" else {}
+        if len(parts) == 1:
+            if method != "POST":
+                raise ApiError(405, "method_not_allowed")
+            name, lang = req.get("name"), req.get("lang") or mgr.lang
+            if name is not None and (not isinstance(name, str) or not name.strip() or len(name) > MAX_INPUT):
+                raise ApiError(400, "bad_name")
+            if lang not in T.StringCatalog.available_languages():
+                raise ApiError(400, "bad_lang")
+            s, text = mgr.create(name=name and name.strip(), lang=lang)
+            return 201, s.frame(text)
+
+        sid = parts[1]
+        if not SESSION_ID.fullmatch(sid) or sid not in mgr:
+            raise ApiError(404, "session_not_found")
+        action = parts[2] if len(parts) == 3 else None
+        try:
+            if action is None and method == "DELETE":
+                mgr.close(sid)
+                return 200, {"closed": sid}
+            if action is None and method == "GET":
+                s = mgr.get(sid)
+                if s.ended:
+                    return 200, s.frame("")
+                mgr.step(sid)
+                return 200, s.frame(s.screen)
+            if action not in (None, "step", "save", "load"):
+                raise ApiError(404, "not_found")
+            if method != "POST" or action is None:
+                raise ApiError(405, "method_not_allowed")
+            if action == "step":
+                inputs = req.get("inputs", [req["input"]] if "input" in req else None)
+                if (not isinstance(inputs, list) or len(inputs) > MAX_BATCH
+                        or not all(isinstance(x, str) and len(x) <= MAX_INPUT for x in inputs)):
+                    raise ApiError(400, "bad_inputs")
+                text = mgr.step(sid, inputs)
+                return 200, mgr.get(sid).frame(text)
+            slot = req.get("slot")
+            if not isinstance(slot, int) or isinstance(slot, bool) or not 1 <= slot <= T.SaveManager.SLOT_COUNT:
+                raise ApiError(400, "bad_slot")
+            if action == "save":
+                mgr.save(sid, slot - 1)
+                text = mgr.step(sid)
+            else:
+                text = mgr.load(sid, slot - 1)
+                if text is None:
+                    mgr.step(sid)
+                    raise ApiError(404, "slot_empty")
+            return 200, mgr.get(sid).frame(text)
+        except SessionEnded:
+            raise ApiError(410, "session_ended")
+        except SessionBusy:
+            raise ApiError(409, "session_busy")
+
+    @staticmethod
+    def _json(body: bytes) -> dict:
+        try:
+            req = json.loads(body or b"{}")
+        except ValueError:
+            raise ApiError(400, "bad_json")
+        if not isinstance(req, dict):
+            raise ApiError(400, "bad_json")
+        return req
+
+    async def handle(self, reader, writer) -> None:
+        """Jedno połączenie: żądania po kolei (keep-alive) aż do Connection: close lub bezczynności."""
+        import asyncio
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.keepalive)
+                except asyncio.TimeoutError:
+                    break
+                if not line.strip():
+                    break
+                method, path, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                conn = headers.get("connection", "").lower()
+                keep = conn == "keep-alive" if version == "HTTP/1.0" else conn != "close"
+                n = int(headers.get("content-length") or 0)
+                if "transfer-encoding" in headers or n > MAX_BODY or n < 0:
+                    status, payload = (411, {"error": "length_required"}) if n <= MAX_BODY else \
+                        (413, {"error": "payload_too_large"})
+                    keep = False
+                    data, ctype = json.dumps(payload).encode("utf-8"), "application/json; charset=utf-8"
+                else:
+                    body = await reader.readexactly(n) if n else b""
+                    status, ctype, data = await self.respond(method, path, body)
+                writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                              f"Content-Type: {ctype}\r\nContent-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method: str, path: str, body: bytes) -> Tuple[int, str, bytes]:
+        """(status, Content-Type, treść) - z tego procesu albo od procesu-właściciela sesji."""
+        import asyncio
+        owner = self._owner(path)
+        if owner is not None:
+            try:
+                return await self._forward(owner, method, path, body)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                status, payload = 503, {"error": "worker_unavailable"}
+        else:
+            try:
+                status, payload = self.dispatch(method, path, body)
+            except ApiError as e:
+                status, payload = e.status, {"error": e.code}
+            except Exception:
+                # Błąd gry albo serwera - połączenie i pozostałe sesje działają dalej
+                import traceback
+                traceback.print_exc()
+                status, payload = 500, {"error": "internal_error"}
+        if isinstance(payload, str):
+            return status, "text/plain; version=0.0.4; charset=utf-8", payload.encode("utf-8")
+        return status, "application/json; charset=utf-8", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def _owner(self, path: str) -> Optional[int]:
+        """Indeks procesu, który obsługuje żądanie, jeśli to nie ten (None - obsłuż tutaj)."""
+        if not self.peers:
+            return None
+        path, _, query = path.partition("?")
+        parts = [p for p in path.split("/") if p]
+        if parts == ["metrics"] and query.startswith("worker="):
+            shard = int(query[len("worker="):]) if query[len("worker="):].isdigit() else -1
+        elif len(parts) >= 2 and parts[0] == "sessions" and SESSION_ID.fullmatch(parts[1]):
+            shard = int(parts[1][:2], 16)
+        else:
+            return None
+        if shard == self.manager.shard or not 0 <= shard < len(self.peers):
+            return None
+        return shard
+
+    async def _forward(self, shard: int, method: str, path: str, body: bytes) -> Tuple[int, str, bytes]:
+        import asyncio
+        reader, writer = await asyncio.open_unix_connection(self.peers[shard])
+        try:
+            writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            data = await reader.read()
+        finally:
+            writer.close()
+        headers = dict(line.split(": ", 1) for line in head[1:] if line)
+        return int(head[0].split()[1]), headers["Content-Type"], data
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, sweep: float = 30.0,
+                    sock=None, unix: Optional[str] = None) -> None:
+        """Obsługa do SIGTERM/SIGINT; sock - gotowe gniazdo nasłuchujące (wspólne po fork())."""
+        import asyncio
+        import signal
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        if sock is None:
+            server = await asyncio.start_server(self.handle, host, port)
+            print(f"Thalanor API: http://{host}:{port}/ (magazyn sesji: {self.manager.store_dir})")
+        else:
+            server = await asyncio.start_server(self.handle, sock=sock)
+        mgr = self.manager
+        if mgr.restored:
+            print(f"{mgr.store_dir}: {len(mgr.restored)} sesji z migawki ({mgr.restore_seconds * 1e3:.1f} ms)")
+        peer = None
+        if unix is not None:
+            if os.path.exists(unix):
+                os.remove(unix)
+            peer = await asyncio.start_unix_server(self.handle, unix)
+        try:
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), sweep)
+                except asyncio.TimeoutError:
+                    mgr.evict_idle()
+        finally:
+            server.close()
+            if peer is not None:
+                peer.close()
+                os.remove(unix)
+            # Restart (deploy): sesje graczy w pamięci przechodzą do migawki, nowy proces je podejmie
+            t0 = time.perf_counter()
+            n, size = mgr.drain()
+            print(f"{mgr.store_dir}: migawka {n} sesji, {size / 2 ** 20:.1f} MiB, "
+                  f"{(time.perf_counter() - t0) * 1e3:.0f} ms")
+
+
+# =============================================================================
+# PREFORK
+# =============================================================================
+
+def preload_catalog(boot: str = "build"):
+    """Katalog treści zbudowany w całości (wszystkie sceny, teksty wszystkich języków) - przed fork()."""
+    import thalanor_v1_9 as T
+    catalog = T.Game(boot=boot).catalog
+    catalog.scenes.materialize_all()
+    for lang in T.StringCatalog.available_languages():
+        T.StringCatalog.for_lang(lang)
+    return catalog
+
+
+def _worker(index: int, sock, store: str, peers: Tuple[str, ...], keepalive: float, sweep: float,
+            fingerprint: str, manager_args: dict) -> None:
+    import asyncio
+    import gc
+    import thalanor_v1_9 as T
+    gc.enable()
+    mgr = SessionManager(os.path.join(store, f"w{index}"), shard=index, **manager_args)
+    asyncio.run(Api(mgr, keepalive, peers).serve(sock=sock, unix=peers[index], sweep=sweep))
+    # Sesje nie mogą zmieniać wspólnego katalogu (hooki scen piszą do Game.scene_narration) -
+    # każda zmiana to kopia stron w tym procesie i rozjazd treści między procesami
+    if T.ContentCatalog.active(T.Game).fingerprint() != fingerprint:
+        print(f"UWAGA: proces obsługi {index} zmienił katalog treści", file=sys.stderr)
+
+
+def print_memory(children: Dict[int, int]) -> None:
+    """Pamięć procesu głównego i procesów obsługi: unikalna (tylko ten proces) i współdzielona."""
+    rows = [("główny", os.getpid())] + [(f"obsługa {i}", pid) for pid, i in sorted(children.items(), key=lambda x: x[1])]
+    mib = lambda n: n / 2 ** 20
+    print(f"  {'proces':<12} {'pid':>7} {'RSS':>9} {'unikalna':>9} {'wspólna':>9} {'PSS':>9}  [MiB]")
+    total = 0
+    for label, pid in rows:
+        m = memory_usage(str(pid))
+        if not m:
+            print(f"  {label:<12} {pid:>7}  (brak /proc/{pid}/smaps_rollup)")
+            continue
+        total += m["pss"]
+        print(f"  {label:<12} {pid:>7} {mib(m['rss']):9.1f} {mib(m['unique']):9.1f} {mib(m['shared']):9.1f} "
+              f"{mib(m['pss']):9.1f}")
+    print(f"  razem (suma PSS): {mib(total):.1f} MiB")
+    sys.stdout.flush()
+
+
+def prefork(host: str, port: int, workers: int, store: str, keepalive: float = 15.0, sweep: float = 30.0,
+            freeze: bool = True, boot: str = "build", **manager_args) -> None:
+    """Proces główny: katalog raz, gc.freeze(), N procesów obsługi (fork) na wspólnym gnieździe."""
+    import gc
+    import signal
+    import socket
+    import traceback
+    # Bez zbierania w trakcie budowy katalogu - obiekty nie przechodzą między generacjami,
+    # a po gc.freeze() kolektor procesów obsługi w ogóle ich nie dotyka (strony zostają wspólne)
+    gc.disable()
+    catalog = preload_catalog(boot)
+    fingerprint = catalog.fingerprint()
+    os.makedirs(store, exist_ok=True)
+    sock = socket.create_server((host, port), backlog=1024)
+    peers = tuple(os.path.join(store, f"w{i}.sock") for i in range(workers))
+    if freeze:
+        gc.freeze()
+    children: Dict[int, int] = {}
+    stopping = []
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+                _worker(index, sock, store, peers, keepalive, sweep, fingerprint, manager_args)
+                code = 0
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    def stop(signum, frame) -> None:
+        stopping.append(signum)
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: print_memory(children))
+    for i in range(workers):
+        spawn(i)
+    time.sleep(1.0)
+    print(f"Thalanor API: http://{host}:{port}/ - {workers} procesów obsługi, magazyn sesji: {store}, "
+          f"gc.freeze: {'tak' if freeze else 'nie'} (pamięć: kill -USR1 {os.getpid()})")
+    print_memory(children)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"proces obsługi {index} (pid {pid}) zakończył się ({status}) - uruchamiam ponownie")
+            spawn(index)
+    sock.close()
+
+
+# =============================================================================
+# BENCH / CHECK
+# =============================================================================
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"n": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    xs = sorted(samples)
+    at = lambda q: xs[min(len(xs) - 1, int(len(xs) * q))]
+    return {"n": len(xs), "p50": xs[len(xs) // 2], "p90": at(0.9), "p99": at(0.99), "max": xs[-1]}
+
+
+def bench(sessions: int, resident: int, budget: int, steps: int, idle: float, store: Optional[str],
+          seed: int = 0) -> dict:
+    """Sesje z losowym wejściem po kolei przez LRU mniejsze niż liczba sesji."""
+    import thalanor_v1_9 as T
+    T.Game()  # katalog treści zbudowany przed pomiarem
+    pool = ("1", "2", "3", "4", "1", "2", "1", "", "x")
+    rnd = random.Random(seed)
+    with tempfile.TemporaryDirectory() if store is None else _keep(store) as workdir:
+        rss0 = process_rss()
+        T.enable_step_timing()  # fazy kroku tylko z tego pomiaru
+        mgr = SessionManager(workdir, max_resident=resident, budget=budget, idle=idle)
+        sids = [mgr.create(name=f"Gracz{i}", seed=seed + i)[0].sid for i in range(sessions)]
+        lat, n_steps, ended = [], 0, 0
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            for sid in sids:
+                if sid not in mgr:
+                    continue
+                t = time.perf_counter()
+                mgr.step(sid, [rnd.choice(pool)])
+                lat.append((time.perf_counter() - t) * 1e6)
+                n_steps += 1
+                if mgr.live[sid].ended:
+                    mgr.close(sid)
+                    ended += 1
+            mgr.evict_idle()
+        wall = time.perf_counter() - t0
+        series = mgr.profiler.series
+        reh = series.get(("rehydrate", ("spill",)), [0] * (len(mgr.profiler.buckets) + 2))
+        return {
+            "sessions": sessions,
+            "resident_limit": resident,
+            "steps": n_steps,
+            "ended": ended,
+            "wall_s": wall,
+            "steps_per_s": n_steps / wall,
+            "step_us": _percentiles(lat),
+            "phases_us": {phase: {"n": h.total, "p50": h.percentile(0.5) * 1e6, "p99": h.percentile(0.99) * 1e6}
+                          for phase, h in mgr.step_timer.phases.items() if h.total},
+            "rehydrations": sum(reh[:-1]),
+            "rehydrate_mean_us": reh[-1] / max(1, sum(reh[:-1])) * 1e6,
+            "resident": len(mgr.live),
+            "spilled": len(mgr.spilled),
+            "resident_state_bytes": mgr.live_bytes,
+            "rss_mb": process_rss() / 2 ** 20,
+            "rss_growth_mb": (process_rss() - rss0) / 2 ** 20,
+        }
+
+
+def _keep(path: str):
+    from contextlib import nullcontext
+    os.makedirs(path, exist_ok=True)
+    return nullcontext(path)
+
+
+def print_bench(res: dict) -> None:
+    print(f"Sesje: {res['sessions']} (w pamięci najwyżej {res['resident_limit']}), {res['steps']} kroków, "
+          f"{res['ended']} zakończonych, {res['wall_s']:.2f} s")
+    st = res["step_us"]
+    print(f"  krok [µs]: p50 {st['p50']:.1f}  p90 {st['p90']:.1f}  p99 {st['p99']:.1f}  max {st['max']:.1f}  "
+          f"({res['steps_per_s']:.0f} kroków/s)")
+    print("  fazy kroku [µs, górna granica kubełka]: " + "  ".join(
+        f"{phase} p50 {ph['p50']:.1f}/p99 {ph['p99']:.1f}" for phase, ph in res["phases_us"].items()))
+    print(f"  przywrócenia z dysku: {res['rehydrations']}, średnio {res['rehydrate_mean_us']:.1f} µs")
+    print(f"  na koniec: {res['resident']} w pamięci ({res['resident_state_bytes'] / 1024:.0f} KiB stanu), "
+          f"{res['spilled']} na dysku")
+    print(f"  RSS: {res['rss_mb']:.1f} MiB (+{res['rss_growth_mb']:.1f} MiB w trakcie)")
+
+
+def bench_snapshot(sessions: int, played: int, steps: int, touch: int, store: Optional[str], seed: int = 0) -> dict:
+    """Migawka N sesji przy zamknięciu i ich odtworzenie przy starcie nowego menedżera.
+
+    Rozgrywanych jest `played` sesji; reszta to ich rekordy pod nowymi id (stan jest ten sam,
+    a budowa dziesiątek tysięcy sesji krokami trwałaby minuty)."""
+    import thalanor_v1_9 as T
+    T.Game()
+    rnd = random.Random(seed)
+    with tempfile.TemporaryDirectory() if store is None else _keep(store) as workdir:
+        mgr = SessionManager(workdir, max_resident=sessions + 1, budget=1 << 62)
+        for i in range(played):
+            s, _ = mgr.create(name=f"Gracz{i}", seed=seed + i)
+            for _ in range(steps):
+                if not s.ended:
+                    mgr.step(s.sid, [rnd.choice(("1", "2", "3", "1"))])
+        screens = {sid: s.screen for sid, s in mgr.live.items() if not s.ended}
+        templates = [s.to_record() for s in mgr.live.values() if not s.ended]
+        while len(mgr.live) < sessions:
+            sid = mgr._new_id()
+            mgr.live[sid] = Session.from_record(sid, mgr._save_dir(sid), templates[len(mgr.live) % len(templates)])
+        rss = process_rss()
+        t0 = time.perf_counter()
+        n, size = mgr.drain()
+        drain_s = time.perf_counter() - t0
+        mgr._close_snapshot()
+
+        t0 = time.perf_counter()
+        boot = SessionManager(workdir, max_resident=sessions + 1, budget=1 << 62)
+        boot_s = time.perf_counter() - t0
+        restored = len(boot.restored)
+        lat, mismatches = [], 0
+        for sid in list(screens) + rnd.sample(sorted(boot.restored), min(touch, restored)):
+            if sid not in boot.restored:
+                continue
+            t = time.perf_counter()
+            boot.step(sid)
+            lat.append((time.perf_counter() - t) * 1e6)
+            mismatches += sid in screens and boot.live[sid].screen != screens[sid]
+        boot._close_snapshot()
+        return {
+            "sessions": n,
+            "played": played,
+            "snapshot_mb": size / 2 ** 20,
+            "drain_s": drain_s,
+            "boot_s": boot_s,
+            "restored": restored,
+            "first_step_us": _percentiles(lat),
+            "mismatches": mismatches,
+            "rss_mb": rss / 2 ** 20,
+        }
+
+
+def print_snapshot(res: dict) -> None:
+    print(f"Migawka: {res['sessions']} sesji ({res['played']} rozegranych), {res['snapshot_mb']:.1f} MiB")
+    print(f"  zapis (drain): {res['drain_s'] * 1e3:.0f} ms, jeden plik")
+    print(f"  start z migawki: {res['boot_s'] * 1e3:.0f} ms, {res['restored']} sesji do podjęcia")
+    st = res["first_step_us"]
+    print(f"  pierwszy krok sesji z migawki [µs]: p50 {st['p50']:.1f}  p99 {st['p99']:.1f}  max {st['max']:.1f}  "
+          f"(n={st['n']})")
+    print(f"  klatka inna niż przed restartem: {res['mismatches']}")
+    print(f"  RSS przed zapisem: {res['rss_mb']:.1f} MiB")
+
+
+def check(paths: List[str], spill_every: int) -> List[Tuple[str, bool]]:
+    """(plik, zgodne?) - wyjście sesji przy wejściu naraz, po kolei i z odkładaniem na dysk;
+    na końcu - czy sesje zostawiły katalog treści bez zmian."""
+    catalog = preload_catalog()
+    fingerprint = catalog.fingerprint()
+    rows = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            transcript = json.load(f)
+        inputs, outs = transcript["inputs"], []
+        for mode in ("batch", "steps", "spill"):
+            with tempfile.TemporaryDirectory() as workdir:
+                mgr = SessionManager(workdir, lang=transcript.get("lang"))
+                s, text = mgr.create(seed=transcript["seed"], clock=transcript.get("clock"))
+                chunks = [text]
+                batches = [inputs] if mode == "batch" else [[line] for line in inputs]
+                for i, batch in enumerate(batches):
+                    if s.sid not in mgr or mgr.get(s.sid).ended:
+                        break
+                    chunks.append(mgr.step(s.sid, batch))
+                    if mode == "spill" and i % spill_every == 0 and s.sid in mgr.live:
+                        mgr.spill(s.sid)
+                outs.append("".join(chunks))
+        rows.append((path, outs[0] == outs[1] == outs[2]))
+    rows.append(("katalog treści", catalog.fingerprint() == fingerprint))
+    return rows
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="thalanor_server", description="Sesje gry Thalanor po stronie serwera")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("bench", help="sesje przez LRU z odkładaniem na dysk - kroki, przywracanie, RSS")
+    p.add_argument("--sessions", type=int, default=2000)
+    p.add_argument("--resident", type=int, default=200, help="limit sesji w pamięci")
+    p.add_argument("--budget", type=float, default=256, help="budżet stanu sesji w pamięci [MiB]")
+    p.add_argument("--steps", type=int, default=20, help="kroków na sesję")
+    p.add_argument("--idle", type=float, default=300.0, help="limit bezczynności [s]")
+    p.add_argument("--store", help="katalog magazynu (domyślnie tymczasowy)")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("serve", help="API HTTP/JSON sesji gry")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--store", default="thalanor_sessions", help="katalog magazynu sesji i ich zapisów")
+    p.add_argument("--resident", type=int, default=10000, help="limit sesji w pamięci")
+    p.add_argument("--budget", type=float, default=256, help="budżet stanu sesji w pamięci [MiB]")
+    p.add_argument("--idle", type=float, default=300.0, help="po ilu sekundach bezczynności sesja idzie na dysk")
+    p.add_argument("--keepalive", type=float, default=15.0, help="limit bezczynności połączenia [s]")
+    p.add_argument("--lang", default=None)
+    p.add_argument("--workers", type=int, default=1, help="procesy obsługi (prefork, > 1 - tylko Unix)")
+    p.add_argument("--no-freeze", action="store_true", help="bez gc.freeze() przed fork() (do porównania pamięci)")
+    p = sub.add_parser("snapshot", help="migawka wszystkich sesji przy zamknięciu i start z niej")
+    p.add_argument("--sessions", type=int, default=50000)
+    p.add_argument("--played", type=int, default=200, help="sesji rozgrywanych naprawdę (reszta to ich kopie)")
+    p.add_argument("--steps", type=int, default=10, help="kroków na rozgrywaną sesję")
+    p.add_argument("--touch", type=int, default=2000, help="losowe sesje podejmowane po starcie")
+    p.add_argument("--store", help="katalog magazynu (domyślnie tymczasowy)")
+    p.add_argument("--json", action="store_true", help="wynik jako JSON")
+    p = sub.add_parser("check", help="sesja daje to samo wyjście naraz, krokami i po odłożeniu na dysk")
+    p.add_argument("paths", nargs="*")
+    p.add_argument("--spill-every", type=int, default=3, help="odkładaj sesję co N kroków")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        import asyncio
+        manager_args = dict(max_resident=args.resident, budget=int(args.budget * 2 ** 20), idle=args.idle,
+                            lang=args.lang)
+        if args.workers > 1:
+            prefork(args.host, args.port, args.workers, args.store, args.keepalive, min(30.0, args.idle),
+                    freeze=not args.no_freeze, **manager_args)
+        else:
+            asyncio.run(Api(SessionManager(args.store, **manager_args), args.keepalive)
+                        .serve(args.host, args.port, sweep=min(30.0, args.idle)))
+    elif args.command == "bench":
+        res = bench(args.sessions, args.resident, int(args.budget * 2 ** 20), args.steps, args.idle, args.store)
+        if args.json:
+            print(json.dumps(res, indent=2))
+        else:
+            print_bench(res)
+    elif args.command == "snapshot":
+        res = bench_snapshot(args.sessions, args.played, args.steps, args.touch, args.store)
+        if args.json:
+            print(json.dumps(res, indent=2))
+        else:
+            print_snapshot(res)
+        if res["mismatches"]:
+            return 1
+    elif args.command == "check":
+        rows = check(args.paths or sorted(glob.glob(os.path.join(REPLAY_DIR, "*.json"))), args.spill_every)
+        for path, ok in rows:
+            print(f"{'OK   ' if ok else 'RÓŻNE'} {os.path.relpath(path) if os.path.exists(path) else path}")
+        if not all(ok for _, ok in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
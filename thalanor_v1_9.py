@@ -9,31 +9,121 @@ Wersja: 1.9
 Autorzy: Adam Ostrowski, Arkadiusz Noiszewski
 """
 
-import json
+import builtins
+import marshal
 import os
 import random
+import sys
+import zlib
+from array import array
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from collections.abc import MutableMapping, MutableSet
+from functools import partial
+from itertools import count
+from operator import methodcaller
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 
 # =============================================================================
 # UTIL
 # =============================================================================
 
+# Sesja bez terminala (powtórki, testy obciążeniowe). Bez niej gra używa konsoli,
+# modułu random i zegara systemowego - dokładnie jak wcześniej.
+class InputExhausted(Exception):
+    """Skrypt sesji nie ma już wejścia - gra czeka na gracza, którego nie ma."""
+
+
+class SessionIO:
+    """Wejście z listy, wyjście do bufora, własne RNG, zegar i katalog zapisów jednej sesji."""
+
+    def __init__(self, inputs: Iterable[str] = (), seed: Optional[int] = None,
+                 clock: Optional[str] = None, save_dir: Optional[str] = None,
+                 timed: bool = False, buffer_saves: bool = False):
+        from collections import deque
+        from io import StringIO
+        self.inputs = deque(inputs)
+        self.out = StringIO()
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.save_dir = save_dir
+        # Przy buffer_saves=True zapisy slotów zostają w pamięci (slot -> JSON) - zapisuje
+        # je na dysk dopiero właściciel sesji (np. serwer po domknięciu tury)
+        self.saves: Optional[Dict[int, str]] = {} if buffer_saves else None
+        # Przy timed=True zapisujemy chwilę każdego odczytu - różnice to czasy kroków silnika
+        self.marks: Optional[List[float]] = [] if timed else None
+
+    def read(self, prompt: str) -> str:
+        self.out.write(prompt)
+        if self.marks is not None:
+            from time import perf_counter
+            self.marks.append(perf_counter())
+        if not self.inputs:
+            raise InputExhausted(prompt)
+        line = self.inputs.popleft()
+        self.out.write(line + "\n")
+        return line
+
+    def write(self, text: str) -> None:
+        self.out.write(text)
+
+    def output(self) -> str:
+        return self.out.getvalue()
+
+    def activate(self):
+        """Ustawia sesję w bieżącym kontekście; zwraca token dla _session_io.reset()."""
+        # print modułu przechodzi na wersję sesyjną dopiero przy pierwszej sesji -
+        # gra w konsoli nie płaci za sprawdzanie ContextVar przy każdej linii
+        global print
+        print = _session_print
+        return _session_io.set(self)
+
+
+_session_io: ContextVar[Optional[SessionIO]] = ContextVar("thalanor_session_io", default=None)
+
+
+    # print/input modułu - idą do sesji, jeśli jest ustawiona, inaczej do konsoli
+def _session_print(*args: Any, **kwargs: Any) -> None:
+    sio = _session_io.get()
+    if sio is None or kwargs.get("file") is not None:
+        builtins.print(*args, **kwargs)
+    else:
+        sep, end = kwargs.get("sep"), kwargs.get("end")
+        sio.write((" " if sep is None else sep).join(map(str, args)) + ("\n" if end is None else end))
+
+
+print = builtins.print
+
+
+def input(prompt: str = "") -> str:
+    sio = _session_io.get()
+    return builtins.input(prompt) if sio is None else sio.read(prompt)
+
+
+    # Generator losowy sesji (moduł random, gdy gra działa w konsoli)
+def rng() -> Any:
+    sio = _session_io.get()
+    return random if sio is None else sio.rng
+
+
     # Funkcja pomocnicza do bezpiecznego pobierania danych od użytkownika
     # Autor: A.O
 def safe_input(prompt: str) -> str:
     try:
         return input(prompt)
     except EOFError:
-        print("\n[Wejście przerwane. Wpisz 0 aby wyjść lub kontynuuj.]")
+        print(tr("ui.input_interrupted"))
         return ""
 
 
     # Zwraca aktualny timestamp jako string
     # Autor: A.O
 def now_ts() -> str:
+    sio = _session_io.get()
+    if sio is not None and sio.clock is not None:
+        return sio.clock
+    from datetime import datetime
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
@@ -43,12 +133,126 @@ def norm(raw: str) -> str:
     return (raw or "").strip()
 
 
+# =============================================================================
+# STRINGS (katalog tekstów)
+# =============================================================================
+
+# Katalog z plikami treści (teksty, paczki scen); w wersji .exe pliki leżą w _MEIPASS
+CONTENT_DIR = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "content")
+DEFAULT_LANG = "pl"
+
+# Język bieżącej sesji - ContextVar, żeby kilka sesji w jednym procesie nie mieszało języków
+_current_lang: ContextVar[str] = ContextVar("thalanor_lang", default=DEFAULT_LANG)
+
+
+# Katalog tekstów jednego języka.
+# Wszystkie teksty trzymane są w jednym bloku UTF-8 + tablicy offsetów;
+# pojedynczy tekst dekodowany jest dopiero przy wyświetleniu.
+class StringCatalog:
+    _loaded: Dict[str, "StringCatalog"] = {}
+
+    def __init__(self, lang: str, entries: Dict[str, str]):
+        self.lang = lang
+        self._index: Dict[str, int] = {}
+        offsets = array("I", [0])
+        chunks = []
+        pos = 0
+        for i, (key, text) in enumerate(entries.items()):
+            raw = text.encode("utf-8")
+            chunks.append(raw)
+            pos += len(raw)
+            offsets.append(pos)
+            self._index[sys.intern(key)] = i
+        self._blob = b"".join(chunks)
+        self._offsets = offsets
+
+    @staticmethod
+    def files_for(lang: str) -> List[str]:
+        """Pliki strings_<lang>.json oraz strings_<lang>_*.json (np. kolejne akty)."""
+        try:
+            names = os.listdir(CONTENT_DIR)
+        except OSError:
+            return []
+        base = f"strings_{lang}"
+        return [
+            os.path.join(CONTENT_DIR, n) for n in sorted(names)
+            if n.endswith(".json") and (n == base + ".json" or n.startswith(base + "_"))
+        ]
+
+    @classmethod
+    def available_languages(cls) -> List[str]:
+        try:
+            names = os.listdir(CONTENT_DIR)
+        except OSError:
+            return [DEFAULT_LANG]
+        langs = {n[len("strings_"):-len(".json")].split("_")[0]
+                 for n in names if n.startswith("strings_") and n.endswith(".json")}
+        return sorted(langs | {DEFAULT_LANG}, key=lambda l: (l != DEFAULT_LANG, l))
+
+    @classmethod
+    def for_lang(cls, lang: str) -> "StringCatalog":
+        """Zwraca katalog danego języka - ładowany z dysku przy pierwszym użyciu."""
+        cat = cls._loaded.get(lang)
+        if cat is None:
+            cat = cls._loaded[lang] = cls.load(lang)
+        return cat
+
+    @classmethod
+    def load(cls, lang: str) -> "StringCatalog":
+        """Buduje katalog języka z plików (bez zapamiętywania w _loaded)."""
+        import json
+        entries: Dict[str, str] = {}
+        for path in cls.files_for(lang):
+            with open(path, "r", encoding="utf-8") as f:
+                entries.update(json.load(f))
+        return cls(lang, entries)
+
+    def to_parts(self) -> tuple:
+        """Postać do serializacji (marshal): klucze w kolejności offsetów, blok, offsety."""
+        return tuple(self._index), self._blob, self._offsets.tobytes()
+
+    @classmethod
+    def from_parts(cls, lang: str, parts: tuple) -> "StringCatalog":
+        keys, blob, offsets = parts
+        cat = cls.__new__(cls)
+        cat.lang = lang
+        cat._index = {sys.intern(k): i for i, k in enumerate(keys)}
+        cat._blob = blob
+        cat._offsets = array("I")
+        cat._offsets.frombytes(offsets)
+        return cat
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        i = self._index.get(key)
+        if i is None:
+            return default
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def nbytes(self) -> int:
+        return len(self._blob) + self._offsets.itemsize * len(self._offsets)
+
+
+    # Zwraca tekst o danym id w języku bieżącej sesji (brakujące teksty - z języka domyślnego)
+def tr(key: str, **fmt: Any) -> str:
+    text = StringCatalog.for_lang(_current_lang.get()).get(key)
+    if text is None:
+        text = StringCatalog.for_lang(DEFAULT_LANG).get(key, key)
+    return text.format(**fmt) if fmt else text
+
+
 # =============================================================================
 # ITEM / INVENTORY / EQUIPMENT
 # =============================================================================
 
-@dataclass
-# Klasa reprezentująca przedmiot w grze
+@dataclass(frozen=True, slots=True)
+# Klasa reprezentująca przedmiot w grze - niezmienna definicja z katalogu (items_db),
+# współdzielona przez wszystkie egzemplarze w plecakach i ekwipunku
 # Autor: A.O
 class Item:
     item_id: str
@@ -63,13 +267,13 @@ class Item:
     def __str__(self) -> str:
         parts = []
         if self.damage:
-            parts.append(f"OBR: {self.damage}")
+            parts.append(tr("item.damage", n=self.damage))
         if self.armor:
-            parts.append(f"PANC: {self.armor}")
+            parts.append(tr("item.armor", n=self.armor))
         if self.heal:
-            parts.append(f"LECZY: {self.heal}")
+            parts.append(tr("item.heal", n=self.heal))
         suffix = f" ({', '.join(parts)})" if parts else ""
-        return f"{self.name}{suffix}"
+        return f"{tr(self.name)}{suffix}"
 
     def to_dict(self) -> dict:
         return {
@@ -97,103 +301,730 @@ class Item:
         )
 
 
-@dataclass
+@dataclass(slots=True)
+# Egzemplarz przedmiotu w plecaku/ekwipunku: referencja do definicji + stan własny
+# (wytrzymałość, zaklęcia - na Akt II). Pola definicji czytane są z Item.
+class ItemInstance:
+    item: Item
+    durability: Optional[int] = None
+    enchantments: Tuple[str, ...] = ()
+
+    @property
+    def item_id(self) -> str:
+        return self.item.item_id
+
+    @property
+    def name(self) -> str:
+        return self.item.name
+
+    @property
+    def description(self) -> str:
+        return self.item.description
+
+    @property
+    def item_type(self) -> str:
+        return self.item.item_type
+
+    @property
+    def damage(self) -> int:
+        return self.item.damage
+
+    @property
+    def armor(self) -> int:
+        return self.item.armor
+
+    @property
+    def value(self) -> int:
+        return self.item.value
+
+    @property
+    def heal(self) -> int:
+        return self.item.heal
+
+    def __str__(self) -> str:
+        return str(self.item)
+
+    def to_save(self) -> Any:
+        """W zapisie: samo id przedmiotu, a przy stanie własnym - słownik z id."""
+        if self.durability is None and not self.enchantments:
+            return self.item.item_id
+        data: Dict[str, Any] = {"item_id": self.item.item_id}
+        if self.durability is not None:
+            data["durability"] = self.durability
+        if self.enchantments:
+            data["enchantments"] = list(self.enchantments)
+        return data
+
+    @classmethod
+    def from_save(cls, data: Any, items: Dict[str, Item]) -> "ItemInstance":
+        # Starsze zapisy trzymały pełną kopię przedmiotu - używana, gdy id zniknęło z katalogu
+        if isinstance(data, str):
+            data = {"item_id": data}
+        item = items.get(data["item_id"])
+        if item is None:
+            item = Item.from_dict(data) if "item_type" in data else Item(data["item_id"], data["item_id"], "", "misc")
+        return cls(item, data.get("durability"), tuple(data.get("enchantments", ())))
+
+
+@dataclass(slots=True, eq=False)
+# Stos jednakowych egzemplarzy w plecaku - zajmuje jedno miejsce. Egzemplarze bez
+# stanu własnego współdzielą jeden ItemInstance; ze stanem leżą zawsze po jednym.
+class Stack:
+    instance: ItemInstance
+    count: int = 1
+
+    @property
+    def item_id(self) -> str:
+        return self.instance.item.item_id
+
+    @property
+    def item_type(self) -> str:
+        return self.instance.item.item_type
+
+    @property
+    def stackable(self) -> bool:
+        return _stackable(self.instance)
+
+    def __str__(self) -> str:
+        return str(self.instance) if self.count == 1 else f"{self.instance} x{self.count}"
+
+    def to_save(self) -> Any:
+        data = self.instance.to_save()
+        if self.count == 1:
+            return data
+        if isinstance(data, str):
+            data = {"item_id": data}
+        data["count"] = self.count
+        return data
+
+
+def _stackable(item: ItemInstance) -> bool:
+    return item.durability is None and not item.enchantments
+
+
+@dataclass(slots=True)
 # Klasa zarządzająca plecakiem gracza
 # Autor: A.N
+# Stosy w kolejności dodania; powyżej INDEX_FROM stosów także indeksy item_id -> stosy
+# i item_type -> stosy (mały plecak przeszukuje się szybciej niż utrzymuje dwa słowniki).
+# max_slots liczy miejsca (stosy), nie sztuki.
 class Inventory:
+    MAX_STACK = 99
+    INDEX_FROM = 8
+
     max_slots: int = 20
-    items: List[Item] = field(default_factory=list)
+    _stacks: List[Stack] = field(init=False, default_factory=list, repr=False)
+    _by_id: Optional[Dict[str, List[Stack]]] = field(init=False, default=None, repr=False)
+    _by_type: Optional[Dict[str, List[Stack]]] = field(init=False, default=None, repr=False)
+    _total: int = field(init=False, default=0, repr=False)
+
+    def __len__(self) -> int:
+        return self._total
+
+    @property
+    def free_slots(self) -> int:
+        return self.max_slots - len(self._stacks)
+
+    @property
+    def stacks(self) -> List[Stack]:
+        return list(self._stacks)
+
+    @property
+    def items(self) -> List[ItemInstance]:
+        """Płaska lista egzemplarzy (stos n sztuk = n pozycji), tylko do odczytu."""
+        return [s.instance for s in self._stacks for _ in range(s.count)]
 
-    def add_item(self, item: Item) -> bool:
-        if len(self.items) >= self.max_slots:
+    def has_item(self, item_id: str) -> bool:
+        if self._by_id is None:
+            return any(s.instance.item.item_id == item_id for s in self._stacks)
+        return item_id in self._by_id
+
+    def count(self, item_id: str) -> int:
+        return sum(s.count for s in self._of_id(item_id))
+
+    def first_of_type(self, item_type: str) -> Optional[Stack]:
+        if self._by_type is None:
+            return next((s for s in self._stacks if s.instance.item.item_type == item_type), None)
+        group = self._by_type.get(item_type)
+        return group[0] if group else None
+
+    def of_type(self, item_type: str) -> List[Stack]:
+        if self._by_type is None:
+            return [s for s in self._stacks if s.instance.item.item_type == item_type]
+        return list(self._by_type.get(item_type, ()))
+
+    def _of_id(self, item_id: str) -> List[Stack]:
+        # Przy indeksie - lista z indeksu (nie modyfikować), bez indeksu - nowa lista
+        if self._by_id is None:
+            return [s for s in self._stacks if s.instance.item.item_id == item_id]
+        return self._by_id.get(item_id, [])
+
+    def slots_needed(self, batch: Iterable[Tuple[ItemInstance, int]]) -> int:
+        """Ile nowych miejsc zajmą pary (egzemplarz, liczba) po dopełnieniu istniejących stosów."""
+        need = 0
+        room: Dict[str, int] = {}
+        for item, n in batch:
+            if not _stackable(item):
+                need += n
+                continue
+            iid = item.item.item_id
+            if iid not in room:
+                room[iid] = sum(self.MAX_STACK - s.count for s in self._of_id(iid) if s.stackable)
+            used = min(room[iid], n)
+            room[iid] -= used
+            n -= used
+            if n:
+                new = -(-n // self.MAX_STACK)
+                need += new
+                room[iid] += new * self.MAX_STACK - n
+        return need
+
+    def add_item(self, item: ItemInstance, count: int = 1) -> bool:
+        # Najczęstszy przypadek: jedna sztuka do najnowszego stosu tego przedmiotu
+        group = self._of_id(item.item.item_id)
+        if group and count == 1 and _stackable(item):
+            s = group[-1]
+            if s.count < self.MAX_STACK and s.stackable:
+                s.count += 1
+                self._total += 1
+                return True
+        if count < 1 or self.slots_needed(((item, count),)) > self.free_slots:
             return False
-        self.items.append(item)
+        self._put(item, count)
         return True
 
-    def remove_item(self, item_id: str) -> Optional[Item]:
-        for i, it in enumerate(self.items):
-            if it.item_id == item_id:
-                return self.items.pop(i)
-        return None
+    def add_items(self, items: Iterable[ItemInstance]) -> List[ItemInstance]:
+        """Dodaje egzemplarze po kolei; zwraca te, które się nie zmieściły."""
+        return [it for it in items if not self.add_item(it)]
 
-    def has_item(self, item_id: str) -> bool:
-        return any(it.item_id == item_id for it in self.items)
+    def remove_item(self, item_id: str, count: int = 1) -> Optional[ItemInstance]:
+        """Zabiera count sztuk (najpierw z najnowszych stosów) albo nic; zwraca ostatni egzemplarz."""
+        if count < 1 or self.count(item_id) < count:
+            return None
+        taken = None
+        for s in reversed(list(self._of_id(item_id))):
+            n = min(count, s.count)
+            taken = self.take(s, n)
+            count -= n
+            if not count:
+                break
+        return taken
+
+    def remove_items(self, counts: Dict[str, int]) -> bool:
+        """Zabiera wszystkie podane ilości albo nic."""
+        if any(self.count(iid) < n for iid, n in counts.items()):
+            return False
+        for iid, n in counts.items():
+            if n > 0:
+                self.remove_item(iid, n)
+        return True
+
+    def transfer(self, other: "Inventory", counts: Dict[str, int]) -> bool:
+        """Przenosi podane ilości do innego plecaka - w całości albo wcale."""
+        plan: List[Tuple[Stack, int]] = []
+        for iid, n in counts.items():
+            if self.count(iid) < n:
+                return False
+            for s in reversed(self._of_id(iid)):
+                if n <= 0:
+                    break
+                k = min(n, s.count)
+                plan.append((s, k))
+                n -= k
+        if other.slots_needed((s.instance, k) for s, k in plan) > other.free_slots:
+            return False
+        for s, k in plan:
+            other._put(self.take(s, k), k)
+        return True
+
+    def take(self, stack: Stack, count: int = 1) -> Optional[ItemInstance]:
+        """Zabiera sztuki z konkretnego stosu (np. wybranego w menu)."""
+        if stack not in self._of_id(stack.item_id) or not 1 <= count <= stack.count:
+            return None
+        stack.count -= count
+        self._total -= count
+        if stack.count == 0:
+            self._drop(stack)
+            return stack.instance
+        return ItemInstance(stack.instance.item)
+
+    def clear(self) -> None:
+        self._stacks.clear()
+        self._by_id = self._by_type = None
+        self._total = 0
+
+    def _put(self, item: ItemInstance, count: int) -> None:
+        # Bez sprawdzania miejsc - robią to add_item/transfer (a wczytanie zapisu ich nie potrzebuje)
+        if not _stackable(item):
+            self._push(Stack(item))
+            for _ in range(count - 1):
+                self._push(Stack(ItemInstance(item.item, item.durability, item.enchantments)))
+            return
+        for s in self._of_id(item.item.item_id):
+            if not count:
+                return
+            if s.stackable and s.count < self.MAX_STACK:
+                n = min(count, self.MAX_STACK - s.count)
+                s.count += n
+                self._total += n
+                count -= n
+        while count:
+            n = min(count, self.MAX_STACK)
+            self._push(Stack(item, n))
+            item = ItemInstance(item.item)
+            count -= n
+
+    def _push(self, stack: Stack) -> None:
+        self._stacks.append(stack)
+        self._total += stack.count
+        if self._by_id is not None:
+            self._by_id.setdefault(stack.item_id, []).append(stack)
+            self._by_type.setdefault(stack.item_type, []).append(stack)
+        elif len(self._stacks) > self.INDEX_FROM:
+            self._by_id, self._by_type = {}, {}
+            for s in self._stacks:
+                self._by_id.setdefault(s.item_id, []).append(s)
+                self._by_type.setdefault(s.item_type, []).append(s)
+
+    def _drop(self, stack: Stack) -> None:
+        self._stacks.remove(stack)
+        if self._by_id is None:
+            return
+        group = self._by_id[stack.item_id]
+        group.remove(stack)
+        if not group:
+            del self._by_id[stack.item_id]
+        group = self._by_type[stack.item_type]
+        group.remove(stack)
+        if not group:
+            del self._by_type[stack.item_type]
+
+    def to_save(self) -> List[Any]:
+        return [s.to_save() for s in self._stacks]
+
+    @classmethod
+    def from_save(cls, data: List[Any], items: Dict[str, Item]) -> "Inventory":
+        # Starsze zapisy: każda sztuka osobno - łączą się w stosy przy wczytaniu
+        inv = cls()
+        for d in data:
+            count = int(d.get("count", 1)) if isinstance(d, dict) else 1
+            inv._put(ItemInstance.from_save(d, items), count)
+        return inv
 
     def display(self) -> None:
-        if not self.items:
-            print("  (Plecak pusty)")
+        if not self._stacks:
+            print(tr("ui.backpack_empty"))
             return
-        for i, it in enumerate(self.items, 1):
-            print(f"  {i}. {it}")
+        for i, s in enumerate(self._stacks, 1):
+            print(f"  {i}. {s}")
 
 
-@dataclass
+_EQUIPMENT_VERSIONS = count(1)
+
+
+@dataclass(slots=True)
 # Klasa zarządzająca założonym ekwipunkiem (broń, zbroja, hełm)
 # Autor: A.O
+# Sumy (obrażenia, pancerz) liczone raz i trzymane do equip/unequip. version jest unikalna
+# w procesie (nowy Equipment też dostaje nową), więc Character.derived wie, kiedy przeliczyć.
 class Equipment:
     SLOTS = ["weapon", "armor", "helmet"]
-    slots: Dict[str, Optional[Item]] = field(default_factory=lambda: {s: None for s in Equipment.SLOTS})
+    slots: Dict[str, Optional[ItemInstance]] = field(default_factory=lambda: {s: None for s in Equipment.SLOTS})
+    version: int = field(init=False, repr=False, default_factory=lambda: next(_EQUIPMENT_VERSIONS))
+    _totals: Optional[Tuple[int, int]] = field(init=False, repr=False, default=None)
 
-    def equip(self, item: Item) -> Optional[Item]:
+    def equip(self, item: ItemInstance) -> Optional[ItemInstance]:
         slot = item.item_type
         if slot not in self.slots:
             return None
         old = self.slots[slot]
         self.slots[slot] = item
+        self.changed()
         return old
 
-    def unequip(self, slot: str) -> Optional[Item]:
+    def unequip(self, slot: str) -> Optional[ItemInstance]:
         if slot not in self.slots:
             return None
         old = self.slots[slot]
         self.slots[slot] = None
+        self.changed()
         return old
 
+    def changed(self) -> None:
+        """Unieważnia sumy - wołane przez equip/unequip i po ręcznej zmianie slots."""
+        self._totals = None
+        self.version = next(_EQUIPMENT_VERSIONS)
+
+    def totals(self) -> Tuple[int, int]:
+        if self._totals is None:
+            worn = [it for it in self.slots.values() if it]
+            self._totals = (sum(it.damage for it in worn), sum(it.armor for it in worn))
+        return self._totals
+
     def total_damage(self) -> int:
-        return sum(it.damage for it in self.slots.values() if it)
+        return self.totals()[0]
 
     def total_armor(self) -> int:
-        return sum(it.armor for it in self.slots.values() if it)
+        return self.totals()[1]
 
     def display(self) -> None:
-        print("  Założony ekwipunek:")
+        print(tr("ui.equipped_header"))
         for slot in self.SLOTS:
             it = self.slots.get(slot)
-            print(f"   - {slot:8}: {it.name if it else '(pusto)'}")
+            print(f"   - {slot:8}: {tr(it.name) if it else tr('ui.slot_empty')}")
 
 
 # =============================================================================
 # CHARACTER
 # =============================================================================
 
-@dataclass
-# Klasa reprezentująca postać gracza - główny obiekt stanu gry
+# Rejestr nazw flag / akcji jednorazowych -> małe liczby (numery bitów).
+# Tylko dopisywanie: numer nadany w procesie się nie zmienia. Nazwy z treści
+# rejestrowane są przy budowie katalogu, pozostałe (hooki, zapisy) - przy pierwszym użyciu.
+# Numery bitów zależą od procesu, dlatego zapisy trzymają nazwy.
+class SymbolRegistry:
+    __slots__ = ("index", "names", "_next")
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.names: Dict[int, str] = {}
+        self._next = count()
+
+    def bit(self, name: str) -> int:
+        i = self.index.get(name)
+        if i is None:
+            # setdefault + count() - bez blokady; przy wyścigu najwyżej jeden numer zostaje pusty
+            i = self.index.setdefault(sys.intern(name), next(self._next))
+            self.names[i] = name
+        return i
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+FLAGS = SymbolRegistry()
+ACTIONS = SymbolRegistry()
+_FLAG_INDEX = FLAGS.index
+_ACTION_INDEX = ACTIONS.index
+
+
+def _iter_bits(bits: int) -> Any:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+_MISSING = object()
+
+
+# Flagi postaci: wartości logiczne w dwóch maskach bitowych (on/off - flaga ustawiona
+# na False to co innego niż flaga nieustawiona), pozostałe (liczniki, napisy, np.
+# act1_final_choice) w małym słowniku numer bitu -> wartość, z maską "mixed".
+# Interfejs jak dict.
+class FlagSet(MutableMapping):
+    __slots__ = ("on", "off", "mixed", "_other")
+
+    def __init__(self, data: Any = None):
+        self.on = 0
+        self.off = 0
+        self.mixed = 0
+        self._other: Optional[Dict[int, Any]] = None
+        if data:
+            for name, value in dict(data).items():
+                self[name] = value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        i = _FLAG_INDEX.get(name)
+        if i is None:
+            return default
+        mask = 1 << i
+        if self.on & mask:
+            return True
+        if self.off & mask:
+            return False
+        if self.mixed & mask:
+            return self._other[i]
+        return default
+
+    def __getitem__(self, name: str) -> Any:
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        i = FLAGS.bit(name)
+        mask = 1 << i
+        if self.mixed & mask:
+            self.mixed &= ~mask
+            del self._other[i]
+        if value is True:
+            self.on |= mask
+            self.off &= ~mask
+        elif value is False:
+            self.off |= mask
+            self.on &= ~mask
+        else:
+            self.on &= ~mask
+            self.off &= ~mask
+            self.mixed |= mask
+            if self._other is None:
+                self._other = {}
+            self._other[i] = value
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self:
+            raise KeyError(name)
+        i = FLAGS.index[name]
+        self.on &= ~(1 << i)
+        self.off &= ~(1 << i)
+        if self.mixed >> i & 1:
+            self.mixed &= ~(1 << i)
+            del self._other[i]
+
+    def __contains__(self, name: object) -> bool:
+        return self.get(name, _MISSING) is not _MISSING  # type: ignore[arg-type]
+
+    def _bits(self) -> List[int]:
+        return sorted([*_iter_bits(self.on | self.off), *(self._other or ())])
+
+    def __iter__(self) -> Any:
+        return (FLAGS.names[i] for i in self._bits())
+
+    def __len__(self) -> int:
+        return (self.on | self.off).bit_count() + len(self._other or ())
+
+    def __repr__(self) -> str:
+        return f"FlagSet({dict(self.items())!r})"
+
+    def __reduce__(self) -> tuple:
+        # Numery bitów są lokalne dla procesu - pickle przenosi nazwy
+        return FlagSet, (dict(self.items()),)
+
+    def state(self) -> tuple:
+        """Hashowalny obraz flag (maski + wartości nielogiczne)."""
+        return self.on, self.off, tuple(sorted(self._other.items())) if self._other else ()
+
+
+# Akcje jednorazowe postaci - zbiór nazw trzymany jako maska bitowa. Interfejs jak set.
+class ActionSet(MutableSet):
+    __slots__ = ("bits",)
+
+    def __init__(self, names: Any = ()):
+        self.bits = 0
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name: object) -> bool:
+        i = _ACTION_INDEX.get(name)  # type: ignore[arg-type]
+        return i is not None and bool(self.bits >> i & 1)
+
+    def add(self, name: str) -> None:
+        self.bits |= 1 << ACTIONS.bit(name)
+
+    def discard(self, name: str) -> None:
+        i = ACTIONS.index.get(name)
+        if i is not None:
+            self.bits &= ~(1 << i)
+
+    def __iter__(self) -> Any:
+        return (ACTIONS.names[i] for i in _iter_bits(self.bits))
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __repr__(self) -> str:
+        return f"ActionSet({set(self)!r})"
+
+    def __reduce__(self) -> tuple:
+        return ActionSet, (list(self),)
+
+
+def requirement_masks(req: Dict[str, Any]) -> tuple:
+    """Wymagania jako maski bitowe: (need_on, need_off, forbid_on, forbid_used, flag_bits, reszta).
+
+    Reszta (statystyki, przedmioty) zostaje słownikiem dla Character.check_requirement.
+    Wynik zgodny z check_requirement, o ile żadna z flag nie ma wartości nielogicznej
+    (flag_bits & FlagSet.mixed == 0) - wtedy wybór sprawdza pełny słownik.
+    """
+    need_on = need_off = forbid_on = forbid_used = 0
+    rest: Dict[str, Any] = {}
+    for k, v in req.items():
+        if k == "flag":
+            if isinstance(v, (list, tuple)) and len(v) == 2:
+                if v[1] is True:
+                    need_on |= 1 << FLAGS.bit(v[0])
+                elif v[1] is False:
+                    need_off |= 1 << FLAGS.bit(v[0])
+                else:
+                    rest[k] = v
+            else:
+                need_on |= 1 << FLAGS.bit(str(v))
+        elif k == "not_flag":
+            forbid_on |= 1 << FLAGS.bit(str(v))
+        elif k == "not_used":
+            forbid_used |= 1 << ACTIONS.bit(str(v))
+        else:
+            rest[k] = v
+    return need_on, need_off, forbid_on, forbid_used, need_on | need_off | forbid_on, rest
+
+
+# Pola liczbowe postaci trzymane razem w jednej tablicy array("i") (kolejność = indeks)
+CHARACTER_STATS = (
+    "level", "experience",
+    "strength", "dexterity", "intelligence", "vitality",
+    "max_hp", "max_mp", "current_hp", "current_mp",
+    "gold", "silver", "reputation",
+)
+_CHARACTER_DEFAULTS = array("i", (1, 0, 1, 1, 1, 1, 10, 10, 10, 10, 0, 0, 0))
+
+
+def _packed(name: str) -> property:
+    i = CHARACTER_STATS.index(name)
+
+    def fget(self: "Character") -> int:
+        return self._stats[i]
+
+    if name not in DERIVED_FROM:
+        def fset(self: "Character", value: int) -> None:
+            self._stats[i] = value
+    else:
+        def fset(self: "Character", value: int) -> None:
+            self._stats[i] = value
+            self._derived = None
+    return property(fget, fset)
+
+
+# Statystyki, od których zależy DerivedStats - tylko ich zmiana unieważnia migawkę
+DERIVED_FROM = ("strength", "dexterity", "intelligence", "vitality", "max_hp", "max_mp")
+
+
+@dataclass(frozen=True, slots=True)
+# Migawka statystyk pochodnych: bazowe + premie z ekwipunku (i w przyszłości efektów).
+# Czytają ją HUD, ekran postaci, rzuty i obrażenia; liczona w Character._derive.
+class DerivedStats:
+    damage: int
+    armor: int
+    strength: int
+    dexterity: int
+    intelligence: int
+    vitality: int
+    max_hp: int
+    max_mp: int
+    equipment_version: int = 0
+
+
+def _lazy(slot: str, factory: Callable[[], Any]) -> property:
+    # Kontener tworzony przy pierwszym odwołaniu - świeża postać nie płaci za puste dict/set/plecak
+    def fget(self: "Character") -> Any:
+        value = getattr(self, slot)
+        if value is None:
+            value = factory()
+            setattr(self, slot, value)
+        return value
+
+    def fset(self: "Character", value: Any) -> None:
+        setattr(self, slot, value)
+    return property(fget, fset)
+
+
+# Klasa reprezentująca postać gracza - główny obiekt stanu gry.
+# Zwarta postać dla wielu sesji w procesie: __slots__, statystyki w array("i"),
+# flagi i akcje jednorazowe w maskach bitowych, kontenery (plecak, ekwipunek,
+# relacje) tworzone leniwie.
+# Atrybuty jak dawniej: ch.strength, getattr(ch, stat), ch.flags[...] itd.
 # Autor: A.N
 class Character:
-    name: str
-    level: int = 1
-    experience: int = 0
-
-    strength: int = 1
-    dexterity: int = 1
-    intelligence: int = 1
-    vitality: int = 1
-
-    max_hp: int = 10
-    max_mp: int = 10
-    current_hp: int = 10
-    current_mp: int = 10
-
-    gold: int = 0
-    silver: int = 0
+    __slots__ = ("name", "_stats", "_inventory", "_equipment", "used_actions", "flags", "_npc_relations",
+                 "_derived")
+
+    level = _packed("level")
+    experience = _packed("experience")
+
+    strength = _packed("strength")
+    dexterity = _packed("dexterity")
+    intelligence = _packed("intelligence")
+    vitality = _packed("vitality")
+
+    max_hp = _packed("max_hp")
+    max_mp = _packed("max_mp")
+    current_hp = _packed("current_hp")
+    current_mp = _packed("current_mp")
+
+    gold = _packed("gold")
+    silver = _packed("silver")
+    reputation = _packed("reputation")
+
+    inventory = _lazy("_inventory", Inventory)
+    equipment = _lazy("_equipment", Equipment)
+
+    npc_relations = _lazy("_npc_relations", dict)
+
+    def __init__(self, name: str, **fields: Any):
+        self.name = name
+        self._stats = array("i", _CHARACTER_DEFAULTS)
+        self._inventory = self._equipment = self._npc_relations = None
+        self._derived: Optional[DerivedStats] = None
+        # Flagi i akcje jednorazowe - maski bitowe (patrz FlagSet / ActionSet), sprawdzane najczęściej
+        self.flags: FlagSet = FlagSet()
+        self.used_actions: ActionSet = ActionSet()
+        for key, value in fields.items():
+            if not isinstance(getattr(type(self), key, None), property):
+                raise TypeError(f"Character: nieznane pole '{key}'")
+            setattr(self, key, value)
+
+    def __repr__(self) -> str:
+        stats = ", ".join(f"{k}={v}" for k, v in zip(CHARACTER_STATS, self._stats))
+        return f"Character(name={self.name!r}, {stats})"
+
+    def state_key(self) -> tuple:
+        """Zwarty, hashowalny obraz stanu postaci (statystyki, flagi, akcje, przedmioty, relacje)."""
+        eq = self._equipment
+        worn = tuple(it.item_id if it else None for it in eq.slots.values()) if eq else ()
+        return (
+            self._stats.tobytes(),
+            self.flags.state(),
+            self.used_actions.bits,
+            tuple(sorted((s.item_id, s.count) for s in self._inventory._stacks)) if self._inventory else (),
+            worn if any(worn) else (),  # puste sloty = brak ekwipunku (tworzony leniwie)
+            tuple(sorted(self._npc_relations.items())) if self._npc_relations else (),
+        )
 
-    inventory: Inventory = field(default_factory=Inventory)
-    equipment: Equipment = field(default_factory=Equipment)
+    @classmethod
+    def from_state(cls, key: tuple, items: Dict[str, Item], name: str = "Bohater") -> "Character":
+        """Postać odtworzona z state_key() - przedmioty jako świeże egzemplarze z katalogu."""
+        stats, (on, off, other), used, stacks, worn, relations = key
+        ch = cls(name)
+        ch._stats = array("i", stats)
+        ch.flags.on, ch.flags.off = on, off
+        for i, value in other:
+            ch.flags[FLAGS.names[i]] = value
+        ch.used_actions.bits = used
+        for item_id, n in stacks:
+            ch.inventory._put(ItemInstance.from_save(item_id, items), n)
+        if any(worn):
+            for slot, item_id in zip(list(ch.equipment.slots), worn):
+                ch.equipment.slots[slot] = ItemInstance.from_save(item_id, items) if item_id else None
+            ch.equipment.changed()
+        if relations:
+            ch.npc_relations = dict(relations)
+        return ch
 
-    used_actions: Set[str] = field(default_factory=set)
-    flags: Dict[str, Any] = field(default_factory=dict)
-    reputation: int = 0
-    npc_relations: Dict[str, int] = field(default_factory=dict)
+    @property
+    def derived(self) -> DerivedStats:
+        """Statystyki pochodne; przeliczane tylko po zmianie ekwipunku lub statystyk z DERIVED_FROM."""
+        d = self._derived
+        eq = self._equipment
+        if d is None or d.equipment_version != (eq.version if eq else 0):
+            d = self._derived = self._derive()
+        return d
+
+    def _derive(self) -> DerivedStats:
+        eq = self._equipment
+        damage, armor = eq.totals() if eq else (0, 0)
+        return DerivedStats(damage, armor, self.strength, self.dexterity, self.intelligence,
+                            self.vitality, self.max_hp, self.max_mp, eq.version if eq else 0)
 
     @property
     def exp_to_level(self) -> int:
@@ -203,7 +1034,7 @@ class Character:
         if amount <= 0:
             return
         self.experience += amount
-        print(f"  +{amount} DOŚWIADCZENIA")
+        print(tr("char.exp_gain", n=amount))
         while self.experience >= self.exp_to_level:
             self.experience -= self.exp_to_level
             self.level_up()
@@ -216,11 +1047,11 @@ class Character:
         self.current_mp = self.max_mp
         print()
         print("═" * 60)
-        print(f"  ⭐⭐⭐ AWANS! OSIĄGNĄŁEŚ POZIOM {self.level}! ⭐⭐⭐")
+        print(tr("char.level_up", level=self.level))
         print("═" * 60)
-        print("  Zyskujesz: +5 MAKS. HP, +3 MAKS. MP (pełne uleczenie)")
+        print(tr("char.level_up_gain"))
         print()
-        print("  🎁 MASZ 2 PUNKTY STATYSTYK DO ROZDANIA!")
+        print(tr("char.level_up_points"))
         print("─" * 60)
         self._distribute_stat_points(2)
 
@@ -228,43 +1059,43 @@ class Character:
         """Pozwala graczowi rozdać punkty statystyk."""
         remaining = points
         while remaining > 0:
-            print(f"\n  Pozostałe punkty: {remaining}")
-            print(f"  Aktualne statystyki:")
-            print(f"    1. SIŁA: {self.strength}")
-            print(f"    2. ZRĘCZNOŚĆ: {self.dexterity}")
-            print(f"    3. INTELIGENCJA: {self.intelligence}")
-            print(f"    4. WITALNOŚĆ: {self.vitality}")
+            print(tr("char.points_left", n=remaining))
+            print(tr("char.current_stats"))
+            print(f"    1. {tr('stat.strength')}: {self.strength}")
+            print(f"    2. {tr('stat.dexterity')}: {self.dexterity}")
+            print(f"    3. {tr('stat.intelligence')}: {self.intelligence}")
+            print(f"    4. {tr('stat.vitality')}: {self.vitality}")
             print()
             
             try:
-                choice = input("  Wybierz statystykę (1-4): ").strip()
+                choice = input(tr("char.pick_stat_prompt")).strip()
                 if choice == "1":
                     self.strength += 1
-                    print(f"  +1 SIŁA (teraz: {self.strength})")
+                    print(tr("char.stat_up", stat=tr("stat.strength"), n=self.strength))
                     remaining -= 1
                 elif choice == "2":
                     self.dexterity += 1
-                    print(f"  +1 ZRĘCZNOŚĆ (teraz: {self.dexterity})")
+                    print(tr("char.stat_up", stat=tr("stat.dexterity"), n=self.dexterity))
                     remaining -= 1
                 elif choice == "3":
                     self.intelligence += 1
-                    print(f"  +1 INTELIGENCJA (teraz: {self.intelligence})")
+                    print(tr("char.stat_up", stat=tr("stat.intelligence"), n=self.intelligence))
                     remaining -= 1
                 elif choice == "4":
                     self.vitality += 1
                     self.max_hp += 2
                     self.current_hp = min(self.max_hp, self.current_hp + 2)
-                    print(f"  +1 WITALNOŚĆ (teraz: {self.vitality}), +2 MAKS. HP")
+                    print(tr("char.vitality_up", n=self.vitality))
                     remaining -= 1
                 else:
-                    print("  Nieprawidłowy wybór. Wpisz 1, 2, 3 lub 4.")
+                    print(tr("char.pick_stat_invalid"))
             except (EOFError, KeyboardInterrupt):
-                print("\n  Automatycznie przydzielam pozostałe punkty do SIŁY.")
+                print(tr("char.auto_points"))
                 self.strength += remaining
                 remaining = 0
         
         print("─" * 60)
-        print("  ✅ Punkty rozdane! Kontynuujesz przygodę...")
+        print(tr("char.points_done"))
         print("═" * 60)
 
     def add_money(self, gold: int = 0, silver: int = 0) -> None:
@@ -274,17 +1105,17 @@ class Character:
             self.gold += self.silver // 100
             self.silver = self.silver % 100
         if gold:
-            print(f"  +{gold} ZŁOTA")
+            print(tr("char.gold_gain", n=gold))
         if silver:
-            print(f"  +{silver} SREBRA")
+            print(tr("char.silver_gain", n=silver))
 
     def take_damage(self, amount: int) -> None:
         if amount <= 0:
             return
-        armor = self.equipment.total_armor()
+        armor = self.derived.armor
         actual = max(1, amount - armor)
         self.current_hp = max(0, self.current_hp - actual)
-        print(f"  OTRZYMUJESZ {actual} OBRAŻEŃ (ŻYCIE: {self.current_hp}/{self.max_hp})")
+        print(tr("char.damage_taken", n=actual, hp=self.current_hp, max_hp=self.max_hp))
 
     def heal(self, amount: int) -> None:
         if amount <= 0:
@@ -293,21 +1124,14 @@ class Character:
         self.current_hp = min(self.max_hp, self.current_hp + amount)
         gained = self.current_hp - before
         if gained > 0:
-            print(f"  +{gained} ŻYCIA (ŻYCIE: {self.current_hp}/{self.max_hp})")
+            print(tr("char.healed", n=gained, hp=self.current_hp, max_hp=self.max_hp))
 
     def check_requirement(self, req: Dict[str, Any]) -> Tuple[bool, Optional[Tuple[str, Any]]]:
         for k, v in req.items():
             if k in ("strength", "dexterity", "intelligence", "vitality", "level"):
                 cur = getattr(self, k)
                 if cur < int(v):
-                    label = {
-                        "strength": "SIŁA",
-                        "dexterity": "ZRĘCZNOŚĆ",
-                        "intelligence": "INTELIGENCJA",
-                        "vitality": "WITALNOŚĆ",
-                        "level": "POZIOM",
-                    }[k]
-                    return False, ("stat", (label, int(v)))
+                    return False, ("stat", (k, int(v)))
             elif k == "has_item":
                 if not self.inventory.has_item(str(v)):
                     return False, ("has_item", str(v))
@@ -320,6 +1144,10 @@ class Character:
                     name = str(v)
                     if not bool(self.flags.get(name, False)):
                         return False, ("flag", (name, True))
+            elif k == "not_flag":
+                # Flaga nieustawiona liczy się jak False
+                if bool(self.flags.get(str(v), False)):
+                    return False, ("flag", (str(v), False))
             elif k == "not_used":
                 if str(v) in self.used_actions:
                     return False, ("not_used", str(v))
@@ -340,16 +1168,18 @@ class Character:
             "current_mp": self.current_mp,
             "gold": self.gold,
             "silver": self.silver,
-            "inventory": [it.to_dict() for it in self.inventory.items],
-            "equipment": {slot: (it.to_dict() if it else None) for slot, it in self.equipment.slots.items()},
+            "inventory": self.inventory.to_save(),
+            "equipment": {slot: (it.to_save() if it else None) for slot, it in self.equipment.slots.items()},
             "used_actions": sorted(list(self.used_actions)),
-            "flags": self.flags,
+            "flags": dict(self.flags),
             "reputation": self.reputation,
             "npc_relations": self.npc_relations,
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Character":
+    def from_dict(cls, data: dict, items: Optional[Dict[str, Item]] = None) -> "Character":
+        """items - katalog definicji przedmiotów (items_db), do którego odwołują się zapisy."""
+        items = items or {}
         ch = cls(name=data.get("name", "Bohater"))
         ch.level = data.get("level", 1)
         ch.experience = data.get("experience", 0)
@@ -365,28 +1195,380 @@ class Character:
         ch.silver = data.get("silver", 0)
 
         inv_data = data.get("inventory", [])
-        ch.inventory = Inventory()
-        ch.inventory.items = [Item.from_dict(d) for d in inv_data]
+        ch.inventory = Inventory.from_save(inv_data, items)
 
         eq_data = data.get("equipment", {})
         ch.equipment = Equipment()
         for slot, it_data in eq_data.items():
-            ch.equipment.slots[slot] = Item.from_dict(it_data) if it_data else None
+            ch.equipment.slots[slot] = ItemInstance.from_save(it_data, items) if it_data else None
+        ch.equipment.changed()
 
-        ch.used_actions = set(data.get("used_actions", []))
-        ch.flags = data.get("flags", {}) or {}
+        ch.used_actions = ActionSet(data.get("used_actions", []))
+        ch.flags = FlagSet(data.get("flags", {}) or {})
         ch.reputation = int(data.get("reputation", 0))
         ch.npc_relations = data.get("npc_relations", {}) or {}
         return ch
 
+
 # =============================================================================
-# CHOICE / SCENE
+# TRADING
+# =============================================================================
+
+# Najwyższa premia/kara cenowa kupca z reputacji i relacji z NPC, w procentach
+PRICE_MODIFIER_CAP = 25
+
+
+@dataclass(frozen=True, slots=True)
+# Kupiec z paczki treści: marże (% wartości przedmiotu), skupowane typy i towar startowy.
+# Definicja jest współdzielona przez sesje; bieżący towar trzyma sesja (Game.merchant_stock).
+class Merchant:
+    merchant_id: str
+    name: str
+    npc: Optional[str]
+    sell_pct: int                       # gracz kupuje
+    buy_pct: int                        # gracz sprzedaje
+    buys: Tuple[str, ...]
+    stock: Tuple[Tuple[str, int], ...]
+    # Towar startowy jako słownik - wspólna baza MerchantStock wszystkich sesji
+    base: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "base", dict(self.stock))
+
+    def modifier(self, ch: Character) -> int:
+        """Premia cenowa postaci w procentach: reputacja + 2 x relacja z NPC kupca, w granicach limitu."""
+        relation = int(ch.npc_relations.get(self.npc, 0)) if self.npc else 0
+        return max(-PRICE_MODIFIER_CAP, min(PRICE_MODIFIER_CAP, ch.reputation + 2 * relation))
+
+
+@dataclass(slots=True)
+# Towar kupca w sesji: wspólna baza z definicji + zmiany tej sesji (id -> +/- sztuk).
+# Sesja płaci tylko za to, czym handlowała; w zapisie trafia wyłącznie delta.
+# Kupiec trzyma liczby sztuk - stan własny sprzedanego egzemplarza przepada.
+class MerchantStock:
+    base: Dict[str, int]
+    delta: Dict[str, int] = field(default_factory=dict)
+
+    def count(self, item_id: str) -> int:
+        return self.base.get(item_id, 0) + self.delta.get(item_id, 0)
+
+    def change(self, item_id: str, n: int) -> None:
+        d = self.delta.get(item_id, 0) + n
+        if d:
+            self.delta[item_id] = d
+        else:
+            self.delta.pop(item_id, None)
+
+    def entries(self) -> List[Tuple[str, int]]:
+        """(id, ilość) dostępnego towaru: najpierw w kolejności bazy, potem odkupione od graczy."""
+        out = [(iid, self.count(iid)) for iid in self.base]
+        out += [(iid, n) for iid, n in self.delta.items() if iid not in self.base]
+        return [(iid, n) for iid, n in out if n > 0]
+
+
+@dataclass(frozen=True, slots=True)
+# Cennik kupca przy danej premii - liczony raz dla wszystkich przedmiotów i współdzielony
+# przez sesje (ContentCatalog.price_table). Ceny w srebrze: sprzedaż w górę, skup w dół.
+class PriceTable:
+    merchant_id: str
+    modifier: int
+    sell: Dict[str, int]
+    buy: Dict[str, int]
+
+    @classmethod
+    def build(cls, merchant: Merchant, modifier: int, items: Dict[str, Item]) -> "PriceTable":
+        stocked = {item_id for item_id, _ in merchant.stock}
+        sell_f = merchant.sell_pct * (100 - modifier)
+        buy_f = merchant.buy_pct * (100 + modifier)
+        sell: Dict[str, int] = {}
+        buy: Dict[str, int] = {}
+        for item_id, it in items.items():
+            deals = it.item_type in merchant.buys
+            if deals or item_id in stocked:
+                sell[item_id] = max(1, -(-it.value * sell_f // 10000))
+            if deals and it.value * buy_f >= 10000:
+                buy[item_id] = it.value * buy_f // 10000
+        return cls(merchant.merchant_id, modifier, sell, buy)
+
+
+def quote(game: "Game", merchant_id: str, buy: Optional[Dict[str, int]] = None,
+          sell: Optional[Dict[str, int]] = None) -> Tuple[Optional[int], Optional[Tuple[str, Any]]]:
+    """Saldo partii w srebrze (dodatnie - płaci gracz) albo (None, powód)."""
+    merchant = game.catalog.merchants.get(merchant_id)
+    if merchant is None:
+        return None, ("merchant", merchant_id)
+    prices = game.catalog.price_table(merchant, merchant.modifier(game.character))
+    total = 0
+    for table, batch, sign, missing in ((prices.sell, buy, 1, "no_price"), (prices.buy, sell, -1, "not_buying")):
+        for item_id, n in (batch or {}).items():
+            price = table.get(item_id)
+            if price is None:
+                return None, (missing, item_id)
+            if n < 0:
+                return None, ("count", item_id)
+            total += sign * price * n
+    return total, None
+
+
+def transact(game: "Game", merchant_id: str, buy: Optional[Dict[str, int]] = None,
+             sell: Optional[Dict[str, int]] = None) -> Tuple[bool, Optional[Tuple[str, Any]]]:
+    """Kupno i sprzedaż jedną partią - przedmioty i pieniądze zmieniają się razem albo wcale.
+
+    Zwraca (ok, powód) jak Character.check_requirement.
+    """
+    buy = {k: n for k, n in (buy or {}).items() if n}
+    sell = {k: n for k, n in (sell or {}).items() if n}
+    if not buy and not sell:
+        return False, ("count", None)
+    total, reason = quote(game, merchant_id, buy, sell)
+    if reason:
+        return False, reason
+    ch = game.character
+    wealth = ch.gold * 100 + ch.silver
+    if wealth < total:
+        return False, ("money", total - wealth)
+    stock = game.merchant_stock(merchant_id)
+    for item_id, n in buy.items():
+        if stock.count(item_id) < n:
+            return False, ("stock", item_id)
+    for item_id, n in sell.items():
+        if ch.inventory.count(item_id) < n:
+            return False, ("not_owned", item_id)
+    inv = ch.inventory
+    items = game.items_db
+    bought = [(ItemInstance(items[item_id]), n) for item_id, n in buy.items()]
+    if inv.slots_needed(bought) <= inv.free_slots:
+        if sell:
+            inv.remove_items(sell)
+    else:
+        # Zakup zmieści się najwyżej po sprzedaży - sprzedawane sztuki czekają na boku
+        held = Inventory(max_slots=sys.maxsize)
+        if not sell or not inv.transfer(held, sell):
+            return False, ("space", None)
+        if inv.slots_needed(bought) > inv.free_slots:
+            held.transfer(inv, sell)
+            return False, ("space", None)
+    for it, n in bought:
+        inv.add_item(it, n)
+        stock.change(it.item_id, -n)
+    for item_id, n in sell.items():
+        stock.change(item_id, n)
+    ch.gold, ch.silver = divmod(wealth - total, 100)
+    return True, None
+
+
+# =============================================================================
+# EFFECT BYTECODE
 # =============================================================================
 
+# Efekty wyborów kompilowane są do płaskiej krotki: kod operacji + argumenty,
+# jedna instrukcja za drugą. Skoki są względne (liczba pozycji do pominięcia
+# za końcem instrukcji), więc programy efektów skleja się zwykłym "+".
+# Instrukcje warunkowe (TEST_*, ROLL, REMOVE_ITEM, PAY_SILVER) idą dalej, gdy
+# warunek jest spełniony, a w przeciwnym razie przeskakują ostatni argument.
+# Program to czyste dane (int/str/None/bool) - da się go marshal/pickle, przesłać
+# do innego procesu i analizować statycznie (disassemble).
+Effect = Tuple[Any, ...]
 EffectFn = Callable[["Game"], None]
 OnEnterFn = Callable[["Game"], None]
 ExitConditionFn = Callable[["Game"], Optional[str]]
 
+OPCODES = (
+    # nazwa, liczba argumentów
+    ("ADD_EXP", 1),              # n
+    ("ADD_HP", 1),               # n (ujemne = obrażenia)
+    ("ADD_SILVER", 1),           # n
+    ("ADD_SILVER_RNG", 2),       # lo, hi
+    ("SET_FLAG", 2),             # klucz, wartość
+    ("PRINT", 1),                # id tekstu (z pustymi liniami)
+    ("SAY", 2),                  # id tekstu, prefiks
+    ("SAY_N", 2),                # id tekstu, n
+    ("STAT", 3),                 # statystyka, delta, limit
+    ("ADD_ITEM", 1),             # id przedmiotu
+    ("EQUIP_FIRST_WEAPON", 0),
+    ("PICK_STAT", 1),            # statystyka
+    ("JUMP", 1),                 # skok
+    ("TEST_FLAG", 2),            # klucz, skok
+    ("TEST_STAT", 3),            # statystyka, minimum, skok
+    ("ROLL", 4),                 # statystyka|None, baza %, % za punkt ponad 1, skok
+    ("REMOVE_ITEM", 2),          # id przedmiotu, skok
+    ("PAY_SILVER", 2),           # kwota, skok
+    ("CALL", 1),                 # dowolna funkcja fn(game) - poza formatem danych
+)
+OPNAMES = tuple(name for name, _ in OPCODES)
+OPARITY = tuple(n for _, n in OPCODES)
+(OP_ADD_EXP, OP_ADD_HP, OP_ADD_SILVER, OP_ADD_SILVER_RNG, OP_SET_FLAG, OP_PRINT, OP_SAY, OP_SAY_N,
+ OP_STAT, OP_ADD_ITEM, OP_EQUIP_FIRST_WEAPON, OP_PICK_STAT, OP_JUMP, OP_TEST_FLAG, OP_TEST_STAT,
+ OP_ROLL, OP_REMOVE_ITEM, OP_PAY_SILVER, OP_CALL) = range(len(OPCODES))
+
+
+def fx_if(test: Effect, then: Effect, orelse: Effect = ()) -> Effect:
+    """Składa rozgałęzienie; test to instrukcja warunkowa bez ostatniego argumentu (skoku)."""
+    if orelse:
+        then = then + (OP_JUMP, len(orelse))
+    return test + (len(then),) + then + orelse
+
+
+def assemble(effects: List[Any]) -> Effect:
+    """Skleja programy efektów w jeden; zwykłe funkcje fn(game) trafiają do instrukcji CALL."""
+    code: Effect = ()
+    for e in effects:
+        code += e if isinstance(e, tuple) else (OP_CALL, e)
+    return code
+
+
+def disassemble(code: Effect) -> List[Tuple[int, str, tuple]]:
+    """Lista instrukcji (pozycja, nazwa, argumenty) - do analizy i podglądu programu."""
+    out = []
+    pc = 0
+    while pc < len(code):
+        op = code[pc]
+        n = OPARITY[op]
+        out.append((pc, OPNAMES[op], tuple(code[pc + 1:pc + 1 + n])))
+        pc += 1 + n
+    return out
+
+
+    # Interpreter efektów - jedna pętla, instrukcje w kolejności częstości
+def execute(game: "Game", code: Effect) -> None:
+    ch = game.character
+    pc = 0
+    end = len(code)
+    while pc < end:
+        op = code[pc]
+        if op == OP_PRINT:
+            print("\n" + tr(code[pc + 1]) + "\n")
+            pc += 2
+        elif op == OP_SET_FLAG:
+            ch.flags[code[pc + 1]] = code[pc + 2]
+            pc += 3
+        elif op == OP_ADD_EXP:
+            ch.add_experience(code[pc + 1])
+            pc += 2
+        elif op == OP_ADD_HP:
+            amt = code[pc + 1]
+            if amt >= 0:
+                ch.heal(amt)
+            else:
+                ch.take_damage(-amt)
+            pc += 2
+        elif op == OP_SAY:
+            print(code[pc + 2] + tr(code[pc + 1]))
+            pc += 3
+        elif op == OP_ROLL:
+            stat = code[pc + 1]
+            chance = code[pc + 2]
+            if stat is not None:
+                chance += (getattr(ch.derived, stat, 1) - 1) * code[pc + 3]
+            pc += 5
+            if rng().randint(1, 100) > chance:
+                pc += code[pc - 1]
+        elif op == OP_JUMP:
+            pc += 2 + code[pc + 1]
+        elif op == OP_TEST_FLAG:
+            pc += 3
+            if not ch.flags.get(code[pc - 2], False):
+                pc += code[pc - 1]
+        elif op == OP_STAT:
+            stat, delta, cap = code[pc + 1], code[pc + 2], code[pc + 3]
+            newv = getattr(ch, stat) + delta
+            if cap is not None:
+                newv = min(newv, cap)
+            setattr(ch, stat, newv)
+
+            sign = "+" if delta > 0 else ""
+            print(f"  {sign}{delta} {tr('stat.' + stat)}")
+
+            if stat == "vitality" and delta > 0:
+                ch.max_hp += 2 * delta
+                ch.current_hp = min(ch.max_hp, ch.current_hp + 2 * delta)
+                print(tr("fx.max_hp_up", n=2 * delta, max_hp=ch.max_hp))
+            pc += 4
+        elif op == OP_ADD_ITEM:
+            it = game.items_db[code[pc + 1]]
+            if ch.inventory.add_item(ItemInstance(it)):
+                print(tr("fx.item_received", item=tr(it.name)))
+            else:
+                print(tr("fx.backpack_full"))
+            pc += 2
+        elif op == OP_ADD_SILVER:
+            ch.add_money(silver=code[pc + 1])
+            pc += 2
+        elif op == OP_ADD_SILVER_RNG:
+            ch.add_money(silver=rng().randint(code[pc + 1], code[pc + 2]))
+            pc += 3
+        elif op == OP_SAY_N:
+            print(tr(code[pc + 1], n=code[pc + 2]))
+            pc += 3
+        elif op == OP_REMOVE_ITEM:
+            pc += 3
+            if not ch.inventory.remove_item(code[pc - 2]):
+                pc += code[pc - 1]
+        elif op == OP_PAY_SILVER:
+            amount = code[pc + 1]
+            pc += 3
+            if ch.silver >= amount:
+                ch.silver -= amount
+            else:
+                pc += code[pc - 1]
+        elif op == OP_TEST_STAT:
+            pc += 4
+            if getattr(ch, code[pc - 3]) < code[pc - 2]:
+                pc += code[pc - 1]
+        elif op == OP_EQUIP_FIRST_WEAPON:
+            stack = ch.inventory.first_of_type("weapon")
+            if stack:
+                it = ch.inventory.take(stack)
+                old = ch.equipment.equip(it)
+                print(tr("fx.weapon_equipped", item=tr(it.name)))
+                if old:
+                    ch.inventory.add_item(old)
+            else:
+                print(tr("fx.no_weapon"))
+            pc += 1
+        elif op == OP_PICK_STAT:
+            _pick_stat(ch, code[pc + 1])
+            pc += 2
+        elif op == OP_CALL:
+            code[pc + 1](game)
+            ch = game.character
+            pc += 2
+        else:
+            raise ValueError(f"Nieznana instrukcja efektu {op!r} na pozycji {pc}")
+
+
+    # Wybór statystyki na starcie (2 punkty do rozdania)
+def _pick_stat(ch: "Character", stat: str) -> None:
+    picks_count = ch.flags.get("stat_picks_count", 0)
+    if picks_count >= 2:
+        print(tr("fx.picks_exhausted"))
+        return
+
+    # Zwiększ statystykę
+    cur = getattr(ch, stat)
+    setattr(ch, stat, cur + 1)
+
+    print(tr("char.stat_up", stat=tr("stat." + stat), n=getattr(ch, stat)))
+
+    # Witalność daje też HP
+    if stat == "vitality":
+        ch.max_hp += 2
+        ch.current_hp = ch.max_hp
+        print(tr("fx.pick_vitality_hp", max_hp=ch.max_hp))
+
+    # Zwiększ licznik
+    ch.flags["stat_picks_count"] = picks_count + 1
+    remaining = 2 - (picks_count + 1)
+    if remaining > 0:
+        print(tr("fx.picks_left", n=remaining))
+    else:
+        print(tr("fx.picks_done"))
+
+
+# =============================================================================
+# CHOICE / SCENE
+# =============================================================================
+
 
 @dataclass
 # Klasa reprezentująca wybór gracza w scenie
@@ -395,53 +1577,86 @@ class Choice:
     text: str
     next_scene: Optional[str]
     requirements: Dict[str, Any] = field(default_factory=dict)
-    effects: List[EffectFn] = field(default_factory=list)
+    effects: List[Effect] = field(default_factory=list)
     one_time_id: Optional[str] = None
     hidden_if_unavailable: bool = False
+    code: Effect = field(init=False, repr=False, default=())
+    done_mask: int = field(init=False, repr=False, default=0)
+    # Wymagania jako maski bitowe (requirement_masks) - liczone raz, przy tworzeniu wyboru
+    req_masks: tuple = field(init=False, repr=False, default=())
+
+    def __post_init__(self):
+        self.code = assemble(self.effects)
+        if self.one_time_id:
+            self.done_mask = 1 << ACTIONS.bit(self.one_time_id)
+        self.req_masks = requirement_masks(self.requirements)
 
     def is_done(self, game: "Game") -> bool:
-        return bool(self.one_time_id) and (self.one_time_id in game.character.used_actions)
+        return bool(game.character.used_actions.bits & self.done_mask)
 
     def is_available(self, game: "Game") -> bool:
-        if self.is_done(game):
+        ch = game.character
+        used = ch.used_actions.bits
+        if used & self.done_mask:
+            return False
+        need_on, need_off, forbid_on, forbid_used, flag_bits, rest = self.req_masks
+        flags = ch.flags
+        if flags.mixed & flag_bits:
+            ok, _ = ch.check_requirement(self.requirements)
+            return ok
+        if (flags.on & need_on) != need_on or (flags.off & need_off) != need_off:
             return False
-        ok, _ = game.character.check_requirement(self.requirements)
-        return ok
+        if flags.on & forbid_on or used & forbid_used:
+            return False
+        if rest:
+            ok, _ = ch.check_requirement(rest)
+            return ok
+        return True
 
     def block_reason(self, game: "Game") -> Optional[str]:
         ok, reason = game.character.check_requirement(self.requirements)
         if ok or not reason:
             return None
+        return self.describe_block(reason)
 
+    @staticmethod
+    def describe_block(reason: Tuple[str, Any]) -> str:
         kind, data = reason
         if kind == "stat":
-            label, val = data
-            return f"WYMAGANA {label} {val}"
+            stat, val = data
+            return tr("block.stat", stat=tr("stat." + stat), n=val)
         if kind == "flag":
-            return "NAJPIERW WYKONAJ WCZEŚNIEJSZE DZIAŁANIA"
+            return tr("block.flag")
         if kind == "has_item":
-            return f"WYMAGANY PRZEDMIOT: {data}"
+            return tr("block.has_item", item=data)
         if kind == "not_used":
-            return "TO JUŻ ZOSTAŁO ZROBIONE"
-        return "ZABLOKOWANE"
+            return tr("block.not_used")
+        return tr("block.other")
 
-    def display(self, idx: int, game: "Game") -> None:
+    def display(self, idx: int, game: "Game") -> str:
+        """Wypisuje wybór; zwraca zdarzenie pokrycia: done / available / blocked:<powód>."""
         if self.is_done(game):
-            print(f"  V. {self.text} [ZROBIONE]")
-            return
+            print(f"  V. {tr(self.text)} [{tr('ui.choice_done')}]")
+            return "done"
 
         if not self.is_available(game):
-            reason = self.block_reason(game)
-            print(f"  X. {self.text} [{reason}]")
-            return
+            ok, reason = game.character.check_requirement(self.requirements)
+            blocked = None if ok or not reason else reason
+            print(f"  X. {tr(self.text)} [{self.describe_block(blocked) if blocked else None}]")
+            return "blocked:" + (blocked[0] if blocked else "other")
 
-        print(f"  {idx}. {self.text}")
+        print(f"  {idx}. {tr(self.text)}")
+        return "available"
 
     def apply(self, game: "Game") -> None:
-        if self.one_time_id:
-            game.character.used_actions.add(self.one_time_id)
-        for fn in self.effects:
-            fn(game)
+        if self.done_mask:
+            game.character.used_actions.bits |= self.done_mask
+        execute(game, self.code)
+
+
+    # Hooki scen wskazywane są nazwą metody Game - wywoływane na obiekcie bieżącej sesji
+def _call_hook(name: str, game: "Game") -> Any:
+    return getattr(game, name)(game)
 
 
 @dataclass
@@ -467,158 +1682,1441 @@ class Scene:
             return self.exit_condition(game)
         return None
 
-    def display(self, game: "Game") -> List[Tuple[int, Choice]]:
+    def display(self, game: "Game", events: Optional[list] = None) -> List[Tuple[int, Choice]]:
+        """Wypisuje scenę; do `events` (jeśli podane) trafia (pozycja, zdarzenie) każdego pokazanego wyboru."""
         ch = game.character
         weapon = ch.equipment.slots.get("weapon")
-        weapon_name = weapon.name if weapon else "BRAK"
+        weapon_name = tr(weapon.name) if weapon else tr("ui.no_weapon")
 
         # Statystyki zawsze na górze - czytelny pasek
         print("\n" + "═" * 80)
-        print(f"  ❤️  ŻYCIE: {ch.current_hp}/{ch.max_hp}  |  ⭐ POZIOM: {ch.level}  |  📊 EXP: {ch.experience}/{ch.exp_to_level}")
-        print(f"  💪 SIŁ: {ch.strength}  |  🏃 ZRĘ: {ch.dexterity}  |  🧠 INT: {ch.intelligence}  |  🛡️  WIT: {ch.vitality}")
-        print(f"  💰 SREBRO: {ch.silver}  |  🪙  ZŁOTO: {ch.gold}  |  ⚔️  BROŃ: {weapon_name}")
+        print(tr("ui.hud_line1", hp=ch.current_hp, max_hp=ch.max_hp, level=ch.level,
+                 exp=ch.experience, exp_to_level=ch.exp_to_level))
+        print(tr("ui.hud_line2", strength=ch.strength, dexterity=ch.dexterity,
+                 intelligence=ch.intelligence, vitality=ch.vitality))
+        print(tr("ui.hud_line3", silver=ch.silver, gold=ch.gold, weapon=weapon_name))
         print("═" * 80)
         
         # Tytuł sceny
-        print(f"\n  📍 {self.title}")
+        print(f"\n  📍 {tr(self.title)}")
         print("─" * 80)
         
-        # Narracja
-        print(self.narration)
+        # Narracja (hook sceny mógł ją podmienić dla tej sesji)
+        print(tr(game.scene_narration.get(self.scene_id, self.narration)))
 
         if self.objective:
             print()
             print("┄" * 80)
-            print(f"  >>> CEL: {self.objective} <<<")
+            print(tr("ui.objective", objective=tr(self.objective)))
             print("┄" * 80)
 
         # Separator przed wyborami
         print()
         print("─" * 80)
-        print("  DOSTĘPNE AKCJE:")
+        print(tr("ui.actions_header"))
         print("─" * 80)
 
         shown: List[Tuple[int, Choice]] = []
         idx = 1
-        for c in self.choices:
+        for pos, c in enumerate(self.choices):
             if c.hidden_if_unavailable and not c.is_available(game):
                 continue
             shown.append((idx, c))
-            c.display(idx, game)
+            event = c.display(idx, game)
+            if events is not None:
+                events.append((pos, event))
             idx += 1
 
         print("─" * 80)
-        print("Wpisz NUMER opcji lub 'menu'. | [O] = opcjonalne | [F] = fabularne")
-        print("Legenda: X = zablokowane, V = zrobione (jednorazowe).")
+        print(tr("ui.choice_hint"))
+        print(tr("ui.choice_legend"))
         return shown
 
+    def frame(self, game: "Game") -> dict:
+        """To, co pokazuje display(), jako dane (dla klientów bez terminala, np. API HTTP)."""
+        choices = []
+        idx = 1
+        for c in self.choices:
+            if c.hidden_if_unavailable and not c.is_available(game):
+                continue
+            if c.is_done(game):
+                state, reason = "done", tr("ui.choice_done")
+            elif not c.is_available(game):
+                state, reason = "blocked", c.block_reason(game)
+            else:
+                state, reason = "available", None
+            choices.append({"index": idx, "text": tr(c.text), "state": state, "reason": reason})
+            idx += 1
+        return {
+            "scene": self.scene_id,
+            "title": tr(self.title),
+            "narration": tr(game.scene_narration.get(self.scene_id, self.narration)),
+            "objective": tr(self.objective) if self.objective else None,
+            "choices": choices,
+        }
 
-# =============================================================================
-# SAVE MANAGER
-# =============================================================================
-
-# Klasa odpowiedzialna za zapis i odczyt gry z plików JSON
-# Autor: A.N - Klasa zarządzająca zapisami gry
-class SaveManager:
-    SLOT_COUNT = 4
-    SLOT_FILES = [f"thalanor_save_slot{i}.json" for i in range(1, SLOT_COUNT + 1)]
 
-    @classmethod
-    def slot_info(cls, idx: int) -> Optional[dict]:
-        path = cls.SLOT_FILES[idx]
-        if not os.path.exists(path):
-            return None
+# Katalog scen gry - sceny rejestrowane są jako lekkie fabryki i budowane
+# dopiero przy pierwszym odwołaniu (scenes[id] / scenes.get(id)).
+# Pamięć i czas startu rosną więc z treścią faktycznie odwiedzoną przez gracza.
+class SceneCatalog(dict):
+    def __init__(self):
+        super().__init__()
+        self._factories: Dict[str, Callable[[], Scene]] = {}
+
+    def register(self, scene_id: str, factory: Callable[[], Scene]) -> None:
+        self._factories[scene_id] = factory
+        dict.pop(self, scene_id, None)
+
+    def __missing__(self, scene_id: str) -> Scene:
+        factory = self._factories.get(scene_id)
+        if factory is None:
+            raise KeyError(scene_id)
+        scene = factory()
+        self[scene_id] = scene
+        return scene
+
+    def get(self, scene_id: str, default: Optional[Scene] = None) -> Optional[Scene]:
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return None
+            return self[scene_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, scene_id: object) -> bool:
+        return dict.__contains__(self, scene_id) or scene_id in self._factories
+
+    def ids(self) -> List[str]:
+        """Id wszystkich znanych scen (bez budowania ich)."""
+        return list(dict.fromkeys([*self._factories, *dict.keys(self)]))
+
+    def materialize_all(self) -> None:
+        for scene_id in self.ids():
+            self[scene_id]
+
+    def materialized_count(self) -> int:
+        return dict.__len__(self)
 
-    @classmethod
-    def save(cls, idx: int, ch: Character, scene_id: str) -> None:
-        data = {
-            "timestamp": now_ts(),
-            "scene": scene_id,
-            "character": ch.to_dict(),
-        }
-        with open(cls.SLOT_FILES[idx], "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print("Zapisano grę.")
 
-    @classmethod
-    def load(cls, idx: int) -> Tuple[Optional[Character], Optional[str]]:
-        try:
-            with open(cls.SLOT_FILES[idx], "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return Character.from_dict(data["character"]), data["scene"]
-        except Exception:
-            return None, None
 # =============================================================================
-# GAME
+# PROFILING
 # =============================================================================
 
-# Główna klasa gry - zarządza pętlą rozgrywki i scenami
-# Autorzy: A.O + A.N - Główna klasa gry (silnik rozgrywki)
-class Game:
-    INTRO_TEXT = (
-        "Budzisz się w starej chacie na skraju lasu.\n"
-        "Twoja przeszłość wydaje się być rozmazana.\n\n"
-        "Czujesz tylko ból, zapach dymu i ciszę, która przychodzi po rzezi.\n"
-        "Przypominasz sobie o tym, że coś złego wydarzyło się w twojej rodzinnej wiosce.\n"
-        "Ale jedno pytanie wisi w powietrzu bez odpowiedzi: dlaczego i gdzie jestem?\n\n"
-        "Każdy wybór ma cenę. Czasem to słowa, nie stal, decydują o tym kto doczeka świtu."
-    )
+# Progi kubełków histogramów czasu CPU [s]
+PROFILE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+
+# Mierzone ścieżki: nazwa metryki, etykiety, opis
+PROFILE_METRICS = {
+    "scene_enter": ("thalanor_scene_enter_cpu_seconds", ("scene",),
+                    "Czas CPU hooka wejścia do sceny (Scene.enter)."),
+    "scene_check_exit": ("thalanor_scene_check_exit_cpu_seconds", ("scene",),
+                         "Czas CPU warunku wyjścia ze sceny (Scene.check_exit)."),
+    "scene_display": ("thalanor_scene_display_cpu_seconds", ("scene",),
+                      "Czas CPU wyświetlenia sceny (Scene.display)."),
+    "choice_apply": ("thalanor_choice_apply_cpu_seconds", ("scene", "choice"),
+                     "Czas CPU wykonania wyboru (Choice.apply); choice to pozycja na liście wyborów sceny."),
+    "effect": ("thalanor_effect_cpu_seconds", ("scene", "choice", "effect", "op"),
+               "Czas CPU pojedynczego efektu wyboru; effect to pozycja na liście efektów, op - pierwsza instrukcja."),
+}
+
+
+def _atomic_write(path: str, text: str) -> None:
+    """Zapis pliku przez plik tymczasowy i os.replace - czytelnik widzi stary albo nowy plik, nigdy połowę."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# Profiler ścieżek scen: liczba wywołań i histogram czasu CPU (thread_time - czekanie
+# na gracza się nie liczy) dla każdej sceny, wyboru i efektu. Jeden na proces, włączany
+# enable_profiling(); wyłączony kosztuje play_scene jeden odczyt zmiennej globalnej.
+class Profiler:
+    def __init__(self, buckets: Iterable[float] = PROFILE_BUCKETS,
+                 metrics: Optional[Dict[str, tuple]] = None):
+        import threading
+        self.buckets = tuple(buckets)
+        # Opisy metryk do render() - inne niż PROFILE_METRICS dla histogramów spoza silnika (np. serwer)
+        self.metrics = PROFILE_METRICS if metrics is None else metrics
+        # (ścieżka, etykiety) -> liczniki kubełków (ostatni: +Inf) i suma czasu na końcu
+        self.series: Dict[Tuple[str, tuple], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, labels: tuple, seconds: float) -> None:
+        from bisect import bisect_left
+        key = (metric, labels)
+        with self._lock:
+            row = self.series.get(key)
+            if row is None:
+                row = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[bisect_left(self.buckets, seconds)] += 1
+            row[-1] += seconds
+
+    def timed(self, metric: str, labels: tuple, fn: Callable[..., Any], *args: Any) -> Any:
+        from time import thread_time
+        t0 = thread_time()
+        try:
+            return fn(*args)
+        finally:
+            self.observe(metric, labels, thread_time() - t0)
+
+    def enter(self, scene: Scene, game: "Game") -> None:
+        self.timed("scene_enter", (scene.scene_id,), scene.enter, game)
+
+    def check_exit(self, scene: Scene, game: "Game") -> Optional[str]:
+        return self.timed("scene_check_exit", (scene.scene_id,), scene.check_exit, game)
+
+    def display(self, scene: Scene, game: "Game", events: Optional[list] = None) -> List[Tuple[int, Choice]]:
+        return self.timed("scene_display", (scene.scene_id,), scene.display, game, events)
+
+    def apply(self, scene: Scene, choice: Choice, game: "Game") -> None:
+        # Jak Choice.apply, ale efekt po efekcie - programy efektów są niezależne
+        # (skoki nie wychodzą poza własny efekt), więc wynik jest ten sam
+        labels = (scene.scene_id, str(scene.choices.index(choice)))
+        self.timed("choice_apply", labels, self._apply_effects, labels, choice, game)
+
+    def _apply_effects(self, labels: tuple, choice: Choice, game: "Game") -> None:
+        if choice.done_mask:
+            game.character.used_actions.bits |= choice.done_mask
+        for i, e in enumerate(choice.effects):
+            code = e if isinstance(e, tuple) else (OP_CALL, e)
+            op = OPNAMES[code[0]] if code else "NOP"
+            self.timed("effect", labels + (str(i), op), execute, game, code)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.series.clear()
+
+    def render(self) -> str:
+        """Wszystkie serie w formacie tekstowym Prometheusa (text/plain; version=0.0.4)."""
+        with self._lock:
+            series = sorted((key, list(row)) for key, row in self.series.items())
+        les = [repr(b) for b in self.buckets] + ["+Inf"]
+        lines = []
+        for metric, (name, label_names, help_text) in self.metrics.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (m, labels), row in series:
+                if m != metric:
+                    continue
+                lbl = ",".join(f'{k}="{_prom_escape(v)}"' for k, v in zip(label_names, labels))
+                sep = "," if lbl else ""
+                total = 0
+                for le, n in zip(les, row):
+                    total += n
+                    lines.append(f'{name}_bucket{{{lbl}{sep}le="{le}"}} {total}')
+                lines.append(f"{name}_sum{{{lbl}}} {row[-1]!r}")
+                lines.append(f"{name}_count{{{lbl}}} {total}")
+        return "\n".join(lines) + "\n"
 
-    DEFAULT_NAMES = ["Kaelen", "Rhodan", "Mirel", "Syrien", "Aragorn", "Fila", "Filavandrel", "Cahir", "Desmond"]
+    def dump(self, path: str) -> None:
+        """Zapis do pliku (np. dla textfile collectora node_exportera) - atomowo, przez plik tymczasowy."""
+        _atomic_write(path, self.render())
 
-    def __init__(self):
-        self.character: Optional[Character] = None
-        self.current_scene_id: str = "prolog_instincts"
-        self.scenes: Dict[str, Scene] = {}
-        self.items_db: Dict[str, Item] = {}
-        self.running: bool = True
 
-        self._create_items()
-        self._create_scenes()
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
 
-    # -------------------------
-    # Items
-    # -------------------------
-    def _create_items(self) -> None:
-        self.items_db = {
-            "bandage": Item(
-                "bandage", "Prowizoryczny bandaż",
-                "Kawałek materiału, który może uratować życie.", "consumable",
-                value=3, heal=2
-            ),
-            "primitive_stick": Item(
-                "primitive_stick", "Prymitywny kij",
-                "Krzywy, twardy kij. Prymitywny, ale lepszy niż gołe pięści.", "weapon",
-                damage=3, value=8
-            ),
-            "silver_knife": Item(
-                "silver_knife", "Srebrny nóż",
-                "Pięknie zdobiony nóż ze szczerego srebra. Symbole na rękojeści są nieznane.", "weapon",
-                damage=5, value=50
-            ),
-        }
 
-    # -------------------------
-    # Slots UI
-    # -------------------------
-    def _print_slots(self) -> None:
-        print("\n--- SLOTY ZAPISU (1–4) ---")
-        for i in range(SaveManager.SLOT_COUNT):
-            info = SaveManager.slot_info(i)
-            if not info:
-                print(f"  {i+1}. (PUSTO)")
-            else:
-                ts = info.get("timestamp", "brak daty")
-                scene = info.get("scene", "?")
-                name = (info.get("character", {}) or {}).get("name", "Bohater")
-                lvl = (info.get("character", {}) or {}).get("level", 1)
-                print(f"  {i+1}. {name} (POZIOM {lvl}) | scena: {scene} | zapis: {ts}")
-        print()
+_profiler: Optional[Profiler] = None
+
+
+def enable_profiling(profiler: Optional[Profiler] = None) -> Profiler:
+    global _profiler
+    _profiler = profiler or Profiler()
+    return _profiler
+
+
+def disable_profiling() -> Optional[Profiler]:
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+    # Okresowy zrzut metryk do pliku (wątek w tle) - Profiler albo Coverage, wszystko z dump(path)
+def start_metrics_dump(profiler: Any, path: str, interval: float = 15.0) -> Callable[[], None]:
+    """Zrzuca metryki co `interval` sekund; zwraca funkcję zatrzymującą (z ostatnim zrzutem)."""
+    import threading
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.wait(interval):
+            profiler.dump(path)
+
+    threading.Thread(target=loop, name="thalanor-metrics-dump", daemon=True).start()
+
+    def close() -> None:
+        stop.set()
+        profiler.dump(path)
+    return close
+
+
+    # Endpoint /metrics (HTTP, wątek w tle) - do odpytywania przez Prometheusa
+def serve_metrics(profiler: Any, port: int, host: str = "127.0.0.1"):
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = profiler.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="thalanor-metrics", daemon=True).start()
+    return server
+
+
+# =============================================================================
+# ADVISOR
+# =============================================================================
+
+# Co z postaci może jeszcze czytać treść osiągalna ze sceny (thalanor_analysis.liveness).
+# Reszta nie zmienia dalszej gry, więc canonical_state wycina ją z klucza stanu.
+# `steps` to już przybliżenie: statystyka w kluczu jako przedział szerokości `step`.
+@dataclass(frozen=True, slots=True)
+class StateRelevance:
+    flags: int = -1                  # maska flag czytanych dalej
+    actions: int = -1                # maska akcji jednorazowych czytanych dalej
+    dropped: Tuple[int, ...] = ()    # indeksy CHARACTER_STATS, których nic dalej nie czyta
+    hp_cap: Optional[int] = None     # dalsze obrażenia razem < hp_cap - wyższe HP nic nie zmienia
+    exp_gain: Optional[int] = None   # EXP do zdobycia dalej - poniżej progu awansu minus tyle nic nie zmienia
+    steps: Tuple[Tuple[int, int], ...] = ()  # (indeks CHARACTER_STATS, szerokość przedziału)
+
+    def to_save(self) -> List[Any]:
+        # Maski jako nazwy - numery bitów FLAGS/ACTIONS są nadawane w każdym procesie od nowa
+        return [None if self.flags < 0 else _bit_names(self.flags, FLAGS),
+                None if self.actions < 0 else _bit_names(self.actions, ACTIONS),
+                list(self.dropped), self.hp_cap, self.exp_gain, [list(st) for st in self.steps]]
+
+    @classmethod
+    def from_save(cls, data: List[Any]) -> "StateRelevance":
+        flags, actions, dropped, hp_cap, exp_gain, steps = data
+        return cls(-1 if flags is None else sum(1 << FLAGS.bit(n) for n in flags),
+                   -1 if actions is None else sum(1 << ACTIONS.bit(n) for n in actions),
+                   tuple(dropped), hp_cap, exp_gain, tuple(map(tuple, steps)))
+
+
+def _bit_names(bits: int, registry: SymbolRegistry) -> List[str]:
+    return sorted(registry.names[i] for i in _iter_bits(bits))
+
+
+_STAT_LEVEL = CHARACTER_STATS.index("level")
+_STAT_EXP = CHARACTER_STATS.index("experience")
+_STAT_HP = CHARACTER_STATS.index("current_hp")
+
+
+def canonical_state(scene_id: str, state: tuple, rel: StateRelevance) -> tuple:
+    """Klucz stanu decyzji: scena + Character.state_key() bez tego, czego `rel` nie uznaje za czytane dalej.
+
+    HP ponad hp_cap i EXP, z którym awans jest już nieosiągalny, są sprowadzane do jednej
+    wartości - stany różniące się tylko nimi mają tę samą przyszłość (przeżycie, awanse).
+    """
+    stats, (on, off, other), used, stacks, worn, relations = state
+    fm, am = rel.flags, rel.actions
+    other = tuple(kv for kv in other if fm >> kv[0] & 1)
+    if rel.dropped or rel.hp_cap is not None or rel.exp_gain is not None or rel.steps:
+        values = array("i", stats)
+        for i in rel.dropped:
+            values[i] = 0
+        if rel.hp_cap is not None and values[_STAT_HP] > rel.hp_cap:
+            values[_STAT_HP] = rel.hp_cap
+        if rel.exp_gain is not None:
+            # próg awansu jak Character.exp_to_level
+            values[_STAT_EXP] = max(values[_STAT_EXP], values[_STAT_LEVEL] * 100 - rel.exp_gain)
+        for i, step in rel.steps:
+            values[i] //= step
+        stats = values.tobytes()
+    return scene_id, stats, on & fm, off & fm, other, used & am, stacks, worn, relations
+
+
+def state_digest(key: tuple) -> str:
+    """Skrót klucza z canonical_state, niezależny od procesu: flagi i akcje po nazwach."""
+    import hashlib
+    scene_id, stats, on, off, other, used, stacks, worn, relations = key
+    stable = (scene_id, tuple(array("i", stats)), _bit_names(on, FLAGS), _bit_names(off, FLAGS),
+              sorted((FLAGS.names[i], v) for i, v in other), _bit_names(used, ACTIONS), stacks, worn, relations)
+    return hashlib.blake2b(repr(stable).encode("utf-8"), digest_size=8).hexdigest()
+
+
+# Podpowiedź najlepszego wyboru z tabeli polityki (thalanor_analysis.py solve --advisor)
+@dataclass(slots=True)
+class Advisor:
+    objective: str
+    live: Dict[str, StateRelevance]    # scena -> co z postaci czyta się dalej
+    policy: Dict[str, int]             # skrót stanu -> pozycja najlepszego wyboru w scenie
+
+    @classmethod
+    def load(cls, path: str) -> "Advisor":
+        import json
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        live = {k: StateRelevance.from_save(v) for k, v in data["live"].items()}
+        return cls(data["objective"], live, data["policy"])
+
+    def best(self, scene: Scene, game: "Game") -> Optional[Choice]:
+        live = self.live.get(scene.scene_id)
+        if live is None:
+            return None
+        pos = self.policy.get(state_digest(canonical_state(scene.scene_id, game.character.state_key(), live)))
+        return None if pos is None else scene.choices[pos]
+
+
+_advisor: Optional[Advisor] = None
+
+
+def enable_advisor(advisor: Advisor) -> Advisor:
+    global _advisor
+    _advisor = advisor
+    return advisor
+
+
+# =============================================================================
+# COVERAGE
+# =============================================================================
+
+# Pokrycie scen i wyborów: ile razy scena była pokazana, a wybór pokazany, dostępny,
+# zablokowany (z kategorią powodu z check_requirement), już zrobiony, wybrany i ukończony
+# (po efektach postać żyje). Klucz licznika: (scena, pozycja wyboru | -1 dla sceny, zdarzenie).
+class _ThreadGuard:
+    __slots__ = ("__weakref__",)
+
+
+class Coverage:
+    """Liczniki pokrycia - każdy wątek liczy do własnego słownika, bez blokady.
+
+    Pokazanie sceny to jeden licznik na cały układ wyborów (scena, zdarzenia wyborów) -
+    na ścieżce gry jedna inkrementacja; snapshot() rozkłada je na liczniki wyborów,
+    scala słowniki wątków i liczniki dołączone przez merge() (np. z plików innych
+    procesów); dump() zapisuje wynik jako JSON - liczniki się sumują. Słownik wątku,
+    który się skończył, jest doliczany do scalonych liczników i zapominany.
+    """
+
+    def __init__(self) -> None:
+        import threading
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: Dict[int, Dict[tuple, int]] = {}  # id(słownik) -> słownik żywego wątku
+        self._merged: Dict[tuple, int] = {}
+
+    def _shard(self) -> Dict[tuple, int]:
+        try:
+            return self._local.counts
+        except AttributeError:
+            import weakref
+            counts = self._local.counts = {}
+            # Wartości threading.local znikają z końcem wątku - razem z nimi strażnik,
+            # którego finalize przenosi słownik wątku do _merged
+            guard = self._local.guard = _ThreadGuard()
+            weakref.finalize(guard, self._retire, counts)
+            with self._lock:
+                self._shards[id(counts)] = counts
+            return counts
+
+    def _retire(self, counts: Dict[tuple, int]) -> None:
+        with self._lock:
+            self._shards.pop(id(counts), None)
+            self._expand(counts, self._merged)
+
+    def record_scene(self, scene: Scene, game: "Game", events: Optional[list] = None) -> None:
+        """Pokazanie sceny; `events` z Scene.display - bez nich (symulacja bez wyjścia) liczone od nowa."""
+        if events is None:
+            events = []
+            ch = game.character
+            for pos, c in enumerate(scene.choices):
+                available = c.is_available(game)
+                if c.hidden_if_unavailable and not available:
+                    continue
+                if c.is_done(game):
+                    events.append((pos, "done"))
+                elif available:
+                    events.append((pos, "available"))
+                else:
+                    ok, reason = ch.check_requirement(c.requirements)
+                    events.append((pos, "blocked:" + (reason[0] if reason and not ok else "other")))
+        counts = self._shard()
+        key = (scene.scene_id, tuple(events))
+        counts[key] = counts.get(key, 0) + 1
+
+    def record_taken(self, scene: Scene, choice: Choice, game: "Game") -> None:
+        counts = self._shard()
+        pos = scene.choices.index(choice)
+        key = (scene.scene_id, pos, "taken")
+        counts[key] = counts.get(key, 0) + 1
+        if game.character.current_hp > 0:
+            key = (scene.scene_id, pos, "completed")
+            counts[key] = counts.get(key, 0) + 1
+
+    def merge(self, counts: Dict[tuple, int]) -> None:
+        with self._lock:
+            merged = self._merged
+            for key, n in counts.items():
+                merged[key] = merged.get(key, 0) + n
+
+    @staticmethod
+    def _expand(shard: Dict[tuple, int], out: Dict[tuple, int]) -> None:
+        # Liczniki wątku do `out`: pokazanie sceny rozłożone na liczniki wyborów
+        for key, n in list(shard.items()):
+            if len(key) == 2:
+                sid, events = key
+                keys = [(sid, -1, "shown")]
+                for pos, event in events:
+                    keys += ((sid, pos, "shown"), (sid, pos, event))
+            else:
+                keys = (key,)
+            for k in keys:
+                out[k] = out.get(k, 0) + n
+
+    def snapshot(self) -> Dict[tuple, int]:
+        with self._lock:
+            out = dict(self._merged)
+            shards = list(self._shards.values())
+        for shard in shards:
+            self._expand(shard, out)
+        return out
+
+    @staticmethod
+    def to_rows(counts: Dict[tuple, int]) -> List[list]:
+        return [[sid, pos, event, n] for (sid, pos, event), n in sorted(counts.items())]
+
+    @staticmethod
+    def from_rows(rows: Iterable[list]) -> Dict[tuple, int]:
+        return {(sid, pos, event): n for sid, pos, event, n in rows}
+
+    def dump(self, path: str) -> None:
+        """Zapis do pliku JSON - atomowo, przez plik tymczasowy."""
+        import json
+        _atomic_write(path, json.dumps({"coverage": self.to_rows(self.snapshot())}))
+
+    @classmethod
+    def load(cls, path: str) -> Dict[tuple, int]:
+        import json
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_rows(json.load(f)["coverage"])
+
+
+_coverage: Optional[Coverage] = None
+
+
+def enable_coverage(coverage: Optional[Coverage] = None) -> Coverage:
+    global _coverage
+    _coverage = coverage or Coverage()
+    return _coverage
+
+
+def disable_coverage() -> Optional[Coverage]:
+    global _coverage
+    coverage, _coverage = _coverage, None
+    return coverage
+
+
+# =============================================================================
+# STEP TIMING
+# =============================================================================
+
+# Fazy kroku gracza, od odpowiedzi do następnej klatki: rozpoznanie wyboru, efekty,
+# przejście do następnej sceny (koniec tury, śmierć, wyszukanie sceny), hook wejścia, ekran
+STEP_PHASES = ("parse", "apply", "transition", "enter", "display")
+
+
+# Histogram opóźnień w stylu HDR: kubełki logarytmiczno-liniowe - `sub` równych kubełków
+# w każdej oktawie od `lowest` s, więc błąd względny (<= 1/sub) jest ten sam w całym zakresie.
+class LatencyHistogram:
+    def __init__(self, lowest: float = 1e-6, octaves: int = 26, sub: int = 8):
+        self.bounds = tuple(lowest * 2 ** o * (1 + i / sub) for o in range(octaves) for i in range(1, sub + 1))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def record(self, seconds: float) -> None:
+        from bisect import bisect_left
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+
+    def percentile(self, q: float) -> float:
+        """Górna granica kubełka z q-tym kwantylem (q w 0..1); 0.0 bez pomiarów."""
+        if not self.total:
+            return 0.0
+        rank, seen = q * self.total, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else float("inf")
+        return float("inf")
+
+
+# Czasy faz kroku (zegar ścienny, perf_counter) dla wszystkich sesji procesu - do SLO
+# opóźnienia "odpowiedź -> klatka". Jeden na proces, włączany enable_step_timing().
+class StepTimer:
+    def __init__(self):
+        import threading
+        self.phases: Dict[str, LatencyHistogram] = {p: LatencyHistogram() for p in STEP_PHASES}
+        self._lock = threading.Lock()
+
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            hist = self.phases.get(phase)
+            if hist is None:
+                hist = self.phases[phase] = LatencyHistogram()
+            hist.record(seconds)
+
+    def render(self) -> str:
+        """Histogramy faz w formacie tekstowym Prometheusa (kubełki do ostatniego niepustego i +Inf)."""
+        name = "thalanor_step_phase_seconds"
+        lines = [f"# HELP {name} Czas fazy kroku gracza (od odpowiedzi do klatki), kubełki HDR.",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for phase, hist in self.phases.items():
+                last = max((i for i, n in enumerate(hist.counts[:-1]) if n), default=-1)
+                total = 0
+                for le, n in zip(hist.bounds[:last + 1], hist.counts):
+                    total += n
+                    lines.append(f'{name}_bucket{{phase="{phase}",le="{le:.9g}"}} {total}')
+                lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {hist.total}')
+                lines.append(f'{name}_sum{{phase="{phase}"}} {hist.sum!r}')
+                lines.append(f'{name}_count{{phase="{phase}"}} {hist.total}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        _atomic_write(path, self.render())
+
+
+_step_timer: Optional[StepTimer] = None
+
+
+def enable_step_timing(timer: Optional[StepTimer] = None) -> StepTimer:
+    global _step_timer
+    _step_timer = timer or StepTimer()
+    return _step_timer
+
+
+def disable_step_timing() -> Optional[StepTimer]:
+    global _step_timer
+    timer, _step_timer = _step_timer, None
+    return timer
+
+
+# Kilka źródeł metryk (Profiler, StepTimer) pod jednym zrzutem do pliku / endpointem /metrics
+class MetricsSet:
+    def __init__(self, *sources: Any):
+        self.sources = sources
+
+    def render(self) -> str:
+        return "".join(src.render() for src in self.sources)
+
+    def dump(self, path: str) -> None:
+        _atomic_write(path, self.render())
+
+
+# =============================================================================
+# SAVE MANAGER
+# =============================================================================
+
+# Klasa odpowiedzialna za zapis i odczyt gry z plików JSON
+# Autor: A.N - Klasa zarządzająca zapisami gry
+class SaveManager:
+    SLOT_COUNT = 4
+    SLOT_FILES = [f"thalanor_save_slot{i}.json" for i in range(1, SLOT_COUNT + 1)]
+
+    @classmethod
+    def slot_path(cls, idx: int) -> str:
+        """Plik slotu - w katalogu zapisów sesji, jeśli go ma (SessionIO.save_dir)."""
+        sio = _session_io.get()
+        if sio is None or sio.save_dir is None:
+            return cls.SLOT_FILES[idx]
+        return os.path.join(sio.save_dir, cls.SLOT_FILES[idx])
+
+    @classmethod
+    def _slot_text(cls, idx: int) -> Optional[str]:
+        """Treść slotu - z zapisów sesji czekających w pamięci, inaczej z pliku (None, gdy pusty)."""
+        sio = _session_io.get()
+        if sio is not None and sio.saves is not None and idx in sio.saves:
+            return sio.saves[idx]
+        path = cls.slot_path(idx)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    @classmethod
+    def slot_info(cls, idx: int) -> Optional[dict]:
+        import json
+        try:
+            text = cls._slot_text(idx)
+            return None if text is None else json.loads(text)
+        except Exception:
+            return None
+
+    @classmethod
+    def save(cls, idx: int, ch: Character, scene_id: str,
+             merchants: Optional[Dict[str, MerchantStock]] = None) -> None:
+        import json
+        data = {
+            "timestamp": now_ts(),
+            "scene": scene_id,
+            "character": ch.to_dict(),
+        }
+        if merchants:
+            data["merchants"] = {mid: stock.delta for mid, stock in merchants.items() if stock.delta}
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        sio = _session_io.get()
+        if sio is not None and sio.saves is not None:
+            sio.saves[idx] = text
+        else:
+            with open(cls.slot_path(idx), "w", encoding="utf-8") as f:
+                f.write(text)
+        print(tr("ui.saved"))
+
+    @classmethod
+    def load(cls, idx: int, items: Optional[Dict[str, Item]] = None) -> Tuple[Optional[Character], Optional[str]]:
+        import json
+        try:
+            data = json.loads(cls._slot_text(idx))
+            return Character.from_dict(data["character"], items), data["scene"]
+        except Exception:
+            return None, None
+
+    @classmethod
+    def load_merchants(cls, idx: int, merchants: Dict[str, "Merchant"]) -> Optional[Dict[str, "MerchantStock"]]:
+        """Towar kupców zapisany w slocie (None, jeśli sesja jeszcze nie handlowała)."""
+        data = cls.slot_info(idx) or {}
+        stocks = {mid: MerchantStock(merchants[mid].base, dict(delta))
+                  for mid, delta in (data.get("merchants") or {}).items() if mid in merchants}
+        return stocks or None
+
+
+# =============================================================================
+# CONTENT PACKS
+# =============================================================================
+
+# Wersja formatu skompilowanej paczki - zmiana unieważnia pamięć podręczną
+# (także po zaostrzeniu walidacji - stare wpisy ominęłyby nowe sprawdzenia)
+PACK_FORMAT = 4
+
+
+class ContentError(ValueError):
+    """Błąd w definicji paczki treści."""
+
+
+# Słownik efektów paczek treści: nazwa w pliku -> fabryka efektu w Game
+EFFECT_VOCABULARY: Dict[str, str] = {
+    "exp": "fx_add_exp",
+    "hp": "fx_add_hp",
+    "silver": "fx_add_silver",
+    "silver_rng": "fx_add_silver_rng",
+    "flag": "fx_flag",
+    "print": "fx_print",
+    "stat": "fx_stat",
+    "item": "fx_add_item",
+    "equip_first_weapon": "fx_equip_first_weapon_if_any",
+    "clear_directions": "_fx_clear_directions",
+    "bandage_or_int_heal": "_fx_bandage_or_int_heal",
+    "share_item": "_fx_share_item_and_rep",
+    "fight_damage": "_fx_fight_damage",
+    "final_defend": "_fx_final_defend",
+    "pay_silver": "_fx_pay_silver",
+    "mglak_escape_roll": "_fx_mglak_escape_roll",
+    "mglak_final_escape": "_fx_mglak_final_escape",
+    "werewolf_attack_roll": "_fx_werewolf_attack_roll",
+    "werewolf_final_roll": "_fx_werewolf_final_roll",
+    "pick_stat": "_fx_pick_stat",
+    "trade": "fx_trade",
+}
+
+# Argumenty efektów: typy kolejnych argumentów i ile z nich jest wymaganych (reszta ma
+# wartość domyślną w fabryce). "stat" to nazwa pola postaci z CHARACTER_STATS.
+_FLAG_VALUE = (bool, int, float, str, type(None))
+EFFECT_ARGS: Dict[str, Tuple[tuple, int]] = {
+    "exp": ((int,), 1),
+    "hp": ((int,), 1),
+    "silver": ((int,), 1),
+    "silver_rng": ((int, int), 2),
+    "flag": ((str, _FLAG_VALUE), 1),
+    "print": ((str,), 1),
+    "stat": (("stat", int, (int, type(None))), 2),
+    "item": ((str,), 1),
+    "equip_first_weapon": ((), 0),
+    "clear_directions": ((str,), 1),
+    "bandage_or_int_heal": ((), 0),
+    "share_item": ((str, int), 2),
+    "fight_damage": ((int,), 1),
+    "final_defend": ((), 0),
+    "pay_silver": ((int,), 1),
+    "mglak_escape_roll": (("stat", str, str), 3),
+    "mglak_final_escape": ((), 0),
+    "werewolf_attack_roll": (("stat", str, str), 3),
+    "werewolf_final_roll": ((), 0),
+    "pick_stat": (("stat",), 1),
+    "trade": ((str,), 1),
+}
+
+REQUIREMENT_KEYS = ("strength", "dexterity", "intelligence", "vitality", "level", "has_item", "flag", "not_flag", "not_used")
+ITEM_TYPES = ("weapon", "armor", "helmet", "consumable", "misc")
+
+
+def _arg_ok(value: Any, kind: Any) -> bool:
+    # bool to podklasa int - w JSON true/false to nie liczba, chyba że typ dopuszcza bool
+    if kind == "stat":
+        return value in CHARACTER_STATS
+    kinds = kind if isinstance(kind, tuple) else (kind,)
+    if isinstance(value, bool):
+        return bool in kinds
+    return isinstance(value, kinds)
+
+
+def _effect_error(e: Any) -> Optional[str]:
+    """Opis błędu efektu z paczki (nazwa, liczba i typy argumentów) albo None, gdy poprawny."""
+    if not isinstance(e, list) or not e or not isinstance(e[0], str) or e[0] not in EFFECT_VOCABULARY:
+        return f"nieznany efekt {e!r}"
+    kinds, required = EFFECT_ARGS[e[0]]
+    args = e[1:]
+    if not required <= len(args) <= len(kinds):
+        want = required if required == len(kinds) else f"{required}-{len(kinds)}"
+        return f"efekt {e[0]!r}: {len(args)} argumentów zamiast {want}"
+    for i, (value, kind) in enumerate(zip(args, kinds), 1):
+        if not _arg_ok(value, kind):
+            return f"efekt {e[0]!r}: zły argument {i}: {value!r}"
+    return None
+
+
+def _prune_cache(path: str) -> None:
+    """Usuwa starsze pliki cache tego samego źródła (ten sam prefiks "<nazwa>.<cache_tag>-"
+    i rozszerzenie) - po edycji treści zostaje tylko świeżo zapisany."""
+    cache_dir, name = os.path.split(path)
+    prefix, ext = name[:name.rindex("-") + 1], os.path.splitext(name)[1]
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for other in names:
+        if other != name and other.startswith(prefix) and other.endswith(ext):
+            try:
+                os.remove(os.path.join(cache_dir, other))
+            except OSError:
+                pass
+
+
+# Paczka treści: przedmioty, sceny, wybory, wymagania i efekty zadeklarowane w pliku JSON.
+# Skompilowana postać (krotki) zapisywana jest przez marshal w content/__pycache__
+# pod kluczem z hasha treści - kolejne starty pomijają parsowanie i walidację.
+class ContentPack:
+    _loaded: Dict[str, "ContentPack"] = {}
+
+    def __init__(self, name: str, digest: str, scenes: tuple, items: tuple, aliases: Dict[str, str],
+                 merchants: tuple = ()):
+        self.name = name
+        self.digest = digest
+        self.scenes = scenes
+        self.items = items
+        self.aliases = aliases
+        self.merchants = merchants
+
+    @staticmethod
+    def cache_path(path: str, digest: str) -> str:
+        cache_dir = os.environ.get("THALANOR_CACHE_DIR") or os.path.join(os.path.dirname(path), "__pycache__")
+        base = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(cache_dir, f"{base}.{sys.implementation.cache_tag}-{digest}.pack")
+
+    @classmethod
+    def load(cls, path: str) -> "ContentPack":
+        import hashlib
+        import json
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw + b"%d" % PACK_FORMAT).hexdigest()[:16]
+        pack = cls._loaded.get(path)
+        if pack is not None and pack.digest == digest:
+            return pack
+
+        cache = cls.cache_path(path, digest)
+        compiled = None
+        try:
+            with open(cache, "rb") as f:
+                compiled = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            compiled = None
+        if compiled is None:
+            compiled = cls.compile(json.loads(raw.decode("utf-8")), path)
+            cls._write_cache(cache, compiled)
+
+        pack = cls._loaded[path] = cls(os.path.basename(path), digest, *compiled)
+        return pack
+
+    @staticmethod
+    def _write_cache(cache: str, compiled: tuple) -> None:
+        # Zapis atomowy; brak uprawnień do katalogu nie jest błędem - paczka po prostu nie trafi do cache
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            tmp = f"{cache}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump(compiled, f)
+            os.replace(tmp, cache)
+        except OSError:
+            return
+        _prune_cache(cache)
+
+    @staticmethod
+    def compile(data: dict, source: str = "<pack>") -> tuple:
+        """Waliduje definicję paczki i zamienia ją na zwarte krotki: (sceny, przedmioty, aliasy scen, kupcy)."""
+        def fail(msg: str) -> None:
+            raise ContentError(f"{source}: {msg}")
+
+        def freeze(v: Any) -> Any:
+            return tuple(freeze(x) for x in v) if isinstance(v, list) else v
+
+        def field(obj: dict, key: str, kind: Any, default: Any, where: str) -> Any:
+            # Pole o oczekiwanym kształcie - inaczej ContentError zamiast AttributeError/TypeError dalej
+            value = obj.get(key, default)
+            if not _arg_ok(value, kind):
+                fail(f"{where}: pole '{key}' ma zły typ ({type(value).__name__})")
+            return value
+
+        if not isinstance(data, dict):
+            fail("paczka musi być obiektem JSON")
+        items = []
+        item_ids = set()
+        for idef in field(data, "items", list, [], "paczka"):
+            if not isinstance(idef, dict):
+                fail(f"przedmiot nie jest obiektem: {idef!r}")
+            iid = idef.get("item_id")
+            if not isinstance(iid, str) or not iid:
+                fail("przedmiot bez item_id")
+            if iid in item_ids:
+                fail(f"powtórzony przedmiot '{iid}'")
+            item_ids.add(iid)
+            if idef.get("item_type") not in ITEM_TYPES:
+                fail(f"{iid}: nieznany typ przedmiotu {idef.get('item_type')!r}")
+            # Kolejność pól jak w Item
+            items.append((
+                iid, field(idef, "name", str, "", iid), field(idef, "description", str, "", iid), idef["item_type"],
+                *(field(idef, k, int, 0, iid) for k in ("damage", "armor", "value", "heal")),
+            ))
+
+        # Kupcy: marże w % wartości; skup nie może przebić sprzedaży nawet przy skrajnych premiach
+        merchants = []
+        merchant_ids = set()
+        for md in field(data, "merchants", list, [], "paczka"):
+            if not isinstance(md, dict):
+                fail(f"kupiec nie jest obiektem: {md!r}")
+            mid = md.get("merchant_id")
+            if not isinstance(mid, str) or not mid:
+                fail("kupiec bez merchant_id")
+            if mid in merchant_ids:
+                fail(f"powtórzony kupiec '{mid}'")
+            merchant_ids.add(mid)
+            sell_pct, buy_pct = field(md, "sell_pct", int, 120, mid), field(md, "buy_pct", int, 50, mid)
+            if buy_pct * (100 + PRICE_MODIFIER_CAP) > sell_pct * (100 - PRICE_MODIFIER_CAP):
+                fail(f"{mid}: cena skupu może przekroczyć cenę sprzedaży")
+            buys = field(md, "buys", list, [], mid)
+            for t in buys:
+                if t not in ITEM_TYPES:
+                    fail(f"{mid}: nieznany typ przedmiotu {t!r}")
+            stock = field(md, "stock", dict, {}, mid)
+            for iid, n in stock.items():
+                if not _arg_ok(n, int) or n < 1:
+                    fail(f"{mid}: zła ilość towaru '{iid}'")
+            merchants.append((mid, field(md, "name", str, "", mid), field(md, "npc", (str, type(None)), None, mid),
+                              sell_pct, buy_pct, tuple(buys), tuple(stock.items())))
+
+        # "replaces": id scen usuniętych/przemianowanych - sesje w nich przechodzą do tej sceny
+        aliases: Dict[str, str] = {}
+        scenes = []
+        seen = set()
+        for sd in field(data, "scenes", list, [], "paczka"):
+            if not isinstance(sd, dict):
+                fail(f"scena nie jest obiektem: {sd!r}")
+            sid = sd.get("scene_id")
+            if not isinstance(sid, str) or not sid:
+                fail("scena bez scene_id")
+            if sid in seen:
+                fail(f"powtórzona scena '{sid}'")
+            seen.add(sid)
+            for hook, prefix in (("on_enter", "_on_enter_"), ("exit_condition", "_exit_")):
+                name = sd.get(hook)
+                if name is not None and not (isinstance(name, str) and name.startswith(prefix)):
+                    fail(f"{sid}: {hook} musi wskazywać metodę {prefix}*")
+            for old in field(sd, "replaces", list, [], sid):
+                if not isinstance(old, str):
+                    fail(f"{sid}: replaces musi zawierać id scen")
+                aliases[old] = sid
+
+            choices = []
+            for cd in field(sd, "choices", list, [], sid):
+                if not isinstance(cd, dict):
+                    fail(f"{sid}: wybór nie jest obiektem: {cd!r}")
+                if not isinstance(cd.get("text"), str):
+                    fail(f"{sid}: wybór bez tekstu")
+                reqs = field(cd, "requirements", dict, {}, sid)
+                for k, v in reqs.items():
+                    if k not in REQUIREMENT_KEYS:
+                        fail(f"{sid}: nieznane wymaganie '{k}'")
+                    if k == "flag":
+                        ok = isinstance(v, str) or (isinstance(v, list) and len(v) == 2 and isinstance(v[0], str)
+                                                    and _arg_ok(v[1], _FLAG_VALUE))
+                    else:
+                        ok = _arg_ok(v, int if k in CHARACTER_STATS else str)
+                    if not ok:
+                        fail(f"{sid}: złe wymaganie {k}={v!r}")
+                effects = []
+                for e in field(cd, "effects", list, [], sid):
+                    error = _effect_error(e)
+                    if error:
+                        fail(f"{sid}: {error}")
+                    effects.append(freeze(e))
+                choices.append((
+                    cd["text"],
+                    field(cd, "next_scene", (str, type(None)), None, sid),
+                    {k: freeze(v) for k, v in reqs.items()},
+                    tuple(effects),
+                    field(cd, "one_time_id", (str, type(None)), None, sid),
+                    bool(cd.get("hidden_if_unavailable", False)),
+                ))
+
+            scenes.append((
+                sid,
+                field(sd, "title", str, "", sid),
+                field(sd, "narration", str, "", sid),
+                sd.get("objective"),
+                bool(sd.get("explore_mode", False)),
+                tuple(field(sd, "subscenes", list, [], sid)),
+                sd.get("on_enter"),
+                sd.get("exit_condition"),
+                tuple(choices),
+            ))
+        return tuple(scenes), tuple(items), aliases, tuple(merchants)
+
+
+# =============================================================================
+# CONTENT CATALOG
+# =============================================================================
+
+# Katalog treści procesu: przedmioty i sceny ze wszystkich paczek gry (CONTENT_PACKS).
+# Zbudowany katalog nie jest już modyfikowany - hooki trzymają stan w sesji (Game) -
+# więc jedna instancja obsługuje wszystkie sesje, a przeładowanie treści to podmiana
+# jednej referencji (install). Sesje przechodzą na nowy katalog przy następnej scenie.
+class ContentCatalog:
+    _active: Dict[type, "ContentCatalog"] = {}
+
+    def __init__(self, owner: type):
+        self.owner = owner
+        self.packs: Tuple[str, ...] = owner.CONTENT_PACKS
+        self.version = 0
+        self.items: Dict[str, Item] = {}
+        self.merchants: Dict[str, Merchant] = {}
+        # Cenniki (id kupca, premia) -> PriceTable, budowane przy pierwszym handlu
+        self.price_tables: Dict[Tuple[str, int], PriceTable] = {}
+        self.scenes: SceneCatalog = SceneCatalog()
+        self.defns: List[tuple] = []
+        self.aliases: Dict[str, str] = {}
+
+    @classmethod
+    def active(cls, owner: type) -> Optional["ContentCatalog"]:
+        return cls._active.get(owner)
+
+    @classmethod
+    def install(cls, catalog: "ContentCatalog") -> None:
+        prev = cls._active.get(catalog.owner)
+        catalog.version = prev.version + 1 if prev else 1
+        cls._active[catalog.owner] = catalog
+
+    @classmethod
+    def shared(cls, owner: type, boot: str = "build") -> "ContentCatalog":
+        """Aktywny katalog procesu - budowany (albo odtwarzany z migawki) przy pierwszej sesji."""
+        catalog = cls._active.get(owner)
+        if catalog is None:
+            catalog = cls(owner)
+            if not (boot == "snapshot" and CatalogSnapshot.restore(catalog)):
+                catalog.build()
+                if boot == "snapshot":
+                    CatalogSnapshot.save(catalog)
+            cls.install(catalog)
+        return catalog
+
+    def build(self) -> None:
+        packs = [ContentPack.load(os.path.join(CONTENT_DIR, name)) for name in self.packs]
+        self._create_items(packs)
+        self._create_merchants(packs)
+        self._create_scenes(packs)
+
+    def resolve(self, scene_id: str) -> str:
+        """Scena dla sesji po podmianie katalogu: ta sama, jej następczyni ("replaces") albo start gry."""
+        if scene_id in self.scenes:
+            return scene_id
+        return self.aliases.get(scene_id) or self.defns[0][0]
+
+    def fingerprint(self) -> str:
+        """Skrót treści katalogu (zbudowane sceny z wyborami, przedmioty, kupcy) - do sprawdzenia,
+        że sesje go nie zmieniają (katalog jest wspólny dla sesji, a po fork() - dla procesów)."""
+        import hashlib
+        h = hashlib.blake2b(digest_size=16)
+        for part in (sorted(dict.items(self.scenes)), sorted(self.items.items()), sorted(self.merchants.items())):
+            h.update(repr(part).encode("utf-8"))
+        return h.hexdigest()
+
+    # -------------------------
+    # Items
+    # -------------------------
+    def _create_items(self, packs: List[ContentPack]) -> None:
+        for pack in packs:
+            for fields in pack.items:
+                self.items[fields[0]] = Item(*fields)
+
+    # -------------------------
+    # Merchants
+    # -------------------------
+    def _create_merchants(self, packs: List[ContentPack]) -> None:
+        for pack in packs:
+            for fields in pack.merchants:
+                self.merchants[fields[0]] = Merchant(*fields)
+        problems = [f"{mid}: brak przedmiotu '{iid}'"
+                    for mid, m in self.merchants.items() for iid, _ in m.stock if iid not in self.items]
+        if problems:
+            raise ContentError("; ".join(problems))
+
+    def price_table(self, merchant: Merchant, modifier: int) -> PriceTable:
+        key = (merchant.merchant_id, modifier)
+        table = self.price_tables.get(key)
+        if table is None:
+            table = self.price_tables.setdefault(key, PriceTable.build(merchant, modifier, self.items))
+        return table
+
+    # -------------------------
+    # Scenes
+    # -------------------------
+    def _create_scenes(self, packs: List[ContentPack]) -> None:
+        """Rejestruje sceny z paczek treści - kolejne akty to kolejne paczki.
+
+        Sceny nie są tu budowane - SceneCatalog tworzy je przy pierwszym odwołaniu.
+        """
+        defns = [d for pack in packs for d in pack.scenes]
+        aliases: Dict[str, str] = {}
+        for pack in packs:
+            aliases.update(pack.aliases)
+        self._validate_scenes(defns, aliases)
+        self._register_scenes(defns, aliases)
+
+    @staticmethod
+    def _intern_symbols(defns: List[tuple]) -> None:
+        # Nazwy znane z treści dostają najniższe bity, w kolejności paczek
+        for defn in defns:
+            for _, _, requirements, effects, one_time_id, _ in defn[8]:
+                if one_time_id:
+                    ACTIONS.bit(one_time_id)
+                if "not_used" in requirements:
+                    ACTIONS.bit(str(requirements["not_used"]))
+                for k in ("flag", "not_flag"):
+                    v = requirements.get(k)
+                    if v is not None:
+                        FLAGS.bit(str(v[0] if isinstance(v, tuple) else v))
+                for e in effects:
+                    if e[0] == "flag":
+                        FLAGS.bit(e[1])
+
+    def _register_scenes(self, defns: List[tuple], aliases: Dict[str, str]) -> None:
+        self.defns = list(defns)
+        self.aliases = dict(aliases)
+        self._intern_symbols(defns)
+        for defn in defns:
+            self.scenes.register(defn[0], partial(self._build_scene, defn))
+
+    def _build_scene(self, defn: tuple) -> Scene:
+        scene_id, title, narration, objective, explore_mode, subscenes, on_enter, exit_condition, choices = defn
+        return Scene(
+            scene_id=scene_id,
+            title=title,
+            narration=narration,
+            objective=objective,
+            explore_mode=explore_mode,
+            subscenes=list(subscenes),
+            on_enter=partial(_call_hook, on_enter) if on_enter else None,
+            exit_condition=partial(_call_hook, exit_condition) if exit_condition else None,
+            choices=[
+                Choice(text, next_scene, requirements=dict(requirements),
+                       effects=[getattr(self.owner, EFFECT_VOCABULARY[e[0]])(*e[1:]) for e in effects],
+                       one_time_id=one_time_id, hidden_if_unavailable=hidden)
+                for text, next_scene, requirements, effects, one_time_id, hidden in choices
+            ],
+        )
+
+    def _validate_scenes(self, defns: List[tuple], aliases: Dict[str, str]) -> None:
+        """Sprawdza powiązania między definicjami (cele wyborów, podsceny, hooki, przedmioty, kupcy, aliasy)."""
+        known = {d[0] for d in defns}
+        problems = []
+        for sid, _, _, _, _, subscenes, on_enter, exit_condition, choices in defns:
+            for target in [c[1] for c in choices] + list(subscenes):
+                if target is not None and target not in known:
+                    problems.append(f"{sid}: brak sceny docelowej '{target}'")
+            for hook in (on_enter, exit_condition):
+                if hook and not callable(getattr(self.owner, hook, None)):
+                    problems.append(f"{sid}: brak hooka '{hook}'")
+            for _, _, requirements, effects, _, _ in choices:
+                item_ids = [e[1] for e in effects if e[0] in ("item", "share_item")]
+                if "has_item" in requirements:
+                    item_ids.append(requirements["has_item"])
+                problems.extend(f"{sid}: brak przedmiotu '{i}'" for i in item_ids if i not in self.items)
+                problems.extend(f"{sid}: brak kupca '{e[1]}'" for e in effects
+                                if e[0] == "trade" and e[1] not in self.merchants)
+        for old, sid in aliases.items():
+            if old in known:
+                problems.append(f"{sid}: zastępuje istniejącą scenę '{old}'")
+        if problems:
+            raise ContentError("; ".join(problems))
+
+
+# =============================================================================
+# CATALOG SNAPSHOT (szybki start)
+# =============================================================================
+
+SNAPSHOT_FORMAT = 3
+
+
+# Migawka katalogu gry: przedmioty, skompilowane definicje scen i katalog tekstów
+# języka domyślnego, zapisane jednym plikiem marshal. Klucz liczony jest z rozmiaru
+# i czasu modyfikacji plików źródłowych (kod, paczki, teksty), więc start w trybie
+# migawki nie czyta ani nie hashuje JSON-ów - wystarczy kilka stat() i jeden odczyt.
+class CatalogSnapshot:
+    _cache: Dict[str, dict] = {}
+
+    @staticmethod
+    def sources(packs: Tuple[str, ...]) -> List[str]:
+        return ([os.path.abspath(__file__)]
+                + [os.path.join(CONTENT_DIR, n) for n in packs]
+                + StringCatalog.files_for(DEFAULT_LANG))
+
+    @classmethod
+    def path(cls, packs: Tuple[str, ...]) -> str:
+        parts = [f"{SNAPSHOT_FORMAT}:{PACK_FORMAT}"]
+        for src in cls.sources(packs):
+            st = os.stat(src)
+            parts.append(f"{src}:{st.st_mtime_ns}:{st.st_size}")
+        key = "%08x" % zlib.crc32("|".join(parts).encode("utf-8"))
+        cache_dir = os.environ.get("THALANOR_CACHE_DIR") or os.path.join(CONTENT_DIR, "__pycache__")
+        return os.path.join(cache_dir, f"catalog.{sys.implementation.cache_tag}-{key}.snap")
+
+    @classmethod
+    def restore(cls, catalog: ContentCatalog) -> bool:
+        """Odtwarza katalog treści z migawki. Zwraca False, jeśli migawki brak lub jest nieaktualna."""
+        try:
+            path = cls.path(catalog.packs)
+            data = cls._cache.get(path)
+            if data is None:
+                with open(path, "rb") as f:
+                    data = marshal.load(f)
+                cls._cache[path] = data
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+
+        catalog.items = {t[0]: Item(*t) for t in data["items"]}
+        catalog.merchants = {t[0]: Merchant(*t) for t in data["merchants"]}
+        catalog._register_scenes(data["scenes"], data["aliases"])
+        for lang, parts in data["strings"].items():
+            if lang not in StringCatalog._loaded:
+                StringCatalog._loaded[lang] = StringCatalog.from_parts(lang, parts)
+        return True
+
+    @classmethod
+    def save(cls, catalog: ContentCatalog) -> Optional[str]:
+        data = {
+            "items": tuple(tuple(it.to_dict().values()) for it in catalog.items.values()),
+            "merchants": tuple((m.merchant_id, m.name, m.npc, m.sell_pct, m.buy_pct, m.buys, m.stock)
+                               for m in catalog.merchants.values()),
+            "scenes": tuple(catalog.defns),
+            "aliases": catalog.aliases,
+            "strings": {DEFAULT_LANG: StringCatalog.for_lang(DEFAULT_LANG).to_parts()},
+        }
+        try:
+            path = cls.path(catalog.packs)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(tmp, path)
+        except OSError:
+            return None
+        _prune_cache(path)
+        return path
+
+
+# =============================================================================
+# HOT RELOAD
+# =============================================================================
+
+# Przeładowanie treści w działającym procesie (serwer) bez zrywania sesji.
+# Wątek w tle co `interval` sekund porównuje stat() paczek i plików tekstów; po zmianie
+# buduje nowy katalog poza ścieżką obsługi graczy (paczki, walidacja, wszystkie sceny,
+# teksty załadowanych języków), a potem podmienia referencje. Paczka z błędem
+# (ContentError, zły JSON, dowolny wyjątek przy budowie) nie jest instalowana - gra
+# dalej działa na poprzedniej, a błąd trafia do last_error i licznika failures.
+class CatalogReloader:
+    def __init__(self, owner: Optional[type] = None, interval: float = 1.0):
+        self.owner: type = owner or Game
+        self.interval = interval
+        self.swaps = 0
+        self.failures = 0
+        self.last_error: Optional[Exception] = None
+        self.last_build = 0.0
+        self.last_pause = 0.0
+        self._signature = self.signature()
+        self._stop: Any = None
+        self._thread: Any = None
+
+    def sources(self) -> List[str]:
+        return ([os.path.join(CONTENT_DIR, name) for name in self.owner.CONTENT_PACKS]
+                + [path for lang in StringCatalog.available_languages() for path in StringCatalog.files_for(lang)])
+
+    def signature(self) -> tuple:
+        sig = []
+        for path in self.sources():
+            try:
+                st = os.stat(path)
+            except OSError:
+                sig.append((path, None, None))
+                continue
+            sig.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def poll(self) -> bool:
+        """Przeładowuje treść, jeśli pliki się zmieniły. Zwraca True po podmianie katalogu."""
+        sig = self.signature()
+        if sig == self._signature:
+            return False
+        self._signature = sig
+        return self.reload()
+
+    def reload(self) -> bool:
+        from time import perf_counter
+        t0 = perf_counter()
+        try:
+            catalog = ContentCatalog(self.owner)
+            catalog.build()
+            catalog.scenes.materialize_all()
+            strings = {lang: StringCatalog.load(lang) for lang in list(StringCatalog._loaded)}
+        except Exception as e:
+            # Każdy błąd nowej treści (też nieprzewidziany w walidacji) zostawia stary katalog
+            self.failures += 1
+            self.last_error = e
+            return False
+
+        # Podmiana: dwa przypisania referencji - sesje przejdą na nowy katalog przy następnej scenie
+        t1 = perf_counter()
+        ContentCatalog.install(catalog)
+        StringCatalog._loaded = strings
+        t2 = perf_counter()
+
+        self.last_build = t1 - t0
+        self.last_pause = t2 - t1
+        self.last_error = None
+        self.swaps += 1
+        return True
+
+    def start(self) -> "CatalogReloader":
+        import threading
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="thalanor-reload", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        # Wątek obserwatora nie może zginąć po cichu - błąd liczy się jak nieudane przeładowanie
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = e
+
+
+# =============================================================================
+# GAME
+# =============================================================================
+
+# Główna klasa gry - zarządza pętlą rozgrywki i scenami
+# Autorzy: A.O + A.N - Główna klasa gry (silnik rozgrywki)
+class Game:
+    INTRO_TEXT = "ui.intro"
+
+    DEFAULT_NAMES = ["Kaelen", "Rhodan", "Mirel", "Syrien", "Aragorn", "Fila", "Filavandrel", "Cahir", "Desmond"]
+
+    # Paczki treści (content/*.json) ładowane przy starcie - Akt II dopisuje tu swoją paczkę
+    CONTENT_PACKS = ("act1.json",)
+
+    def __init__(self, lang: str = DEFAULT_LANG, boot: str = "build"):
+        self.character: Optional[Character] = None
+        self.current_scene_id: str = "prolog_instincts"
+        self.running: bool = True
+        self.lang: str = lang
+        # Narracje podmienione przez hooki scen (scene_id -> id tekstu) - stan sesji, nie katalogu
+        self.scene_narration: Dict[str, str] = {}
+        # Towar kupców w tej sesji - tworzony przy pierwszym handlu (merchant_stock)
+        self.merchant_stocks: Optional[Dict[str, MerchantStock]] = None
+        # Koniec efektów ostatniego wyboru (perf_counter) - początek fazy "transition" (STEP TIMING)
+        self._step_mark: float = 0.0
+        # Śmierci postaci w tym obiekcie gry (licznik procesu, nie część stanu sesji)
+        self.deaths = 0
+
+        # Katalog treści wspólny dla sesji procesu;
+        # boot="snapshot" - przy pierwszym budowaniu odtwarzany z migawki
+        self.catalog: ContentCatalog = ContentCatalog.shared(type(self), boot)
+
+    @property
+    def scenes(self) -> SceneCatalog:
+        return self.catalog.scenes
+
+    @property
+    def items_db(self) -> Dict[str, Item]:
+        return self.catalog.items
+
+    def merchant_stock(self, merchant_id: str) -> MerchantStock:
+        if self.merchant_stocks is None:
+            self.merchant_stocks = {}
+        stock = self.merchant_stocks.get(merchant_id)
+        if stock is None:
+            stock = self.merchant_stocks[merchant_id] = MerchantStock(self.catalog.merchants[merchant_id].base)
+        return stock
+
+    def _sync_catalog(self) -> None:
+        """Przechodzi na katalog podmieniony przez przeładowanie treści (CatalogReloader)."""
+        current = ContentCatalog.active(type(self))
+        if current is not None and current is not self.catalog:
+            self.catalog = current
+            self.current_scene_id = current.resolve(self.current_scene_id)
+
+    def set_language(self, lang: str) -> None:
+        """Przełącza język sesji (teksty ładowane są z katalogu przy pierwszym użyciu)."""
+        self.lang = lang
+        _current_lang.set(lang)
+
+    # -------------------------
+    # Slots UI
+    # -------------------------
+    def _print_slots(self) -> None:
+        print(tr("ui.slots_header"))
+        for i in range(SaveManager.SLOT_COUNT):
+            info = SaveManager.slot_info(i)
+            if not info:
+                print(tr("ui.slot_empty_line", n=i + 1))
+            else:
+                ts = info.get("timestamp", tr("ui.slot_no_date"))
+                scene = info.get("scene", "?")
+                name = (info.get("character", {}) or {}).get("name", tr("ui.default_hero"))
+                lvl = (info.get("character", {}) or {}).get("level", 1)
+                print(tr("ui.slot_line", n=i + 1, name=name, level=lvl, scene=scene, ts=ts))
+        print()
 
     def _choose_slot(self, prompt: str) -> Optional[int]:
         self._print_slots()
@@ -634,7 +3132,7 @@ class Game:
                 return n - 1
         except ValueError:
             pass
-        print("Nieprawidłowy slot.")
+        print(tr("ui.invalid_slot"))
         return None
 
     # -------------------------
@@ -644,15 +3142,12 @@ class Game:
     def main_menu(self) -> bool:
         while True:
             print("\n" + "=" * 80)
-            print("  THALANOR: ZATOPIONE KRONIKI — DEMO (AKT I)")
+            print(tr("ui.main_title"))
             print("=" * 80)
-            print(self.INTRO_TEXT)
-            print("\n--- MENU ---")
-            print("  1. Nowa gra")
-            print("  2. Wczytaj grę")
-            print("  0. Wyjście\n")
+            print(tr(self.INTRO_TEXT))
+            print(tr("ui.main_menu", lang=self.lang.upper()))
 
-            c = safe_input("Wybierz: ")
+            c = safe_input(tr("ui.pick"))
             if c is None:
                 continue
             c = c.strip()
@@ -663,32 +3158,33 @@ class Game:
                 return True
 
             if c == "2":
-                slot = self._choose_slot("Wybierz numer slotu do wczytania (1-4) lub Enter aby wrócić: ")
+                slot = self._choose_slot(tr("ui.load_slot_prompt"))
                 if slot is None:
                     continue
-                ch, sid = SaveManager.load(slot)
+                ch, sid = SaveManager.load(slot, self.items_db)
                 if ch and sid:
                     self.character = ch
                     self.current_scene_id = sid
+                    self.merchant_stocks = SaveManager.load_merchants(slot, self.catalog.merchants)
                     return True
-                print("Ten slot jest pusty albo zapis uszkodzony.")
+                print(tr("ui.slot_broken"))
+                continue
+
+            if c == "3":
+                langs = StringCatalog.available_languages()
+                nxt = langs[(langs.index(self.lang) + 1) % len(langs)] if self.lang in langs else DEFAULT_LANG
+                self.set_language(nxt)
                 continue
 
             if c == "0":
                 return False
 
-            print("Nieprawidłowy wybór! - spróbuj ponownie")
+            print(tr("ui.main_invalid"))
 
     def game_menu(self) -> None:
         while True:
-            print("\n--- MENU GRY ---")
-            print("  1. Statystyki")
-            print("  2. Ekwipunek")
-            print("  3. Plecak")
-            print("  4. Zapisz grę (wybór slotu)")
-            print("  5. Nowa gra")
-            print("  0. Powrót")
-            c = safe_input("Wybierz: ")
+            print(tr("ui.game_menu"))
+            c = safe_input(tr("ui.pick"))
             if c is None:
                 continue
             c = c.strip()
@@ -698,19 +3194,19 @@ class Game:
             elif c == "2":
                 self.equipment_menu()
             elif c == "3":
-                print("\n--- PLECAK ---")
+                print(tr("ui.backpack_header"))
                 self.character.inventory.display()
             elif c == "4":
-                slot = self._choose_slot("Zapisz w slocie (1-4) lub Enter aby anulować: ")
+                slot = self._choose_slot(tr("ui.save_slot_prompt"))
                 if slot is None:
                     continue
-                SaveManager.save(slot, self.character, self.current_scene_id)
+                SaveManager.save(slot, self.character, self.current_scene_id, self.merchant_stocks)
             elif c == "5":
-                ans = safe_input("Czy na pewno chcesz rozpocząć nową grę? (t/n): ")
+                ans = safe_input(tr("ui.confirm_new_game"))
                 if ans is None:
                     continue
                 ans = ans.strip().lower()
-                if ans == "t":
+                if ans == tr("ui.yes"):
                     self.create_character()
                     self.current_scene_id = "prolog_instincts"
                     return
@@ -720,38 +3216,37 @@ class Game:
     def character_stats_screen(self) -> None:
         ch = self.character
         print("\n" + "=" * 80)
-        print(f"  {ch.name} — POZIOM {ch.level}")
+        print(tr("ui.stats_title", name=ch.name, level=ch.level))
         print("=" * 80)
-        print(f"  DOŚWIADCZENIE: {ch.experience}/{ch.exp_to_level} (do poziomu {ch.level+1})")
-        print(f"  ŻYCIE: {ch.current_hp}/{ch.max_hp}")
+        print(tr("ui.stats_exp", exp=ch.experience, exp_to_level=ch.exp_to_level, next_level=ch.level + 1))
+        print(tr("ui.stats_hp", hp=ch.current_hp, max_hp=ch.max_hp))
         print("-" * 80)
-        print(f"  SIŁA: {ch.strength}")
-        print(f"  ZRĘCZNOŚĆ: {ch.dexterity}")
-        print(f"  INTELIGENCJA: {ch.intelligence}")
-        print(f"  WITALNOŚĆ: {ch.vitality}")
+        print(f"  {tr('stat.strength')}: {ch.strength}")
+        print(f"  {tr('stat.dexterity')}: {ch.dexterity}")
+        print(f"  {tr('stat.intelligence')}: {ch.intelligence}")
+        print(f"  {tr('stat.vitality')}: {ch.vitality}")
         print("-" * 80)
-        print(f"  ZŁOTO: {ch.gold} | SREBRO: {ch.silver}")
-        print(f"  OBRAŻENIA (z broni): {ch.equipment.total_damage()} | PANCERZ: {ch.equipment.total_armor()}")
+        print(tr("ui.stats_money", gold=ch.gold, silver=ch.silver))
+        d = ch.derived
+        print(tr("ui.stats_combat", damage=d.damage, armor=d.armor))
         print("=" * 80)
 
     def equipment_menu(self) -> None:
         ch = self.character
-        print("\n--- EKWIPUNEK ---")
+        print(tr("ui.equipment_header"))
         ch.equipment.display()
-        print("\n  1. Załóż przedmiot z plecaka")
-        print("  2. Zdejmij przedmiot")
-        print("  0. Powrót")
-        c = safe_input("Wybierz: ")
+        print(tr("ui.equipment_menu"))
+        c = safe_input(tr("ui.pick"))
         if c is None:
             return
         c = c.strip()
 
         if c == "1":
-            print("\n--- PLECAK ---")
+            print(tr("ui.backpack_header"))
             ch.inventory.display()
-            if not ch.inventory.items:
+            if not ch.inventory:
                 return
-            raw = safe_input("Numer przedmiotu do założenia: ")
+            raw = safe_input(tr("ui.equip_prompt"))
             if raw is None:
                 return
             raw = raw.strip()
@@ -759,36 +3254,80 @@ class Game:
                 return
             try:
                 n = int(raw)
-                if 1 <= n <= len(ch.inventory.items):
-                    it = ch.inventory.items[n - 1]
-                    if it.item_type not in Equipment.SLOTS:
-                        print("Tego nie da się założyć.")
+                stacks = ch.inventory.stacks
+                if 1 <= n <= len(stacks):
+                    if stacks[n - 1].item_type not in Equipment.SLOTS:
+                        print(tr("ui.cannot_equip"))
                         return
-                    ch.inventory.items.remove(it)
+                    it = ch.inventory.take(stacks[n - 1])
                     old = ch.equipment.equip(it)
-                    print(f"Założono: {it.name}")
+                    print(tr("ui.equipped", item=tr(it.name)))
                     if old:
                         ch.inventory.add_item(old)
-                        print(f"Zdjęto: {old.name}")
+                        print(tr("ui.unequipped", item=tr(old.name)))
             except ValueError:
                 return
 
         elif c == "2":
-            slot = safe_input("Slot (weapon/armor/helmet): ")
+            slot = safe_input(tr("ui.unequip_prompt"))
             if slot is None:
                 return
             slot = slot.strip().lower()
             it = ch.equipment.unequip(slot)
             if it:
                 ch.inventory.add_item(it)
-                print(f"Zdjęto: {it.name}")
+                print(tr("ui.unequipped", item=tr(it.name)))
+
+    def trade_menu(self, merchant_id: str) -> None:
+        ch = self.character
+        merchant = self.catalog.merchants[merchant_id]
+        stock = self.merchant_stock(merchant_id)
+        while True:
+            prices = self.catalog.price_table(merchant, merchant.modifier(ch))
+            print(tr("trade.header", merchant=tr(merchant.name)))
+            print(tr("trade.money", gold=ch.gold, silver=ch.silver))
+            print(tr("trade.stock_header"))
+            goods = stock.entries()
+            for i, (item_id, n) in enumerate(goods, 1):
+                label = str(self.items_db[item_id]) + (f" x{n}" if n > 1 else "")
+                print(f"  {i}. {label} — {tr('trade.price', n=prices.sell.get(item_id, '-'))}")
+            print(tr("trade.backpack_header"))
+            own = ch.inventory.stacks
+            for i, s in enumerate(own, 1):
+                price = prices.buy.get(s.item_id)
+                label = tr("trade.price", n=price) if price is not None else tr("trade.not_buying")
+                print(f"  {i}. {s} — {label}")
+            raw = safe_input(tr("trade.prompt"))
+            if raw is None:
+                return
+            parts = raw.strip().lower().split()
+            if not parts or parts[0] == "0":
+                return
+            try:
+                action, n = parts[0], int(parts[1])
+                qty = int(parts[2]) if len(parts) > 2 else 1
+            except (IndexError, ValueError):
+                print(tr("trade.invalid"))
+                continue
+            side = goods if action == tr("trade.key_buy") else own if action == tr("trade.key_sell") else None
+            if side is None or not 1 <= n <= len(side) or qty < 1:
+                print(tr("trade.invalid"))
+                continue
+            buying = side is goods
+            item_id = goods[n - 1][0] if buying else own[n - 1].item_id
+            batch = {item_id: qty}
+            ok, reason = transact(self, merchant_id, buy=batch if buying else None, sell=None if buying else batch)
+            if ok:
+                print(tr("trade.bought" if buying else "trade.sold", item=tr(self.items_db[item_id].name), n=qty))
+            else:
+                print(tr("trade.failed." + reason[0]))
 
     # -------------------------
     # Character creation
     # -------------------------
     def create_character(self) -> None:
         while True:
-            raw = safe_input("\nNadaj imię swojego bohatera (Enter = wybór losowy): ")
+            raw = safe_input(tr("ui.name_prompt"))
             if raw is None:
                 continue
             raw = raw.strip()
@@ -796,61 +3335,127 @@ class Game:
                 name = raw
                 break
 
-            candidate = random.choice(self.DEFAULT_NAMES)
-            confirm = safe_input(f"Chcesz, żebym nadał imię: {candidate}? (t/n): ")
+            candidate = rng().choice(self.DEFAULT_NAMES)
+            confirm = safe_input(tr("ui.name_confirm", name=candidate))
             if confirm is None:
                 continue
             confirm = confirm.strip().lower()
-            if confirm == "t":
+            if confirm == tr("ui.yes"):
                 name = candidate
                 break
 
+        self.new_character(name)
+
+    def new_character(self, name: str) -> Character:
+        """Świeża postać na start gry (bez pytań - używane też przez narzędzia analizy)."""
         self.character = Character(name=name)
         # pełne HP na start (potem prolog ustawi 3/ max)
         self.character.current_hp = self.character.max_hp
-        self.character.flags = {}
-        self.character.used_actions = set()
+        self.character.flags = FlagSet()
+        self.character.used_actions = ActionSet()
+        self.merchant_stocks = None
+        return self.character
+
+    def session_state(self) -> dict:
+        """Stan sesji na granicy tury (postać, scena, kupcy, narracje) - same typy proste."""
+        return {
+            "character": None if self.character is None else self.character.to_dict(),
+            "scene": self.current_scene_id,
+            "running": self.running,
+            "lang": self.lang,
+            "narration": dict(self.scene_narration),
+            "merchants": {mid: dict(stock.delta) for mid, stock in (self.merchant_stocks or {}).items()},
+        }
+
+    def restore_session(self, state: dict) -> None:
+        """Odwrotność session_state(); słowniki ze stanu przechodzą na własność sesji."""
+        ch = state["character"]
+        self.character = None if ch is None else Character.from_dict(ch, self.items_db)
+        self.current_scene_id = state["scene"]
+        self.running = state["running"]
+        self.lang = state["lang"]
+        self.scene_narration = state["narration"]
+        merchants = self.catalog.merchants
+        self.merchant_stocks = {mid: MerchantStock(merchants[mid].base, delta)
+                                for mid, delta in state["merchants"].items() if mid in merchants} or None
 
     # -------------------------
     # Engine
     # -------------------------
+    def show_advice(self, scene: Scene, options: List[Tuple[int, Choice]]) -> None:
+        best = _advisor.best(scene, self)
+        for idx, c in options:
+            if c is best:
+                print(tr("ui.advisor_hint", choice=idx))
+
     def play_scene(self) -> None:
+        self._sync_catalog()
         scene = self.scenes.get(self.current_scene_id)
         if not scene:
-            print(f"[BŁĄD] Brak sceny: {self.current_scene_id}. Powrót do prologu.")
-            self.current_scene_id = "prolog_instincts"
+            print(tr("ui.missing_scene", scene=self.current_scene_id))
+            self.current_scene_id = self.catalog.resolve(self.current_scene_id)
             return
 
-        scene.enter(self)
-
-        nxt = scene.check_exit(self)
+        # Czasy faz kroku (STEP TIMING); przejście liczone od końca efektów poprzedniego wyboru
+        st = _step_timer
+        if st is not None:
+            from time import perf_counter
+            t = perf_counter()
+            if self._step_mark:
+                st.observe("transition", t - self._step_mark)
+            self._step_mark = 0.0
+
+        prof = _profiler
+        if prof is None:
+            scene.enter(self)
+            nxt = scene.check_exit(self)
+        else:
+            prof.enter(scene, self)
+            nxt = prof.check_exit(scene, self)
+        if st is not None:
+            t, t0 = perf_counter(), t
+            st.observe("enter", t - t0)
         if nxt:
             self.current_scene_id = nxt
+            if st is not None:
+                self._step_mark = t
             return
 
-        options = scene.display(self)
+        cov = _coverage
+        events = None if cov is None else []
+        options = scene.display(self, events) if prof is None else prof.display(scene, self, events)
+        if cov is not None:
+            cov.record_scene(scene, self, events)
+        if _advisor is not None:
+            self.show_advice(scene, options)
+        if st is not None:
+            st.observe("display", perf_counter() - t)
 
         while True:
-            raw = safe_input("\nTwój wybór: ")
+            raw = safe_input(tr("ui.your_choice"))
             if raw is None:
                 continue
+            if st is not None:
+                t = perf_counter()
             raw = raw.strip()
 
             # PUSTE / SPACJE => nie wyłączamy gry
             if raw == "":
-                print("Podaj numer opcji albo wpisz 'menu'.")
+                print(tr("ui.choice_help"))
                 continue
 
             low = raw.lower()
             if low == "menu":
                 self.game_menu()
-                options = scene.display(self)
+                options = scene.display(self) if prof is None else prof.display(scene, self)
+                if _advisor is not None:
+                    self.show_advice(scene, options)
                 continue
 
             try:
                 n = int(raw)
             except ValueError:
-                print("Podaj numer opcji albo wpisz 'menu'.")
+                print(tr("ui.choice_help"))
                 continue
 
             chosen = None
@@ -859,1307 +3464,218 @@ class Game:
                     chosen = c
                     break
             if not chosen:
-                print("Nieprawidłowy wybór.")
+                print(tr("ui.invalid_choice"))
                 continue
 
             if not chosen.is_available(self):
                 if chosen.is_done(self):
-                    print("To już zostało zrobione.")
+                    print(tr("ui.already_done"))
                 else:
-                    print("Ta opcja jest zablokowana.")
+                    print(tr("ui.choice_blocked"))
                 continue
 
-            chosen.apply(self)
+            if st is not None:
+                t, t0 = perf_counter(), t
+                st.observe("parse", t - t0)
+            if prof is None:
+                chosen.apply(self)
+            else:
+                prof.apply(scene, chosen, self)
+            if st is not None:
+                self._step_mark = perf_counter()
+                st.observe("apply", self._step_mark - t)
+            if cov is not None:
+                cov.record_taken(scene, chosen, self)
             if chosen.next_scene is not None:
                 self.current_scene_id = chosen.next_scene
             break
 
         # Autor metody: A.O
     def run(self) -> None:
+        _current_lang.set(self.lang)
         if not self.main_menu():
-            print("\nDo zobaczenia!")
+            print(tr("ui.goodbye"))
             return
 
-        while self.running:
-            self.play_scene()
-
-            if self.character.current_hp <= 0:
-                print()
-                print("═" * 60)
-                print("  💀💀💀 NIE ŻYJESZ 💀💀💀")
-                print("═" * 60)
-                print()
-                print("  Twoja historia dobiegła końca...")
-                print("  Ciemność pochłania wszystko. Ból ustępuje miejsca nicości.")
-                print()
-                print("═" * 60)
-                print()
-                ans = safe_input("Chcesz wczytać zapisaną grę? (t/n): ")
-                if ans and ans.strip().lower() == "t":
-                    slot = self._choose_slot("Wybierz slot do wczytania (1-4) lub Enter aby wrócić do menu: ")
-                    if slot is not None:
-                        ch, sid = SaveManager.load(slot)
-                        if ch and sid:
-                            self.character = ch
-                            self.current_scene_id = sid
-                            continue
-                    # Jeśli nie wczytano - wróć do menu głównego
-                    if self.main_menu():
-                        continue
-                break
+        while self.running and self.turn():
+            pass
 
-            if self.character.flags.get("act1_completed", False):
-                print("\n*** KONIEC WERSJI DEMONSTRACYJNEJ (AKT I) ***")
-                print("Dalsze prace trwają. W przyszłości możliwym będzie utworzenie gry na silniku graficznym PyEngine.\n")
-                print("Autorzy: Adam Ostrowski, Arkadiusz Noiszewski\n")
-                ans = safe_input("Czy na pewno chcesz wyjść z gry? (t/n): ")
-                if ans and ans.strip().lower() == "t":
-                    break
-                if not self.main_menu():
-                    break
+        print(tr("ui.thanks"))
 
-        print("Dziękujemy za grę!")
+    def turn(self) -> bool:
+        """Jedna tura: scena z wyborem gracza, potem śmierć albo koniec aktu; False - koniec gry."""
+        self.play_scene()
+
+        if self.character.current_hp <= 0:
+            self._step_mark = 0.0  # dalej czekamy na gracza - to już nie przejście
+            self.deaths += 1
+            print()
+            print("═" * 60)
+            print(tr("ui.death_title"))
+            print("═" * 60)
+            print()
+            print(tr("ui.death_text"))
+            print()
+            print("═" * 60)
+            print()
+            ans = safe_input(tr("ui.death_load_prompt"))
+            if ans and ans.strip().lower() == tr("ui.yes"):
+                slot = self._choose_slot(tr("ui.death_slot_prompt"))
+                if slot is not None:
+                    ch, sid = SaveManager.load(slot, self.items_db)
+                    if ch and sid:
+                        self.character = ch
+                        self.current_scene_id = sid
+                        self.merchant_stocks = SaveManager.load_merchants(slot, self.catalog.merchants)
+                        return True
+                # Jeśli nie wczytano - wróć do menu głównego
+                return self.main_menu()
+            return False
+
+        if self.character.flags.get("act1_completed", False):
+            self._step_mark = 0.0
+            print(tr("ui.demo_end"))
+            ans = safe_input(tr("ui.confirm_quit"))
+            if ans and ans.strip().lower() == tr("ui.yes"):
+                return False
+            return self.main_menu()
+        return True
 
     # =============================================================================
     # FX helpers
     # =============================================================================
 
         # Autor fabryk efektów: A.N
-    def fx_add_exp(self, amt: int) -> EffectFn:
-        def _fn(game: "Game"):
-            game.character.add_experience(amt)
-        return _fn
-
-    def fx_add_hp(self, amt: int) -> EffectFn:
-        def _fn(game: "Game"):
-            if amt >= 0:
-                game.character.heal(amt)
-            else:
-                game.character.take_damage(-amt)
-        return _fn
-
-    def fx_add_silver(self, amt: int) -> EffectFn:
-        def _fn(game: "Game"):
-            game.character.add_money(silver=amt)
-        return _fn
-
-    def fx_add_silver_rng(self, lo: int, hi: int) -> EffectFn:
-        def _fn(game: "Game"):
-            s = random.randint(lo, hi)
-            game.character.add_money(silver=s)
-        return _fn
-
-    def fx_flag(self, key: str, value: Any = True) -> EffectFn:
-        def _fn(game: "Game"):
-            game.character.flags[key] = value
-        return _fn
-
-    # Autor: A.O - Helper do wyświetlania tekstu po wyborze
-    def fx_print(self, text: str) -> EffectFn:
-        def _fn(game: "Game"):
-            print("\n" + text + "\n")
-        return _fn
-
-    def fx_stat(self, stat: str, delta: int, cap: Optional[int] = None) -> EffectFn:
-        def _fn(game: "Game"):
-            ch = game.character
-            cur = getattr(ch, stat)
-            newv = cur + delta
-            if cap is not None:
-                newv = min(newv, cap)
-            setattr(ch, stat, newv)
-
-            label = {
-                "strength": "SIŁA",
-                "dexterity": "ZRĘCZNOŚĆ",
-                "intelligence": "INTELIGENCJA",
-                "vitality": "WITALNOŚĆ",
-            }.get(stat, stat.upper())
-
-            sign = "+" if delta > 0 else ""
-            print(f"  {sign}{delta} {label}")
-
-            if stat == "vitality" and delta > 0:
-                ch.max_hp += 2 * delta
-                ch.current_hp = min(ch.max_hp, ch.current_hp + 2 * delta)
-                print(f"  +{2 * delta} do MAKS. ŻYCIA (teraz {ch.max_hp})")
-        return _fn
-
-    def fx_add_item(self, item_id: str) -> EffectFn:
-        def _fn(game: "Game"):
-            it = game.items_db[item_id]
-            ok = game.character.inventory.add_item(Item.from_dict(it.to_dict()))
-            if ok:
-                print(f"  OTRZYMUJESZ: {it.name}")
-            else:
-                print("  Plecak jest pełny — nie możesz tego zabrać.")
-        return _fn
-
-    def fx_equip_first_weapon_if_any(self) -> EffectFn:
-        def _fn(game: "Game"):
-            ch = game.character
-            for it in list(ch.inventory.items):
-                if it.item_type == "weapon":
-                    ch.inventory.items.remove(it)
-                    old = ch.equipment.equip(it)
-                    print(f"  Zakładasz broń: {it.name}")
-                    if old:
-                        ch.inventory.add_item(old)
-                    return
-            print("  Nie masz broni do założenia.")
-        return _fn
+    # Fabryki zwracają programy efektów (patrz EFFECT BYTECODE)
+    @staticmethod
+    def fx_add_exp(amt: int) -> Effect:
+        return (OP_ADD_EXP, amt)
+
+    @staticmethod
+    def fx_add_hp(amt: int) -> Effect:
+        return (OP_ADD_HP, amt)
+
+    @staticmethod
+    def fx_add_silver(amt: int) -> Effect:
+        return (OP_ADD_SILVER, amt)
+
+    @staticmethod
+    def fx_add_silver_rng(lo: int, hi: int) -> Effect:
+        return (OP_ADD_SILVER_RNG, lo, hi)
+
+    @staticmethod
+    def fx_flag(key: str, value: Any = True) -> Effect:
+        return (OP_SET_FLAG, key, value)
+
+    # Autor: A.O - Helper do wyświetlania tekstu po wyborze (text = id tekstu w katalogu)
+    @staticmethod
+    def fx_print(text: str) -> Effect:
+        return (OP_PRINT, text)
+
+    @staticmethod
+    def fx_stat(stat: str, delta: int, cap: Optional[int] = None) -> Effect:
+        return (OP_STAT, stat, delta, cap)
+
+    @staticmethod
+    def fx_add_item(item_id: str) -> Effect:
+        return (OP_ADD_ITEM, item_id)
+
+    @staticmethod
+    def fx_equip_first_weapon_if_any() -> Effect:
+        return (OP_EQUIP_FIRST_WEAPON,)
+
+    @staticmethod
+    def fx_trade(merchant_id: str) -> Effect:
+        return (OP_CALL, methodcaller("trade_menu", merchant_id))
+
+    @staticmethod
+    def _fx_clear_directions(except_key: str) -> Effect:
+        code: Effect = ()
+        for k in ("direction_forest", "direction_hills", "direction_swamp"):
+            code += (OP_SET_FLAG, k, k == except_key)
+        return code
+
+    @staticmethod
+    def _fx_bandage_or_int_heal() -> Effect:
+        return fx_if(
+            (OP_REMOVE_ITEM, "bandage"),
+            (OP_ADD_HP, 2, OP_SAY, "fx.bandage_used", ""),
+            fx_if(
+                (OP_TEST_STAT, "intelligence", 2),
+                (OP_ADD_HP, 1, OP_SAY, "fx.wounds_dressed", ""),
+                (OP_SAY, "fx.cannot_heal", ""),
+            ),
+        )
 
-    def _fx_clear_directions(self, except_key: str) -> EffectFn:
-        def _fn(game: "Game"):
-            for k in ("direction_forest", "direction_hills", "direction_swamp"):
-                game.character.flags[k] = (k == except_key)
-        return _fn
+    @staticmethod
+    def _fx_share_item_and_rep(item_id: str, exp: int) -> Effect:
+        return fx_if(
+            (OP_REMOVE_ITEM, item_id),
+            (OP_ADD_EXP, exp, OP_SAY, "fx.shared_item", ""),
+            (OP_SAY, "fx.no_such_item", ""),
+        )
 
-    def _fx_bandage_or_int_heal(self) -> EffectFn:
-        def _fn(game: "Game"):
-            ch = game.character
-            if ch.inventory.has_item("bandage"):
-                ch.inventory.remove_item("bandage")
-                ch.heal(2)
-                print("  Zużyto bandaż.")
-                return
-            if ch.intelligence >= 2:
-                ch.heal(1)
-                print("  Opatrujesz rany najlepiej jak potrafisz.")
-                return
-            print("  Nie masz bandaża ani wiedzy, by to zrobić skutecznie.")
-        return _fn
-
-    def _fx_share_item_and_rep(self, item_id: str, exp: int) -> EffectFn:
-        def _fn(game: "Game"):
-            it = game.character.inventory.remove_item(item_id)
-            if not it:
-                print("  Nie masz tego przedmiotu.")
-                return
-            game.character.add_experience(exp)
-            print("  Dzielisz się zasobami. Ktoś to zapamięta.")
-        return _fn
+    @staticmethod
+    def _fx_fight_damage(base_dmg: int) -> Effect:
+        return fx_if(
+            (OP_TEST_FLAG, "fight_advantage"),
+            (OP_ADD_HP, -max(1, base_dmg - 1)),
+            (OP_ADD_HP, -base_dmg),
+        )
 
-    def _fx_fight_damage(self, base_dmg: int) -> EffectFn:
-        def _fn(game: "Game"):
-            ch = game.character
-            dmg = base_dmg
-            if ch.flags.get("fight_advantage", False):
-                dmg = max(1, base_dmg - 1)
-            ch.take_damage(dmg)
-        return _fn
-
-    def _fx_final_defend(self) -> EffectFn:
-        def _fn(game: "Game"):
-            game.character.take_damage(2)
-            game.character.add_experience(20)
-            game.character.flags["act1_protector"] = True
-        return _fn
+    @staticmethod
+    def _fx_final_defend() -> Effect:
+        return (OP_ADD_HP, -2, OP_ADD_EXP, 20, OP_SET_FLAG, "act1_protector", True)
 
     # -------------------------
     # Nowe helpery dla fabuły leśnej
     # -------------------------
     
-    def _fx_pay_silver(self, amount: int) -> EffectFn:
+    @staticmethod
+    def _fx_pay_silver(amount: int) -> Effect:
         """Płaci srebrem jeśli gracz ma wystarczająco."""
-        def _fn(game: "Game"):
-            ch = game.character
-            if ch.silver >= amount:
-                ch.silver -= amount
-                print(f"  Płacisz {amount} SREBRA.")
-            else:
-                print(f"  Nie masz wystarczająco srebra!")
-        return _fn
-
-    def _fx_mglak_escape_roll(self, stat: str, success_msg: str, fail_msg: str) -> EffectFn:
-        """Rzut na statystykę podczas ucieczki przed Mglakiem."""
-        def _fn(game: "Game"):
-            import random
-            ch = game.character
-            stat_val = getattr(ch, stat, 1)
-            # Szansa = 30% + 15% za każdy punkt statystyki powyżej 1
-            chance = 30 + (stat_val - 1) * 15
-            roll = random.randint(1, 100)
-            
-            if roll <= chance:
-                print(f"  ✓ {success_msg}")
-                ch.add_experience(5)
-            else:
-                print(f"  ✗ {fail_msg}")
-                ch.take_damage(1)
-        return _fn
-
-    def _fx_mglak_final_escape(self) -> EffectFn:
-        """Ostatni segment ucieczki przed Mglakiem."""
-        def _fn(game: "Game"):
-            import random
-            ch = game.character
-            # Zawsze udaje się uciec, ale możesz oberwać
-            roll = random.randint(1, 100)
-            if roll <= 50:
-                print("  Wypadasz z mgły na trakt! Udało się!")
-                ch.add_experience(10)
-            else:
-                print("  Lodowate pazury drasnęły twoje plecy, ale UCIEKŁEŚ!")
-                ch.take_damage(1)
-                ch.add_experience(10)
-        return _fn
-
-    def _fx_werewolf_attack_roll(self, stat: str, success_msg: str, fail_msg: str) -> EffectFn:
-        """Rzut na statystykę podczas walki z wilkołakiem."""
-        def _fn(game: "Game"):
-            import random
-            ch = game.character
-            stat_val = getattr(ch, stat, 1)
-            chance = 30 + (stat_val - 1) * 20
-            roll = random.randint(1, 100)
-            
-            if roll <= chance:
-                print(f"  ✓ {success_msg}")
-                ch.add_experience(10)
-            else:
-                print(f"  ✗ {fail_msg}")
-                ch.take_damage(2)
-        return _fn
-
-    def _fx_werewolf_final_roll(self) -> EffectFn:
-        """Ostatni segment walki z wilkołakiem."""
-        def _fn(game: "Game"):
-            import random
-            ch = game.character
-            roll = random.randint(1, 100)
-            if roll <= 60:
-                print("  Świt! Pierwsz promienie słońca przebijają przez drzewa!")
-                print("  Bestia wyje i cofa się w las!")
-                ch.add_experience(20)
-            else:
-                print("  Bestia trafia cię ostatni raz zanim nadchodzi świt!")
-                ch.take_damage(2)
-                ch.add_experience(15)
-        return _fn
-
-    # =============================================================================
-    # Scenes
-    # =============================================================================
-
-    def _create_scenes(self) -> None:
-        # PROLOG: 2 z 4 (blokada po 2 wybranych)
-        self.scenes["prolog_instincts"] = Scene(
-            scene_id="prolog_instincts",
-            title="PROLOG — Wybór talentów startowych",
-            narration=(
-                "Zanim wraca ból, pojawia się jedyna jasna myśl:\n"
-                "musisz przypomnieć sobie to, w czym byłeś najlepszy.\n\n"
-                "Masz 2 PUNKTY STATYSTYK do rozdania.\n"
-                "Możesz wybrać tę samą statystykę dwa razy lub dwie różne.\n"
-                "Gdy rozdasz oba punkty — rozpoczniesz właściwą grę."
-            ),
-            objective="Rozdaj 2 punkty statystyk.",
-            explore_mode=True,
-            on_enter=self._on_enter_instincts,
-            choices=[
-                Choice("[O] SIŁA +1 — lepsze akcje siłowe", "prolog_instincts",
-                       effects=[self._fx_pick_stat("strength")]),
-                Choice("[O] ZRĘCZNOŚĆ +1 — lepsze skradanie i refleks", "prolog_instincts",
-                       effects=[self._fx_pick_stat("dexterity")]),
-                Choice("[O] INTELIGENCJA +1 — lepsza analiza i tropy", "prolog_instincts",
-                       effects=[self._fx_pick_stat("intelligence")]),
-                Choice("[O] WITALNOŚĆ +1 — większa wytrzymałość (+2 HP)", "prolog_instincts",
-                       effects=[self._fx_pick_stat("vitality")]),
-                Choice("[F] ✅ Zakończ wybór i rozpocznij grę", "prolog_wake_up",
-                       requirements={"flag": ("picks_done", True)}),
-            ],
-        )
-
-        # SCENA 1
-        self.scenes["prolog_wake_up"] = Scene(
-            scene_id="prolog_wake_up",
-            title="1. Przebudzenie",
-            narration=(
-                "Ból wyrywa cię z ciemności.\n\n"
-                "Oddychasz płytko - czujesz jakbyś miał złamane żebra. Każdy ruch pali jak ogień pod skórą.\n"
-                "Leżysz na słomianym łożu w starej chacie. W kominku tli się ogień.\n\n"
-                "Nie pamiętasz nic. Czujesz kompletny mętlik w głowie.\n"
-                "Co wydarzyło się w mojej rodzinnej wiosce? Dlaczego tu jestem? - KIM JA JESTEM?\n\n"
-                "Jesteś ciężko ranny. (ŻYCIE: 3 / maks.)\n\n"
-                "Na stole leży sakiewka i zwinięty pergamin.\n"
-                "Za oknem: noc."
-            ),
-            objective="Rozejrzyj się i ustal, gdzie jesteś oraz czy jesteś sam.",
-            explore_mode=True,
-            subscenes=["prolog_table", "prolog_bed", "prolog_window"],
-            on_enter=self._on_enter_prolog_wake_up,
-            exit_condition=self._exit_prolog_wake_up,
-            choices=[
-                Choice("[O] Podejdź do okna i wyjrzyj", "prolog_window",
-                       one_time_id="look_window", effects=[self.fx_flag("visited_window", True)]),
-                Choice("[O] Połóż się na słomianym łożu", "prolog_bed", one_time_id="lie_down"),
-                Choice("[F] Podejdź do stołu", "prolog_table"),
-                Choice("[O] Ogrzej się przy kominku (+1 ŻYCIA)", "prolog_wake_up",
-                       one_time_id="fireplace_warmth", effects=[self.fx_add_hp(+1)]),
-                Choice("[O] Sprawdź swoje rany", "prolog_wake_up",
-                       requirements={"intelligence": 2}, one_time_id="examine_wounds",
-                       effects=[self.fx_add_exp(10), self.fx_stat("intelligence", +0)]),
-                Choice("[F] Nasłuchuj otoczenia", "prolog_wake_up",
-                       requirements={"dexterity": 2}, one_time_id="listen_night",
-                       effects=[self.fx_stat("dexterity", +0), self.fx_flag("heard_snoring", True)]),
-            ],
-        )
-
-        self.scenes["prolog_window"] = Scene(
-            scene_id="prolog_window",
-            title="Podscena — Okno",
-            narration=(
-                "Podchodzisz do okna.\n\n"
-                "Widzisz ciemny las. Drzewa ustawione są w rząd czarnych kolumn.\n"
-                "W oddali majaczy łuna — jakby pożar już dawno wygasł, ale popiół jeszcze unosi się w powietrzu.\n\n"
-                "Cisza jest nienaturalna. Odczuwasz strach.\n"
-                "Nawet nocne ptaki wydają się milczeć."
-            ),
-            explore_mode=True,
-            choices=[Choice("[F] Wróć do łóżka", "prolog_wake_up")],
-        )
-
-        self.scenes["prolog_table"] = Scene(
-            scene_id="prolog_table",
-            title="Podscena — Stół",
-            narration="Drewniany stół jest porysowany i stary. Leży na nim sakiewka oraz pergamin.",
-            objective="Możesz tu znaleźć drobne zasoby i jakiś kawałek papieru.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] Sprawdź sakiewkę", "prolog_table",
-                       one_time_id="take_pouch",
-                       effects=[self.fx_add_silver_rng(5, 15), self.fx_flag("table_interacted", True)]),
-                Choice("[O] Przeczytaj pergamin", "prolog_table",
-                       requirements={"intelligence": 2}, one_time_id="read_parchment",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "Nie wiem dlaczego próbowałeś ratować tego człowieka.\n\n"
-                               "Doskonale wiem, że nie posiadasz wielu środków a przez niego zmarnujesz ich jeszcze więcej...\n"
-                               "Ale nie mogę zostawić Ciebie samego w tej sytuacji... Masz to moje ostatnie oszczędności.\n\n"
-                               "Jeśli po przebudzeniu ten ktoś wbije Ci nóż w plecy, nawet mnie to nie zdziwi.\n"
-                               "Weź go chociaż zwiąż do tego łoża.\n"
-                               "K."
-                           ),
-                           self.fx_flag("note_warning", True),
-                           self.fx_flag("table_interacted", True)
-                       ]),
-                Choice("[F] Wróć", "prolog_wake_up"),
-            ],
-        )
-
-        self.scenes["prolog_bed"] = Scene(
-            scene_id="prolog_bed",
-            title="Podscena — Łoże",
-            narration=(
-                "Próbujesz się uspokoić i zebrać chaotyczne myśli.\n\n"
-                "Sen nie przychodzi.\n"
-                "Nie możesz zasnąć.\n"
-                "Ból trzyma cię przy życiu i przy świadomości."
-            ),
-            explore_mode=True,
-            choices=[Choice("[F] Wróć", "prolog_wake_up")],
-        )
-
-        # SCENA 2
-        self.scenes["prolog_old_man_intro"] = Scene(
-            scene_id="prolog_old_man_intro",
-            title="2. Ktoś tu jest",
-            narration=(
-                "Drzwi chaty skrzypią.\n\n"
-                "— Spokojnie… — mówi ktoś łagodnym głosem.\n"
-                "Wchodzi stary mężczyzna z lampą w prawej dłoni.\n\n"
-                "— Obudziłeś się w końcu. Znalazłem cię przy spalonych ruinach."
-            ),
-            objective="Zdecyduj, czy mu ufasz i dowiedz się, co wie.",
-            explore_mode=True,
-            subscenes=["old_man_questions", "old_man_decision"],
-            on_enter=self._on_enter_scene2_dynamic,
-            choices=[
-                Choice("„[O] Kim jesteś?”", "old_man_questions",
-                       one_time_id="ask_who",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "— Jestem tylko starcem, którego zainteresował los młodego człowieka,\n"
-                               "który ledwo dychał po starciu z tymi nędznymi orkami."
-                           ),
-                           self.fx_flag("visited_old_man_questions", True)
-                       ]),
-                Choice("„[O] Dlaczego mi pomogłeś?”", "old_man_questions",
-                       one_time_id="ask_why_help",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "— Sam tego nie wiem. Nie potrafiłem przejść obok cudzego nieszczęścia obojętnie."
-                           )
-                       ]),
-                Choice("[O] Milcz i obserwuj go uważnie", "old_man_questions",
-                       requirements={"intelligence": 2}, one_time_id="observe_oldman",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "Starasz się przyjrzeć starszemu mężczyźnie.\n"
-                               "Widzisz zmarszczki na jego czole. Ubrany jest w lekkie szaty.\n"
-                               "Przy pasie ma alchemiczny przybornik.\n"
-                               "Dostrzegasz też krucze ziele i mniszek — typowe do leczenia ran."
-                           )
-                       ]),
-                Choice("[O] Cofnij się instynktownie", "old_man_questions",
-                       requirements={"dexterity": 2}, one_time_id="step_back",
-                       effects=[
-                           self.fx_stat("dexterity", +1),
-                           self.fx_add_hp(-1),
-                           self.fx_print(
-                               "Nieufnie cofasz się do tyłu pod ścianę — pomimo tego, że wiesz,\n"
-                               "że i tak nic by to nie dało ze względu na twój stan zdrowia.\n"
-                               "Staruszek patrząc na ciebie wydaje się zażenowany, ale również w pełni podziwu,\n"
-                               "że pomimo rozległych ran starasz się zachować rozwagę."
-                           )
-                       ]),
-                Choice("[F] Podejmij decyzję co zrobić dalej", "old_man_decision"),
-            ],
-        )
-
-        self.scenes["old_man_questions"] = Scene(
-            scene_id="old_man_questions",
-            title="Podscena — Pytania",
-            narration=(
-                "Starzec mówi oszczędnie. Wydaje ci się, że nie do końca ci ufa.\n"
-                "Nie daje ci to pewności, prawdopodobnie sam do końca nie wie dlaczego Ci pomógł"
-            ),
-            explore_mode=True,
-            choices=[
-                Choice("„[O] Co stało się z wioską w której mnie znalazłeś?”", "old_man_questions",
-                       one_time_id="ask_village",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "— Wioska została doszczętnie zniszczona… wielu ludzi tam poległo.\n"
-                               "Część z ładniejszych kobiet została porwana przez te cholerne orki."
-                           ),
-                           self.fx_flag("knows_orcs", True)
-                       ]),
-                Choice("„[O] Dlaczego nie zabili akurat mnie?”", "old_man_questions",
-                       requirements={"intelligence": 2}, one_time_id="ask_survival",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "— Nie wiem dlaczego nie zginąłeś, jednakże prawdopodobnie sam Arros nad tobą czuwał."
-                           ),
-                           self.fx_flag("hint_survival", True)
-                       ]),
-                Choice("„[O] Jak długo już tu leżę?”", "old_man_questions",
-                       one_time_id="ask_time",
-                       effects=[
-                           self.fx_add_exp(20),
-                           self.fx_print(
-                               "— Znalazłem cię 4 dni temu, od tamtej pory walczyłem z gorączką która pochłonęła twoje ciało…\n"
-                               "Wywar z piekielników zdecydowanie złagodził objawy gorączki, a zioła lecznicze lekko poprawiły stan twoich ran."
-                           )
-                       ]),
-                Choice("[F] Wróć", "prolog_old_man_intro"),
-            ],
-        )
-
-        self.scenes["old_man_decision"] = Scene(
-            scene_id="old_man_decision",
-            title="Podscena — Decyzja",
-            narration=(
-                "— Dzień będzie za niedługo świtał. Jeśli zostaniesz, złapiesz oddech, a ja w tym czasie cię opatrzę.\n"
-                "Jeśli odejdziesz… las może nie być dla ciebie łaskawy w tym stanie.\n\n"
-                "— Decyzja jednak należy tylko do ciebie."
-            ),
-            explore_mode=True,
-            choices=[
-                Choice(
-                    "[F] Zostanę tu jeszcze chwilę, jednak nie chciałbym Panu przeszkadzać...",
-                    "act1_dawn_safe",
-                    one_time_id="stay_choice",
-                    effects=[
-                        self.fx_flag("stayed_with_old_man", True),
-                        self.fx_print(
-                            "— Spokojnie, nie przeszkadzasz…\n"
-                            "Właściwie to cieszę się, że w końcu się obudziłeś…\n"
-                            "Powoli zaczynałem tracić nadzieję, że jeszcze otworzysz oczy."
-                        ),
-                    ],
-                ),
-                Choice(
-                    "[F] Muszę iść dalej, muszę odnaleźć wspomnienia które utraciłem...",
-                    "act1_dawn_departure",
-                    one_time_id="leave_choice",
-                    effects=[
-                        self.fx_flag("left_early", True),
-                        self.fx_print(
-                            "— Rób jak uważasz jednakże twoje rany mogą doprowadzić Cię do śmierci…\n"
-                            "Daj mi chociaż zmienić Ci bandaże na nowe."
-                        ),
-                        self.fx_add_hp(+1),
-                    ],
-                ),
-            ],
-        )
-
-        # SCENA 3A
-        self.scenes["act1_dawn_safe"] = Scene(
-            scene_id="act1_dawn_safe",
-            title="3. Świt nad popiołem",
-            narration=(
-                "Świt przychodzi powoli. Starzec wymienił stare bandaże na nowe oraz obmył moje rany.\n"
-                "W chacie pachnie ziołami i dymem. Starzec podaje ci czarny, gorzki wywar.\n"
-                "— To pomoże. Chociaż trochę.\n"
-                "Ale najpierw musisz to wypić."
-            ),
-            objective="Zbierz siły i rusz na trakt.",
-            explore_mode=True,
-            subscenes=["old_man_directions"],
-            choices=[
-                Choice(
-                    "[O] Wypij wywar (+3 ŻYCIA)",
-                    "act1_dawn_safe",
-                    one_time_id="drink_brew",
-                    effects=[
-                        self.fx_add_hp(3),
-                        self.fx_add_exp(10),
-                        self.fx_print(
-                            "Ugh… śmierdzi obrzydliwie i smakuje jeszcze gorzej…\n"
-                            "Ale czujesz, że rozgrzewający wywar zaczyna oddziaływać pozytywnie na twój organizm."
-                        ),
-                    ],
-                ),
-                Choice(
-                    "[O] Zapytaj dokąd iść dalej",
-                    "old_man_directions",
-                    one_time_id="ask_directions",
-                    effects=[
-                        self.fx_add_exp(10),
-                        self.fx_print(
-                            "— Czy mógłbyś powiedzieć mi dokąd mogę dojść po wyjściu z twojej chaty?\n"
-                            "— Trakt biegnie na wschód, staraj się unikać ciszy i pod żadnym pozorem nie podchodź\n"
-                            "do porzuconych wozów lub ludzi wołających o pomoc."
-                        ),
-                    ],
-                ),
-                Choice(
-                    "[O] Pomóż przygotować chatę",
-                    "act1_dawn_safe",
-                    requirements={"strength": 2},
-                    one_time_id="help_cabin",
-                    effects=[
-                        self.fx_add_exp(20),
-                        self.fx_stat("strength", +1),
-                        self.fx_print(
-                            "— W takim razie w ramach tego co dla mnie zrobiłeś, pozwól mi proszę chociaż\n"
-                            "posprzątać po sobie... Wiem, że to niewiele ale chciałbym chociaż w taki sposób okazać Ci swoją wdzięczność."
-                        ),
-                    ],
-                ),
-                Choice(
-                    "[F] Wyrusz na trakt",
-                    "act1_forest_road",
-                    effects=[
-                        self.fx_print(
-                            "— Dziękuję Ci za pomoc, jednakże muszę wyruszać aby powrócić do rodzinnej wioski...\n"
-                            "Myślę że tam mogę dowiedzieć się czegoś więcej o moich wspomnieniach.\n"
-                            "— Żegnaj przyjacielu, pamiętaj, że zawsze będziesz u mnie mile widziany."
-                        ),
-                    ],
-                ),
-            ],
-        )
-
-        self.scenes["old_man_directions"] = Scene(
-            scene_id="old_man_directions",
-            title="Podscena — Wskazówki starca",
-            narration=(
-                "Starzec kreśli palcem w popiele na stole.\n\n"
-                "— Trakt biegnie na wschód. Jeśli chcesz przeżyć, trzymaj się go,\n"
-                "ale staraj się nie ufać ciszy. W tym lesie obudziło się coś prastarego...\n"
-                "Wyczuwam tą siłę nawet z tego miejsca.\n\n"
-                "— W okolicy kręcą się szajki bandytów i to coś złowrogiego...\n"
-                "Możliwe, że to pewnego rodzaju klątwa...\n\n"
-                "— Jeśli zobaczysz porzucone wozy, nie dotykaj ich jeśli nie musisz.\n"
-                "POD ŻADNYM POZOREM NIE ZBLIŻAJ SIĘ DO LUDZI KTÓRZY MOGLIBY WOŁAĆ O POMOC!\n"
-                "To bardzo niebezpieczne... Ja sprawdziłem praktycznie całą drogę\n"
-                "i nie znalazłem nikogo żywego poza tobą...\n\n"
-                "Starzec patrzy ci prosto w oczy.\n\n"
-                "— Jeśli poczujesz się zagrożony, pojawi się ta grobowa cisza\n"
-                "i poczujesz lodowatą obecność... UCIEKAJ.\n"
-                "On już rozpoczął swoje łowy...\n\n"
-                "Dlatego lepiej powinieneś tu zostać."
-            ),
-            explore_mode=True,
-            choices=[
-                Choice("[O] Wróć", "act1_dawn_safe",
-                       effects=[self.fx_flag("warned_by_old_man", True)]),
-            ],
-        )
-
-        # SCENA 3B
-        self.scenes["act1_dawn_departure"] = Scene(
-            scene_id="act1_dawn_departure",
-            title="3. Świt nad popiołem",
-            narration=(
-                "Wychodzisz przed świtem.\n"
-                "Las połyka cię natychmiast.\n"
-                "Jesteś sam."
-            ),
-            objective="Dotrzyj do traktu, nie tracąc resztek sił.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] Ruszaj ostrożnie (-1 ŻYCIA)", "act1_dawn_departure",
-                       one_time_id="depart_careful", effects=[self.fx_add_hp(-1), self.fx_add_exp(5)]),
-                Choice("[O] Ukryj się i obserwuj", "act1_dawn_departure",
-                       requirements={"dexterity": 2}, one_time_id="hide_observe",
-                       effects=[self.fx_add_exp(5), self.fx_stat("dexterity", +1)]),
-                Choice("[O] Uspokój oddech", "act1_dawn_departure",
-                       requirements={"intelligence": 2}, one_time_id="calm_breath",
-                       effects=[self.fx_add_exp(5), self.fx_add_hp(+1)]),
-                Choice("[F] Dotrzyj do traktu", "act1_forest_road"),
-            ],
-        )
-
-        # =============================================================================
-        # AKT I - NOWA FABUŁA LEŚNA
-        # =============================================================================
-
-        # SCENA 4 - Początek wędrówki przez las
-        self.scenes["act1_forest_road"] = Scene(
-            scene_id="act1_forest_road",
-            title="4. Trakt przez las",
-            narration=(
-                "Opuszczasz chatę starca i ruszasz na wschód, zgodnie z jego wskazówkami.\n\n"
-                "Las otacza cię ze wszystkich stron. Wysokie dęby i sosny tworzą gęsty baldachim,\n"
-                "przez który z trudem przebijają się promienie słońca. Pod stopami chrzęszczą\n"
-                "suche liście i połamane gałązki.\n\n"
-                "Między drzewami dostrzegasz resztki zniszczonych wozów - ich drewno jest poczerniałe,\n"
-                "jakby ktoś próbował je spalić. W powietrzu unosi się lekki zapach dymu i czegoś...\n"
-                "słodkawego. Niepokojącego.\n\n"
-                "Idziesz już jakiś czas, gdy nagle słyszysz coś w oddali..."
-            ),
-            objective="Podążaj traktem na wschód i bądź czujny.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] Rozejrzyj się uważnie po okolicy", "act1_forest_road",
-                       one_time_id="forest_look_around",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Przystajesz i rozglądasz się. Las wydaje się martwy - nie słychać ptaków,\n"
-                               "nie widać zwierząt. Tylko cisza i odległy szum wiatru w koronach drzew.\n"
-                               "Dostrzegasz ślady na ziemi - coś dużego przechodziło tędy niedawno."
-                           )
-                       ]),
-                Choice("[O] Zbadaj zniszczony wóz przy trakcie", "act1_forest_road",
-                       one_time_id="forest_check_wagon",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_add_item("bandage"),
-                           self.fx_print(
-                               "Podchodzisz ostrożnie do wraku wozu. Wśród szczątków znajdujesz\n"
-                               "kawałek czystego płótna - przyda się jako prowizoryczny bandaż.\n"
-                               "Na drewnie widać ślady pazurów... i coś co wygląda jak ludzkie zadrapania.\n"
-                               "Ktoś desperacko próbował się wydostać."
-                           )
-                       ]),
-                Choice("[F] Idź dalej traktem", "act1_forest_voices",
-                       effects=[self.fx_add_exp(5)]),
-            ],
-        )
-
-        # SCENA 5 - Głosy w lesie
-        self.scenes["act1_forest_voices"] = Scene(
-            scene_id="act1_forest_voices",
-            title="5. Głosy w lesie",
-            narration=(
-                "Idziesz dalej, gdy nagle słyszysz to wyraźnie...\n\n"
-                "— POMOCY! PROSZĘ, NIECH KTOŚ MI POMOŻE!\n\n"
-                "To głos kobiety, dochodzący gdzieś z głębi lasu, na lewo od traktu.\n"
-                "Brzmi rozpaczliwie, pełen strachu i bólu.\n\n"
-                "— BŁAGAM! JESTEM RANNA! NIE MOGĘ SIĘ RUSZYĆ!\n\n"
-                "Słowa starca wracają do ciebie: 'POD ŻADNYM POZOREM NIE ZBLIŻAJ SIĘ\n"
-                "DO LUDZI KTÓRZY MOGLIBY WOŁAĆ O POMOC'..."
-            ),
-            objective="Zdecyduj, czy zareagujesz na wołanie.",
-            explore_mode=True,
-            on_enter=self._on_enter_forest_voices,
-            choices=[
-                Choice("[F] Zlekceważ głosy i idź dalej", "act1_bandit_camp",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_flag("ignored_voices", True),
-                           self.fx_print(
-                               "Zaciskasz zęby i zmuszasz się do ignorowania wołania.\n"
-                               "Starzec ostrzegał cię... Musisz mu zaufać.\n"
-                               "Idziesz dalej, a głosy powoli cichną za tobą."
-                           )
-                       ]),
-                Choice("[O] Nasłuchuj uważnie dźwięków", "act1_forest_voices",
-                       requirements={"intelligence": 3},
-                       one_time_id="listen_voices",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_flag("listened_carefully", True),
-                           self.fx_print(
-                               "Zamykasz oczy i nasłuchujesz...\n"
-                               "Coś jest nie tak. Głos jest... zbyt perfekcyjny. Zbyt czysty.\n"
-                               "I powtarza się w dokładnie tych samych odstępach czasu.\n"
-                               "To nie jest człowiek. To coś, co NAŚLADUJE człowieka."
-                           )
-                       ]),
-                Choice("[F] Sprawdź co się dzieje", "mglak_trap_enter",
-                       effects=[
-                           self.fx_flag("went_to_voices", True),
-                           self.fx_print(
-                               "Nie możesz zostawić kogoś w potrzebie...\n"
-                               "Schodzisz z traktu i zagłębiasz się w las."
-                           )
-                       ]),
-            ],
-        )
-
-        # SCENA - Pułapka Mglaka (wejście)
-        self.scenes["mglak_trap_enter"] = Scene(
-            scene_id="mglak_trap_enter",
-            title="Pułapka",
-            narration="",
-            objective="Przetrwaj!",
-            explore_mode=False,
-            on_enter=self._on_enter_mglak_trap,
-            choices=[
-                Choice("[F] Uciekaj natychmiast!", "mglak_escape_1",
-                       effects=[self.fx_add_exp(5)]),
-            ],
-        )
-
-        # SCENA - Ucieczka przed Mglakiem (1)
-        self.scenes["mglak_escape_1"] = Scene(
-            scene_id="mglak_escape_1",
-            title="Ucieczka — Segment 1",
-            narration=(
-                "Biegniesz ile sił w nogach! Mgła gęstnieje wokół ciebie.\n\n"
-                "Za sobą słyszysz... syczenie? Charczenie? Coś się zbliża!\n\n"
-                "Przed tobą rozwidlenie - możesz skoczyć przez przewrócony pień\n"
-                "albo przebiec przez gęste zarośla!"
-            ),
-            objective="Wybierz drogę ucieczki!",
-            explore_mode=False,
-            choices=[
-                Choice("[F] Przeskocz przez pień!", "mglak_escape_2",
-                       effects=[self._fx_mglak_escape_roll("dexterity", "Udało się! Przeskakujesz zgrabnie.", "Potykasz się! Coś drasnęło twoje plecy!")]),
-                Choice("[F] Przebiegnij przez zarośla!", "mglak_escape_2",
-                       effects=[self._fx_mglak_escape_roll("strength", "Przedzierasz się przez chaszcze!", "Kolce rozdzierają ci skórę!")]),
-            ],
-        )
-
-        # SCENA - Ucieczka przed Mglakiem (2)
-        self.scenes["mglak_escape_2"] = Scene(
-            scene_id="mglak_escape_2",
-            title="Ucieczka — Segment 2",
-            narration=(
-                "Nie zwalniasz! Serce wali ci jak oszalałe!\n\n"
-                "Mgła jest wszędzie - ledwo widzisz na metr przed siebie.\n"
-                "Ale... czy tam jest światło? Tak! Widzisz przebłyski słońca!\n\n"
-                "Tylko czy to prawdziwa droga, czy kolejna pułapka?\n"
-                "Z drugiej strony słyszysz szum wody - może strumień?"
-            ),
-            objective="Wybierz drogę!",
-            explore_mode=False,
-            choices=[
-                Choice("[F] Biegnij w stronę światła!", "mglak_escape_3",
-                       effects=[self._fx_mglak_escape_roll("intelligence", "Intuicja cię nie zawiodła!", "To była iluzja! Tracisz orientację!")]),
-                Choice("[F] Biegnij do strumienia!", "mglak_escape_3",
-                       effects=[self._fx_mglak_escape_roll("vitality", "Woda spowalnia istotę!", "Zimna woda szokuje twoje ciało!")]),
-            ],
-        )
-
-        # SCENA - Ucieczka przed Mglakiem (3)
-        self.scenes["mglak_escape_3"] = Scene(
-            scene_id="mglak_escape_3",
-            title="Ucieczka — Segment 3",
-            narration=(
-                "Jeszcze trochę! Mgła zaczyna rzednąć!\n\n"
-                "Widzisz trakt! Jesteś prawie na miejscu!\n"
-                "Ale istota jest tuż za tobą - czujesz lodowaty oddech na karku!\n\n"
-                "Ostatni zryw!"
-            ),
-            objective="Ostatnia szansa!",
-            explore_mode=False,
-            choices=[
-                Choice("[F] Rzuć się do przodu z całych sił!", "mglak_escape_end",
-                       effects=[self._fx_mglak_final_escape()]),
-            ],
-        )
-
-        # SCENA - Koniec ucieczki przed Mglakiem
-        self.scenes["mglak_escape_end"] = Scene(
-            scene_id="mglak_escape_end",
-            title="Koniec ucieczki",
-            narration="",
-            objective="Odetchnij...",
-            explore_mode=True,
-            on_enter=self._on_enter_mglak_escape_end,
-            choices=[
-                Choice("[F] Idź dalej, nie oglądając się za siebie", "act1_bandit_camp",
-                       effects=[
-                           self.fx_flag("escaped_mglak", True),
-                           self.fx_add_exp(15)
-                       ]),
-            ],
-        )
-
-        # SCENA 6 - Opuszczony obóz bandytów
-        self.scenes["act1_bandit_camp"] = Scene(
-            scene_id="act1_bandit_camp",
-            title="6. Opuszczony obóz",
-            narration=(
-                "Po dłuższym marszu dostrzegasz coś między drzewami.\n\n"
-                "To pozostałości obozu - wygasłe ognisko, porzucone namioty,\n"
-                "porozrzucane przedmioty. Wszystko wskazuje na to, że ludzie\n"
-                "opuścili to miejsce w wielkim pośpiechu.\n\n"
-                "Na ziemi leżą resztki jedzenia, butelki, a także...\n"
-                "Czy to broń? Ktoś zostawił tutaj sporo rzeczy."
-            ),
-            objective="Przeszukaj obóz lub idź dalej.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] Przeszukaj namioty", "act1_bandit_camp",
-                       one_time_id="search_tents",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_add_silver(8),
-                           self.fx_print(
-                               "W namiotach znajdujesz trochę srebra i prowiantu.\n"
-                               "Bandyci musieli bardzo się spieszyć, skoro to zostawili."
-                           )
-                       ]),
-                Choice("[O] Podkradnij się do skrzyni przy ognisku", "act1_bandit_camp",
-                       requirements={"dexterity": 3},
-                       one_time_id="steal_silver_knife",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_add_item("silver_knife"),
-                           self.fx_print(
-                               "Twoja zręczność pozwala ci cicho otworzyć skrzynię.\n"
-                               "W środku znajdujesz SREBRNY NÓŻ! Pięknie zdobiony,\n"
-                               "z symbolami których nie rozpoznajesz. Może się przydać..."
-                           )
-                       ]),
-                Choice("[O] Zbierz pozostałe jedzenie (+2 HP)", "act1_bandit_camp",
-                       one_time_id="camp_food",
-                       effects=[
-                           self.fx_add_hp(2),
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Znajdujesz trochę suszonego mięsa i chleba.\n"
-                               "Nie jest świeże, ale jedzenie to jedzenie."
-                           )
-                       ]),
-                Choice("[F] Opuść obóz i idź dalej", "act1_healing_spot",
-                       effects=[self.fx_add_exp(5)]),
-            ],
-        )
-
-        # SCENA 7 - Miejsce odpoczynku (jagody/zioła)
-        self.scenes["act1_healing_spot"] = Scene(
-            scene_id="act1_healing_spot",
-            title="7. Polana przy strumieniu",
-            narration=(
-                "Trakt prowadzi cię do małej polany przy strumieniu.\n\n"
-                "To dobre miejsce na krótki odpoczynek. Strumień jest czysty,\n"
-                "a na brzegu rosną jakieś krzewy z ciemnymi jagodami.\n"
-                "Widzisz też żółte kwiaty - wyglądają na lecznicze zioła."
-            ),
-            objective="Odpręż się i uzupełnij siły.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] Zjedz jagody z krzaków (+2 HP)", "act1_healing_spot",
-                       one_time_id="eat_berries",
-                       effects=[
-                           self.fx_add_hp(2),
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Jagody są słodkie i soczyste. Czujesz, jak energia\n"
-                               "wraca do twojego zmęczonego ciała."
-                           )
-                       ]),
-                Choice("[O] Użyj ziół do opatrzenia ran (+3 HP)", "act1_healing_spot",
-                       requirements={"intelligence": 3},
-                       one_time_id="use_herbs",
-                       effects=[
-                           self.fx_add_hp(3),
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "Twoja wiedza pozwala ci rozpoznać lecznicze właściwości ziół.\n"
-                               "Przygotowujesz prowizoryczny okład, który łagodzi ból ran."
-                           )
-                       ]),
-                Choice("[O] Napij się wody ze strumienia (+1 HP)", "act1_healing_spot",
-                       one_time_id="drink_water",
-                       effects=[
-                           self.fx_add_hp(1),
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Zimna, czysta woda orzeźwia cię. Czujesz się trochę lepiej."
-                           )
-                       ]),
-                Choice("[F] Ruszaj dalej", "act1_bandits_wagon",
-                       effects=[self.fx_add_exp(5)]),
-            ],
-        )
-
-        # SCENA 8 - Bandyci przy wozie
-        self.scenes["act1_bandits_wagon"] = Scene(
-            scene_id="act1_bandits_wagon",
-            title="8. Spotkanie na trakcie",
-            narration=(
-                "Idąc dalej, słyszysz głosy. Tym razem to prawdziwe głosy - męskie, szorstkie.\n\n"
-                "Za zakrętem widzisz dwóch mężczyzn grzebiących w zniszczonym wozie.\n"
-                "Są uzbrojeni - jeden ma miecz, drugi topór. Na ich twarzach widać blizny.\n\n"
-                "— Hej, patrz! Mamy gościa! — jeden z nich cię zauważył.\n\n"
-                "Drugi odwraca się i mierzy cię wzrokiem.\n"
-                "— No no... Samotny wędrowiec. Co tutaj robisz, przyjacielu?"
-            ),
-            objective="Zdecyduj, jak rozegrać to spotkanie.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] „Tylko przechodzę. Nie chcę kłopotów.", "act1_bandits_talk",
-                       one_time_id="bandits_peaceful",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "— Kłopotów? My też nie chcemy kłopotów... — mówi pierwszy,\n"
-                               "ale w jego głosie słychać sarkazm."
-                           )
-                       ]),
-                Choice("[O] Obserwuj ich uważnie, nie odpowiadaj", "act1_bandits_talk",
-                       requirements={"intelligence": 2},
-                       one_time_id="bandits_observe",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_flag("observed_bandits", True),
-                           self.fx_print(
-                               "Nie odpowiadasz. Obserwujesz ich ruchy.\n"
-                               "Pierwszy jest nerwowy - ciągle zerka w las.\n"
-                               "Drugi jest spokojniejszy, ale trzyma rękę na mieczu.\n"
-                               "Coś ich niepokoi..."
-                           )
-                       ]),
-                Choice("[F] Spróbuj ich wyminąć i uciec", "act1_bandits_flee",
-                       requirements={"dexterity": 3},
-                       effects=[
-                           self.fx_add_exp(15),
-                           self.fx_print(
-                               "Wykorzystujesz moment nieuwagi i rzucasz się do ucieczki!\n"
-                               "Słyszysz za sobą przekleństwa, ale nikt cię nie goni.\n"
-                               "Widocznie mają ważniejsze sprawy..."
-                           )
-                       ]),
-            ],
-        )
-
-        # SCENA - Rozmowa z bandytami
-        self.scenes["act1_bandits_talk"] = Scene(
-            scene_id="act1_bandits_talk",
-            title="Rozmowa z bandytami",
-            narration=(
-                "Bandyci podchodzą bliżej. Nie wyglądają na przyjaźnie nastawionych,\n"
-                "ale też nie atakują od razu.\n\n"
-                "— Widzisz, przyjacielu — zaczyna ten z mieczem — mamy tu mały problem.\n"
-                "Obóz musieliśmy porzucić, bo... coś tam chodziło po nocy.\n"
-                "A teraz szukamy czegokolwiek wartościowego.\n\n"
-                "— Może masz coś dla nas? — pyta drugi, kręcąc toporem."
-            ),
-            objective="Zdecyduj, co zrobisz.",
-            explore_mode=True,
-            on_enter=self._on_enter_forest_voices,
-            choices=[
-                Choice("[F] Daj im trochę srebra (płacisz 5 SREBRA)", "act1_bandits_flee",
-                       requirements={"flag": ("has_silver_5", True)},
-                       one_time_id="pay_bandits",
-                       effects=[
-                           self._fx_pay_silver(5),
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Wrzucasz im kilka monet. Pierwszy łapie je w locie.\n"
-                               "— Mądry człowiek. Idź sobie.\n"
-                               "Odchodzą, nie oglądając się za siebie."
-                           )
-                       ]),
-                Choice("[F] Powiedz im o istocie w lesie", "act1_bandits_flee",
-                       requirements={"flag": ("escaped_mglak", True)},
-                       one_time_id="warn_bandits",
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "— Jeśli chcecie rady... uciekajcie z tego lasu.\n"
-                               "Jest tu coś... we mgle. Ledwo uszedłem z życiem.\n\n"
-                               "Ich twarze bledną. Wymieniają spojrzenia.\n"
-                               "— Mglak... — szepcze jeden. — Cholera. Idziemy stąd.\n"
-                               "Odchodzą szybkim krokiem, nie patrząc na ciebie."
-                           )
-                       ]),
-                Choice("[F] Zaatakuj ich z zaskoczenia!", "act1_bandits_fight",
-                       requirements={"strength": 3},
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_flag("fought_bandits", True)
-                       ]),
-                Choice("[F] Uciekaj!", "act1_bandits_flee",
-                       effects=[
-                           self.fx_add_hp(-1),
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Rzucasz się do ucieczki! Jeden z nich próbuje cię złapać,\n"
-                               "drapiąc twoje ramię, ale udaje ci się wyrwać!"
-                           )
-                       ]),
-            ],
-        )
-
-        # SCENA - Walka z bandytami
-        self.scenes["act1_bandits_fight"] = Scene(
-            scene_id="act1_bandits_fight",
-            title="Walka z bandytami",
-            narration=(
-                "Rzucasz się na nich z całych sił!\n\n"
-                "Udaje ci się zaskoczyć pierwszego - twój cios trafia go w szczękę\n"
-                "i pada na ziemię. Drugi zamachuje się toporem, ale jest za wolny!\n\n"
-                "Wykorzystujesz moment i uderzasz go w brzuch. Zgina się w pół.\n"
-                "— Dość! Dość! — krzyczy pierwszy, leżąc na ziemi.\n"
-                "— Bierz co chcesz, tylko nas nie zabijaj!"
-            ),
-            objective="Zdecyduj, co zrobisz z pokonanymi.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] Zabierz ich sakiewki", "act1_bandits_flee",
-                       one_time_id="loot_bandits",
-                       effects=[
-                           self.fx_add_silver(15),
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "Zabierasz ich pieniądze. Nie próbują się sprzeciwiać."
-                           )
-                       ]),
-                Choice("[F] Zostaw ich i odejdź", "act1_bandits_flee",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "— Macie szczęście, że nie jestem mordercą.\n"
-                               "Odchodzisz, zostawiając ich na ziemi."
-                           )
-                       ]),
-            ],
-        )
-
-        # SCENA - Po bandytach
-        self.scenes["act1_bandits_flee"] = Scene(
-            scene_id="act1_bandits_flee",
-            title="Po spotkaniu",
-            narration=(
-                "Zostawiasz bandytów za sobą i idziesz dalej.\n\n"
-                "Słońce powoli zaczyna zachodzić. Musisz znaleźć miejsce na nocleg,\n"
-                "zanim zrobi się całkowicie ciemno. W tym lesie nie chcesz\n"
-                "być złapany przez noc bez ognia..."
-            ),
-            objective="Znajdź miejsce na obóz.",
-            explore_mode=True,
-            choices=[
-                Choice("[F] Szukaj miejsca na obóz", "act1_night_camp",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Znajdujesz niewielką polanę osłoniętą skałami.\n"
-                               "To dobre miejsce - łatwo się bronić i można rozpalić ogień."
-                           )
-                       ]),
-            ],
-        )
-
-        # SCENA 9 - Nocny obóz
-        self.scenes["act1_night_camp"] = Scene(
-            scene_id="act1_night_camp",
-            title="9. Nocny obóz",
-            narration=(
-                "Rozpalasz ognisko. Płomienie tańczą, rzucając cienie na okoliczne drzewa.\n\n"
-                "Noc jest cicha. Zbyt cicha. Nawet wiatr ucichł.\n\n"
-                "Siadasz przy ogniu, wpatrując się w ciemność między drzewami.\n"
-                "Musisz przetrwać do świtu. To nie powinno być trudne...\n\n"
-                "Mijają godziny. Zmęczenie daje o sobie znać.\n"
-                "Oczy same ci się zamykają...\n\n"
-                "Słyszysz jak coś wolnym krokiem zbliża się do Ciebie z oddali."
-            ),
-            objective="Przetrwaj noc.",
-            explore_mode=True,
-            choices=[
-                Choice("[O] Dorzuć drewna do ognia", "act1_night_camp",
-                       one_time_id="add_wood",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_flag("fire_strong", True),
-                           self.fx_print(
-                               "Dorzucasz więcej gałęzi. Ogień bucha jasnym płomieniem.\n"
-                               "W oddali zaczynasz słyszeć warczenie."
-                           )
-                       ]),
-                Choice("[O] Przygotuj pochodnię", "act1_night_camp",
-                       one_time_id="make_torch",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_flag("has_torch", True),
-                           self.fx_print(
-                               "Z gałęzi i kawałka tkaniny robisz prowizoryczną pochodnię.\n"
-                               "Ona na pewno pozwoli mi rozświetlić chociaż trochę tej przeklętej ciemności"
-                               "Pozwoli mi też na uderzenie potencjalnego celu.\n"
-                           )
-                       ]),
-                Choice("[F] Czekaj i obserwuj ciemność", "act1_werewolf_appears",
-                       effects=[self.fx_add_exp(10)]),
-            ],
-        )
-
-        # SCENA 10 - Wilkołak się pojawia
-        self.scenes["act1_werewolf_appears"] = Scene(
-            scene_id="act1_werewolf_appears",
-            title="10. Bestia z ciemności",
-            narration=(
-                "Widzisz TO.\n\n"
-                "Z ciemności wyłania się masywna sylwetka. Stoi na dwóch nogach,\n"
-                "ale jej kształt nie jest ludzki. Pokryte futrem ciało, wydłużony pysk,\n"
-                "żółte oczy błyszczące w świetle ognia...\n\n"
-                "WILKOŁAK.\n\n"
-                "Bestia warczy, obnażając kły. Zbliża się powoli, ale ogień\n"
-                "trzyma ją na dystans. Widać, że się go boi.\n\n"
-                "Ale jest też głodna. I zdesperowana."
-            ),
-            objective="Przetrwaj do świtu!",
-            explore_mode=False,
-            on_enter=self._on_enter_werewolf,
-            choices=[
-                Choice("[F] Pomachaj pochodnią!", "werewolf_fight_1",
-                       requirements={"flag": ("has_torch", True)},
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_flag("used_torch", True),
-                           self.fx_print(
-                               "Chwytasz pochodnię i wymachujesz nią przed sobą!\n"
-                               "Bestia cofa się, sycząc z wściekłości!"
-                           )
-                       ]),
-                Choice("[F] Rzuć w niego płonącą gałąź!", "werewolf_fight_1",
-                       requirements={"flag": ("fire_strong", True)},
-                       effects=[
-                           self.fx_add_exp(10),
-                           self.fx_print(
-                               "Chwytasz płonącą gałąź z ogniska i rzucasz w bestię!\n"
-                               "Trafiona, wyje z bólu i cofa się na moment!"
-                           )
-                       ]),
-                Choice("[F] Użyj srebrnego noża!", "werewolf_fight_silver",
-                       requirements={"has_item": "silver_knife"},
-                       effects=[
-                           self.fx_add_exp(15),
-                           self.fx_flag("used_silver_knife", True)
-                       ]),
-                Choice("[F] Stój nieruchomo i nie prowokuj!", "werewolf_fight_1",
-                       effects=[
-                           self.fx_add_exp(5),
-                           self.fx_print(
-                               "Stoisz nieruchomo, nie spuszczając wzroku z bestii.\n"
-                               "Wilkołak kręci się niespokojnie, ale nie atakuje... jeszcze."
-                           )
-                       ]),
-            ],
-        )
-
-        # SCENA - Walka z wilkołakiem (ze srebrnym nożem)
-        self.scenes["werewolf_fight_silver"] = Scene(
-            scene_id="werewolf_fight_silver",
-            title="Srebrne ostrze",
-            narration=(
-                "Wyciągasz srebrny nóż. W świetle ognia błyszczy on dziwnym blaskiem.\n\n"
-                "Bestia SYCZY na widok srebra. Cofa się, ale nadal warczy.\n\n"
-                "Gdy rzuca się na ciebie, zamachasz nożem!\n"
-                "Ostrze przecina jej ramię - bestia WYJE z bólu!\n\n"
-                "Krew - ciemna, prawie czarna - spływa po jej futrze.\n"
-                "Wilkołak cofa się, trzymając ranę. Patrzy na ciebie z nienawiścią...\n"
-                "I znika w ciemności."
-            ),
-            objective="Przetrwałeś!",
-            explore_mode=True,
-            choices=[
-                Choice("[F] Czekaj do świtu", "act1_dawn_ending",
-                       effects=[
-                           self.fx_flag("wounded_werewolf", True),
-                           self.fx_add_exp(20)
-                       ]),
-            ],
+        return fx_if(
+            (OP_PAY_SILVER, amount),
+            (OP_SAY_N, "fx.paid_silver", amount),
+            (OP_SAY, "fx.not_enough_silver", ""),
         )
 
-        # SCENA - Walka z wilkołakiem (1)
-        self.scenes["werewolf_fight_1"] = Scene(
-            scene_id="werewolf_fight_1",
-            title="Starcie z bestią",
-            narration=(
-                "Bestia nie ustępuje! Krąży wokół ogniska, szukając okazji do ataku.\n\n"
-                "Nagle rzuca się! Musisz zareagować!"
-            ),
-            objective="Broń się!",
-            explore_mode=False,
-            choices=[
-                Choice("[F] Odskocz w bok!", "werewolf_fight_2",
-                       effects=[self._fx_werewolf_attack_roll("dexterity", "Unikasz pazurów!", "Pazury rozdzierają ci ramię!")]),
-                Choice("[F] Zasłoń się rękami!", "werewolf_fight_2",
-                       effects=[self._fx_werewolf_attack_roll("vitality", "Blokujesz atak!", "Ból jest nie do zniesienia!")]),
-                Choice("[F] Kopnij ją w pysk!", "werewolf_fight_2",
-                       effects=[self._fx_werewolf_attack_roll("strength", "Trafiony! Bestia się zatacza!", "Chybiasz i tracisz równowagę!")]),
-            ],
+    @staticmethod
+    def _fx_mglak_escape_roll(stat: str, success_msg: str, fail_msg: str) -> Effect:
+        """Rzut na statystykę podczas ucieczki przed Mglakiem."""
+        # Szansa = 30% + 15% za każdy punkt statystyki powyżej 1
+        return fx_if(
+            (OP_ROLL, stat, 30, 15),
+            (OP_SAY, success_msg, "  ✓ ", OP_ADD_EXP, 5),
+            (OP_SAY, fail_msg, "  ✗ ", OP_ADD_HP, -1),
         )
 
-        # SCENA - Walka z wilkołakiem (2)
-        self.scenes["werewolf_fight_2"] = Scene(
-            scene_id="werewolf_fight_2",
-            title="Walka trwa",
-            narration=(
-                "Bestia jest wściekła! Atakuje ponownie!\n\n"
-                "Ale... czy niebo się rozjaśnia? Czy to świt?"
-            ),
-            objective="Jeszcze chwila!",
-            explore_mode=False,
-            choices=[
-                Choice("[F] Unikaj i czekaj na świt!", "act1_dawn_ending",
-                       effects=[self._fx_werewolf_final_roll()]),
-            ],
+    @staticmethod
+    def _fx_mglak_final_escape() -> Effect:
+        """Ostatni segment ucieczki przed Mglakiem."""
+        # Zawsze udaje się uciec, ale możesz oberwać
+        return fx_if(
+            (OP_ROLL, None, 50, 0),
+            (OP_SAY, "fx.mglak_final.success", "", OP_ADD_EXP, 10),
+            (OP_SAY, "fx.mglak_final.fail", "", OP_ADD_HP, -1, OP_ADD_EXP, 10),
         )
 
-        # SCENA - Zakończenie Aktu I
-        self.scenes["act1_dawn_ending"] = Scene(
-            scene_id="act1_dawn_ending",
-            title="Świt",
-            narration="",
-            objective="Koniec Aktu I.",
-            explore_mode=True,
-            on_enter=self._on_enter_dawn_ending,
-            choices=[
-                Choice("[F] Zakończ Akt I", "act2_start",
-                       effects=[self.fx_flag("act1_completed", True)]),
-            ],
+    @staticmethod
+    def _fx_werewolf_attack_roll(stat: str, success_msg: str, fail_msg: str) -> Effect:
+        """Rzut na statystykę podczas walki z wilkołakiem."""
+        return fx_if(
+            (OP_ROLL, stat, 30, 20),
+            (OP_SAY, success_msg, "  ✓ ", OP_ADD_EXP, 10),
+            (OP_SAY, fail_msg, "  ✗ ", OP_ADD_HP, -2),
         )
 
-        # SCENA - Akt II placeholder
-        self.scenes["act2_start"] = Scene(
-            scene_id="act2_start",
-            title="Akt II — (placeholder)",
-            narration=(
-                "To koniec pierwszego aktu gry THALANOR: ZATOPIONE KRONIKI.\n\n"
-                "Dziękujemy za grę!\n"
-                "Dalszy rozwój fabuły jest w trakcie tworzenia."
-                "Planujemy wprowadzić tą grę na silnik PyEngine uwzględniając kwestie UI oraz dźwięku.\n\n"
-            ),
-            objective="Koniec wersji Demonstracyjnej.",
-            choices=[Choice("[F] Zakończ grę", None, effects=[self.fx_flag("act1_completed", True)])],
+    @staticmethod
+    def _fx_werewolf_final_roll() -> Effect:
+        """Ostatni segment walki z wilkołakiem."""
+        return fx_if(
+            (OP_ROLL, None, 60, 0),
+            (OP_SAY, "fx.werewolf_final.success", "", OP_ADD_EXP, 20),
+            (OP_SAY, "fx.werewolf_final.fail", "", OP_ADD_HP, -2, OP_ADD_EXP, 15),
         )
 
     # =============================================================================
@@ -2171,55 +3687,13 @@ class Game:
         ch = game.character
         # Licznik rozdanych punktów
         picks_count = ch.flags.get("stat_picks_count", 0)
+        # Flaga blokuje wybory statystyk po rozdaniu 2 punktów (wymaganie w paczce treści)
         ch.flags["picks_done"] = (picks_count >= 2)
-        
-        # Blokuj wybory statystyk po rozdaniu 2 punktów
-        stat_choices = ["SIŁA", "ZRĘCZNOŚĆ", "INTELIGENCJA", "WITALNOŚĆ"]
-        for c in self.scenes["prolog_instincts"].choices:
-            for stat_name in stat_choices:
-                if stat_name in c.text and "[O]" in c.text:
-                    if picks_count >= 2:
-                        c.requirements = {"flag": ("picks_done", False)}
-                    else:
-                        c.requirements = {}
-                    break
     
-    def _fx_pick_stat(self, stat: str) -> EffectFn:
+    @staticmethod
+    def _fx_pick_stat(stat: str) -> Effect:
         """Helper do wyboru statystyki na starcie - bez limitu."""
-        def _fn(game: "Game"):
-            ch = game.character
-            picks_count = ch.flags.get("stat_picks_count", 0)
-            if picks_count >= 2:
-                print("  Już rozdałeś wszystkie punkty!")
-                return
-            
-            # Zwiększ statystykę
-            cur = getattr(ch, stat)
-            setattr(ch, stat, cur + 1)
-            
-            label = {
-                "strength": "SIŁA",
-                "dexterity": "ZRĘCZNOŚĆ",
-                "intelligence": "INTELIGENCJA",
-                "vitality": "WITALNOŚĆ",
-            }.get(stat, stat.upper())
-            
-            print(f"  +1 {label} (teraz: {getattr(ch, stat)})")
-            
-            # Witalność daje też HP
-            if stat == "vitality":
-                ch.max_hp += 2
-                ch.current_hp = ch.max_hp
-                print(f"  +2 MAKS. ŻYCIA (teraz: {ch.max_hp})")
-            
-            # Zwiększ licznik
-            ch.flags["stat_picks_count"] = picks_count + 1
-            remaining = 2 - (picks_count + 1)
-            if remaining > 0:
-                print(f"  Pozostałe punkty do rozdania: {remaining}")
-            else:
-                print("  ✅ Rozdałeś wszystkie punkty! Możesz rozpocząć grę.")
-        return _fn
+        return (OP_PICK_STAT, stat)
 
         # Autor hooków: A.N
     def _on_enter_prolog_wake_up(self, game: "Game") -> None:
@@ -2231,7 +3705,7 @@ class Game:
         ch.current_hp = min(ch.max_hp, 3)
         ch.gold = 0
         ch.silver = 0
-        ch.inventory.items = []
+        ch.inventory = Inventory()
         ch.equipment = Equipment()
 
         ch.flags.setdefault("table_interacted", False)
@@ -2256,20 +3730,11 @@ class Game:
     def _on_enter_first_path(self, game: "Game") -> None:
         ch = game.character
         if ch.flags.get("direction_forest"):
-            self.scenes["act1_first_path"].narration = (
-                "Las szybko gęstnieje. Światło znika między koronami.\n"
-                "Tu łatwo się ukryć — i łatwo zgubić drogę."
-            )
+            self.scene_narration["act1_first_path"] = "act1_first_path.narration.forest"
         elif ch.flags.get("direction_hills"):
-            self.scenes["act1_first_path"].narration = (
-                "Ziemia twardnieje. Masz lepszy widok, ale sam jesteś bardziej widoczny.\n"
-                "Wzgórza nie wybaczają błędów."
-            )
+            self.scene_narration["act1_first_path"] = "act1_first_path.narration.hills"
         else:
-            self.scenes["act1_first_path"].narration = (
-                "Mgła wisi nisko. Każdy krok wciąga buty w miękką ziemię.\n"
-                "Mokradła są ciche w sposób, który budzi niepokój."
-            )
+            self.scene_narration["act1_first_path"] = "act1_first_path.narration.swamp"
 
         # Autor hooków: A.N
     def _on_enter_fight_intro(self, game: "Game") -> None:
@@ -2281,18 +3746,12 @@ class Game:
         # Autor hooków: A.N
     def _on_enter_finale(self, game: "Game") -> None:
         choice = game.character.flags.get("act1_final_choice", "defend")
-        base = (
-            "Ogień trzaska głośniej.\n"
-            "Cienie wokół ogniska poruszają się nie od wiatru, lecz od czegoś, co krąży poza światłem.\n"
-            "To nie są orkowie.\n"
-            "Coś nowego — coś, co poluje inaczej.\n"
-        )
         if choice == "defend":
-            self.scenes["act1_finale"].narration = base + "\nZostajesz. Bronisz ognia."
+            self.scene_narration["act1_finale"] = "act1_finale.narration.defend"
         elif choice == "flee":
-            self.scenes["act1_finale"].narration = base + "\nOdwracasz się. Uciekasz w ciemność."
+            self.scene_narration["act1_finale"] = "act1_finale.narration.flee"
         else:
-            self.scenes["act1_finale"].narration = base + "\nRuszysz pierwszy — by odciągnąć zagrożenie."
+            self.scene_narration["act1_finale"] = "act1_finale.narration.lure"
 
     # -------------------------
     # Nowe hooki dla fabuły leśnej - A.O + A.N
@@ -2303,18 +3762,7 @@ class Game:
         ch = game.character
         if ch.flags.get("warned_by_old_man", False):
             # Gracz został ostrzeżony przez starca
-            extra = "\n\n(Pamiętasz ostrzeżenie starca: nie zbliżaj się do ludzi wołających o pomoc...)"
-            self.scenes["act1_forest_voices"].narration = (
-                "Idziesz dalej, gdy nagle słyszysz to wyraźnie...\n\n"
-                "— POMOCY! PROSZĘ, NIECH KTOŚ MI POMOŻE!\n\n"
-                "To głos kobiety, dochodzący gdzieś z głębi lasu, na lewo od traktu.\n"
-                "Brzmi rozpaczliwie, pełen strachu i bólu.\n\n"
-                "— BŁAGAM! JESTEM RANNA! NIE MOGĘ SIĘ RUSZYĆ!\n\n"
-                "Słowa starca wracają do ciebie: 'POD ŻADNYM POZOREM NIE ZBLIŻAJ SIĘ\n"
-                "DO LUDZI KTÓRZY MOGLIBY WOŁAĆ O POMOC'...\n\n"
-                "Ale... a jeśli to naprawdę ktoś potrzebujący pomocy?"
-                + extra
-            )
+            self.scene_narration["act1_forest_voices"] = "act1_forest_voices.narration.warned"
         #Arek tu jest sprawdzenie czy masz wiecej srebra niz 5
         ch.flags["has_silver_5"] = (ch.silver >= 5)
 
@@ -2326,66 +3774,25 @@ class Game:
         
         if warned:
             # Gracz WIEDZIAŁ że to pułapka
-            narration = (
-                "Schodzisz z traktu i zagłębiasz się w las...\n\n"
-                "Głos prowadzi cię coraz dalej. I nagle... cisza.\n\n"
-                "Starzec OSTRZEGAŁ cię. Wiedziałeś, że to pułapka.\n"
-                "A mimo to tu jesteś. Jakim trzeba być KRETYNEM...\n\n"
-                "Mgła zaczyna gęstnieć wokół ciebie. Lodowata. Nienaturalna.\n"
-                "Z jej głębin wyłania się COŚ. Blade, wychudzone, z oczami\n"
-                "jak dwa martwe księżyce...\n\n"
-                "MGLAK.\n\n"
-                "Starzec miał rację. A ty jesteś idiotą."
-            )
+            narration = "mglak_trap_enter.narration.warned"
         elif listened:
             # Gracz nasłuchiwał, więc wiedział że to pułapka
-            narration = (
-                "Mimo że WIEDZIAŁEŚ, że to nie jest człowiek...\n"
-                "Mimo że twoja intuicja KRZYCZAŁA, żebyś uciekał...\n"
-                "Mimo wszystko - tu jesteś.\n\n"
-                "Głos cichnie. Mgła gęstnieje.\n"
-                "Z jej głębin wyłania się COŚ. Blade, wychudzone...\n\n"
-                "MGLAK. Wampir mgły. Istota polująca na głupców.\n"
-                "Takich jak ty."
-            )
+            narration = "mglak_trap_enter.narration.listened"
         else:
             # Gracz nie wiedział - ścieżka 3B (wyszedł wcześniej od starca)
-            narration = (
-                "Schodzisz z traktu, kierując się głosem kobiety.\n\n"
-                "Las gęstnieje. Światło słoneczne z trudem przebija się przez korony.\n"
-                "Głos się oddala... a potem nagle cichnie.\n\n"
-                "Coś jest nie tak. Powietrze staje się lodowate.\n"
-                "Mgła zaczyna się zbierać wokół twoich stóp...\n\n"
-                "I wtedy TO widzisz. Wyłania się z mgły jak koszmar.\n"
-                "Blade ciało, wychudzone, z oczami jak martwe księżyce.\n"
-                "To nie był człowiek. To PUŁAPKA.\n\n"
-                "MGLAK. I jesteś jego ofiarą."
-            )
+            narration = "mglak_trap_enter.narration.unaware"
         
-        self.scenes["mglak_trap_enter"].narration = narration
+        self.scene_narration["mglak_trap_enter"] = narration
 
     def _on_enter_mglak_escape_end(self, game: "Game") -> None:
         """Narracja po ucieczce przed Mglakiem."""
         ch = game.character
         if ch.current_hp <= 2:
-            narration = (
-                "Wypadasz z mgły na trakt, dysząc ciężko.\n\n"
-                "Jesteś ranny. Bardzo ranny. Ledwo żyjesz.\n"
-                "Ale ŻYJESZ.\n\n"
-                "Za tobą mgła powoli się rozwiewa. Mglak odpuścił...\n"
-                "Na razie.\n\n"
-                "To była lekcja. Bolesna lekcja. Już nigdy nie zignorujesz ostrzeżeń."
-            )
+            narration = "mglak_escape_end.narration.wounded"
         else:
-            narration = (
-                "Wypadasz z mgły na trakt, dysząc ciężko.\n\n"
-                "Udało się. Uciekłeś przed tą istotą.\n"
-                "Twoje serce wali jak oszalałe, ale jesteś cały.\n\n"
-                "Za tobą mgła się rozwiewa. Mglak zniknął.\n\n"
-                "Idziesz dalej, nie oglądając się za siebie."
-            )
+            narration = "mglak_escape_end.narration.healthy"
         
-        self.scenes["mglak_escape_end"].narration = narration
+        self.scene_narration["mglak_escape_end"] = narration
 
     def _on_enter_werewolf(self, game: "Game") -> None:
         """Przygotowanie do walki z wilkołakiem."""
@@ -2400,36 +3807,11 @@ class Game:
         wounded_werewolf = ch.flags.get("wounded_werewolf", False)
         
         if wounded_werewolf:
-            narration = (
-                "Świt.\n\n"
-                "Pierwsze promienie słońca przebijają przez korony drzew.\n"
-                "Tam, gdzie zniknęła bestia, widzisz ruch...\n\n"
-                "To nie wilkołak. To... kobieta?\n\n"
-                "Młoda, piękna, naga. Leży skulona na ziemi, trzymając się za ramię.\n"
-                "Krwawi. W tym samym miejscu, gdzie trafiłeś bestię srebrnym nożem.\n\n"
-                "Jej oczy są pełne bólu i... wstydu?\n"
-                "— P-proszę... — szepcze. — Nie chciałam...\n\n"
-                "Zdejmujesz swoje łachmany i okrywasz nimi drżącą kobietę.\n"
-                "Cokolwiek się stało... ona nie jest winna.\n\n"
-                "Klątwa. To musi być jakaś klątwa.\n\n"
-                "Patrzysz na nią, a potem na wschodzące słońce.\n"
-                "Ten las kryje więcej tajemnic, niż się spodziewałeś..."
-            )
+            narration = "act1_dawn_ending.narration.wounded_werewolf"
         else:
-            narration = (
-                "Świt.\n\n"
-                "Pierwsze promienie słońca przebijają przez korony drzew.\n"
-                "Bestia wyje ostatni raz i znika w lesie.\n\n"
-                "Przetrwałeś.\n\n"
-                "Gasisz resztki ogniska i zbierasz swoje rzeczy.\n"
-                "Ta noc była... koszmarem. Ale żyjesz.\n\n"
-                "Gdzieś w oddali słyszysz jeszcze wycie - ludzkie czy zwierzęce?\n"
-                "Nie wiesz. I nie chcesz wiedzieć.\n\n"
-                "Ruszasz dalej na wschód. Słońce ogrzewa twoje zmęczone ciało.\n"
-                "Koniec Aktu I."
-            )
+            narration = "act1_dawn_ending.narration.survived"
         
-        self.scenes["act1_dawn_ending"].narration = narration
+        self.scene_narration["act1_dawn_ending"] = narration
 
 
 # =============================================================================
@@ -2438,11 +3820,39 @@ class Game:
 
 if __name__ == "__main__":
     random.seed()
+    boot = "snapshot" if ("--snapshot" in sys.argv[1:] or os.environ.get("THALANOR_BOOT") == "snapshot") else "build"
+    # Profilowanie scen i czasy faz kroku: THALANOR_METRICS=plik (zrzut co THALANOR_METRICS_INTERVAL s)
+    # i/lub THALANOR_METRICS_PORT=port (endpoint /metrics)
+    close_metrics = None
+    if os.environ.get("THALANOR_METRICS") or os.environ.get("THALANOR_METRICS_PORT"):
+        profiler = MetricsSet(enable_profiling(), enable_step_timing())
+        if os.environ.get("THALANOR_METRICS"):
+            close_metrics = start_metrics_dump(profiler, os.environ["THALANOR_METRICS"],
+                                               float(os.environ.get("THALANOR_METRICS_INTERVAL", "15")))
+        if os.environ.get("THALANOR_METRICS_PORT"):
+            serve_metrics(profiler, int(os.environ["THALANOR_METRICS_PORT"]))
+    # Pokrycie scen i wyborów: THALANOR_COVERAGE=plik (zrzut co THALANOR_COVERAGE_INTERVAL s;
+    # liczniki z poprzednich uruchomień w tym pliku są doliczane)
+    close_coverage = None
+    if os.environ.get("THALANOR_COVERAGE"):
+        coverage = enable_coverage()
+        if os.path.exists(os.environ["THALANOR_COVERAGE"]):
+            coverage.merge(Coverage.load(os.environ["THALANOR_COVERAGE"]))
+        close_coverage = start_metrics_dump(coverage, os.environ["THALANOR_COVERAGE"],
+                                            float(os.environ.get("THALANOR_COVERAGE_INTERVAL", "60")))
+    # Podpowiedzi najlepszego wyboru: THALANOR_ADVISOR=tabela polityki (thalanor_analysis.py solve --advisor)
+    if os.environ.get("THALANOR_ADVISOR"):
+        enable_advisor(Advisor.load(os.environ["THALANOR_ADVISOR"]))
     try:
-        Game().run()
+        Game(lang=os.environ.get("THALANOR_LANG", DEFAULT_LANG), boot=boot).run()
     except Exception as e:
         import traceback
-        print("\n*** WYSTĄPIŁ BŁĄD ***\n")
+        print(tr("ui.crash"))
         traceback.print_exc()
-        input("\nNaciśnij Enter, aby zamknąć...")
+        input(tr("ui.press_enter"))
+    finally:
+        if close_metrics:
+            close_metrics()
+        if close_coverage:
+            close_coverage()
 